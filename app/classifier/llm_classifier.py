@@ -4,9 +4,13 @@ Uses OpenAI GPT for natural language classification
 """
 
 import json
-from typing import Dict, Any, List, Optional, Tuple
+import hashlib
+from typing import Dict, Any, List, Optional, Tuple, Callable
 from openai import OpenAI
 from app.utils import setup_logging, get_env_variable
+from app.core.api_limits import api_slot, async_api_slot
+from app.core.api_budget import BudgetExceeded, spend_credits, async_spend_credits
+from app.core.shared_cache import SharedCache, MISS
 
 
 class LLMClassifier:
@@ -14,11 +18,16 @@ class LLMClassifier:
     Classify properties as development opportunities using LLM
     """
     
-    def __init__(self):
+    def __init__(self, cache: Optional[SharedCache] = None):
+        """
+        Args:
+            cache: Optional shared cache for LLM classifications
+        """
         self.logger = setup_logging('llm_classifier')
         api_key = get_env_variable('OPENAI_API_KEY')
         self.client = OpenAI(api_key=api_key)
         self.model = "gpt-4o-mini"  # Cost-effective and fast
+        self.cache = cache
         
     def classify_listing(self, listing: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -38,18 +47,61 @@ class LLMClassifier:
         # Get classification from LLM
         classification = self._get_llm_classification(context)
         
-        # Add classification results to listing
+        return self._apply_classification(listing, classification)
+    
+    async def aclassify_listing(self, listing: Dict[str, Any], client) -> Dict[str, Any]:
+        """
+        Async variant of classify_listing
+        
+        Args:
+            listing: Property listing dictionary
+            client: AsyncOpenAI client owned by the caller's event loop
+            
+        Returns:
+            Listing with classification fields added
+        """
+        self.logger.info(f"Classifying: {listing.get('address', 'Unknown')}")
+        
+        context = self._build_classification_context(listing)
+        classification = await self._aget_llm_classification(context, client)
+        
+        return self._apply_classification(listing, classification)
+    
+    def _apply_classification(
+        self,
+        listing: Dict[str, Any],
+        classification: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Add classification results to a listing
+        
+        Args:
+            listing: Property listing dictionary
+            classification: LLM classification result
+            
+        Returns:
+            Listing with classification fields added
+        """
         listing['label'] = classification['label']
         listing['confidence'] = classification['confidence']
         listing['explanation'] = classification['explanation']
         listing['development_score'] = self._calculate_development_score(listing, classification)
         
+        # Placeholders are flagged so they are not kept as results (a listing
+        # may be re-classified after an earlier failure, so stale flags go)
+        for flag in ('classification_error', 'classification_skipped'):
+            if classification.get(flag):
+                listing[flag] = True
+            else:
+                listing.pop(flag, None)
+        
         return listing
     
     def classify_listings_batch(
         self, 
         listings: List[Dict[str, Any]],
-        batch_size: int = 5
+        batch_size: int = 5,
+        on_result: Optional[Callable[[Dict[str, Any]], None]] = None
     ) -> List[Dict[str, Any]]:
         """
         Classify multiple listings with batching
@@ -57,6 +109,8 @@ class LLMClassifier:
         Args:
             listings: List of property listings
             batch_size: Number of listings to classify at once
+            on_result: Called with each successfully classified listing as
+                soon as it is done (e.g. to checkpoint progress)
             
         Returns:
             List of classified listings
@@ -67,6 +121,8 @@ class LLMClassifier:
             try:
                 classified_listing = self.classify_listing(listing)
                 classified.append(classified_listing)
+                if on_result:
+                    on_result(classified_listing)
                 
                 if (i + 1) % 10 == 0:
                     self.logger.info(f"Classified {i + 1}/{len(listings)} listings")
@@ -78,6 +134,7 @@ class LLMClassifier:
                 listing['confidence'] = 0.0
                 listing['explanation'] = f"Classification error: {str(e)}"
                 listing['development_score'] = 0.0
+                listing['classification_error'] = True
                 classified.append(listing)
         
         self.logger.info(f"Completed classification: {len(classified)} listings")
@@ -155,6 +212,83 @@ class LLMClassifier:
         Returns:
             Classification dictionary
         """
+        cache_key = self._classification_cache_key(context)
+        if self.cache:
+            cached = self.cache.get('classification', cache_key)
+            if cached is not MISS:
+                return cached
+        
+        try:
+            spend_credits('openai')
+            with api_slot('openai'):
+                response = self.client.chat.completions.create(**self._completion_request(context))
+            
+            classification = self._parse_classification(response.choices[0].message.content)
+            if self.cache:
+                self.cache.set('classification', cache_key, classification)
+            return classification
+            
+        except json.JSONDecodeError as e:
+            self.logger.error(f"Failed to parse LLM response as JSON: {e}")
+            return self._error_classification('Error parsing LLM response')
+        except BudgetExceeded as e:
+            self.logger.warning(f"LLM classification skipped: {e}")
+            return self._error_classification(f'Classification skipped: {str(e)}', skipped=True)
+        except Exception as e:
+            self.logger.error(f"LLM classification error: {e}")
+            return self._error_classification(f'Classification error: {str(e)}')
+    
+    async def _aget_llm_classification(self, context: str, client) -> Dict[str, Any]:
+        """
+        Async variant of _get_llm_classification
+        
+        Args:
+            context: Property context string
+            client: AsyncOpenAI client owned by the caller's event loop
+            
+        Returns:
+            Classification dictionary
+        """
+        cache_key = self._classification_cache_key(context)
+        if self.cache:
+            cached = self.cache.get('classification', cache_key)
+            if cached is not MISS:
+                return cached
+        
+        try:
+            await async_spend_credits('openai')
+            async with async_api_slot('openai'):
+                response = await client.chat.completions.create(**self._completion_request(context))
+            
+            classification = self._parse_classification(response.choices[0].message.content)
+            if self.cache:
+                self.cache.set('classification', cache_key, classification)
+            return classification
+            
+        except json.JSONDecodeError as e:
+            self.logger.error(f"Failed to parse LLM response as JSON: {e}")
+            return self._error_classification('Error parsing LLM response')
+        except BudgetExceeded as e:
+            self.logger.warning(f"LLM classification skipped: {e}")
+            return self._error_classification(f'Classification skipped: {str(e)}', skipped=True)
+        except Exception as e:
+            self.logger.error(f"LLM classification error: {e}")
+            return self._error_classification(f'Classification error: {str(e)}')
+    
+    def _classification_cache_key(self, context: str) -> str:
+        """Cache key for a classification: model and context together"""
+        return hashlib.sha256(f"{self.model}\n{context}".encode('utf-8')).hexdigest()
+    
+    def _completion_request(self, context: str) -> Dict[str, Any]:
+        """
+        Build the chat completion request for a property context
+        
+        Args:
+            context: Property context string
+            
+        Returns:
+            Keyword arguments for chat.completions.create
+        """
         system_prompt = """You are a real estate development opportunity classifier. 
 Your task is to analyze property listings and determine if they represent good development or teardown opportunities.
 
@@ -185,51 +319,60 @@ Provide your response in JSON format with these fields:
 
 Respond in JSON format only."""
         
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=0.3,
-                max_tokens=200,
-                response_format={"type": "json_object"}
-            )
-            
-            result_text = response.choices[0].message.content
-            result = json.loads(result_text)
-            
-            # Validate and normalize response
-            classification = {
-                'label': result.get('label', 'unknown').lower(),
-                'confidence': float(result.get('confidence', 0.0)),
-                'explanation': result.get('explanation', 'No explanation provided')
-            }
-            
-            # Ensure label is valid
-            if classification['label'] not in ['development', 'potential', 'no', 'unknown']:
-                classification['label'] = 'unknown'
-            
-            # Ensure confidence is in valid range
-            classification['confidence'] = max(0.0, min(1.0, classification['confidence']))
+        return {
+            'model': self.model,
+            'messages': [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            'temperature': 0.3,
+            'max_tokens': 200,
+            'response_format': {"type": "json_object"}
+        }
+    
+    def _parse_classification(self, result_text: str) -> Dict[str, Any]:
+        """
+        Validate and normalize the LLM's JSON response
+        
+        Args:
+            result_text: Raw message content from the LLM
             
-            return classification
+        Returns:
+            Classification dictionary
             
-        except json.JSONDecodeError as e:
-            self.logger.error(f"Failed to parse LLM response as JSON: {e}")
-            return {
-                'label': 'unknown',
-                'confidence': 0.0,
-                'explanation': 'Error parsing LLM response'
-            }
-        except Exception as e:
-            self.logger.error(f"LLM classification error: {e}")
-            return {
-                'label': 'unknown',
-                'confidence': 0.0,
-                'explanation': f'Classification error: {str(e)}'
-            }
+        Raises:
+            json.JSONDecodeError: If the response is not valid JSON
+        """
+        result = json.loads(result_text)
+        
+        classification = {
+            'label': result.get('label', 'unknown').lower(),
+            'confidence': float(result.get('confidence', 0.0)),
+            'explanation': result.get('explanation', 'No explanation provided')
+        }
+        
+        # Ensure label is valid
+        if classification['label'] not in ['development', 'potential', 'no', 'unknown']:
+            classification['label'] = 'unknown'
+        
+        # Ensure confidence is in valid range
+        classification['confidence'] = max(0.0, min(1.0, classification['confidence']))
+        
+        return classification
+    
+    @staticmethod
+    def _error_classification(explanation: str, skipped: bool = False) -> Dict[str, Any]:
+        """
+        Placeholder classification used when the LLM call fails, or is
+        skipped because the API budget refused it
+        """
+        return {
+            'label': 'unknown',
+            'confidence': 0.0,
+            'explanation': explanation,
+            'classification_error': True,
+            'classification_skipped': skipped
+        }
     
     def _calculate_development_score(
         self, 
@@ -323,14 +466,9 @@ Respond in JSON format only."""
         Returns:
             Filtered list of development opportunities
         """
-        valid_labels = ['development']
-        if include_potential:
-            valid_labels.append('potential')
-        
         filtered = [
             listing for listing in listings
-            if listing.get('label') in valid_labels
-            and listing.get('development_score', 0) >= min_score
+            if self.is_development_opportunity(listing, min_score, include_potential)
         ]
         
         # Sort by development score (descending)
@@ -338,6 +476,27 @@ Respond in JSON format only."""
         
         self.logger.info(f"Filtered {len(filtered)} development opportunities from {len(listings)} listings")
         return filtered
+    
+    @staticmethod
+    def is_development_opportunity(
+        listing: Dict[str, Any],
+        min_score: float = 50.0,
+        include_potential: bool = True
+    ) -> bool:
+        """
+        Whether a classified listing passes filter_development_opportunities
+        
+        Args:
+            listing: Classified listing
+            min_score: Minimum development score threshold
+            include_potential: Whether to include 'potential' classifications
+        """
+        valid_labels = ['development']
+        if include_potential:
+            valid_labels.append('potential')
+        
+        return (listing.get('label') in valid_labels
+                and listing.get('development_score', 0) >= min_score)
 
 
 # Example usage
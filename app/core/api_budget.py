@@ -0,0 +1,202 @@
+"""
+Credit budgets for external APIs
+SerpAPI, OpenAI and Google Sheets calls reserve credits before they are
+made, against per-run limits and rolling-window limits (e.g. a monthly
+SerpAPI plan). Every reservation is written to a ledger in the historical
+database, so spending is visible and window limits hold across runs.
+"""
+
+import os
+import asyncio
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+# Share of each limit held back from lower-priority work: once less than
+# this share is left, calls of that priority are refused so the rest stays
+# available for higher-value calls
+PRIORITY_RESERVE = {
+    'high': 0.0,     # e.g. publishing results to Sheets
+    'normal': 0.1,   # e.g. first result pages, classifications
+    'low': 0.3,      # e.g. deeper result pages, Google Maps lookups
+}
+
+# Rolling window per service for limits configured as <SERVICE>_CREDIT_LIMIT
+DEFAULT_WINDOW_DAYS = {
+    'serpapi': 30,   # SerpAPI plans are monthly
+    'openai': 1,
+    'sheets': 1,
+}
+
+
+class BudgetExceeded(Exception):
+    """Raised when a call would spend more credits than its budget allows"""
+
+
+def window_limits_from_env() -> Dict[str, Tuple[float, float]]:
+    """
+    Rolling-window limits configured in the environment
+
+    <SERVICE>_CREDIT_LIMIT sets the credits a service may spend per window
+    (e.g. SERPAPI_CREDIT_LIMIT=5000); <SERVICE>_CREDIT_WINDOW_DAYS overrides
+    its DEFAULT_WINDOW_DAYS.
+
+    Returns:
+        Dictionary of service name -> (credit limit, window in seconds)
+    """
+    limits = {}
+    for service, days in DEFAULT_WINDOW_DAYS.items():
+        limit = os.getenv(f"{service.upper()}_CREDIT_LIMIT")
+        if limit:
+            days = float(os.getenv(f"{service.upper()}_CREDIT_WINDOW_DAYS", days))
+            limits[service] = (float(limit), days * 86400)
+    return limits
+
+
+class ApiBudget:
+    """
+    Per-run and rolling-window credit limits for external APIs
+
+    Per-run spending is counted in memory. Services with a window limit are
+    checked against the database ledger on every reservation, in one
+    transaction with the ledger write, so concurrent runs (e.g. the workers
+    of a multi-location run) share the window. Reservations of the other
+    services are buffered and written to the ledger by flush().
+    """
+
+    def __init__(
+        self,
+        run_limits: Optional[Dict[str, float]] = None,
+        window_limits: Optional[Dict[str, Tuple[float, float]]] = None,
+        ledger=None,
+        location: Optional[str] = None
+    ):
+        """
+        Args:
+            run_limits: Most credits per service for this run
+            window_limits: Service name -> (credit limit, window in seconds)
+            ledger: HistoricalDatabaseManager the reservations are written to
+                (window limits are not enforced without one)
+            location: Location of the run, stored with its ledger entries
+        """
+        self.run_limits = dict(run_limits or {})
+        self.window_limits = dict(window_limits or {}) if ledger is not None else {}
+        self.ledger = ledger
+        self.location = location
+        self.spent: Dict[str, float] = {}
+        self.calls: Dict[str, int] = {}
+        self.refused: Dict[str, int] = {}
+        self._pending: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def reserve(self, service: str, credits: float = 1.0, priority: str = 'normal') -> None:
+        """
+        Spend credits on one call, before making it
+
+        Args:
+            service: Service name ('serpapi', 'openai', 'sheets')
+            credits: Credits the call costs
+            priority: 'high', 'normal' or 'low' (see PRIORITY_RESERVE)
+
+        Raises:
+            BudgetExceeded: If the run or window limit would be exceeded
+        """
+        share = 1.0 - PRIORITY_RESERVE[priority]
+        entry = {
+            'service': service,
+            'credits': credits,
+            'priority': priority,
+            'location': self.location,
+            'used_at': datetime.now().isoformat(timespec='microseconds'),
+        }
+
+        with self._lock:
+            limit = self.run_limits.get(service)
+            if limit is not None and self.spent.get(service, 0) + credits > limit * share:
+                self._refuse(service)
+                raise BudgetExceeded(f"{service} run budget spent ({self.spent.get(service, 0):g}/{limit:g} "
+                                     f"credits, {priority} priority)")
+
+            if service in self.window_limits:
+                window_limit, window_seconds = self.window_limits[service]
+                since = (datetime.now() - timedelta(seconds=window_seconds)).isoformat(timespec='microseconds')
+                try:
+                    granted = self.ledger.reserve_api_credits(entry, window_limit * share, since)
+                except Exception:
+                    # Ledger unavailable: don't block the run, write the entry at flush()
+                    granted = True
+                    self._pending.append(entry)
+                if not granted:
+                    self._refuse(service)
+                    raise BudgetExceeded(f"{service} credit limit of {window_limit:g} per "
+                                         f"{window_seconds / 86400:g} days reached ({priority} priority)")
+            else:
+                self._pending.append(entry)
+
+            self.spent[service] = self.spent.get(service, 0) + credits
+            self.calls[service] = self.calls.get(service, 0) + 1
+
+    def flush(self) -> int:
+        """
+        Write buffered reservations to the ledger
+
+        Returns:
+            Number of entries written
+        """
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if pending and self.ledger is not None:
+            self.ledger.record_api_usage(pending)
+        return len(pending)
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Credits spent, calls made and calls refused this run, per service"""
+        with self._lock:
+            services = set(self.spent) | set(self.refused) | set(self.run_limits)
+            return {
+                service: {
+                    'credits': self.spent.get(service, 0),
+                    'calls': self.calls.get(service, 0),
+                    'refused': self.refused.get(service, 0),
+                    'run_limit': self.run_limits.get(service),
+                }
+                for service in sorted(services)
+            }
+
+    def _refuse(self, service: str) -> None:
+        self.refused[service] = self.refused.get(service, 0) + 1
+
+
+_budget: Optional[ApiBudget] = None
+
+
+def install_api_budget(budget: Optional[ApiBudget]) -> None:
+    """Make the given budget the one spend_credits reserves against in this process (None removes it)"""
+    global _budget
+    _budget = budget
+
+
+def spend_credits(service: str, credits: float = 1.0, priority: str = 'normal') -> None:
+    """
+    Reserve credits against the installed budget before calling a service
+
+    Without an installed budget, e.g. outside pipeline runs, calls are not
+    limited or recorded.
+
+    Raises:
+        BudgetExceeded: If the installed budget refuses the call
+    """
+    budget = _budget
+    if budget is not None:
+        budget.reserve(service, credits, priority)
+
+
+async def async_spend_credits(service: str, credits: float = 1.0, priority: str = 'normal') -> None:
+    """Async variant of spend_credits (ledger checks run in a worker thread)"""
+    budget = _budget
+    if budget is None:
+        return
+    if service in budget.window_limits:
+        await asyncio.to_thread(budget.reserve, service, credits, priority)
+    else:
+        budget.reserve(service, credits, priority)
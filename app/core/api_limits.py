@@ -0,0 +1,179 @@
+"""
+Global concurrency caps for external APIs
+Lets every thread and worker process share one limit per service, and
+counts the calls made to each service in this process. The async pipeline
+uses asyncio semaphores with the same service names and call counts.
+Services with a published request rate are also paced by a token bucket
+per process, whether or not a cap is installed.
+"""
+
+import time
+import asyncio
+import threading
+import multiprocessing
+from collections import Counter
+from contextlib import contextmanager, asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+from app.core.rate_limit import TokenBucket
+
+# Default simultaneous in-flight calls per external service
+DEFAULT_API_CONCURRENCY = {
+    'serpapi': 2,
+    'nominatim': 1,     # OSM usage policy: one request at a time
+    'newton_gis': 4,
+    'openai': 8,
+}
+
+# Async callers don't hold a thread while waiting, so caps can be wider
+DEFAULT_ASYNC_API_CONCURRENCY = {
+    'serpapi': 5,
+    'nominatim': 1,
+    'newton_gis': 16,
+    'openai': 32,
+}
+
+# Requests per second for services with a usage policy; concurrency caps
+# alone let fast or cached responses go back to back
+DEFAULT_API_RATES = {
+    'nominatim': 1.0,   # OSM usage policy: at most one request per second
+}
+
+_limits: Dict[str, Any] = {}
+_rates: Dict[str, float] = dict(DEFAULT_API_RATES)
+_buckets: Dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+_async_limits: ContextVar[Dict[str, asyncio.Semaphore]] = ContextVar('async_api_limits', default={})
+_call_counts: Counter = Counter()
+_counts_lock = threading.Lock()
+
+
+def create_api_limits(
+    concurrency: Optional[Dict[str, int]] = None,
+    context: Optional[Any] = None
+) -> Dict[str, Any]:
+    """
+    Create cross-process semaphores, one per service
+
+    The result can be passed to worker processes (e.g. as a pool initializer
+    argument) and installed there with install_api_limits.
+
+    Args:
+        concurrency: Per-service caps, merged over DEFAULT_API_CONCURRENCY
+        context: multiprocessing context the workers are started with
+
+    Returns:
+        Dictionary of service name -> semaphore
+    """
+    context = context or multiprocessing.get_context()
+    caps = dict(DEFAULT_API_CONCURRENCY)
+    caps.update(concurrency or {})
+    return {service: context.BoundedSemaphore(max(1, cap)) for service, cap in caps.items()}
+
+
+def install_api_limits(limits: Dict[str, Any]) -> None:
+    """Make the given semaphores the caps used by api_slot in this process"""
+    _limits.clear()
+    _limits.update(limits)
+
+
+def install_api_rates(rates: Dict[str, float]) -> None:
+    """Make the given requests per second the pacing used by api_slot in this process ({} disables it)"""
+    with _buckets_lock:
+        _rates.clear()
+        _rates.update(rates)
+        _buckets.clear()
+
+
+def _rate_delay(service: str) -> float:
+    """Seconds to wait before the next call to a rate-limited service (0 for others)"""
+    rate = _rates.get(service)
+    if rate is None:
+        return 0.0
+    with _buckets_lock:
+        bucket = _buckets.get(service)
+        if bucket is None:
+            bucket = _buckets[service] = TokenBucket(rate)
+    return bucket.reserve()
+
+
+@contextmanager
+def api_slot(service: str):
+    """
+    Hold one concurrency slot for a service while calling it
+
+    The call is always counted (see api_call_counts). When no cap is
+    installed for the service, e.g. in single-process runs, it is not
+    capped; services with a rate (DEFAULT_API_RATES) are paced either way.
+    """
+    with _counts_lock:
+        _call_counts[service] += 1
+    semaphore = _limits.get(service)
+    if semaphore is not None:
+        semaphore.acquire()
+    try:
+        # Paced inside the slot, so the calls themselves start at least 1/rate apart
+        delay = _rate_delay(service)
+        if delay > 0:
+            time.sleep(delay)
+        yield
+    finally:
+        if semaphore is not None:
+            semaphore.release()
+
+
+def create_async_limits(concurrency: Optional[Dict[str, int]] = None) -> Dict[str, asyncio.Semaphore]:
+    """
+    Create asyncio semaphores, one per service
+
+    Args:
+        concurrency: Per-service caps, merged over DEFAULT_ASYNC_API_CONCURRENCY
+
+    Returns:
+        Dictionary of service name -> semaphore
+    """
+    caps = dict(DEFAULT_ASYNC_API_CONCURRENCY)
+    caps.update(concurrency or {})
+    return {service: asyncio.Semaphore(max(1, cap)) for service, cap in caps.items()}
+
+
+def install_async_limits(limits: Dict[str, asyncio.Semaphore]) -> None:
+    """
+    Make the given semaphores the caps used by async_api_slot
+
+    The limits are held in a context variable, so they apply to the current
+    task and every task it creates afterwards.
+    """
+    _async_limits.set(limits)
+
+
+@asynccontextmanager
+async def async_api_slot(service: str):
+    """
+    Async variant of api_slot: hold one asyncio slot for a service
+
+    Calls are counted together with api_slot calls, and share its rate
+    pacing. When no cap is installed for the service in the current
+    context, it is not capped.
+    """
+    with _counts_lock:
+        _call_counts[service] += 1
+    semaphore = _async_limits.get().get(service)
+    if semaphore is None:
+        delay = _rate_delay(service)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        yield
+        return
+    async with semaphore:
+        delay = _rate_delay(service)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        yield
+
+
+def api_call_counts() -> Dict[str, int]:
+    """Snapshot of external calls made through api_slot in this process, per service"""
+    with _counts_lock:
+        return dict(_call_counts)
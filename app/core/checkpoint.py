@@ -0,0 +1,178 @@
+"""
+Per-stage checkpoints for resumable pipeline runs
+Stores raw, enriched and classified records incrementally as JSONL under data/checkpoints/<run_id>/.
+A run deletes its checkpoint once it finishes; checkpoints of runs that never
+finished are pruned after RETENTION_DAYS
+"""
+
+import json
+import time
+import uuid
+import shutil
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+from app.utils import DATA_DIR
+
+CHECKPOINT_DIR = DATA_DIR / "checkpoints"
+
+# Days an unfinished run's checkpoint is kept for --resume
+RETENTION_DAYS = 7
+
+
+class RunCheckpoint:
+    """
+    Incremental on-disk state of a single pipeline run
+
+    Layout:
+    - run.json: run parameters and the list of completed stages
+    - <stage>.jsonl: one record per line, appended as each item finishes
+
+    A crash can leave a truncated last line; it is ignored on load, so at
+    most the item in flight is redone on resume.
+    """
+
+    STAGES = ('raw', 'enriched', 'classified')
+
+    def __init__(self, run_id: str, root: Optional[Path] = None):
+        """
+        Args:
+            run_id: Checkpoint run identifier (see new_run_id)
+            root: Directory holding all checkpoints (defaults to data/checkpoints)
+        """
+        self.run_id = run_id
+        self.path = Path(root or CHECKPOINT_DIR) / run_id
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def new_run_id() -> str:
+        """Generate a sortable, unique checkpoint run id"""
+        return f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+
+    @classmethod
+    def create(cls, params: Dict[str, Any], root: Optional[Path] = None) -> 'RunCheckpoint':
+        """
+        Start checkpointing a new run
+
+        Args:
+            params: Run parameters needed to resume it later
+            root: Checkpoint root directory
+
+        Returns:
+            New RunCheckpoint
+        """
+        checkpoint = cls(cls.new_run_id(), root=root)
+        checkpoint.path.mkdir(parents=True, exist_ok=True)
+        checkpoint._write_meta({'run_id': checkpoint.run_id, 'params': params, 'completed': []})
+        return checkpoint
+
+    @classmethod
+    def open(cls, run_id: str, root: Optional[Path] = None) -> 'RunCheckpoint':
+        """
+        Open an existing checkpoint to resume it
+
+        Raises:
+            FileNotFoundError: If no checkpoint exists for run_id
+        """
+        checkpoint = cls(run_id, root=root)
+        if not checkpoint._meta_path.exists():
+            raise FileNotFoundError(f"No checkpoint found for run {run_id} in {checkpoint.path.parent}")
+        return checkpoint
+
+    @classmethod
+    def prune(cls, max_age_days: float = RETENTION_DAYS, root: Optional[Path] = None) -> int:
+        """
+        Delete checkpoints not written to for max_age_days (runs that crashed
+        and were never resumed)
+
+        Returns:
+            Number of checkpoints deleted
+        """
+        root = Path(root or CHECKPOINT_DIR)
+        if not root.exists():
+            return 0
+        cutoff = time.time() - max_age_days * 86400
+        pruned = 0
+        for path in root.iterdir():
+            meta_path = path / 'run.json'
+            if path.is_dir() and meta_path.exists() and meta_path.stat().st_mtime < cutoff:
+                shutil.rmtree(path, ignore_errors=True)
+                pruned += 1
+        return pruned
+
+    def delete(self) -> None:
+        """Delete the checkpoint (once its run has finished)"""
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    @property
+    def params(self) -> Dict[str, Any]:
+        return self._read_meta().get('params', {})
+
+    def append(self, stage: str, record: Dict[str, Any]) -> None:
+        """Append one finished record to a stage"""
+        line = json.dumps(record, default=str, ensure_ascii=False)
+        with self._lock:
+            with open(self._stage_path(stage), 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+                f.flush()
+
+    def write_all(self, stage: str, records: List[Dict[str, Any]]) -> None:
+        """Write a whole stage at once and mark it complete"""
+        with self._lock:
+            with open(self._stage_path(stage), 'w', encoding='utf-8') as f:
+                for record in records:
+                    f.write(json.dumps(record, default=str, ensure_ascii=False) + '\n')
+        self.mark_complete(stage)
+
+    def load(self, stage: str) -> List[Dict[str, Any]]:
+        """Load every intact record written for a stage"""
+        path = self._stage_path(stage)
+        if not path.exists():
+            return []
+
+        records = []
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue  # Truncated write from a crash
+        return records
+
+    def load_by_key(self, stage: str, key: str = 'address') -> Dict[str, Dict[str, Any]]:
+        """Load a stage as a dict keyed by record field (last write wins)"""
+        return {record[key]: record for record in self.load(stage) if record.get(key)}
+
+    def completed_keys(self, stage: str, key: str = 'address') -> Set[str]:
+        return set(self.load_by_key(stage, key))
+
+    def mark_complete(self, stage: str) -> None:
+        with self._lock:
+            meta = self._read_meta()
+            if stage not in meta['completed']:
+                meta['completed'].append(stage)
+            self._write_meta(meta)
+
+    def is_complete(self, stage: str) -> bool:
+        return stage in self._read_meta().get('completed', [])
+
+    @property
+    def _meta_path(self) -> Path:
+        return self.path / 'run.json'
+
+    def _stage_path(self, stage: str) -> Path:
+        if stage not in self.STAGES:
+            raise ValueError(f"Unknown checkpoint stage: {stage}")
+        return self.path / f"{stage}.jsonl"
+
+    def _read_meta(self) -> Dict[str, Any]:
+        with open(self._meta_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _write_meta(self, meta: Dict[str, Any]) -> None:
+        tmp_path = self._meta_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2, default=str)
+        tmp_path.replace(self._meta_path)
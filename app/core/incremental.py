@@ -0,0 +1,43 @@
+"""
+Listing fingerprints for incremental runs
+Detects listings whose source data is unchanged since they were last processed
+"""
+
+import json
+import hashlib
+from typing import Any, Dict
+
+# Source fields that can change a listing's enrichment or classification.
+# Search snippets are left out on purpose: Google varies them per query.
+FINGERPRINT_FIELDS = (
+    'address', 'price', 'description', 'notes',
+    'beds', 'baths', 'sqft', 'lot_size', 'status',
+)
+
+
+def _normalize(value: Any) -> Any:
+    if value is None or value == '':
+        return None
+    if isinstance(value, str):
+        return ' '.join(value.split()).lower()
+    if isinstance(value, (int, float)):
+        return round(float(value), 2)
+    return str(value)
+
+
+def listing_fingerprint(listing: Dict[str, Any]) -> str:
+    """
+    Stable hash of the listing fields that drive enrichment and classification
+
+    Whitespace, case and int/float differences are normalized away, so the
+    same listing scraped twice yields the same fingerprint.
+
+    Args:
+        listing: Raw listing (before enrichment)
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    payload = {field: _normalize(listing.get(field)) for field in FINGERPRINT_FIELDS}
+    encoded = json.dumps(payload, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
@@ -0,0 +1,151 @@
+"""
+Per-stage timing and resource profiling for pipeline runs
+Records wall time, CPU time, peak RSS, item counts and external API calls
+"""
+
+import time
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from app.core.api_limits import api_call_counts
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+def current_rss_mb() -> Optional[float]:
+    """Resident set size of this process in MB (None if psutil is unavailable)"""
+    if psutil is None:
+        return None
+    return psutil.Process().memory_info().rss / (1024 * 1024)
+
+
+@dataclass
+class StageProfile:
+    """Resource usage of one pipeline stage"""
+    stage: str
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    peak_rss_mb: Optional[float] = None
+    items: Optional[int] = None
+    external_calls: Dict[str, int] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict:
+        return {
+            'stage': self.stage,
+            'wall_seconds': round(self.wall_seconds, 3),
+            'cpu_seconds': round(self.cpu_seconds, 3),
+            'peak_rss_mb': round(self.peak_rss_mb, 1) if self.peak_rss_mb is not None else None,
+            'items': self.items,
+            'external_calls': dict(self.external_calls),
+        }
+
+
+class StageProfiler:
+    """
+    Collects a StageProfile per pipeline stage
+
+    Usage:
+        profiler = StageProfiler()
+        with profiler.stage('enrich') as profile:
+            listings = enrich(listings)
+            profile.items = len(listings)
+
+    CPU time and external call counts are process-wide, so stages that run
+    concurrently (e.g. the output sinks) share what happens in their
+    overlapping windows. Peak RSS is sampled by a background thread that
+    only runs while a stage is active.
+    """
+
+    def __init__(self, sample_interval: float = 0.1):
+        """
+        Args:
+            sample_interval: Seconds between RSS samples while stages are active
+        """
+        self.sample_interval = sample_interval
+        self.profiles: List[StageProfile] = []
+        self._active: List[StageProfile] = []
+        self._lock = threading.Lock()
+        self._sampler: Optional[threading.Thread] = None
+
+    @contextmanager
+    def stage(self, name: str):
+        """Profile the enclosed block as stage `name` (safe to use from several threads)"""
+        profile = StageProfile(stage=name, peak_rss_mb=current_rss_mb())
+        calls_before = api_call_counts()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+
+        with self._lock:
+            self.profiles.append(profile)
+            self._active.append(profile)
+            self._ensure_sampler()
+        try:
+            yield profile
+        finally:
+            profile.wall_seconds = time.perf_counter() - wall_start
+            profile.cpu_seconds = time.process_time() - cpu_start
+            calls_after = api_call_counts()
+            profile.external_calls = {
+                service: count - calls_before.get(service, 0)
+                for service, count in calls_after.items()
+                if count - calls_before.get(service, 0) > 0
+            }
+            with self._lock:
+                self._active.remove(profile)
+            self._record_rss([profile])
+
+    def get(self, name: str) -> Optional[StageProfile]:
+        """Most recent profile recorded for a stage"""
+        for profile in reversed(self.profiles):
+            if profile.stage == name:
+                return profile
+        return None
+
+    def to_dicts(self) -> List[Dict]:
+        return [profile.to_dict() for profile in self.profiles]
+
+    def wrap(self, name: str, func: Callable[[], Any], items: Optional[int] = None) -> Callable[[], Any]:
+        """
+        Wrap a no-argument callable so each call is profiled as stage `name`
+
+        Handy for stages handed to a StageGraph.
+        """
+        def profiled():
+            with self.stage(name) as profile:
+                profile.items = items
+                return func()
+        return profiled
+
+    def _ensure_sampler(self):
+        if psutil is None or self._sampler is not None:
+            return
+        self._sampler = threading.Thread(target=self._sample, name='stage-profiler', daemon=True)
+        self._sampler.start()
+
+    def _sample(self):
+        while True:
+            time.sleep(self.sample_interval)
+            rss = current_rss_mb()
+            with self._lock:
+                if not self._active:
+                    self._sampler = None
+                    return
+                self._update_peak(self._active, rss)
+
+    def _record_rss(self, profiles: List[StageProfile]):
+        rss = current_rss_mb()
+        with self._lock:
+            self._update_peak(profiles, rss)
+
+    @staticmethod
+    def _update_peak(profiles: List[StageProfile], rss: Optional[float]):
+        if rss is None:
+            return
+        for profile in profiles:
+            if profile.peak_rss_mb is None or rss > profile.peak_rss_mb:
+                profile.peak_rss_mb = rss
@@ -0,0 +1,192 @@
+"""
+Search query template yield analytics and budget planning
+Tracks what each address-focused query template returns (results, real
+addresses, new addresses, high-score leads) and spends a per-run SerpAPI
+page budget on the templates that have yielded best in earlier runs
+"""
+
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.scraper.search_query_builder import SearchQueryBuilder
+
+# Classified listings at or above this development score count as high-score leads
+HIGH_SCORE_THRESHOLD = 70.0
+
+# Counters kept per template, per run and accumulated across runs
+YIELD_FIELDS = ('pages', 'results', 'real_addresses', 'new_addresses', 'high_score_leads')
+
+# Counters kept per swept street
+STREET_FIELDS = ('results', 'real_addresses', 'new_addresses')
+
+# Template name the yield of street-sweep queries is tracked under
+STREET_SWEEP_TEMPLATE = 'street_sweep'
+
+
+@dataclass
+class PlannedQuery:
+    """One search query of a run's plan"""
+    template: str
+    query: str
+    max_pages: int
+    street: Optional[str] = None  # Set on street-sweep queries
+
+
+def _address_key(listing: Dict[str, Any]) -> str:
+    return (listing.get('address', '') or listing.get('title', '')).strip().lower()
+
+
+class QueryYieldTracker:
+    """
+    Per-run yield counters for each query template
+
+    Real addresses are the results SearchQueryBuilder.extract_real_addresses
+    keeps; new addresses are real addresses not already known (e.g. stored in
+    the historical database) and not found by an earlier query in the run.
+    Real-address listings are tagged with their 'query_template', so the
+    high-score leads they turn into can be credited after classification.
+    """
+
+    def __init__(self, known_addresses: Optional[Callable[[List[str]], Set[str]]] = None):
+        """
+        Args:
+            known_addresses: Returns the subset of the given addresses seen in
+                earlier runs (None counts every address as new)
+        """
+        self.known_addresses = known_addresses
+        self.templates: Dict[str, Dict[str, int]] = {}
+        self.streets: Dict[str, Dict[str, int]] = {}
+        self._seen: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def record_search(self, template: str, results: List[Dict[str, Any]], street: Optional[str] = None) -> None:
+        """
+        Count one query's raw search results
+
+        Args:
+            template: Template name the query was built from
+            results: Listings returned across all of the query's pages
+                (tagged with 'search_page' by LLMSearch)
+            street: Street a street-sweep query searched (also counted per street)
+        """
+        real = SearchQueryBuilder.extract_real_addresses(results)
+        addresses = [_address_key(listing) for listing in real]
+        known = self.known_addresses(addresses) if self.known_addresses and addresses else set()
+
+        with self._lock:
+            counts = self.templates.setdefault(template, dict.fromkeys(YIELD_FIELDS, 0))
+            # A query that came back empty still cost its first page
+            counts['pages'] += max([1] + [listing.get('search_page', 1) for listing in results])
+            counts['results'] += len(results)
+            counts['real_addresses'] += len(real)
+            new = 0
+            for listing in real:
+                listing['query_template'] = template
+                address = _address_key(listing)
+                if address and address not in known and address not in self._seen:
+                    self._seen.add(address)
+                    new += 1
+            counts['new_addresses'] += new
+
+            if street:
+                street_counts = self.streets.setdefault(street, dict.fromkeys(STREET_FIELDS, 0))
+                street_counts['results'] += len(results)
+                street_counts['real_addresses'] += len(real)
+                street_counts['new_addresses'] += new
+
+    def record_leads(self, classified_listings: Iterable[Dict[str, Any]]) -> None:
+        """Credit each high-score lead to the template that found it"""
+        with self._lock:
+            for listing in classified_listings:
+                template = listing.get('query_template')
+                if template in self.templates and \
+                        float(listing.get('development_score', 0) or 0) >= HIGH_SCORE_THRESHOLD:
+                    self.templates[template]['high_score_leads'] += 1
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Per-template counters, in the order templates were first searched"""
+        return [{'template': name, **counts} for name, counts in self.templates.items()]
+
+    def street_dicts(self) -> List[Dict[str, Any]]:
+        """Per-street counters of the streets swept this run"""
+        return [{'street': street, **counts} for street, counts in self.streets.items()]
+
+
+class QueryPlanner:
+    """
+    Chooses which query templates a run searches, and how deep
+
+    Templates are ranked by their smoothed lead value per page. Templates
+    with little history start from an optimistic prior, so new or rarely
+    used templates still get tried before the ranking settles.
+    """
+
+    # Weight of a high-score lead relative to one new address
+    HIGH_SCORE_WEIGHT = 5.0
+
+    # Prior: value per page assumed for a template, worth this many pages of history
+    PRIOR_VALUE_PER_PAGE = 2.0
+    PRIOR_PAGES = 2
+
+    # Value of each further result page relative to the page before it
+    DEPTH_DECAY = 0.5
+
+    def score(self, stats: Optional[Dict[str, Any]]) -> float:
+        """
+        Expected lead value per SerpAPI page of a template
+
+        Args:
+            stats: Accumulated counters of the template (None if never run)
+
+        Returns:
+            Smoothed (new addresses + weighted high-score leads) per page
+        """
+        stats = stats or {}
+        value = stats.get('new_addresses', 0) + self.HIGH_SCORE_WEIGHT * stats.get('high_score_leads', 0)
+        prior = self.PRIOR_VALUE_PER_PAGE * self.PRIOR_PAGES
+        return (value + prior) / (stats.get('pages', 0) + self.PRIOR_PAGES)
+
+    def plan(
+        self,
+        templates: List[Tuple[str, str]],
+        stats: Dict[str, Dict[str, Any]],
+        budget: Optional[int] = None,
+        max_pages: int = 3
+    ) -> List[PlannedQuery]:
+        """
+        Spend a page budget on the best-yielding templates
+
+        Pages are handed out one at a time to whichever template's next page
+        is worth most: a template's first page is worth its score, and each
+        deeper page DEPTH_DECAY times the one before it, since deeper pages
+        mostly repeat addresses. Paginated searches also stop early on low
+        yield, so a run can spend less than its budget.
+
+        Args:
+            templates: (template name, search query) tuples
+            stats: Accumulated counters per template name
+            budget: Most SerpAPI pages for the run (None runs every template
+                to max_pages, in template order)
+            max_pages: Most pages per query
+
+        Returns:
+            Planned queries, best template first
+        """
+        if budget is None:
+            return [PlannedQuery(name, query, max_pages) for name, query in templates]
+
+        scores = {name: self.score(stats.get(name)) for name, _ in templates}
+        pages = [
+            (scores[name] * self.DEPTH_DECAY ** depth, name)
+            for name, _ in templates
+            for depth in range(max_pages)
+        ]
+        # Stable sort: ties go to earlier templates, and to shallower pages
+        pages.sort(key=lambda page: page[0], reverse=True)
+        allocated: Dict[str, int] = {}
+        for _, name in pages[:max(0, budget)]:
+            allocated[name] = allocated.get(name, 0) + 1
+
+        ranked = sorted(templates, key=lambda entry: scores[entry[0]], reverse=True)
+        return [PlannedQuery(name, query, allocated[name]) for name, query in ranked if name in allocated]
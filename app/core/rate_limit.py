@@ -0,0 +1,107 @@
+"""
+Request-rate limiting for external APIs
+A token bucket shared by every thread (or task) calling one API, with a
+shared pause for backing off when the API answers 429 Too Many Requests
+"""
+
+import random
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """
+    Token bucket limiter: `rate` requests per second on average, with bursts
+    of up to `capacity` requests
+
+    Callers reserve a token and then wait the returned delay themselves,
+    so the same bucket serves blocking threads (time.sleep) and asyncio
+    tasks (asyncio.sleep).
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        """
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum tokens saved up for a burst
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()  # In the future while paused
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """
+        Take one token
+
+        Returns:
+            Seconds to wait before making the request
+        """
+        with self._lock:
+            now = self._refill()
+            self._tokens -= 1
+            return (self._updated - now) + max(0.0, -self._tokens / self.rate)
+
+    def acquire(self) -> None:
+        """Take one token, sleeping until it is available"""
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    def pause(self, seconds: float) -> None:
+        """
+        Hold back every new reservation for `seconds` (e.g. after a 429)
+
+        Saved-up burst tokens are dropped, so requests resume at the
+        steady rate rather than all at once.
+        """
+        with self._lock:
+            now = self._refill()
+            self._updated = max(self._updated, now + seconds)
+            self._tokens = min(self._tokens, 0.0)
+
+    def set_rate(self, rate: float) -> None:
+        """Change the steady rate (tokens already earned are kept)"""
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        with self._lock:
+            self._refill()
+            self.rate = rate
+
+    def _refill(self) -> float:
+        now = time.monotonic()
+        if now > self._updated:
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+        return now
+
+
+def backoff_delay(
+    attempt: int,
+    retry_after: Optional[str] = None,
+    base: float = 1.0,
+    cap: float = 60.0
+) -> float:
+    """
+    Delay before retrying a rate-limited request
+
+    Args:
+        attempt: Zero-based retry number
+        retry_after: Retry-After header value, honoured when it is in seconds
+        base: First backoff delay in seconds (doubled on every retry)
+        cap: Longest delay returned
+
+    Returns:
+        Delay in seconds
+    """
+    if retry_after:
+        try:
+            return min(cap, max(0.0, float(retry_after)))
+        except ValueError:
+            pass  # HTTP-date form: fall back to exponential backoff
+    delay = base * (2 ** attempt)
+    return min(cap, delay * random.uniform(1.0, 1.25))
@@ -0,0 +1,144 @@
+"""
+SQLite-backed key/value cache shared by threads and worker processes
+Used for geocoding, parcel lookups and classifications
+"""
+
+import json
+import time
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from app.utils import DATA_DIR
+
+DEFAULT_CACHE_PATH = DATA_DIR / "cache" / "shared_cache.db"
+
+# Returned by get() on a miss, so cached None values (negative lookups) are distinguishable
+MISS = object()
+
+
+class SharedCache:
+    """
+    Persistent namespaced cache with optional per-entry TTL
+
+    Every operation opens its own short-lived connection (WAL mode), so one
+    cache file can safely be used from many threads and processes at once.
+    """
+
+    def __init__(self, path: Optional[str] = None, default_ttl: Optional[float] = None):
+        """
+        Args:
+            path: SQLite file (defaults to data/cache/shared_cache.db)
+            default_ttl: Seconds entries stay valid (None = forever)
+        """
+        self.path = Path(path or DEFAULT_CACHE_PATH)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.default_ttl = default_ttl
+        self._stats_lock = threading.Lock()
+        self.stats: Dict[str, Dict[str, int]] = {}
+        self._initialize_db()
+
+    @contextmanager
+    def _get_connection(self):
+        conn = sqlite3.connect(str(self.path), timeout=30)
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _initialize_db(self):
+        with self._get_connection() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    namespace TEXT NOT NULL,
+                    cache_key TEXT NOT NULL,
+                    value TEXT,
+                    created_at REAL NOT NULL,
+                    expires_at REAL,
+                    PRIMARY KEY (namespace, cache_key)
+                )
+            """)
+            # purge_expired runs once per pipeline run
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_expires ON cache_entries(expires_at)")
+
+    def get(self, namespace: str, key: str, default: Any = MISS) -> Any:
+        """
+        Look up a cached value
+
+        Args:
+            namespace: Cache namespace (e.g. 'geocode')
+            key: Entry key within the namespace
+            default: Returned on a miss or expired entry
+
+        Returns:
+            Cached value or default
+        """
+        with self._get_connection() as conn:
+            row = conn.execute(
+                "SELECT value, expires_at FROM cache_entries WHERE namespace = ? AND cache_key = ?",
+                (namespace, key)
+            ).fetchone()
+
+        if row is None or (row[1] is not None and row[1] < time.time()):
+            self._count(namespace, 'misses')
+            return default
+
+        self._count(namespace, 'hits')
+        return json.loads(row[0])
+
+    def set(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Store a JSON-serializable value
+
+        Args:
+            namespace: Cache namespace
+            key: Entry key within the namespace
+            value: Value to store (None is allowed and cached as a negative result)
+            ttl: Seconds the entry stays valid (defaults to default_ttl)
+        """
+        ttl = self.default_ttl if ttl is None else ttl
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+        with self._get_connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (namespace, cache_key, value, created_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (namespace, key, json.dumps(value, default=str), now, expires_at)
+            )
+
+    def items(self, namespace: str) -> Iterator[Tuple[str, Any]]:
+        """
+        Iterate over the unexpired entries of a namespace
+
+        Args:
+            namespace: Cache namespace
+
+        Yields:
+            (key, value) tuples
+        """
+        with self._get_connection() as conn:
+            rows = conn.execute(
+                "SELECT cache_key, value FROM cache_entries "
+                "WHERE namespace = ? AND (expires_at IS NULL OR expires_at >= ?)",
+                (namespace, time.time())
+            ).fetchall()
+        for key, value in rows:
+            yield key, json.loads(value)
+
+    def purge_expired(self) -> int:
+        """Delete expired entries, returning how many were removed"""
+        with self._get_connection() as conn:
+            cursor = conn.execute(
+                "DELETE FROM cache_entries WHERE expires_at IS NOT NULL AND expires_at < ?",
+                (time.time(),)
+            )
+            return cursor.rowcount
+
+    def _count(self, namespace: str, outcome: str) -> None:
+        with self._stats_lock:
+            counts = self.stats.setdefault(namespace, {'hits': 0, 'misses': 0})
+            counts[outcome] += 1
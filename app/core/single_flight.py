@@ -0,0 +1,129 @@
+"""
+Request coalescing for external HTTP calls
+Concurrent identical GET requests wait on one in-flight call and share its
+response, so duplicate lookups (the same address geocoded by two stages,
+the same detail page surfaced by two queries) spend one request of the
+service's rate-limited capacity instead of several
+"""
+
+import threading
+from contextlib import nullcontext
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import requests
+
+from app.core.api_limits import api_slot
+
+
+class _Call:
+    """One in-flight call and its outcome"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Run at most one call per key at a time; concurrent callers share its outcome
+
+    Only calls that overlap are coalesced: once a call finishes, the next
+    caller with the same key makes a new one (caching is left to SharedCache).
+    Coalescing is per process.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.calls = 0    # Calls made
+        self.shared = 0   # Callers served by another caller's call
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        Call fn, or wait for the in-flight call with the same key
+
+        Args:
+            key: Identity of the call
+            fn: Makes the call
+
+        Returns:
+            fn's result (the same object for every caller sharing the call)
+
+        Raises:
+            Whatever fn raised, in every caller sharing the call
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.calls += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+# One coalescing group per process, shared by every CoalescingSession
+_flights = SingleFlight()
+
+
+def single_flight_stats() -> Dict[str, int]:
+    """Calls made and callers served by a shared call in this process"""
+    return {'calls': _flights.calls, 'shared': _flights.shared}
+
+
+class CoalescingSession(requests.Session):
+    """
+    requests.Session that coalesces concurrent identical GET/HEAD requests
+
+    Requests are identical when their method and full URL (with query
+    parameters) match; headers such as rotating User-Agents are ignored.
+    Requests with a body or stream=True are never coalesced. Callers
+    sharing a request get the same Response object, whose body has already
+    been read.
+
+    Passing slot='<service>' holds that service's api_slot for the request
+    itself, so callers waiting on a shared request do not take up slots.
+    """
+
+    def __init__(self, flights: Optional[SingleFlight] = None):
+        super().__init__()
+        self.flights = flights or _flights
+
+    def request(self, method, url, *args, slot: Optional[str] = None, **kwargs):
+        def send():
+            with api_slot(slot) if slot else nullcontext():
+                return super(CoalescingSession, self).request(method, url, *args, **kwargs)
+
+        key = self._coalesce_key(method, url, args, kwargs)
+        if key is None:
+            return send()
+        return self.flights.do(key, send)
+
+    @staticmethod
+    def _coalesce_key(method: str, url: str, args: tuple, kwargs: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+        """(method, prepared URL) of a coalescible request, else None"""
+        method = method.upper()
+        if method not in ('GET', 'HEAD') or args or kwargs.get('stream'):
+            return None
+        if any(kwargs.get(body) for body in ('data', 'json', 'files')):
+            return None
+        prepared = requests.Request(method, url, params=kwargs.get('params')).prepare()
+        return method, prepared.url
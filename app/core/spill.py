@@ -0,0 +1,266 @@
+"""
+Bounded-memory listing storage for very large runs
+Holds records in memory up to a size threshold, then spills them to JSONL
+segments under data/spill/<id>/; dedup, sort and iteration then run out of core
+"""
+
+import heapq
+import json
+import shutil
+import sqlite3
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from app.utils import DATA_DIR
+from app.core.checkpoint import RunCheckpoint
+
+SPILL_DIR = DATA_DIR / "spill"
+
+
+def _new_spill_path(root: Optional[Path]) -> Path:
+    path = Path(root or SPILL_DIR) / RunCheckpoint.new_run_id()
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _read_jsonl(path: Path) -> Iterator[Dict[str, Any]]:
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            yield json.loads(line)
+
+
+def _write_jsonl(path: Path, records: Iterable[Dict[str, Any]]) -> None:
+    with open(path, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, default=str, ensure_ascii=False) + '\n')
+
+
+class SpillSet:
+    """
+    Set of string keys that moves to an on-disk SQLite index past max_keys
+
+    Supports the parts of the set API the pipeline uses for dedup: add()
+    and `in`.
+    """
+
+    def __init__(self, max_keys: int = 100_000, root: Optional[Path] = None):
+        """
+        Args:
+            max_keys: Keys held in memory before switching to the on-disk index
+            root: Directory spill files are created under (defaults to data/spill)
+        """
+        self.max_keys = max_keys
+        self.root = root
+        self.path: Optional[Path] = None
+        self._keys = set()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._count = 0
+
+    @classmethod
+    def for_memory_limit(cls, memory_limit_mb: float, root: Optional[Path] = None) -> 'SpillSet':
+        """Set that holds about memory_limit_mb of short keys in memory before spilling"""
+        # Rough per-key footprint of a Python set of short strings
+        return cls(max_keys=max(1000, int(memory_limit_mb * 1024 * 1024) // 100), root=root)
+
+    def add(self, key: str) -> bool:
+        """
+        Add a key
+
+        Returns:
+            True if the key was not in the set yet
+        """
+        if self._conn is None:
+            if key in self._keys:
+                return False
+            self._keys.add(key)
+            self._count += 1
+            if len(self._keys) > self.max_keys:
+                self._spill()
+            return True
+
+        added = self._conn.execute("INSERT OR IGNORE INTO spill_keys (key) VALUES (?)", (key,)).rowcount == 1
+        self._count += added
+        return added
+
+    def __contains__(self, key: str) -> bool:
+        if self._conn is None:
+            return key in self._keys
+        return self._conn.execute("SELECT 1 FROM spill_keys WHERE key = ?", (key,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def spilled(self) -> bool:
+        return self._conn is not None
+
+    def close(self) -> None:
+        """Drop the keys and delete the on-disk index"""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        if self.path:
+            shutil.rmtree(self.path, ignore_errors=True)
+            self.path = None
+        self._keys = set()
+        self._count = 0
+
+    def _spill(self):
+        self.path = _new_spill_path(self.root)
+        # Used by whichever thread drives the dedup (e.g. a streaming source thread)
+        self._conn = sqlite3.connect(str(self.path / 'keys.db'), isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=OFF")
+        self._conn.execute("PRAGMA synchronous=OFF")
+        self._conn.execute("CREATE TABLE spill_keys (key TEXT PRIMARY KEY) WITHOUT ROWID")
+        self._conn.executemany("INSERT INTO spill_keys (key) VALUES (?)", ((key,) for key in self._keys))
+        self._keys = set()
+
+
+class SpillBuffer:
+    """
+    Append-only collection of listings with a bounded in-memory footprint
+
+    Records are kept in memory until their estimated size (serialized JSON)
+    reaches memory_limit_mb, then written out as a JSONL segment. Iteration
+    yields spilled segments first and the in-memory tail last, so append
+    order is preserved. A buffer can be iterated any number of times and
+    can be pickled (e.g. returned from a worker process on the same host);
+    whoever ends up with it calls close() to delete its files.
+    """
+
+    def __init__(self, memory_limit_mb: float = 256, root: Optional[Path] = None):
+        """
+        Args:
+            memory_limit_mb: Estimated size of records held in memory before spilling
+            root: Directory spill files are created under (defaults to data/spill)
+        """
+        self.memory_limit_mb = memory_limit_mb
+        self.root = root
+        self.path: Optional[Path] = None
+        self.segments: List[Path] = []
+        self._buffer: List[Dict[str, Any]] = []
+        self._buffer_bytes = 0
+        self._count = 0
+
+    @property
+    def spilled(self) -> bool:
+        return bool(self.segments)
+
+    @property
+    def in_memory(self) -> int:
+        """Number of records currently held in memory"""
+        return len(self._buffer)
+
+    def append(self, record: Dict[str, Any]) -> None:
+        self._buffer.append(record)
+        self._buffer_bytes += len(json.dumps(record, default=str, ensure_ascii=False))
+        self._count += 1
+        if self._buffer_bytes >= self._limit_bytes:
+            self.flush()
+
+    def extend(self, records: Iterable[Dict[str, Any]]) -> None:
+        for record in records:
+            self.append(record)
+
+    def flush(self) -> None:
+        """Write the in-memory records to a new segment"""
+        if not self._buffer:
+            return
+        if self.path is None:
+            self.path = _new_spill_path(self.root)
+        segment = self.path / f"segment_{len(self.segments):05d}.jsonl"
+        _write_jsonl(segment, self._buffer)
+        self.segments.append(segment)
+        self._buffer = []
+        self._buffer_bytes = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for segment in list(self.segments):
+            yield from _read_jsonl(segment)
+        yield from list(self._buffer)
+
+    def filter(self, predicate: Callable[[Dict[str, Any]], bool]) -> 'SpillBuffer':
+        """Records matching predicate, in order, as a new buffer"""
+        result = self._empty_like()
+        result.extend(record for record in self if predicate(record))
+        return result
+
+    def unique(self, key: str = 'address') -> 'SpillBuffer':
+        """
+        First record per non-empty key, in order, as a new buffer
+
+        Seen keys move to an on-disk index once there are too many to
+        hold within the memory limit.
+        """
+        result = self._empty_like()
+        seen = SpillSet.for_memory_limit(self.memory_limit_mb, root=self.root)
+        try:
+            for record in self:
+                identifier = record.get(key, '')
+                if identifier and seen.add(str(identifier)):
+                    result.append(record)
+        finally:
+            seen.close()
+        return result
+
+    def sorted(self, key: Callable[[Dict[str, Any]], Any], reverse: bool = False) -> 'SpillBuffer':
+        """
+        All records sorted by key, as a new buffer
+
+        Spilled buffers are sorted externally: memory-sized runs are sorted
+        and written to disk, then merged.
+        """
+        result = self._empty_like()
+        if not self.spilled:
+            result.extend(sorted(self._buffer, key=key, reverse=reverse))
+            return result
+
+        runs_path = _new_spill_path(self.root)
+        try:
+            runs, chunk, chunk_bytes = [], [], 0
+            for record in self:
+                chunk.append(record)
+                chunk_bytes += len(json.dumps(record, default=str, ensure_ascii=False))
+                if chunk_bytes >= self._limit_bytes:
+                    runs.append(self._write_run(runs_path, len(runs), chunk, key, reverse))
+                    chunk, chunk_bytes = [], 0
+            if chunk:
+                runs.append(self._write_run(runs_path, len(runs), chunk, key, reverse))
+            result.extend(heapq.merge(*(_read_jsonl(run) for run in runs), key=key, reverse=reverse))
+        finally:
+            shutil.rmtree(runs_path, ignore_errors=True)
+        return result
+
+    def close(self) -> None:
+        """Drop all records and delete the spill files"""
+        if self.path:
+            shutil.rmtree(self.path, ignore_errors=True)
+        self.path = None
+        self.segments = []
+        self._buffer = []
+        self._buffer_bytes = 0
+        self._count = 0
+
+    def __enter__(self) -> 'SpillBuffer':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    @property
+    def _limit_bytes(self) -> int:
+        return max(1, int(self.memory_limit_mb * 1024 * 1024))
+
+    def _empty_like(self) -> 'SpillBuffer':
+        return SpillBuffer(memory_limit_mb=self.memory_limit_mb, root=self.root)
+
+    @staticmethod
+    def _write_run(path: Path, index: int, chunk: List[Dict[str, Any]],
+                   key: Callable[[Dict[str, Any]], Any], reverse: bool) -> Path:
+        run = path / f"run_{index:05d}.jsonl"
+        chunk.sort(key=key, reverse=reverse)
+        _write_jsonl(run, chunk)
+        return run
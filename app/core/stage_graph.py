@@ -0,0 +1,145 @@
+"""
+Stage dependency graph for the pipeline
+Runs independent stages concurrently on a bounded thread pool
+"""
+
+import time
+import logging
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+
+@dataclass
+class StageResult:
+    """Outcome of a single stage in the graph"""
+    name: str
+    value: Any = None
+    error: Optional[BaseException] = None
+    started_at: float = 0.0
+    finished_at: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @property
+    def duration_seconds(self) -> float:
+        return max(0.0, self.finished_at - self.started_at)
+
+
+@dataclass
+class _Stage:
+    name: str
+    func: Callable[[], Any]
+    depends_on: List[str] = field(default_factory=list)
+
+
+class StageGraph:
+    """
+    Small DAG executor for I/O-bound pipeline stages
+
+    Each stage is a zero-argument callable. A stage is submitted as soon as
+    every stage it depends on has finished (successfully or not), so the
+    wall-clock time of the graph is bounded by its longest dependency chain
+    rather than the sum of all stages.
+    """
+
+    def __init__(self, max_workers: int = 4, logger: Optional[logging.Logger] = None):
+        """
+        Args:
+            max_workers: Maximum number of stages running at the same time
+            logger: Logger for stage failures (defaults to module logger)
+        """
+        self.max_workers = max(1, max_workers)
+        self.logger = logger or logging.getLogger(__name__)
+        self._stages: Dict[str, _Stage] = {}
+
+    def add_stage(
+        self,
+        name: str,
+        func: Callable[[], Any],
+        depends_on: Sequence[str] = ()
+    ) -> 'StageGraph':
+        """
+        Register a stage
+
+        Args:
+            name: Unique stage name
+            func: Zero-argument callable doing the work
+            depends_on: Names of stages that must finish first
+
+        Returns:
+            The graph itself, so calls can be chained
+        """
+        if name in self._stages:
+            raise ValueError(f"Stage '{name}' already registered")
+        self._stages[name] = _Stage(name=name, func=func, depends_on=list(depends_on))
+        return self
+
+    def run(self) -> Dict[str, StageResult]:
+        """
+        Execute every registered stage respecting dependencies
+
+        Stage exceptions are captured in the returned StageResult instead of
+        being raised, so one failing sink never cancels the others.
+
+        Returns:
+            Mapping of stage name to StageResult
+        """
+        self._validate()
+
+        results: Dict[str, StageResult] = {}
+        pending = dict(self._stages)
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='stage') as executor:
+            while pending or running:
+                ready = [
+                    stage for stage in pending.values()
+                    if all(dep in results for dep in stage.depends_on)
+                ]
+                for stage in ready:
+                    del pending[stage.name]
+                    future = executor.submit(self._run_stage, stage)
+                    running[future] = stage.name
+
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    results[name] = future.result()
+
+        return results
+
+    def _run_stage(self, stage: _Stage) -> StageResult:
+        result = StageResult(name=stage.name, started_at=time.perf_counter())
+        try:
+            result.value = stage.func()
+        except Exception as e:
+            result.error = e
+            self.logger.warning(f"Stage '{stage.name}' failed: {e}")
+        result.finished_at = time.perf_counter()
+        return result
+
+    def _validate(self) -> None:
+        """Reject unknown dependencies and cycles before anything is submitted"""
+        for stage in self._stages.values():
+            for dep in stage.depends_on:
+                if dep not in self._stages:
+                    raise ValueError(f"Stage '{stage.name}' depends on unknown stage '{dep}'")
+
+        visiting, visited = set(), set()
+
+        def visit(name: str):
+            if name in visited:
+                return
+            if name in visiting:
+                raise ValueError(f"Dependency cycle detected at stage '{name}'")
+            visiting.add(name)
+            for dep in self._stages[name].depends_on:
+                visit(dep)
+            visiting.discard(name)
+            visited.add(name)
+
+        for name in self._stages:
+            visit(name)
@@ -0,0 +1,140 @@
+"""
+Streaming execution for per-listing pipeline stages
+Connects stages with bounded queues so each item moves on as soon as it is ready
+"""
+
+import queue
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Sequence
+
+_DONE = object()
+
+
+@dataclass
+class StreamStage:
+    """
+    A per-item stage of a streaming pipeline
+
+    Attributes:
+        name: Stage name (used in logs and thread names)
+        func: Callable taking one item and returning the transformed item,
+              or None to drop it from the stream
+        workers: Number of threads processing this stage in parallel
+        pass_through_on_error: Forward the unchanged input item when func
+              raises, instead of dropping it
+    """
+    name: str
+    func: Callable[[Any], Optional[Any]]
+    workers: int = 1
+    pass_through_on_error: bool = False
+
+
+def stream_through(
+    source: Iterable[Any],
+    stages: Sequence[StreamStage],
+    queue_size: int = 16,
+    logger: Optional[logging.Logger] = None
+) -> Iterator[Any]:
+    """
+    Push items from source through stages, yielding results as they complete
+
+    Every stage runs in its own thread(s) and hands items to the next stage
+    through a bounded queue, so network waits in different stages overlap
+    and at most ``queue_size`` items are buffered between two stages.
+    Output order is not guaranteed when a stage has more than one worker.
+
+    An exception raised for one item is logged and only that item is
+    dropped, or passed on unchanged by stages with pass_through_on_error.
+    Closing the returned generator early stops all stage threads.
+
+    Args:
+        source: Iterable (typically a generator) producing input items
+        stages: Ordered stages each item passes through
+        queue_size: Maximum items buffered between two stages
+        logger: Logger for stage errors (defaults to module logger)
+
+    Yields:
+        Items that made it through every stage
+    """
+    logger = logger or logging.getLogger(__name__)
+    stop = threading.Event()
+    queues: List[queue.Queue] = [queue.Queue(maxsize=queue_size) for _ in range(len(stages) + 1)]
+
+    def put(q: queue.Queue, item: Any) -> bool:
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def get(q: queue.Queue) -> Any:
+        while not stop.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def feed():
+        try:
+            for item in source:
+                if not put(queues[0], item):
+                    return
+        except Exception as e:
+            logger.error(f"Stream source failed: {e}")
+        put(queues[0], _DONE)
+
+    def work(index: int, stage: StreamStage, remaining: List[int], lock: threading.Lock):
+        in_q, out_q = queues[index], queues[index + 1]
+        while True:
+            item = get(in_q)
+            if item is _DONE:
+                # Let sibling workers see the sentinel too; the last one forwards it
+                with lock:
+                    remaining[0] -= 1
+                    last = remaining[0] == 0
+                if last:
+                    put(out_q, _DONE)
+                else:
+                    put(in_q, _DONE)
+                return
+            try:
+                result = stage.func(item)
+            except Exception as e:
+                if not stage.pass_through_on_error:
+                    logger.error(f"Stream stage '{stage.name}' failed: {e}")
+                    continue
+                logger.warning(f"Stream stage '{stage.name}' failed, passing the item on unchanged: {e}")
+                result = item
+            if result is not None and not put(out_q, result):
+                return
+
+    threads = [threading.Thread(target=feed, name='stream-source', daemon=True)]
+    for index, stage in enumerate(stages):
+        workers = max(1, stage.workers)
+        remaining, lock = [workers], threading.Lock()
+        for n in range(workers):
+            threads.append(threading.Thread(
+                target=work,
+                args=(index, stage, remaining, lock),
+                name=f'stream-{stage.name}-{n}',
+                daemon=True
+            ))
+
+    for thread in threads:
+        thread.start()
+
+    try:
+        while True:
+            item = get(queues[-1])
+            if item is _DONE:
+                break
+            yield item
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join(timeout=1)
@@ -4,20 +4,72 @@ Orchestrates scraping, enrichment, and classification
 """
 
 import sys
+import time
+import asyncio
 import argparse
+import threading
+import multiprocessing
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import List, Dict, Any
+from itertools import islice
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple, Callable
 
 from app.utils import (
     setup_logging, 
     save_to_csv, 
     save_to_json,
     deduplicate_listings,
+    normalize_address,
+    has_classification,
     get_timestamp
 )
-from app.scraper import LLMSearch, RedfinScraper, RealtorScraper, ZillowScraper
-from app.enrichment import GISEnrichment
-from app.classifier import LLMClassifier
+from app.core.stage_graph import StageGraph
+from app.core.streaming import StreamStage, stream_through
+from app.core.checkpoint import RunCheckpoint
+from app.core.incremental import listing_fingerprint
+from app.core.shared_cache import SharedCache, DEFAULT_CACHE_PATH
+from app.core.api_limits import (
+    create_api_limits, install_api_limits, api_slot, create_async_limits, install_async_limits
+)
+from app.core.profiling import StageProfiler
+from app.core.api_budget import ApiBudget, install_api_budget, window_limits_from_env
+from app.core.spill import SpillBuffer, SpillSet
+from app.core.query_planner import PlannedQuery, QueryPlanner, QueryYieldTracker, STREET_SWEEP_TEMPLATE
+from app.scraper.html_parsing import ParsePool, install_parse_pool
+from app.scraper.http_cache import http_cache, http_cache_stats
+from app.scraper.listing_urls import listing_identity, listing_key
+from app.scraper.page_fetcher import host_throttle_stats, reset_host_throttles
+from app.scraper.street_sweep import (
+    load_street_list, next_streets, street_from_address, street_list_path, streets_from_parcel_cache
+)
+
+
+class _component:
+    """
+    Decorator for a lazily built, pooled pipeline component
+
+    The decorated method builds the component on first access (thread-safe,
+    so concurrent stages never build it twice); the result is stored on the
+    instance and reused by every later run. Assigning the attribute replaces
+    the component (e.g. with a stub in tests).
+    """
+    
+    def __init__(self, factory: Callable[[Any], Any]):
+        self.factory = factory
+        self.__doc__ = factory.__doc__
+    
+    def __set_name__(self, owner, name):
+        self.name = name
+    
+    def __get__(self, pipeline, owner=None):
+        if pipeline is None:
+            return self
+        with pipeline._component_lock(self.name):
+            if self.name not in pipeline.__dict__:
+                pipeline.__dict__[self.name] = self.factory(pipeline)
+        return pipeline.__dict__[self.name]
 
 
 class DevelopmentPipeline:
@@ -25,19 +77,120 @@ class DevelopmentPipeline:
     Main pipeline for finding development opportunities
     """
     
-    def __init__(self):
+    # Streaming mode: listings buffered between stages and per-stage parallelism
+    STREAM_QUEUE_SIZE = 32
+    STREAM_ENRICH_WORKERS = 2
+    STREAM_CLASSIFY_WORKERS = 4
+    
+    # Async mode: pooled httpx connections across all hosts
+    ASYNC_MAX_CONNECTIONS = 100
+    
+    # Incremental mode: stored results older than this are recomputed anyway
+    INCREMENTAL_MAX_AGE_DAYS = 30
+    
+    # Maps coordinates: most Google Maps searches (one per street) per run
+    MAPS_MAX_QUERIES = 10
+    
+    def __init__(
+        self,
+        max_sink_workers: int = 4,
+        cache_path: Optional[str] = None,
+        search_cache: bool = True
+    ):
+        """
+        Args:
+            max_sink_workers: Thread pool size for the concurrent output stages
+                (Sheets, alerts, database, map)
+            cache_path: SQLite file for the shared geocode/parcel/classification
+                cache (None disables caching)
+            search_cache: Cache SerpAPI responses on disk (in cache_path, or the
+                default cache file) so repeated queries spend no credits
+        """
         self.logger = setup_logging('dev_pipeline')
         self.logger.info("=" * 60)
         self.logger.info("Development Opportunity Pipeline Initialized")
         self.logger.info("=" * 60)
         
-        # Initialize components
-        self.llm_search = LLMSearch()
-        self.redfin_scraper = RedfinScraper()
-        self.realtor_scraper = RealtorScraper()
-        self.zillow_scraper = ZillowScraper()
-        self.enricher = GISEnrichment()
-        self.classifier = LLMClassifier()
+        # Components are built on first use (see the _component properties
+        # below) and pooled across runs
+        self.max_sink_workers = max_sink_workers
+        self.cache_path = cache_path
+        self.search_cache_enabled = search_cache
+        self._component_locks: Dict[str, threading.Lock] = {}
+        self._component_locks_guard = threading.Lock()
+    
+    def _component_lock(self, name: str) -> threading.Lock:
+        with self._component_locks_guard:
+            return self._component_locks.setdefault(name, threading.Lock())
+    
+    @_component
+    def cache(self) -> Optional[SharedCache]:
+        """Shared geocode/parcel/classification cache (None if disabled)"""
+        return SharedCache(self.cache_path) if self.cache_path else None
+    
+    @_component
+    def search_cache(self) -> Optional[SharedCache]:
+        """Persistent SerpAPI response cache (None if disabled)"""
+        if not self.search_cache_enabled:
+            return None
+        return self.cache or SharedCache(DEFAULT_CACHE_PATH)
+    
+    @_component
+    def llm_search(self):
+        """SerpAPI search client"""
+        from app.scraper.llm_search import LLMSearch
+        return LLMSearch(cache=self.search_cache)
+    
+    @_component
+    def redfin_scraper(self):
+        from app.scraper.redfin_scraper import RedfinScraper
+        return RedfinScraper()
+    
+    @_component
+    def realtor_scraper(self):
+        from app.scraper.realtor_scraper import RealtorScraper
+        return RealtorScraper()
+    
+    @_component
+    def zillow_scraper(self):
+        from app.scraper.zillow_scraper import ZillowScraper
+        return ZillowScraper()
+    
+    @_component
+    def enricher(self):
+        """GIS enrichment client"""
+        from app.enrichment.gis_enrichment import GISEnrichment
+        return GISEnrichment(cache=self.cache)
+    
+    @_component
+    def classifier(self):
+        """LLM classifier (builds the OpenAI client)"""
+        from app.classifier.llm_classifier import LLMClassifier
+        return LLMClassifier(cache=self.cache)
+    
+    @_component
+    def roi_classifier(self):
+        """ROI scoring for classified listings"""
+        from app.integrations.roi_calculator import EnhancedLLMClassifier
+        return EnhancedLLMClassifier()
+    
+    @_component
+    def database(self):
+        """Historical SQLite database"""
+        from app.integrations.database_manager import HistoricalDatabaseManager
+        return HistoricalDatabaseManager()
+    
+    @_component
+    def alert_manager(self):
+        """Email/Slack alerts"""
+        from app.integrations.alert_manager import AlertManager
+        return AlertManager(email_enabled=True, slack_enabled=True)
+    
+    @_component
+    def sheets_uploader(self):
+        """Authorized Google Sheets client (raises if credentials are missing; retried next run)"""
+        from app.integrations.google_sheets_uploader import GoogleSheetsUploader
+        return GoogleSheetsUploader()
         
     def run(
         self,
@@ -47,7 +200,18 @@ class DevelopmentPipeline:
         max_pages: int = 3,
         enrich_data: bool = True,
         classify_data: bool = True,
-        min_dev_score: float = 50.0
+        min_dev_score: float = 50.0,
+        streaming: bool = False,
+        resume_run_id: Optional[str] = None,
+        incremental: bool = False,
+        publish: bool = True,
+        batch_id: Optional[str] = None,
+        spill_mb: Optional[float] = None,
+        query_budget: Optional[int] = None,
+        street_sweep: Optional[int] = None,
+        street_list: Optional[str] = None,
+        maps_coordinates: bool = False,
+        credit_limits: Optional[Dict[str, float]] = None
     ) -> Dict[str, Any]:
         """
         Run the complete pipeline
@@ -60,22 +224,674 @@ class DevelopmentPipeline:
             enrich_data: Whether to enrich with GIS data
             classify_data: Whether to classify opportunities
             min_dev_score: Minimum development score for filtering
+            streaming: Stream each listing through enrichment, classification,
+                ROI and persistence as soon as it is found, instead of
+                finishing each stage for every listing before the next starts
+            resume_run_id: Checkpoint run id of a failed batch run to resume.
+                Its saved parameters replace the arguments above, and listings
+                already enriched/classified in that run are not redone. A
+                checkpoint is deleted once its run finishes.
+            incremental: Reuse the stored enrichment, classification and ROI of
+                listings whose source fields are unchanged since they were last
+                saved; only new or changed listings are enriched and classified.
+                Without it, listings already seen in earlier runs (by listing
+                ID) are enriched and classified again
+            publish: Write result files, upload to Sheets, send alerts and
+                generate the map. Multi-location workers pass False, return
+                their listings in stats['listings'] and leave publishing to
+                the parent run.
+            batch_id: Multi-location batch this run belongs to (stored on
+                its scan_runs record)
+            spill_mb: Bounded-memory mode for streaming runs: once the
+                retained listings exceed about this many MB they spill to
+                disk, and dedup, sorting and the result files run out of core
+            query_budget: Most SerpAPI result pages to spend on search
+                queries, allocated to the query templates with the best
+                yield in earlier runs (None searches every template)
+            street_sweep: Also search this many streets, one result page
+                each, rotating through the location's street list over
+                successive runs (least recently swept streets first)
+            street_list: Street list file for street_sweep (defaults to
+                data/streets/<location>.txt, else the streets of cached
+                parcel lookups)
+            maps_coordinates: Search Google Maps for the streets of listings
+                without coordinates (up to MAPS_MAX_QUERIES searches) and
+                carry the coordinates of matching addresses over, so those
+                listings skip Nominatim geocoding
+            credit_limits: Most credits each external API may spend this run
+                (e.g. {'serpapi': 100, 'openai': 500}). Rolling-window limits
+                come from <SERVICE>_CREDIT_LIMIT environment variables; both
+                hold back credits for higher-priority calls when tight.
             
         Returns:
             Dictionary with pipeline results and statistics
         """
+        # Batch runs checkpoint every stage so a failed run can be resumed
+        checkpoint = None
+        if resume_run_id:
+            if streaming:
+                raise ValueError("Resuming is only supported for batch (non-streaming) runs")
+            checkpoint = RunCheckpoint.open(resume_run_id)
+            params = checkpoint.params
+            search_query = params.get('search_query', search_query)
+            location = params.get('location', location)
+            use_scrapers = params.get('use_scrapers', use_scrapers)
+            max_pages = params.get('max_pages', max_pages)
+            enrich_data = params.get('enrich_data', enrich_data)
+            classify_data = params.get('classify_data', classify_data)
+            min_dev_score = params.get('min_dev_score', min_dev_score)
+            incremental = params.get('incremental', incremental)
+            query_budget = params.get('query_budget', query_budget)
+            street_sweep = params.get('street_sweep', street_sweep)
+            street_list = params.get('street_list', street_list)
+            maps_coordinates = params.get('maps_coordinates', maps_coordinates)
+            self.logger.info(f"Resuming checkpointed run {resume_run_id}")
+        elif not streaming:
+            pruned = RunCheckpoint.prune()
+            if pruned:
+                self.logger.info(f"Pruned {pruned} abandoned checkpoints")
+            checkpoint = RunCheckpoint.create({
+                'search_query': search_query,
+                'location': location,
+                'use_scrapers': use_scrapers,
+                'max_pages': max_pages,
+                'enrich_data': enrich_data,
+                'classify_data': classify_data,
+                'min_dev_score': min_dev_score,
+                'incremental': incremental,
+                'query_budget': query_budget,
+                'street_sweep': street_sweep,
+                'street_list': street_list,
+                'maps_coordinates': maps_coordinates
+            })
+            self.logger.info(f"Checkpoint run id: {checkpoint.run_id} "
+                             f"(resume with --resume {checkpoint.run_id})")
+        
         start_time = datetime.now()
         self.logger.info(f"Starting pipeline: {search_query}")
         
-        # Send notification that scan has started
+        # Wall/CPU time, peak RSS, item and external call counts per stage
+        profiler = StageProfiler()
+        query_yield = QueryYieldTracker(known_addresses=self._known_addresses)
+        budget = self._install_budget(location, credit_limits)
         try:
-            from app.integrations.alert_manager import AlertManager
-            alert_manager = AlertManager(email_enabled=True, slack_enabled=True)
-            alert_manager.notify_scan_started(run_type="manual")
+            # Send notification that scan has started
+            if publish:
+                self._notify_scan_started()
+            
+            run_id = None
+            if streaming and incremental:
+                self.logger.warning("Incremental mode applies to batch runs only - ignored while streaming")
+            if spill_mb and not streaming:
+                self.logger.warning("Spill mode applies to streaming runs only - ignored for batch runs")
+            if streaming:
+                # Stages 1-3.5 overlapped per listing, persisted as they complete
+                with profiler.stage('stream') as profile:
+                    total_found, classified_listings, run_id = self._run_streaming(
+                        search_query, location,
+                        use_scrapers=use_scrapers,
+                        max_pages=max_pages,
+                        enrich_data=enrich_data,
+                        classify_data=classify_data,
+                        batch_id=batch_id,
+                        spill_mb=spill_mb,
+                        plan=self._plan_queries(location, query_budget, street_sweep, street_list),
+                        query_yield=query_yield,
+                        maps_coordinates=maps_coordinates
+                    )
+                    profile.items = total_found
+            else:
+                # Stage 1: Data Collection
+                with profiler.stage('collect') as profile:
+                    if checkpoint.is_complete('raw'):
+                        all_listings = checkpoint.load('raw')
+                        self.logger.info(f"Stage 1 restored from checkpoint: {len(all_listings)} listings")
+                    else:
+                        plan = self._plan_queries(location, query_budget, street_sweep, street_list)
+                        all_listings = self._collect_listings(location, use_scrapers, max_pages,
+                                                              plan=plan, query_yield=query_yield,
+                                                              maps_coordinates=maps_coordinates)
+                        checkpoint.write_all('raw', all_listings)
+                    total_found = profile.items = len(all_listings)
+                
+                # Incremental mode: unchanged listings reuse their stored results
+                reused = {}
+                if incremental and classify_data and all_listings:
+                    with profiler.stage('incremental') as profile:
+                        reused = self._find_unchanged(all_listings)
+                        profile.items = len(reused)
+                pending = [l for l in all_listings if l.get('address') not in reused]
+                
+                # Stage 2: Data Enrichment
+                if enrich_data and pending:
+                    self.logger.info("\n" + "=" * 60)
+                    self.logger.info("STAGE 2: DATA ENRICHMENT")
+                    self.logger.info("=" * 60)
+                    
+                    with profiler.stage('enrich') as profile:
+                        pending = self._run_checkpointed(
+                            checkpoint, 'enriched', pending, self.enricher.enrich_listings_batch
+                        )
+                        profile.items = len(pending)
+                    self.logger.info(f"Enriched {len(pending)} listings with GIS data")
+                
+                # Stage 3: Classification
+                classified_listings = []
+                
+                if classify_data and pending:
+                    self.logger.info("\n" + "=" * 60)
+                    self.logger.info("STAGE 3: CLASSIFICATION")
+                    self.logger.info("=" * 60)
+                    
+                    with profiler.stage('classify') as profile:
+                        classified_listings = self._run_checkpointed(
+                            checkpoint, 'classified', pending, self.classifier.classify_listings_batch
+                        )
+                        profile.items = len(classified_listings)
+                    self.logger.info(f"Classified {len(classified_listings)} listings")
+                
+                # Stage 3.5: ROI Scoring & Financial Analysis
+                if classified_listings:
+                    with profiler.stage('roi') as profile:
+                        self._add_roi(classified_listings)
+                        profile.items = len(classified_listings)
+                
+                if reused:
+                    processed = {l.get('address'): l for l in classified_listings}
+                    classified_listings = [
+                        reused.get(l.get('address')) or processed[l.get('address')]
+                        for l in all_listings
+                        if l.get('address') in reused or l.get('address') in processed
+                    ]
+            
+            stats = self._finish_run(
+                search_query, location, start_time,
+                total_found=total_found,
+                classified_listings=classified_listings,
+                min_dev_score=min_dev_score,
+                profiler=profiler,
+                run_id=run_id,
+                batch_id=batch_id,
+                publish=publish,
+                checkpoint_run_id=checkpoint.run_id if checkpoint else None,
+                query_yield=query_yield,
+                budget=budget
+            )
+            
+            # The run finished, so there is nothing left to resume
+            if checkpoint:
+                checkpoint.delete()
+            return stats
+        finally:
+            self._finish_budget(budget)
+    
+    async def arun(
+        self,
+        search_query: str = "Newton MA teardown single family home large lot",
+        location: str = "Newton, MA",
+        use_scrapers: bool = False,
+        max_pages: int = 3,
+        enrich_data: bool = True,
+        classify_data: bool = True,
+        min_dev_score: float = 50.0,
+        publish: bool = True,
+        batch_id: Optional[str] = None,
+        api_concurrency: Optional[Dict[str, int]] = None,
+        query_budget: Optional[int] = None,
+        street_sweep: Optional[int] = None,
+        street_list: Optional[str] = None,
+        maps_coordinates: bool = False,
+        credit_limits: Optional[Dict[str, float]] = None
+    ) -> Dict[str, Any]:
+        """
+        Run the complete pipeline on an asyncio event loop
+        
+        SerpAPI queries, GIS lookups and OpenAI classifications are issued
+        with async clients (httpx, AsyncOpenAI), so hundreds of listings can
+        be in flight at once without a thread each. Every listing is enriched
+        and classified as its own task; per-service asyncio semaphores keep
+        each API within its concurrency cap. The direct scrapers and the
+        once-per-run sinks (Sheets, alerts, database, map) are blocking
+        clients and run in worker threads.
+        
+        Use with asyncio.run(pipeline.arun(...)). Checkpointing, resume and
+        incremental mode are batch run() features.
+        
+        Args:
+            search_query: Search query for properties
+            location: Location to search
+            use_scrapers: Whether to use direct scrapers (in addition to search)
+            max_pages: Max pages per scraper
+            enrich_data: Whether to enrich with GIS data
+            classify_data: Whether to classify opportunities
+            min_dev_score: Minimum development score for filtering
+            publish: Write result files, upload to Sheets, send alerts and
+                generate the map (see run())
+            batch_id: Multi-location batch this run belongs to
+            api_concurrency: Per-service caps overriding DEFAULT_ASYNC_API_CONCURRENCY
+            query_budget: Most SerpAPI result pages to spend on search queries (see run())
+            street_sweep: Streets to search this run (see run())
+            street_list: Street list file for street_sweep (see run())
+            maps_coordinates: Carry Google Maps coordinates over to skip geocoding (see run())
+            credit_limits: Most credits each external API may spend this run (see run())
+            
+        Returns:
+            Dictionary with pipeline results and statistics
+        """
+        import httpx
+        from openai import AsyncOpenAI
+        
+        start_time = datetime.now()
+        self.logger.info(f"Starting async pipeline: {search_query}")
+        
+        profiler = StageProfiler()
+        query_yield = QueryYieldTracker(known_addresses=self._known_addresses)
+        install_async_limits(create_async_limits(api_concurrency))
+        budget = await asyncio.to_thread(self._install_budget, location, credit_limits)
+        try:
+            if publish:
+                await asyncio.to_thread(self._notify_scan_started)
+            
+            classified_listings = []
+            limits = httpx.Limits(max_connections=self.ASYNC_MAX_CONNECTIONS)
+            async with httpx.AsyncClient(limits=limits) as http_client:
+                # Stage 1: Data Collection
+                with profiler.stage('collect') as profile:
+                    plan = await asyncio.to_thread(self._plan_queries, location, query_budget, street_sweep, street_list)
+                    all_listings = await self._acollect_listings(location, use_scrapers, max_pages, http_client,
+                                                                 plan=plan, query_yield=query_yield,
+                                                                 maps_coordinates=maps_coordinates)
+                    total_found = profile.items = len(all_listings)
+                
+                # Stages 2-3: enrichment and classification, one task per listing
+                if all_listings and (enrich_data or classify_data):
+                    self.logger.info("\n" + "=" * 60)
+                    self.logger.info("STAGES 2-3: ASYNC ENRICHMENT → CLASSIFICATION")
+                    self.logger.info("=" * 60)
+                    
+                    openai_client = None
+                    if classify_data:
+                        sync_client = self.classifier.client
+                        openai_client = AsyncOpenAI(api_key=sync_client.api_key, base_url=sync_client.base_url)
+                    
+                    try:
+                        with profiler.stage('process') as profile:
+                            processed = await asyncio.gather(*(
+                                self._aprocess_listing(listing, http_client, openai_client,
+                                                       enrich_data, classify_data)
+                                for listing in all_listings
+                            ))
+                            profile.items = len(processed)
+                    finally:
+                        if openai_client:
+                            await openai_client.close()
+                    
+                    if classify_data:
+                        classified_listings = processed
+                        self.logger.info(f"Classified {len(classified_listings)} listings")
+            
+            # Stage 3.5: ROI Scoring & Financial Analysis
+            if classified_listings:
+                with profiler.stage('roi') as profile:
+                    self._add_roi(classified_listings)
+                    profile.items = len(classified_listings)
+            
+            return await asyncio.to_thread(
+                self._finish_run,
+                search_query, location, start_time,
+                total_found=total_found,
+                classified_listings=classified_listings,
+                min_dev_score=min_dev_score,
+                profiler=profiler,
+                batch_id=batch_id,
+                publish=publish,
+                query_yield=query_yield,
+                budget=budget
+            )
+        finally:
+            await asyncio.to_thread(self._finish_budget, budget)
+    
+    def run_locations(
+        self,
+        locations: List[str],
+        max_workers: int = 4,
+        api_concurrency: Optional[Dict[str, int]] = None,
+        **run_kwargs
+    ) -> Dict[str, Any]:
+        """
+        Run the pipeline for several locations in parallel worker processes
+        
+        Each location runs as its own scan (one scan_runs record per location,
+        grouped by a shared batch_id). Workers share one geocode/parcel/
+        classification cache and one concurrency cap per external API, so
+        adding workers never exceeds SerpAPI, Nominatim, Newton GIS or OpenAI
+        limits. Result files, the Sheets upload (one tab per location), alerts
+        and the map are produced once for the whole batch.
+        
+        Args:
+            locations: Locations to scan (e.g., ['Newton, MA', 'Waltham, MA'])
+            max_workers: Number of worker processes
+            api_concurrency: Per-service caps overriding DEFAULT_API_CONCURRENCY
+            **run_kwargs: Passed to run() for every location (spill_mb also
+                bounds the parent's merged results)
+            
+        Returns:
+            Dictionary with batch results, per-location statistics and failures
+        """
+        batch_id = RunCheckpoint.new_run_id()
+        start_time = datetime.now()
+        
+        self.logger.info("\n" + "=" * 60)
+        self.logger.info(f"MULTI-LOCATION RUN {batch_id}: {len(locations)} locations, "
+                         f"{max_workers} workers")
+        self.logger.info("=" * 60)
+        
+        self._notify_scan_started()
+        
+        # Spawned workers get fresh interpreters (no inherited sockets or locks)
+        context = multiprocessing.get_context('spawn')
+        api_limits = create_api_limits(api_concurrency, context=context)
+        cache_path = self.cache_path or str(DEFAULT_CACHE_PATH)
+        
+        location_stats, failures = {}, {}
+        with ProcessPoolExecutor(
+            max_workers=max(1, min(max_workers, len(locations))),
+            mp_context=context,
+            initializer=_init_location_worker,
+            initargs=(api_limits, cache_path, self.max_sink_workers, self.search_cache_enabled)
+        ) as executor:
+            futures = {}
+            for location in locations:
+                city, state = self._parse_location(location)
+                kwargs = dict(run_kwargs)
+                kwargs.update(
+                    search_query=f"{city} {state} teardown single family home large lot",
+                    location=location,
+                    publish=False,
+                    batch_id=batch_id
+                )
+                futures[executor.submit(_run_location, kwargs)] = location
+            
+            for future in as_completed(futures):
+                location = futures[future]
+                try:
+                    location_stats[location] = future.result()
+                    self.logger.info(f"✓ {location}: {location_stats[location]['total_listings']} listings, "
+                                     f"{location_stats[location]['development_opportunities']} opportunities")
+                except Exception as e:
+                    failures[location] = str(e)
+                    self.logger.error(f"{location} failed: {e}")
+        
+        # Merge per-location results in the order the locations were given.
+        # With spill_mb, workers hand back spill buffers and the merge spills too.
+        spill_mb = run_kwargs.get('spill_mb')
+        if spill_mb:
+            classified_listings, development_opportunities = SpillBuffer(spill_mb), SpillBuffer(spill_mb)
+        else:
+            classified_listings, development_opportunities = [], []
+        for location in locations:
+            if location in location_stats:
+                for merged, key in ((classified_listings, 'listings'), (development_opportunities, 'opportunities')):
+                    results = location_stats[location].pop(key, [])
+                    merged.extend(results)
+                    if isinstance(results, SpillBuffer):
+                        results.close()
+        total_found = sum(s['total_listings'] for s in location_stats.values())
+        high_value = [l for l in classified_listings if float(l.get('development_score', 0)) >= 70.0]
+        
+        if classified_listings:
+            save_to_csv(classified_listings, 'classified_listings.csv')
+            save_to_json(classified_listings, 'classified_listings.json')
+        if development_opportunities:
+            save_to_csv(development_opportunities, 'development_opportunities.csv')
+            save_to_json(development_opportunities, 'development_opportunities.json')
+        
+        # Publish once for the batch; workers already saved to the database
+        sinks = StageGraph(max_workers=self.max_sink_workers, logger=self.logger)
+        if classified_listings:
+            sinks.add_stage(
+                'sheets',
+                lambda: self._upload_to_sheets_by_location(classified_listings, locations)
+            )
+            sinks.add_stage(
+                'alerts',
+                lambda: self._send_alerts(
+                    classified_listings, high_value,
+                    total_found=total_found,
+                    opportunities_found=len(development_opportunities)
+                )
+            )
+        sinks.add_stage('map', lambda: self._generate_map(classified_listings))
+        sink_results = sinks.run()
+        
+        duration = (datetime.now() - start_time).total_seconds()
+        self.logger.info(f"Multi-location run {batch_id} finished in {duration:.1f}s: "
+                         f"{len(location_stats)}/{len(locations)} locations, "
+                         f"{len(development_opportunities)} development opportunities")
+        
+        batch_stats = {
+            'batch_id': batch_id,
+            'duration_seconds': duration,
+            'locations': location_stats,
+            'failed_locations': failures,
+            'total_listings': total_found,
+            'classified_listings': len(classified_listings),
+            'development_opportunities': len(development_opportunities),
+            'stage_seconds': {
+                name: round(result.duration_seconds, 2) for name, result in sink_results.items()
+            }
+        }
+        
+        if spill_mb:
+            classified_listings.close()
+            development_opportunities.close()
+        
+        return batch_stats
+    
+    def _finish_run(
+        self,
+        search_query: str,
+        location: str,
+        start_time: datetime,
+        total_found: int,
+        classified_listings: List[Dict[str, Any]],
+        min_dev_score: float,
+        profiler: StageProfiler,
+        run_id: Optional[int] = None,
+        batch_id: Optional[str] = None,
+        publish: bool = True,
+        checkpoint_run_id: Optional[str] = None,
+        query_yield: Optional[QueryYieldTracker] = None,
+        budget: Optional[ApiBudget] = None
+    ) -> Dict[str, Any]:
+        """
+        Filter opportunities, run the sinks (Stages 4-7) and build run statistics
+        
+        Shared by run() and arun() once listings are classified. A spilled
+        classified_listings buffer is filtered, sorted and exported out of
+        core; its buffers are deleted afterwards unless they are returned
+        (publish=False). The run's query template yield (query_yield) is
+        added to the historical database once its leads are known. The run's
+        API credit budget only feeds the statistics here; run() and arun()
+        uninstall it and write its reservations to the ledger afterwards,
+        even when the run fails partway.
+        
+        Returns:
+            Dictionary with pipeline results and statistics
+        """
+        # Filter for development opportunities
+        development_opportunities = []
+        if isinstance(classified_listings, SpillBuffer):
+            development_opportunities = self._filter_spilled_opportunities(classified_listings, min_dev_score)
+            self.logger.info(f"Found {len(development_opportunities)} development opportunities")
+        elif classified_listings:
+            development_opportunities = self.classifier.filter_development_opportunities(
+                classified_listings,
+                min_score=min_dev_score,
+                include_potential=True
+            )
+            self.logger.info(f"Found {len(development_opportunities)} development opportunities")
+        
+        # Stage 4: Save Results
+        self.logger.info("\n" + "=" * 60)
+        self.logger.info("STAGE 4: SAVING RESULTS")
+        self.logger.info("=" * 60)
+        
+        # Filter high-value opportunities (score >= 70)
+        high_value = [l for l in classified_listings if float(l.get('development_score', 0)) >= 70.0]
+        
+        if classified_listings and publish:
+            save_to_csv(classified_listings, 'classified_listings.csv')
+            save_to_json(classified_listings, 'classified_listings.json')
+        
+        # Stages 4-7: Sheets upload, alerts, database and map run concurrently.
+        # Only the map depends on another sink (it reads back from the database).
+        sinks = StageGraph(max_workers=self.max_sink_workers, logger=self.logger)
+        if classified_listings and publish:
+            sinks.add_stage('sheets', profiler.wrap(
+                'sheets',
+                lambda: self._upload_to_sheets(classified_listings, location),
+                items=len(classified_listings)
+            ))
+            sinks.add_stage('alerts', profiler.wrap(
+                'alerts',
+                lambda: self._send_alerts(
+                    classified_listings, high_value,
+                    total_found=total_found,
+                    opportunities_found=len(development_opportunities)
+                ),
+                items=len(high_value)
+            ))
+        sinks.add_stage('database', profiler.wrap(
+            'database',
+            lambda: self._save_to_database(
+                search_query, location, start_time,
+                total_found=total_found,
+                opportunities_found=len(development_opportunities),
+                high_value_found=len(high_value),
+                classified_listings=classified_listings,
+                run_id=run_id,
+                batch_id=batch_id
+            ),
+            items=len(classified_listings)
+        ))
+        if publish:
+            sinks.add_stage(
+                'map',
+                profiler.wrap('map', lambda: self._generate_map(classified_listings)),
+                depends_on=['database']
+            )
+        sink_results = sinks.run()
+        run_id = sink_results['database'].value or run_id
+        
+        stage_profile = profiler.to_dicts()
+        if run_id is not None:
+            self._save_stage_profiles(run_id, stage_profile)
+        if query_yield and query_yield.templates:
+            self._save_query_yield(location, query_yield, classified_listings)
+        self._purge_caches()
+        
+        if development_opportunities and publish:
+            save_to_csv(development_opportunities, 'development_opportunities.csv')
+            save_to_json(development_opportunities, 'development_opportunities.json')
+        
+        # Pipeline statistics
+        end_time = datetime.now()
+        duration = (end_time - start_time).total_seconds()
+        
+        stats = {
+            'start_time': start_time.strftime('%Y-%m-%d %H:%M:%S'),
+            'end_time': end_time.strftime('%Y-%m-%d %H:%M:%S'),
+            'duration_seconds': duration,
+            'total_listings': total_found,
+            'classified_listings': len(classified_listings),
+            'development_opportunities': len(development_opportunities),
+            'search_query': search_query,
+            'location': location,
+            'run_id': run_id,
+            'checkpoint_run_id': checkpoint_run_id,
+            'stage_seconds': {
+                profile['stage']: round(profile['wall_seconds'], 2) for profile in stage_profile
+            },
+            'stage_profile': stage_profile,
+            'query_yield': query_yield.to_dicts() if query_yield else [],
+            'api_credits': budget.summary() if budget else {}
+        }
+        
+        # Classification breakdown
+        if classified_listings:
+            label_counts = {}
+            for listing in classified_listings:
+                label = listing.get('label', 'unknown')
+                label_counts[label] = label_counts.get(label, 0) + 1
+            stats['classification_breakdown'] = label_counts
+            
+            skipped = sum(1 for listing in classified_listings if listing.get('classification_skipped'))
+            if skipped:
+                stats['classifications_skipped'] = skipped
+                self.logger.warning(f"{skipped} listings left unclassified by the OpenAI budget - "
+                                    f"a later run with budget left classifies them")
+        
+        self._print_summary(stats, list(islice(development_opportunities, 10)))
+        
+        if not publish:
+            stats['listings'] = classified_listings
+            stats['opportunities'] = development_opportunities
+        elif isinstance(classified_listings, SpillBuffer):
+            classified_listings.close()
+            development_opportunities.close()
+        
+        return stats
+    
+    def _install_budget(self, location: str, credit_limits: Optional[Dict[str, float]]) -> ApiBudget:
+        """Create this run's API credit budget and install it for LLMSearch, LLMClassifier and Sheets"""
+        budget = ApiBudget(
+            run_limits=credit_limits,
+            window_limits=window_limits_from_env(),
+            ledger=self.database,
+            location=location
+        )
+        install_api_budget(budget)
+        return budget
+    
+    def _finish_budget(self, budget: ApiBudget):
+        """Uninstall the run's budget and write its buffered reservations to the ledger"""
+        install_api_budget(None)
+        try:
+            budget.flush()
         except Exception as e:
-            self.logger.debug(f"Could not send scan started notification: {e}")
+            self.logger.warning(f"API credit ledger save failed (non-critical): {e}")
+        for service, usage in budget.summary().items():
+            if usage['refused']:
+                self.logger.warning(f"{service}: {usage['refused']} calls refused by the credit budget")
+    
+    def _filter_spilled_opportunities(self, classified_listings: SpillBuffer, min_dev_score: float) -> SpillBuffer:
+        """Out-of-core filter_development_opportunities: matching listings, highest score first"""
+        with classified_listings.filter(
+            lambda listing: self.classifier.is_development_opportunity(listing, min_score=min_dev_score)
+        ) as opportunities:
+            return opportunities.sorted(key=lambda listing: listing.get('development_score', 0), reverse=True)
+    
+    def _collect_listings(
+        self,
+        location: str,
+        use_scrapers: bool,
+        max_pages: int,
+        plan: Optional[List[PlannedQuery]] = None,
+        query_yield: Optional[QueryYieldTracker] = None,
+        maps_coordinates: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Stage 1: Collect listings from SerpAPI and (optionally) direct scrapers
         
-        # Stage 1: Data Collection
+        Args:
+            plan: Search queries to run (defaults to every address-focused template)
+            query_yield: Collects per-template search yield for this run
+            maps_coordinates: Carry Google Maps coordinates over (see run())
+        
+        Returns:
+            Deduplicated list of raw listings
+        """
         self.logger.info("\n" + "=" * 60)
         self.logger.info("STAGE 1: DATA COLLECTION")
         self.logger.info("=" * 60)
@@ -85,250 +901,951 @@ class DevelopmentPipeline:
         # Use LLM Search (primary method - fast and reliable)
         self.logger.info("Searching via SerpAPI...")
         
-        # Build address-focused search queries
+        # Build address-focused search queries
+        from app.scraper.search_query_builder import SearchQueryBuilder
+        query_builder = SearchQueryBuilder()
+        
+        # Use address-focused queries instead of generic ones, best-yielding templates first
+        if plan is None:
+            plan = self._plan_queries(location)
+        
+        search_listings = self._search_planned(plan, location, query_yield)
+        
+        # Filter to keep only real property addresses
+        search_listings = query_builder.extract_real_addresses(search_listings)
+        
+        all_listings.extend(search_listings)
+        self.logger.info(f"SerpAPI: Found {len(search_listings)} listings (filtered for real addresses)")
+        self._log_search_cache()
+        
+        # Optionally use direct scrapers
+        if use_scrapers:
+            for name, listings in self._scrape_sources(location, max_pages):
+                all_listings.extend(listings)
+        
+        all_listings = self._finish_collection(all_listings)
+        if maps_coordinates:
+            self._attach_maps_coordinates(all_listings, location)
+        return all_listings
+    
+    async def _acollect_listings(
+        self,
+        location: str,
+        use_scrapers: bool,
+        max_pages: int,
+        client,
+        plan: Optional[List[PlannedQuery]] = None,
+        query_yield: Optional[QueryYieldTracker] = None,
+        maps_coordinates: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Async variant of _collect_listings
+        
+        Search queries and the scrapers' page fetches run concurrently on
+        the event loop.
+        
+        Returns:
+            Deduplicated list of raw listings
+        """
+        self.logger.info("\n" + "=" * 60)
+        self.logger.info("STAGE 1: DATA COLLECTION (ASYNC)")
+        self.logger.info("=" * 60)
+        
+        from app.scraper.search_query_builder import SearchQueryBuilder
+        query_builder = SearchQueryBuilder()
+        if plan is None:
+            plan = self._plan_queries(location)
+        
+        scraped = None
+        if use_scrapers:
+            scraped = asyncio.create_task(self._ascrape_sources(location, max_pages, client))
+        
+        search_listings = await self._asearch_planned(plan, location, client, query_yield)
+        all_listings = query_builder.extract_real_addresses(search_listings)
+        self.logger.info(f"SerpAPI: Found {len(all_listings)} listings (filtered for real addresses)")
+        self._log_search_cache()
+        
+        if scraped:
+            all_listings.extend(await scraped)
+        
+        all_listings = self._finish_collection(all_listings)
+        if maps_coordinates:
+            await asyncio.to_thread(self._attach_maps_coordinates, all_listings, location)
+        return all_listings
+    
+    def _attach_maps_coordinates(
+        self,
+        listings: List[Dict[str, Any]],
+        location: str,
+        max_queries: Optional[int] = None
+    ) -> int:
+        """
+        Give listings without coordinates those of matching Google Maps results
+        
+        One Maps search is issued per street, streets with the most listings
+        missing coordinates first, up to max_queries (MAPS_MAX_QUERIES).
+        Results are joined to listings by normalized address. Matched
+        coordinates are also stored in the geocode cache, so later runs skip
+        Nominatim for those addresses even without Maps searches.
+        
+        Returns:
+            Number of Maps searches issued
+        """
+        max_queries = self.MAPS_MAX_QUERIES if max_queries is None else max_queries
+        missing = [l for l in listings if l.get('latitude') is None or l.get('longitude') is None]
+        streets = Counter(filter(None, (street_from_address(l.get('address', '')) for l in missing)))
+        queries = [street for street, _ in streets.most_common(max_queries)]
+        if not queries:
+            return 0
+        
+        try:
+            coordinates = self.llm_search.harvest_coordinates(queries, location)
+        except Exception as e:
+            self.logger.warning(f"Google Maps coordinate search failed (non-critical): {e}")
+            return len(queries)
+        
+        matched = 0
+        for listing in missing:
+            coords = coordinates.get(normalize_address(listing.get('address', '')))
+            if coords:
+                listing.update(coords)
+                listing['coordinates_source'] = 'google_maps'
+                matched += 1
+                if self.cache:
+                    self.cache.set('geocode', listing['address'].strip().lower(), coords)
+        
+        self.logger.info(f"✓ Google Maps coordinates for {matched}/{len(missing)} listings "
+                         f"({len(queries)} searches) - geocoding skipped for those")
+        return len(queries)
+    
+    def _purge_caches(self):
+        """Delete expired entries (SerpAPI responses, parse results, page validators) from the caches in use"""
+        caches = [self.cache, self.search_cache]
+        if http_cache_stats() is not None:   # Only once the scrapers have used it
+            caches.append(http_cache().cache)
+        
+        purged_paths = set()
+        for cache in caches:
+            if cache is None or cache.path in purged_paths:
+                continue
+            purged_paths.add(cache.path)
+            try:
+                purged = cache.purge_expired()
+            except Exception as e:
+                self.logger.warning(f"Cache cleanup failed for {cache.path} (non-critical): {e}")
+                continue
+            if purged:
+                self.logger.info(f"Purged {purged} expired cache entries from {cache.path.name}")
+    
+    def _log_search_cache(self):
+        """Log SerpAPI cache hits/misses so far in this process"""
+        for engine, counts in self.llm_search.cache_stats.items():
+            self.logger.info(f"SerpAPI cache ({engine}): {counts['hits']} hits, {counts['misses']} misses")
+    
+    def _log_page_cache(self):
+        """Log how the scrapers' pages were served so far in this process, and which hosts pushed back"""
+        stats = http_cache_stats()
+        if stats:
+            self.logger.info(f"Scraper page cache: {stats['fresh']} fresh, {stats['revalidated']} revalidated, "
+                             f"{stats['fetched']} fetched, {stats['parses_skipped']} parses skipped")
+        for host, throttle in host_throttle_stats().items():
+            if throttle['blocks']:
+                state = "circuit open, skipped for the rest of the run" if throttle['circuit_open'] else \
+                    f"slowed to {throttle['rate']} requests/s"
+                self.logger.warning(f"{host}: {throttle['blocks']} block signals ({state})")
+    
+    def _plan_queries(
+        self,
+        location: str,
+        query_budget: Optional[int] = None,
+        street_sweep: Optional[int] = None,
+        street_list: Optional[str] = None
+    ) -> List[PlannedQuery]:
+        """
+        Search queries for this run: address-focused templates within the
+        page budget, then any street-sweep queries
+        
+        Templates are ranked on their accumulated yield for the location;
+        without stored stats (or a database) every template ranks equal.
+        """
+        from app.scraper.search_query_builder import SearchQueryBuilder
+        templates = SearchQueryBuilder.build_template_queries(location)
+        
+        stats = {}
+        if query_budget is not None:
+            try:
+                stats = self.database.get_query_template_stats(location)
+            except Exception as e:
+                self.logger.warning(f"Query template stats unavailable (non-critical): {e}")
+        
+        plan = QueryPlanner().plan(templates, stats, budget=query_budget,
+                                   max_pages=self.llm_search.SEARCH_MAX_PAGES)
+        if query_budget is not None:
+            self.logger.info(f"Query plan: {len(plan)}/{len(templates)} templates, "
+                             f"{sum(q.max_pages for q in plan)} pages (budget {query_budget}): "
+                             f"{', '.join(q.template for q in plan)}")
+        if street_sweep:
+            plan.extend(self._plan_street_sweep(location, street_sweep, street_list))
+        return plan
+    
+    def _plan_street_sweep(
+        self,
+        location: str,
+        street_sweep: int,
+        street_list: Optional[str] = None
+    ) -> List[PlannedQuery]:
+        """
+        Street-level queries for the streets due for a sweep (one result page each)
+        
+        Returns:
+            Planned street queries, or none if no street list is available
+        """
+        from app.scraper.search_query_builder import SearchQueryBuilder
+        
+        path = Path(street_list) if street_list else street_list_path(location)
+        try:
+            if path.exists():
+                streets = load_street_list(path)
+            else:
+                streets = streets_from_parcel_cache(self.cache) if self.cache else []
+        except Exception as e:
+            self.logger.warning(f"Street list {path} unreadable - street sweep skipped: {e}")
+            return []
+        if not streets:
+            self.logger.warning(f"No street list for {location} ({path}) - street sweep skipped")
+            return []
+        
+        try:
+            history = self.database.get_street_sweep_history(location)
+        except Exception as e:
+            self.logger.warning(f"Street sweep history unavailable (non-critical): {e}")
+            history = {}
+        
+        chosen = next_streets(streets, history, street_sweep)
+        swept = {street.lower() for street in history}
+        never_swept = sum(1 for street in streets if street.lower() not in swept)
+        self.logger.info(f"Street sweep: {len(chosen)} of {len(streets)} streets "
+                         f"({never_swept} never swept)")
+        
+        return [
+            PlannedQuery(STREET_SWEEP_TEMPLATE, query, max_pages=1, street=street)
+            for street, query in SearchQueryBuilder.build_street_queries(chosen, location)
+        ]
+    
+    def _search_planned(
+        self,
+        plan: List[PlannedQuery],
+        location: str,
+        query_yield: Optional[QueryYieldTracker] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Run planned queries concurrently (see LLMSearch.search_multiple_queries)
+        
+        Returns:
+            Combined results deduplicated by link, in plan order
+        """
+        if not plan:
+            return []
+        
+        with ThreadPoolExecutor(max_workers=min(self.llm_search.SEARCH_WORKERS, len(plan))) as executor:
+            results = list(executor.map(
+                lambda planned: self.llm_search.search_properties_paginated(
+                    planned.query, location, max_pages=planned.max_pages),
+                plan
+            ))
+        
+        return self._combine_planned(plan, results, query_yield)
+    
+    async def _asearch_planned(
+        self,
+        plan: List[PlannedQuery],
+        location: str,
+        client,
+        query_yield: Optional[QueryYieldTracker] = None
+    ) -> List[Dict[str, Any]]:
+        """Async variant of _search_planned"""
+        results = await asyncio.gather(*(
+            self.llm_search.asearch_properties_paginated(planned.query, client, location,
+                                                         max_pages=planned.max_pages)
+            for planned in plan
+        ))
+        
+        # Known-address lookups hit the database
+        return await asyncio.to_thread(self._combine_planned, plan, results, query_yield)
+    
+    def _combine_planned(
+        self,
+        plan: List[PlannedQuery],
+        results: List[List[Dict[str, Any]]],
+        query_yield: Optional[QueryYieldTracker] = None
+    ) -> List[Dict[str, Any]]:
+        """Record each query's yield, then merge the results by listing ID"""
+        if query_yield is not None:
+            for planned, listings in zip(plan, results):
+                query_yield.record_search(planned.template, listings, street=planned.street)
+        return self.llm_search._unique_listings([listing for listings in results for listing in listings])
+    
+    def _resolve_listing_ids(self, listings: List[Dict[str, Any]], seen_keys) -> List[Dict[str, Any]]:
+        """
+        Drop listings already collected this run under the same listing ID
+        
+        Listing IDs come from the listing URLs (Zillow zpid, Redfin home id,
+        Realtor property id; canonical URL otherwise), so tracking parameters
+        and alternate paths no longer let a duplicate through to enrichment
+        and classification. Listings whose ID is in the seen-ID index from
+        earlier runs take the address they were first seen with, so
+        incremental reuse and the database treat them as the same listing.
+        
+        Only duplicates within this run are dropped. A listing seen in an
+        earlier run is kept; it skips GIS enrichment and classification only
+        in incremental runs (when unchanged), since a non-incremental run
+        reprocesses every listing by design.
+        
+        Args:
+            listings: Collected listings (gain 'listing_id' when their URL has one)
+            seen_keys: Listing keys collected so far this run (updated in place)
+            
+        Returns:
+            Listings with a new key, or without a URL, in their original order
+        """
+        unique = []
+        for listing in listings:
+            stable_id = listing_identity(listing)
+            key = stable_id or listing_key(listing)
+            if key:
+                if key in seen_keys:
+                    continue
+                seen_keys.add(key)
+            if stable_id:
+                listing['listing_id'] = stable_id
+            unique.append(listing)
+        
+        identified = [l for l in unique if l.get('listing_id') and l.get('address')]
+        if not identified:
+            return unique
+        try:
+            indexed = self.database.get_listing_ids([l['listing_id'] for l in identified])
+            self.database.record_listing_ids([
+                {'listing_id': l['listing_id'], 'address': l['address'], 'link': l.get('link') or l.get('url')}
+                for l in identified
+            ])
+        except Exception as e:
+            self.logger.warning(f"Listing ID index unavailable (non-critical): {e}")
+            return unique
+        
+        realigned = 0
+        for listing in identified:
+            address = indexed.get(listing['listing_id'])
+            if address and address != listing['address']:
+                listing['address'] = address
+                realigned += 1
+        if indexed:
+            self.logger.info(f"Listing ID index: {len(indexed)}/{len(identified)} listings seen in earlier runs "
+                             f"({realigned} under a different address; reused only by --incremental runs)")
+        return unique
+    
+    def _known_addresses(self, addresses: List[str]) -> set:
+        """Lowercased addresses already in the historical database (none if it is unavailable)"""
+        try:
+            return self.database.get_known_addresses(addresses)
+        except Exception as e:
+            self.logger.warning(f"Known address lookup failed (non-critical): {e}")
+            return set()
+    
+    def _save_query_yield(
+        self,
+        location: str,
+        query_yield: QueryYieldTracker,
+        classified_listings: List[Dict[str, Any]]
+    ):
+        """Credit high-score leads to their query templates and persist the run's template yield"""
+        query_yield.record_leads(classified_listings)
+        for stats in query_yield.to_dicts():
+            self.logger.info(f"Query template {stats['template']}: {stats['pages']} pages, "
+                             f"{stats['results']} results, {stats['real_addresses']} real, "
+                             f"{stats['new_addresses']} new, {stats['high_score_leads']} high-score")
+        try:
+            self.database.save_query_template_stats(location, query_yield.to_dicts())
+            if query_yield.streets:
+                self.database.record_street_sweeps(location, query_yield.street_dicts())
+        except Exception as e:
+            self.logger.warning(f"Query template stats save failed (non-critical): {e}")
+    
+    def _finish_collection(self, all_listings: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Deduplicate, fingerprint and save collected raw listings"""
+        # Deduplicate by listing ID (search results and scrapers alike), then by address
+        all_listings = self._resolve_listing_ids(all_listings, set())
+        all_listings = deduplicate_listings(all_listings, key='address')
+        self.logger.info(f"\nTotal unique listings collected: {len(all_listings)}")
+        
+        # Fingerprint source fields so later incremental runs can skip unchanged listings
+        for listing in all_listings:
+            listing['fingerprint'] = listing_fingerprint(listing)
+        
+        # Save raw listings
+        if all_listings:
+            save_to_csv(all_listings, 'raw_listings.csv')
+        
+        return all_listings
+    
+    def _scrape_sources(self, location: str, max_pages: int):
+        """
+        Run the direct scrapers, all sources at once
+        
+        Each source fetches its pages under its own host's throttle, so the
+        stage takes about as long as the slowest host.
+        
+        Yields:
+            (source name, listings) tuples as sources finish; failed sources
+            are logged and skipped
+        """
+        city, state = self._parse_location(location)
+        scrapers = self._scraper_sources()
+        reset_host_throttles()   # Hosts that blocked an earlier run get another chance
+        
+        def scrape(name, scraper):
+            self.logger.info(f"Scraping {name}...")
+            return scraper.search_location(city, state, max_pages=max_pages)
+        
+        with ThreadPoolExecutor(max_workers=len(scrapers)) as executor:
+            futures = {executor.submit(scrape, name, scraper): name for name, scraper in scrapers}
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    listings = future.result()
+                    self.logger.info(f"{name}: Found {len(listings)} listings")
+                    yield name, listings
+                except Exception as e:
+                    self.logger.error(f"{name} scraping failed: {e}")
+        self._log_page_cache()
+    
+    async def _ascrape_sources(self, location: str, max_pages: int, client) -> List[Dict[str, Any]]:
+        """
+        Async variant of _scrape_sources
+        
+        Returns:
+            Listings of every source that did not fail
+        """
+        city, state = self._parse_location(location)
+        scrapers = await asyncio.to_thread(self._scraper_sources)
+        reset_host_throttles()
+        
+        async def scrape(name, scraper):
+            self.logger.info(f"Scraping {name}...")
+            try:
+                listings = await scraper.asearch_location(city, state, client, max_pages=max_pages)
+                self.logger.info(f"{name}: Found {len(listings)} listings")
+                return listings
+            except Exception as e:
+                self.logger.error(f"{name} scraping failed: {e}")
+                return []
+        
+        results = await asyncio.gather(*(scrape(name, scraper) for name, scraper in scrapers))
+        self._log_page_cache()
+        return [listing for listings in results for listing in listings]
+    
+    def _scraper_sources(self) -> List[Tuple[str, Any]]:
+        """(source name, scraper) for each direct scraper"""
+        return [
+            ('Redfin', self.redfin_scraper),
+            ('Realtor.com', self.realtor_scraper),
+            ('Zillow', self.zillow_scraper),  # note: may be blocked
+        ]
+    
+    def _run_streaming(
+        self,
+        search_query: str,
+        location: str,
+        use_scrapers: bool,
+        max_pages: int,
+        enrich_data: bool,
+        classify_data: bool,
+        batch_id: Optional[str] = None,
+        spill_mb: Optional[float] = None,
+        plan: Optional[List[PlannedQuery]] = None,
+        query_yield: Optional[QueryYieldTracker] = None,
+        maps_coordinates: bool = False
+    ) -> Tuple[int, List[Dict[str, Any]], Optional[int]]:
+        """
+        Stages 1-3.5 in streaming mode
+        
+        Each listing flows search/scrapers -> enrichment -> classification ->
+        ROI -> database as soon as it is found, through bounded queues, so
+        network waits overlap across stages and the first lead is persisted
+        long before the last search query returns. Raw and enriched listings
+        are only counted, not retained.
+        
+        With spill_mb, classified listings are retained in a SpillBuffer and
+        the dedup indexes spill to disk too, so memory stays bounded.
+        
+        Returns:
+            (total listings found, classified listings, scan run_id or None)
+        """
+        self.logger.info("\n" + "=" * 60)
+        self.logger.info("STAGES 1-3.5: STREAMING COLLECTION → ENRICHMENT → CLASSIFICATION → ROI")
+        self.logger.info("=" * 60)
+        
+        found = [0]
+        
+        def source():
+            for listing in self._iter_listings(location, use_scrapers, max_pages, spill_mb,
+                                               plan=plan, query_yield=query_yield,
+                                               maps_coordinates=maps_coordinates):
+                found[0] += 1
+                yield listing
+        
+        stages = []
+        if enrich_data:
+            # Like enrich_listings_batch, a listing that fails enrichment goes on un-enriched
+            stages.append(StreamStage('enrich', self.enricher.enrich_listing,
+                                      workers=self.STREAM_ENRICH_WORKERS, pass_through_on_error=True))
+        
+        run_id = None
+        if classify_data:
+            stages.append(StreamStage('classify', self._classify_listing,
+                                      workers=self.STREAM_CLASSIFY_WORKERS))
+            stages.append(StreamStage('roi', self._add_roi_to_listing))
+            
+            # Record the run up front so listings can be persisted as they arrive.
+            # If the database is unavailable, Stage 6 saves everything at the end.
+            try:
+                db = self.database
+                run_id = db.record_scan_run(search_query=search_query, location=location,
+                                            run_type="manual", batch_id=batch_id)
+                db.update_scan_run(run_id, status='running')
+                
+                def persist(listing):
+                    try:
+                        db.save_listings([listing], run_id, auto_classify=True)
+                    except Exception as e:
+                        self.logger.warning(f"Could not persist {listing.get('address')}: {e}")
+                    return listing
+                
+                stages.append(StreamStage('persist', persist))
+            except Exception as e:
+                self.logger.warning(f"Streaming persistence disabled (non-critical): {e}")
+                run_id = None
+        
+        classified_listings = SpillBuffer(spill_mb) if spill_mb else []
+        stream_start = time.perf_counter()
+        processed = 0
+        
+        for listing in stream_through(source(), stages, queue_size=self.STREAM_QUEUE_SIZE, logger=self.logger):
+            processed += 1
+            if processed == 1:
+                self.logger.info(f"✓ First lead ready after {time.perf_counter() - stream_start:.1f}s: "
+                                 f"{listing.get('address', 'Unknown')}")
+            if classify_data:
+                classified_listings.append(listing)
+        
+        self.logger.info(f"Streamed {processed}/{found[0]} listings in "
+                         f"{time.perf_counter() - stream_start:.1f}s")
+        return found[0], classified_listings, run_id
+    
+    def _iter_listings(
+        self,
+        location: str,
+        use_scrapers: bool,
+        max_pages: int,
+        spill_mb: Optional[float] = None,
+        plan: Optional[List[PlannedQuery]] = None,
+        query_yield: Optional[QueryYieldTracker] = None,
+        maps_coordinates: bool = False
+    ):
+        """
+        Yield unique real-address listings one search query (or scraper) at a time
+        
+        Streaming counterpart of _collect_listings: duplicates are dropped by
+        listing ID and by address as results arrive. With spill_mb, the seen
+        listing IDs and addresses move to on-disk indexes once they outgrow memory. With
+        maps_coordinates, each query's new listings get Google Maps
+        coordinates before they are yielded, within one MAPS_MAX_QUERIES
+        budget for the whole run.
+        """
         from app.scraper.search_query_builder import SearchQueryBuilder
         query_builder = SearchQueryBuilder()
         
-        # Use address-focused queries instead of generic ones
-        search_queries = query_builder.build_address_focused_queries(location)
+        if spill_mb:
+            seen_keys, seen_addresses = SpillSet.for_memory_limit(spill_mb), SpillSet.for_memory_limit(spill_mb)
+        else:
+            seen_keys, seen_addresses = set(), set()
         
-        search_listings = self.llm_search.search_multiple_queries(search_queries, location)
+        def unseen(listings):
+            for listing in self._resolve_listing_ids(listings, seen_keys):
+                address = listing.get('address', '')
+                if not address or address in seen_addresses:
+                    continue
+                seen_addresses.add(address)
+                listing['fingerprint'] = listing_fingerprint(listing)
+                yield listing
         
-        # Filter to keep only real property addresses
-        search_listings = query_builder.extract_real_addresses(search_listings)
+        maps_budget = [self.MAPS_MAX_QUERIES if maps_coordinates else 0]
         
-        all_listings.extend(search_listings)
-        self.logger.info(f"SerpAPI: Found {len(search_listings)} listings (filtered for real addresses)")
+        def located(listings):
+            listings = list(listings)
+            if maps_budget[0] > 0:
+                maps_budget[0] -= self._attach_maps_coordinates(listings, location, max_queries=maps_budget[0])
+            return listings
         
-        # Optionally use direct scrapers
-        if use_scrapers:
-            city, state = self._parse_location(location)
-            
-            # Redfin
-            try:
-                self.logger.info("Scraping Redfin...")
-                redfin_listings = self.redfin_scraper.search_location(
-                    city, state, max_pages=max_pages
+        try:
+            # Queries run concurrently under the search rate limiter; results
+            # are yielded per query, in plan order, as soon as they are in
+            if plan is None:
+                plan = self._plan_queries(location)
+            with ThreadPoolExecutor(max_workers=self.llm_search.SEARCH_WORKERS) as executor:
+                searches = executor.map(
+                    lambda planned: self.llm_search.search_properties_paginated(
+                        planned.query, location, max_pages=planned.max_pages),
+                    plan
                 )
-                all_listings.extend(redfin_listings)
-                self.logger.info(f"Redfin: Found {len(redfin_listings)} listings")
-            except Exception as e:
-                self.logger.error(f"Redfin scraping failed: {e}")
+                for planned, results in zip(plan, searches):
+                    if query_yield is not None:
+                        query_yield.record_search(planned.template, results, street=planned.street)
+                    yield from located(unseen(query_builder.extract_real_addresses(results)))
+            self._log_search_cache()
             
-            # Realtor.com
+            if use_scrapers:
+                for name, listings in self._scrape_sources(location, max_pages):
+                    yield from located(unseen(listings))
+        finally:
+            for seen in (seen_keys, seen_addresses):
+                if isinstance(seen, SpillSet):
+                    seen.close()
+    
+    def _classify_listing(self, listing: Dict[str, Any]) -> Dict[str, Any]:
+        """Classify one listing, falling back to an 'unknown' label on error"""
+        try:
+            return self.classifier.classify_listing(listing)
+        except Exception as e:
+            return self._classification_failed(listing, e)
+    
+    def _classification_failed(self, listing: Dict[str, Any], error: Exception) -> Dict[str, Any]:
+        """Log a classification error and give the listing an 'unknown' label"""
+        self.logger.error(f"Error classifying listing: {error}")
+        listing['label'] = 'unknown'
+        listing['confidence'] = 0.0
+        listing['explanation'] = f"Classification error: {str(error)}"
+        listing['development_score'] = 0.0
+        listing['classification_error'] = True
+        return listing
+    
+    async def _aprocess_listing(
+        self,
+        listing: Dict[str, Any],
+        http_client,
+        openai_client,
+        enrich_data: bool,
+        classify_data: bool
+    ) -> Dict[str, Any]:
+        """
+        Enrich and classify one listing on the event loop
+        
+        Errors are handled like the batch stages: a failed enrichment keeps
+        the original listing, a failed classification labels it 'unknown'.
+        """
+        if enrich_data:
             try:
-                self.logger.info("Scraping Realtor.com...")
-                realtor_listings = self.realtor_scraper.search_location(
-                    city, state, max_pages=max_pages
-                )
-                all_listings.extend(realtor_listings)
-                self.logger.info(f"Realtor.com: Found {len(realtor_listings)} listings")
+                listing = await self.enricher.aenrich_listing(listing, http_client)
             except Exception as e:
-                self.logger.error(f"Realtor.com scraping failed: {e}")
-            
-            # Zillow (note: may be blocked)
+                self.logger.error(f"Error enriching listing: {e}")
+        
+        if classify_data:
             try:
-                self.logger.info("Scraping Zillow...")
-                zillow_listings = self.zillow_scraper.search_location(
-                    city, state, max_pages=max_pages
-                )
-                all_listings.extend(zillow_listings)
-                self.logger.info(f"Zillow: Found {len(zillow_listings)} listings")
+                listing = await self.classifier.aclassify_listing(listing, openai_client)
             except Exception as e:
-                self.logger.error(f"Zillow scraping failed: {e}")
+                listing = self._classification_failed(listing, e)
         
-        # Deduplicate
-        all_listings = deduplicate_listings(all_listings, key='address')
-        self.logger.info(f"\nTotal unique listings collected: {len(all_listings)}")
+        return listing
+    
+    def _find_unchanged(self, listings: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Find listings whose fingerprint matches their last stored snapshot
         
-        # Save raw listings
-        if all_listings:
-            save_to_csv(all_listings, 'raw_listings.csv')
+        Snapshots holding a failed or budget-skipped classification are not
+        reused, so those listings are classified again.
         
-        # Stage 2: Data Enrichment
-        if enrich_data and all_listings:
-            self.logger.info("\n" + "=" * 60)
-            self.logger.info("STAGE 2: DATA ENRICHMENT")
-            self.logger.info("=" * 60)
+        Args:
+            listings: Fingerprinted raw listings
             
-            all_listings = self.enricher.enrich_listings_batch(all_listings)
-            self.logger.info(f"Enriched {len(all_listings)} listings with GIS data")
+        Returns:
+            Dictionary of address -> stored processed listing to reuse
+        """
+        try:
+            stored = self.database.get_listing_snapshots(
+                [l.get('address', '') for l in listings],
+                max_age_days=self.INCREMENTAL_MAX_AGE_DAYS
+            )
+        except Exception as e:
+            self.logger.warning(f"Incremental lookup failed, processing all listings: {e}")
+            return {}
         
-        # Stage 3: Classification
-        classified_listings = []
-        development_opportunities = []
+        reused = {}
+        for listing in listings:
+            address = listing.get('address')
+            previous = stored.get(address)
+            if (previous and previous['fingerprint'] == listing.get('fingerprint')
+                    and has_classification(previous['snapshot'])):
+                snapshot = previous['snapshot']
+                # Carry over this run's search metadata; enriched fields stay as stored
+                for key in ('title', 'link', 'snippet', 'search_timestamp', 'source_url'):
+                    if listing.get(key):
+                        snapshot[key] = listing[key]
+                reused[address] = snapshot
         
-        if classify_data and all_listings:
-            self.logger.info("\n" + "=" * 60)
-            self.logger.info("STAGE 3: CLASSIFICATION")
-            self.logger.info("=" * 60)
-            
-            classified_listings = self.classifier.classify_listings_batch(all_listings)
-            self.logger.info(f"Classified {len(classified_listings)} listings")
-            
-            # Filter for development opportunities
-            development_opportunities = self.classifier.filter_development_opportunities(
-                classified_listings,
-                min_score=min_dev_score,
-                include_potential=True
-            )
-            self.logger.info(f"Found {len(development_opportunities)} development opportunities")
+        self.logger.info(f"Incremental: {len(reused)} unchanged listings reused, "
+                         f"{len(listings) - len(reused)} new, changed or not yet classified")
+        return reused
+    
+    def _run_checkpointed(
+        self,
+        checkpoint: RunCheckpoint,
+        stage: str,
+        listings: List[Dict[str, Any]],
+        batch_func: Callable[..., List[Dict[str, Any]]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Run a per-listing batch stage, skipping listings already checkpointed
         
-        # Stage 3.5: ROI Scoring & Financial Analysis (NEW)
-        if classified_listings:
-            self.logger.info("\n" + "=" * 60)
-            self.logger.info("STAGE 3.5: ROI SCORING & FINANCIAL ANALYSIS")
-            self.logger.info("=" * 60)
+        Each finished listing is appended to the stage checkpoint as soon as it
+        is done, so a crash mid-stage only loses the listing in flight. Failed
+        classifications are not checkpointed, so a resume retries them.
+        
+        Args:
+            checkpoint: Checkpoint of the current run
+            stage: Checkpoint stage name ('enriched' or 'classified')
+            listings: Input listings (unique by address)
+            batch_func: Batch function accepting (listings, on_result=...) and
+                returning one output listing per input, in order
             
-            try:
-                from app.integrations.roi_calculator import EnhancedLLMClassifier
-                
-                roi_classifier = EnhancedLLMClassifier()
-                roi_count = 0
-                high_roi_count = 0
-                
-                # Add ROI calculations to each classified listing
-                for listing in classified_listings:
-                    # Create property data dict for ROI calculation
-                    property_data = {
-                        'address': listing.get('address'),
-                        'price': listing.get('price'),
-                        'last_price': listing.get('price'),
-                        'lot_size': listing.get('lot_size'),
-                        'square_feet': listing.get('square_feet'),
-                        'zoning_type': listing.get('zoning_type')
-                    }
-                    
-                    # Add ROI to classification
-                    listing = roi_classifier.add_roi_to_classification(listing, property_data)
-                    roi_count += 1
-                    
-                    # Track high-ROI opportunities
-                    if listing.get('roi_percentage', 0) >= 30:
-                        high_roi_count += 1
-                
-                self.logger.info(f"✓ ROI calculated for {roi_count} listings")
-                if high_roi_count > 0:
-                    self.logger.info(f"  - {high_roi_count} with excellent ROI potential (30%+)")
-                
-            except Exception as e:
-                self.logger.warning(f"ROI scoring failed (non-critical): {e}")
-                import traceback
-                self.logger.debug(traceback.format_exc())
+        Returns:
+            Stage output for every input listing, in input order
+        """
+        done = checkpoint.load_by_key(stage)
+        pending = [l for l in listings if l.get('address') not in done]
+        if done:
+            self.logger.info(f"Resuming {stage} stage: {len(listings) - len(pending)} done, "
+                             f"{len(pending)} remaining")
         
-        # Stage 4: Save Results & Upload to Google Sheets
+        def on_result(listing):
+            # Failed and budget-skipped classifications are redone on resume
+            if stage != 'classified' or has_classification(listing):
+                checkpoint.append(stage, listing)
+        
+        results = iter(batch_func(pending, on_result=on_result) if pending else [])
+        merged = [done[l['address']] if l.get('address') in done else next(results) for l in listings]
+        
+        checkpoint.mark_complete(stage)
+        return merged
+    
+    def _add_roi(self, classified_listings: List[Dict[str, Any]]) -> None:
+        """Stage 3.5: Add ROI scoring & financial analysis to classified listings in place"""
         self.logger.info("\n" + "=" * 60)
-        self.logger.info("STAGE 4: SAVING RESULTS & UPLOADING TO SHEETS")
+        self.logger.info("STAGE 3.5: ROI SCORING & FINANCIAL ANALYSIS")
         self.logger.info("=" * 60)
         
-        if classified_listings:
-            save_to_csv(classified_listings, 'classified_listings.csv')
-            save_to_json(classified_listings, 'classified_listings.json')
+        try:
+            roi_count = 0
+            high_roi_count = 0
             
-            # Upload to Google Sheets
-            try:
-                from app.integrations.google_sheets_uploader import GoogleSheetsUploader
-                
-                self.logger.info(f"Initializing Google Sheets uploader...")
-                sheets_uploader = GoogleSheetsUploader()
-                self.logger.info(f"✓ Uploader ready, uploading {len(classified_listings)} listings...")
+            # Add ROI calculations to each classified listing
+            for listing in classified_listings:
+                listing = self._add_roi_to_listing(listing)
+                roi_count += 1
                 
-                # Upload to Google Sheet with location filtering
+                # Track high-ROI opportunities
+                if listing.get('roi_percentage', 0) >= 30:
+                    high_roi_count += 1
+            
+            self.logger.info(f"✓ ROI calculated for {roi_count} listings")
+            if high_roi_count > 0:
+                self.logger.info(f"  - {high_roi_count} with excellent ROI potential (30%+)")
+            
+        except Exception as e:
+            self.logger.warning(f"ROI scoring failed (non-critical): {e}")
+            import traceback
+            self.logger.debug(traceback.format_exc())
+    
+    def _add_roi_to_listing(self, listing: Dict[str, Any]) -> Dict[str, Any]:
+        """Add ROI fields to a single classified listing"""
+        # Create property data dict for ROI calculation
+        property_data = {
+            'address': listing.get('address'),
+            'price': listing.get('price'),
+            'last_price': listing.get('price'),
+            'lot_size': listing.get('lot_size'),
+            'square_feet': listing.get('square_feet'),
+            'zoning_type': listing.get('zoning_type')
+        }
+        
+        return self.roi_classifier.add_roi_to_classification(listing, property_data)
+    
+    def _notify_scan_started(self):
+        """Send notification that a scan has started"""
+        try:
+            self.alert_manager.notify_scan_started(run_type="manual")
+        except Exception as e:
+            self.logger.debug(f"Could not send scan started notification: {e}")
+    
+    def _upload_to_sheets(self, classified_listings: List[Dict[str, Any]], location: str) -> bool:
+        """Stage 4: Upload classified listings to Google Sheets"""
+        try:
+            sheets_uploader = self.sheets_uploader
+            self.logger.info(f"✓ Uploader ready, uploading {len(classified_listings)} listings...")
+            
+            # Upload to Google Sheet with location filtering
+            with api_slot('google_sheets'):
                 success = sheets_uploader.upload_listings(
                     listings=classified_listings,
                     sheet_name='DevelopmentLeads',
                     location_filter=location,
                     sort_by='development_score'
                 )
-                
-                if success:
-                    self.logger.info(f"✓ Google Sheets upload successful ({len(classified_listings)} listings)")
-                else:
-                    self.logger.warning(f"Google Sheets upload returned False")
-                
-            except FileNotFoundError as e:
-                self.logger.warning(f"Google Sheets not configured: {e}")
-                self.logger.info("→ To enable: Download google_credentials.json (see TASK1_GOOGLE_SHEETS_SETUP.md)")
-            except Exception as e:
-                self.logger.error(f"Google Sheets upload failed: {e}")
-                import traceback
-                self.logger.error(traceback.format_exc())
             
-            # Stage 5: Send Alerts for High-Value Opportunities
-            self.logger.info("\n" + "=" * 60)
-            self.logger.info("STAGE 5: SENDING ALERTS")
-            self.logger.info("=" * 60)
+            if success:
+                self.logger.info(f"✓ Google Sheets upload successful ({len(classified_listings)} listings)")
+            else:
+                self.logger.warning(f"Google Sheets upload returned False")
+            return success
             
-            try:
-                from app.integrations.alert_manager import AlertManager
+        except FileNotFoundError as e:
+            self.logger.warning(f"Google Sheets not configured: {e}")
+            self.logger.info("→ To enable: Download google_credentials.json (see TASK1_GOOGLE_SHEETS_SETUP.md)")
+        except Exception as e:
+            self.logger.error(f"Google Sheets upload failed: {e}")
+            import traceback
+            self.logger.error(traceback.format_exc())
+        return False
+    
+    def _upload_to_sheets_by_location(
+        self,
+        classified_listings: List[Dict[str, Any]],
+        locations: List[str]
+    ) -> bool:
+        """Stage 4 (multi-location): Upload listings with one Sheets tab per location"""
+        try:
+            sheets_uploader = self.sheets_uploader
+            with api_slot('google_sheets'):
+                success = sheets_uploader.upload_with_tabs(
+                    listings=classified_listings,
+                    sheet_name='DevelopmentLeads',
+                    locations=locations
+                )
+            
+            if success:
+                self.logger.info(f"✓ Google Sheets upload successful ({len(locations)} location tabs)")
+            else:
+                self.logger.warning(f"Google Sheets upload returned False")
+            return success
+            
+        except FileNotFoundError as e:
+            self.logger.warning(f"Google Sheets not configured: {e}")
+        except Exception as e:
+            self.logger.error(f"Google Sheets upload failed: {e}")
+        return False
+    
+    def _send_alerts(
+        self,
+        classified_listings: List[Dict[str, Any]],
+        high_value: List[Dict[str, Any]],
+        total_found: int,
+        opportunities_found: int
+    ) -> Dict[str, bool]:
+        """Stage 5: Send alerts for high-value opportunities"""
+        try:
+            alert_manager = self.alert_manager
+            
+            if high_value:
+                self.logger.info(f"Found {len(high_value)} high-value opportunities (score >= 70)")
                 
-                alert_manager = AlertManager(email_enabled=True, slack_enabled=True)
+                alert_results = alert_manager.alert_on_opportunities(
+                    opportunities=high_value,
+                    recipient_email=None,  # Uses SENDER_EMAIL from env
+                    run_type="manual"
+                )
                 
-                # Filter high-value opportunities (score >= 70)
-                high_value = [l for l in classified_listings if float(l.get('development_score', 0)) >= 70.0]
+                if alert_results.get('email'):
+                    self.logger.info(f"✓ Email alert sent for {len(high_value)} opportunities")
+                if alert_results.get('slack'):
+                    self.logger.info(f"✓ Slack alert sent for {len(high_value)} opportunities")
                 
-                if high_value:
-                    self.logger.info(f"Found {len(high_value)} high-value opportunities (score >= 70)")
-                    
-                    alert_results = alert_manager.alert_on_opportunities(
-                        opportunities=high_value,
-                        recipient_email=None,  # Uses SENDER_EMAIL from env
-                        run_type="manual"
-                    )
-                    
-                    if alert_results.get('email'):
-                        self.logger.info(f"✓ Email alert sent for {len(high_value)} opportunities")
-                    if alert_results.get('slack'):
-                        self.logger.info(f"✓ Slack alert sent for {len(high_value)} opportunities")
-                    
-                    if not alert_results.get('email') and not alert_results.get('slack'):
-                        self.logger.warning("Alerts not configured - skipped email/Slack")
-                else:
-                    self.logger.info("No high-value opportunities found - sending scan completion summary")
-                    
-                    # Send scan completed notification (summary with no new values found)
-                    summary_results = alert_manager.notify_scan_completed(
-                        total_found=len(all_listings),
-                        opportunities_found=len(development_opportunities),
-                        high_value_found=0,
-                        run_type="manual"
-                    )
-                    
-                    if summary_results.get('email'):
-                        self.logger.info(f"✓ Scan completion email sent")
-                    if summary_results.get('slack'):
-                        self.logger.info(f"✓ Scan completion Slack notification sent")
-                    
-            except Exception as e:
-                self.logger.warning(f"Alert sending failed (non-critical): {e}")
+                if not alert_results.get('email') and not alert_results.get('slack'):
+                    self.logger.warning("Alerts not configured - skipped email/Slack")
+                return alert_results
+            
+            self.logger.info("No high-value opportunities found - sending scan completion summary")
+            
+            # Send scan completed notification (summary with no new values found)
+            summary_results = alert_manager.notify_scan_completed(
+                total_found=total_found,
+                opportunities_found=opportunities_found,
+                high_value_found=0,
+                run_type="manual"
+            )
+            
+            if summary_results.get('email'):
+                self.logger.info(f"✓ Scan completion email sent")
+            if summary_results.get('slack'):
+                self.logger.info(f"✓ Scan completion Slack notification sent")
+            return summary_results
+                
+        except Exception as e:
+            self.logger.warning(f"Alert sending failed (non-critical): {e}")
+            return {}
+    
+    def _save_to_database(
+        self,
+        search_query: str,
+        location: str,
+        start_time: datetime,
+        total_found: int,
+        opportunities_found: int,
+        high_value_found: int,
+        classified_listings: List[Dict[str, Any]],
+        run_id: Optional[int] = None,
+        batch_id: Optional[str] = None
+    ) -> Optional[int]:
+        """
+        Stage 6: Save the run and its classified listings to the historical database
         
-        # Stage 6: Save to Historical Database
-        self.logger.info("\n" + "=" * 60)
-        self.logger.info("STAGE 6: SAVING TO HISTORICAL DATABASE")
-        self.logger.info("=" * 60)
+        Args:
+            run_id: Scan run already recorded by streaming mode. Its totals are
+                updated in place and its listings (persisted while streaming)
+                are not saved a second time.
+            batch_id: Multi-location batch the new scan run belongs to
         
+        Returns:
+            run_id of the recorded scan run, or None if the save failed
+        """
         try:
-            from app.integrations.database_manager import HistoricalDatabaseManager
+            db = self.database
             
-            db = HistoricalDatabaseManager()
-            
-            # Record this scan run
-            run_id = db.record_scan_run(
-                search_query=search_query,
-                location=location,
-                run_type="manual",
-                total_found=len(all_listings),
-                opportunities_found=len(development_opportunities),
-                high_value_found=len(high_value) if classified_listings else 0,
+            run_totals = dict(
+                total_found=total_found,
+                opportunities_found=opportunities_found,
+                high_value_found=high_value_found,
                 duration_seconds=(datetime.now() - start_time).total_seconds()
             )
             
-            # Save all classified listings to database
-            if classified_listings:
-                db_stats = db.save_listings(classified_listings, run_id, auto_classify=True)
-                self.logger.info(f"✓ Database saved: {db_stats['new_listings']} new, "
-                               f"{db_stats['updated_listings']} updated, "
-                               f"{db_stats['classifications_added']} classifications")
+            if run_id is not None:
+                db.update_scan_run(run_id, status='success', **run_totals)
+                self.logger.info(f"✓ Database scan run {run_id} finalized "
+                               f"({len(classified_listings)} listings saved while streaming)")
+            else:
+                # Record this scan run
+                run_id = db.record_scan_run(
+                    search_query=search_query,
+                    location=location,
+                    run_type="manual",
+                    batch_id=batch_id,
+                    **run_totals
+                )
+                
+                # Save all classified listings to database
+                if classified_listings:
+                    db_stats = db.save_listings(classified_listings, run_id, auto_classify=True)
+                    self.logger.info(f"✓ Database saved: {db_stats['new_listings']} new, "
+                                   f"{db_stats['updated_listings']} updated, "
+                                   f"{db_stats['classifications_added']} classifications")
             
             # Show database statistics
             db_stats = db.get_statistics(days=30)
@@ -336,101 +1853,86 @@ class DevelopmentPipeline:
             self.logger.info(f"  - {db_stats['total_listings']} total properties")
             self.logger.info(f"  - {db_stats['high_value_opportunities']} high-value opportunities (last 30 days)")
             self.logger.info(f"  - {db_stats['recent_runs']} scan runs (last 30 days)")
+            return run_id
             
         except Exception as e:
             self.logger.warning(f"Database save failed (non-critical): {e}")
             import traceback
             self.logger.debug(traceback.format_exc())
+            return None
+    
+    def _save_stage_profiles(self, run_id: int, stage_profile: List[Dict[str, Any]]):
+        """Persist the per-stage profile of this run, linked to its scan run"""
+        try:
+            self.database.save_stage_profiles(run_id, stage_profile)
+        except Exception as e:
+            self.logger.warning(f"Stage profile save failed (non-critical): {e}")
+    
+    def _generate_map(self, classified_listings: List[Dict[str, Any]]) -> Optional[str]:
+        """
+        Stage 7: Generate map visualization from recent database records
         
-        # Stage 7: Generate Map Visualization
-        self.logger.info("\n" + "=" * 60)
-        self.logger.info("STAGE 7: GENERATING MAP VISUALIZATION")
-        self.logger.info("=" * 60)
+        Must run after the database stage, since it maps what was just saved.
         
+        Returns:
+            Path of the saved map, or None if no map was produced
+        """
         try:
             from app.integrations.map_generator import MapGenerator
             from pathlib import Path
             
-            if classified_listings:
-                # Create output directory
-                map_dir = Path("data/maps")
-                map_dir.mkdir(parents=True, exist_ok=True)
-                
-                # Get all recent properties from database for mapping
-                db = HistoricalDatabaseManager()
-                map_properties = db.get_recent_opportunities(days=30, min_score=0)
-                
-                if map_properties:
-                    # Create and save maps
-                    map_gen = MapGenerator()
-                    stats_map = map_gen.add_properties(map_properties)
-                    
-                    # Log counts
-                    self.logger.info(f"✓ Added {len(map_properties)} properties to map:")
-                    self.logger.info(f"  - Excellent (🔴): {stats_map['excellent']}")
-                    self.logger.info(f"  - Good (🟠): {stats_map['good']}")
-                    self.logger.info(f"  - Fair (🟡): {stats_map['fair']}")
-                    self.logger.info(f"  - Low (🟢): {stats_map['low']}")
-                    
-                    # Add heatmap
-                    map_gen.add_heatmap()
-                    self.logger.info(f"✓ Heatmap layer added")
-                    
-                    # Add layer controls
-                    map_gen.add_layer_control()
-                    self.logger.info(f"✓ Layer controls added")
-                    
-                    # Save maps
-                    main_map = map_dir / "latest_map.html"
-                    map_path = map_gen.save_map(str(main_map))
-                    self.logger.info(f"✓ Main map saved: {main_map}")
-                    
-                    # Generate statistics
-                    map_stats = map_gen.generate_stats()
-                    self.logger.info(f"✓ Map statistics:")
-                    self.logger.info(f"  - Total: {map_stats['total_properties']}")
-                    self.logger.info(f"  - Avg score: {map_stats['average_score']:.1f}/100")
-                    self.logger.info(f"  - Range: {map_stats['min_score']:.1f}-{map_stats['max_score']:.1f}")
-                else:
-                    self.logger.info("⚠ No geocoded properties available for mapping")
-            else:
+            if not classified_listings:
                 self.logger.info("⚠ No classified listings available for mapping")
+                return None
+            
+            # Create output directory
+            map_dir = Path("data/maps")
+            map_dir.mkdir(parents=True, exist_ok=True)
+            
+            # Get all recent properties from database for mapping
+            map_properties = self.database.get_recent_opportunities(days=30, min_score=0)
+            
+            if not map_properties:
+                self.logger.info("⚠ No geocoded properties available for mapping")
+                return None
+            
+            # Create and save maps
+            map_gen = MapGenerator()
+            stats_map = map_gen.add_properties(map_properties)
+            
+            # Log counts
+            self.logger.info(f"✓ Added {len(map_properties)} properties to map:")
+            self.logger.info(f"  - Excellent (🔴): {stats_map['excellent']}")
+            self.logger.info(f"  - Good (🟠): {stats_map['good']}")
+            self.logger.info(f"  - Fair (🟡): {stats_map['fair']}")
+            self.logger.info(f"  - Low (🟢): {stats_map['low']}")
+            
+            # Add heatmap
+            map_gen.add_heatmap()
+            self.logger.info(f"✓ Heatmap layer added")
+            
+            # Add layer controls
+            map_gen.add_layer_control()
+            self.logger.info(f"✓ Layer controls added")
+            
+            # Save maps
+            main_map = map_dir / "latest_map.html"
+            map_path = map_gen.save_map(str(main_map))
+            self.logger.info(f"✓ Main map saved: {main_map}")
+            
+            # Generate statistics
+            map_stats = map_gen.generate_stats()
+            self.logger.info(f"✓ Map statistics:")
+            self.logger.info(f"  - Total: {map_stats['total_properties']}")
+            self.logger.info(f"  - Avg score: {map_stats['average_score']:.1f}/100")
+            self.logger.info(f"  - Range: {map_stats['min_score']:.1f}-{map_stats['max_score']:.1f}")
+            return map_path
                 
         except Exception as e:
             self.logger.warning(f"Map generation failed (non-critical): {e}")
             import traceback
             self.logger.debug(traceback.format_exc())
-        
-        if development_opportunities:
-            save_to_csv(development_opportunities, 'development_opportunities.csv')
-            save_to_json(development_opportunities, 'development_opportunities.json')
-        
-        # Pipeline statistics
-        end_time = datetime.now()
-        duration = (end_time - start_time).total_seconds()
-        
-        stats = {
-            'start_time': start_time.strftime('%Y-%m-%d %H:%M:%S'),
-            'end_time': end_time.strftime('%Y-%m-%d %H:%M:%S'),
-            'duration_seconds': duration,
-            'total_listings': len(all_listings),
-            'classified_listings': len(classified_listings),
-            'development_opportunities': len(development_opportunities),
-            'search_query': search_query,
-            'location': location
-        }
-        
-        # Classification breakdown
-        if classified_listings:
-            label_counts = {}
-            for listing in classified_listings:
-                label = listing.get('label', 'unknown')
-                label_counts[label] = label_counts.get(label, 0) + 1
-            stats['classification_breakdown'] = label_counts
-        
-        self._print_summary(stats, development_opportunities[:10])
-        
-        return stats
+            return None
     
     def _parse_location(self, location: str) -> tuple:
         """Parse location string into city and state"""
@@ -459,6 +1961,23 @@ class DevelopmentPipeline:
             for label, count in stats['classification_breakdown'].items():
                 self.logger.info(f"  {label}: {count}")
         
+        if stats.get('stage_profile'):
+            self.logger.info(f"\nStage Profile:")
+            self.logger.info(f"  {'Stage':<12} {'Wall s':>8} {'CPU s':>8} {'Peak MB':>8} {'Items':>6}  External calls")
+            for profile in stats['stage_profile']:
+                peak = f"{profile['peak_rss_mb']:.0f}" if profile['peak_rss_mb'] is not None else 'N/A'
+                items = profile['items'] if profile['items'] is not None else '-'
+                calls = ', '.join(f"{service}={count}" for service, count in sorted(profile['external_calls'].items()))
+                self.logger.info(f"  {profile['stage']:<12} {profile['wall_seconds']:>8.2f} "
+                                 f"{profile['cpu_seconds']:>8.2f} {peak:>8} {items:>6}  {calls or '-'}")
+        
+        if stats.get('api_credits'):
+            self.logger.info(f"\nAPI Credits:")
+            for service, usage in stats['api_credits'].items():
+                limit = f"/{usage['run_limit']:g}" if usage['run_limit'] is not None else ''
+                self.logger.info(f"  {service}: {usage['credits']:g}{limit} credits, "
+                                 f"{usage['calls']} calls, {usage['refused']} refused")
+        
         if top_opportunities:
             self.logger.info(f"\nTop 10 Development Opportunities:")
             for i, opp in enumerate(top_opportunities, 1):
@@ -474,6 +1993,30 @@ class DevelopmentPipeline:
         self.logger.info("=" * 60)
 
 
+# Multi-location worker process state (one pipeline per worker process)
+_worker_pipeline = None
+
+
+def _init_location_worker(
+    api_limits: Dict[str, Any],
+    cache_path: str,
+    max_sink_workers: int,
+    search_cache: bool = True
+):
+    """Process pool initializer: install the shared API caps and build a pipeline"""
+    global _worker_pipeline
+    install_api_limits(api_limits)
+    # Location workers already run one per core; parse pages in-process
+    install_parse_pool(ParsePool(workers=0))
+    _worker_pipeline = DevelopmentPipeline(max_sink_workers=max_sink_workers, cache_path=cache_path,
+                                           search_cache=search_cache)
+
+
+def _run_location(run_kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """Run the pipeline for one location inside a worker process"""
+    return _worker_pipeline.run(**run_kwargs)
+
+
 def main():
     """
     Command-line interface for the pipeline
@@ -520,6 +2063,93 @@ def main():
         help='Skip classification'
     )
     
+    parser.add_argument(
+        '--stream',
+        action='store_true',
+        help='Stream each listing through enrichment/classification as soon as it is found'
+    )
+    
+    parser.add_argument(
+        '--async',
+        dest='use_async',
+        action='store_true',
+        help='Run on an asyncio event loop with async HTTP/OpenAI clients'
+    )
+    
+    parser.add_argument(
+        '--resume',
+        metavar='RUN_ID',
+        help='Resume a failed run from its checkpoint, skipping completed work'
+    )
+    
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Skip enrichment/classification for listings unchanged since the last run '
+             '(without it, listings seen in earlier runs are processed again)'
+    )
+    
+    parser.add_argument(
+        '--no-search-cache',
+        action='store_true',
+        help='Always query SerpAPI instead of reusing cached responses'
+    )
+    
+    parser.add_argument(
+        '--spill-mb',
+        type=float,
+        metavar='MB',
+        help='With --stream: spill retained listings to disk past about this many MB'
+    )
+    
+    parser.add_argument(
+        '--query-budget',
+        type=int,
+        metavar='PAGES',
+        help='Spend at most this many SerpAPI result pages, on the best-yielding query templates'
+    )
+    
+    parser.add_argument(
+        '--street-sweep',
+        type=int,
+        metavar='STREETS',
+        help='Also search this many streets per run, rotating through the street list'
+    )
+    
+    parser.add_argument(
+        '--street-list',
+        metavar='FILE',
+        help='Street list for --street-sweep (.txt, .csv or a GIS layer; default data/streets/<location>.txt)'
+    )
+    
+    parser.add_argument(
+        '--maps-coordinates',
+        action='store_true',
+        help='Take coordinates from Google Maps searches (one per street) instead of geocoding each listing'
+    )
+    
+    parser.add_argument(
+        '--credit-limit',
+        action='append',
+        default=[],
+        metavar='SERVICE=CREDITS',
+        help='Most credits an API may spend per run (e.g., serpapi=100); repeat for each service'
+    )
+    
+    parser.add_argument(
+        '--locations',
+        nargs='+',
+        metavar='LOCATION',
+        help='Scan several locations in parallel (e.g., --locations "Newton, MA" "Waltham, MA")'
+    )
+    
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=4,
+        help='Worker processes for --locations'
+    )
+    
     parser.add_argument(
         '--min-score',
         type=float,
@@ -529,10 +2159,55 @@ def main():
     
     args = parser.parse_args()
     
+    credit_limits = {}
+    for limit in args.credit_limit:
+        service, _, credits = limit.partition('=')
+        try:
+            credit_limits[service.strip().lower()] = float(credits)
+        except ValueError:
+            parser.error(f"--credit-limit expects SERVICE=CREDITS, got {limit!r}")
+    
     # Run pipeline
-    pipeline = DevelopmentPipeline()
+    pipeline = DevelopmentPipeline(search_cache=not args.no_search_cache)
     
     try:
+        if args.locations:
+            pipeline.run_locations(
+                args.locations,
+                max_workers=args.workers,
+                use_scrapers=args.use_scrapers,
+                max_pages=args.max_pages,
+                enrich_data=not args.no_enrich,
+                classify_data=not args.no_classify,
+                min_dev_score=args.min_score,
+                streaming=args.stream,
+                incremental=args.incremental,
+                spill_mb=args.spill_mb,
+                query_budget=args.query_budget,
+                street_sweep=args.street_sweep,
+                street_list=args.street_list,
+                maps_coordinates=args.maps_coordinates,
+                credit_limits=credit_limits
+            )
+            return 0
+        
+        if args.use_async:
+            asyncio.run(pipeline.arun(
+                search_query=args.query,
+                location=args.location,
+                use_scrapers=args.use_scrapers,
+                max_pages=args.max_pages,
+                enrich_data=not args.no_enrich,
+                classify_data=not args.no_classify,
+                min_dev_score=args.min_score,
+                query_budget=args.query_budget,
+                street_sweep=args.street_sweep,
+                street_list=args.street_list,
+                maps_coordinates=args.maps_coordinates,
+                credit_limits=credit_limits
+            ))
+            return 0
+        
         stats = pipeline.run(
             search_query=args.query,
             location=args.location,
@@ -540,7 +2215,16 @@ def main():
             max_pages=args.max_pages,
             enrich_data=not args.no_enrich,
             classify_data=not args.no_classify,
-            min_dev_score=args.min_score
+            min_dev_score=args.min_score,
+            streaming=args.stream,
+            resume_run_id=args.resume,
+            incremental=args.incremental,
+            spill_mb=args.spill_mb,
+            query_budget=args.query_budget,
+            street_sweep=args.street_sweep,
+            street_list=args.street_list,
+            maps_coordinates=args.maps_coordinates,
+            credit_limits=credit_limits
         )
         
         return 0
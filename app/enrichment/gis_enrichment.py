@@ -5,9 +5,12 @@ Fetches parcel, zoning, and assessment data from public sources
 
 import time
 import re
-from typing import Dict, Any, Optional, List
-import requests
+import asyncio
+from typing import Dict, Any, Optional, List, Callable, Tuple
 from app.utils import setup_logging, clean_sqft
+from app.core.api_limits import async_api_slot
+from app.core.shared_cache import SharedCache, MISS
+from app.core.single_flight import CoalescingSession
 
 
 class GISEnrichment:
@@ -15,17 +18,28 @@ class GISEnrichment:
     Enrich property listings with GIS and public record data
     """
     
-    def __init__(self):
+    def __init__(self, cache: Optional[SharedCache] = None):
+        """
+        Args:
+            cache: Optional shared cache for parcel and geocoding lookups
+                (can be shared across worker processes)
+        """
         self.logger = setup_logging('gis_enrichment')
+        self.cache = cache
         
         # Newton GIS endpoints
         self.newton_gis_base = "https://gis.newtonma.gov/arcgis/rest/services"
         self.newton_assessor_url = "https://data.newtonma.gov/resource/assessor-data"
+        self.newton_assessor_api = "https://data.newtonma.gov/resource/assessor.json"
+        
+        # Geocoding: Nominatim (OpenStreetMap)
+        self.nominatim_url = "https://nominatim.openstreetmap.org/search"
         
         # Backup: MassGIS for statewide data
         self.mass_gis_base = "https://gis.massgis.state.ma.us/arcgis/rest/services"
         
-        self.session = requests.Session()
+        # Concurrent identical lookups share one request (see CoalescingSession)
+        self.session = CoalescingSession()
     
     def enrich_listing(self, listing: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -54,8 +68,8 @@ class GISEnrichment:
         if assessment_data:
             listing.update(assessment_data)
         
-        # Get coordinates if not present
-        if 'latitude' not in listing or 'longitude' not in listing:
+        # Get coordinates if not present (e.g. carried over from Google Maps results)
+        if listing.get('latitude') is None or listing.get('longitude') is None:
             coords = self._geocode_address(address)
             if coords:
                 listing.update(coords)
@@ -65,12 +79,18 @@ class GISEnrichment:
         
         return listing
     
-    def enrich_listings_batch(self, listings: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def enrich_listings_batch(
+        self,
+        listings: List[Dict[str, Any]],
+        on_result: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> List[Dict[str, Any]]:
         """
         Enrich multiple listings with rate limiting
         
         Args:
             listings: List of property listings
+            on_result: Called with each successfully enriched listing as soon
+                as it is done (e.g. to checkpoint progress)
             
         Returns:
             List of enriched listings
@@ -81,6 +101,8 @@ class GISEnrichment:
             try:
                 enriched_listing = self.enrich_listing(listing)
                 enriched.append(enriched_listing)
+                if on_result:
+                    on_result(enriched_listing)
                 
                 # Rate limiting
                 if i > 0 and i % 10 == 0:
@@ -104,47 +126,23 @@ class GISEnrichment:
         Returns:
             Dictionary with parcel data
         """
+        cache_key = self._clean_address_for_query(address).lower()
+        if self.cache:
+            cached = self.cache.get('parcel', cache_key)
+            if cached is not MISS:
+                return cached
+        
         try:
-            # Newton Parcels API endpoint
-            url = f"{self.newton_gis_base}/Public/Parcels/MapServer/0/query"
-            
-            params = {
-                'where': f"SITE_ADDR LIKE '%{self._clean_address_for_query(address)}%'",
-                'outFields': '*',
-                'f': 'json',
-                'returnGeometry': 'true'
-            }
-            
-            response = self.session.get(url, params=params, timeout=10)
+            url, params = self._parcel_request(address)
+            response = self.session.get(url, params=params, timeout=10, slot='newton_gis')
             response.raise_for_status()
             
-            data = response.json()
+            parcel_data = self._parse_parcel(response.json(), address)
             
-            if data.get('features'):
-                feature = data['features'][0]
-                attrs = feature.get('attributes', {})
-                
-                parcel_data = {
-                    'parcel_id': attrs.get('PARCEL_ID'),
-                    'lot_size': clean_sqft(str(attrs.get('LOT_SIZE', ''))),
-                    'zoning': attrs.get('ZONING'),
-                    'land_use': attrs.get('LAND_USE'),
-                    'frontage': attrs.get('FRONTAGE'),
-                    'owner_name': attrs.get('OWNER_NAME'),
-                    'owner_address': attrs.get('OWNER_ADDR')
-                }
-                
-                # Extract coordinates from geometry
-                if 'geometry' in feature:
-                    geom = feature['geometry']
-                    if 'x' in geom and 'y' in geom:
-                        parcel_data['longitude'] = geom['x']
-                        parcel_data['latitude'] = geom['y']
-                
-                self.logger.info(f"Found parcel data for {address}")
-                return parcel_data
-            
-            return None
+            # Not-found results are cached too; request errors are not
+            if self.cache:
+                self.cache.set('parcel', cache_key, parcel_data)
+            return parcel_data
             
         except Exception as e:
             self.logger.error(f"Error fetching parcel data: {e}")
@@ -161,34 +159,11 @@ class GISEnrichment:
             Dictionary with assessment data
         """
         try:
-            # This is a placeholder - actual API may vary
-            # Newton may have a public assessor database or API
-            
-            url = "https://data.newtonma.gov/resource/assessor.json"
-            
-            params = {
-                'address': address,
-                '$limit': 1
-            }
-            
-            response = self.session.get(url, params=params, timeout=10)
+            url, params = self._assessment_request(address)
+            response = self.session.get(url, params=params, timeout=10, slot='newton_gis')
             
             if response.status_code == 200:
-                data = response.json()
-                
-                if data:
-                    record = data[0]
-                    
-                    assessment_data = {
-                        'assessed_value': record.get('total_value'),
-                        'land_value': record.get('land_value'),
-                        'building_value': record.get('building_value'),
-                        'year_built': record.get('year_built'),
-                        'building_area': clean_sqft(str(record.get('building_area', '')))
-                    }
-                    
-                    self.logger.info(f"Found assessment data for {address}")
-                    return assessment_data
+                return self._parse_assessment(response.json(), address)
             
             return None
             
@@ -207,41 +182,256 @@ class GISEnrichment:
         Returns:
             Dictionary with latitude and longitude
         """
+        cache_key = address.strip().lower()
+        if self.cache:
+            cached = self.cache.get('geocode', cache_key)
+            if cached is not MISS:
+                return cached
+        
         try:
-            # Using Nominatim (OpenStreetMap) - free geocoding
-            url = "https://nominatim.openstreetmap.org/search"
+            url, params, headers = self._geocode_request(address)
+            response = self.session.get(url, params=params, headers=headers, timeout=10, slot='nominatim')
+            response.raise_for_status()
+            
+            coords = self._parse_geocode(response.json(), address)
             
-            params = {
-                'q': address,
-                'format': 'json',
-                'limit': 1
-            }
+            if self.cache:
+                self.cache.set('geocode', cache_key, coords)
+            return coords
             
-            headers = {
-                'User-Agent': 'Anil_Project_Real_Estate/1.0'
-            }
+        except Exception as e:
+            self.logger.error(f"Geocoding failed: {e}")
+            return None
+    
+    async def aenrich_listing(self, listing: Dict[str, Any], client) -> Dict[str, Any]:
+        """
+        Async variant of enrich_listing
+        
+        Parcel and assessment lookups run concurrently; geocoding only runs
+        when neither the listing nor its parcel has coordinates.
+        
+        Args:
+            listing: Property listing dictionary
+            client: httpx.AsyncClient owned by the caller's event loop
             
-            response = self.session.get(url, params=params, headers=headers, timeout=10)
+        Returns:
+            Enriched listing with additional fields
+        """
+        address = listing.get('address', '')
+        if not address or address == "N/A":
+            self.logger.warning("No valid address for enrichment")
+            return listing
+        
+        self.logger.info(f"Enriching: {address}")
+        
+        parcel_data, assessment_data = await asyncio.gather(
+            self._aget_parcel_data(address, client),
+            self._aget_assessment_data(address, client)
+        )
+        if parcel_data:
+            listing.update(parcel_data)
+        if assessment_data:
+            listing.update(assessment_data)
+        
+        if listing.get('latitude') is None or listing.get('longitude') is None:
+            coords = await self._ageocode_address(address, client)
+            if coords:
+                listing.update(coords)
+        
+        return self._calculate_metrics(listing)
+    
+    async def _aget_parcel_data(self, address: str, client) -> Optional[Dict[str, Any]]:
+        """Async variant of _get_parcel_data"""
+        cache_key = self._clean_address_for_query(address).lower()
+        if self.cache:
+            cached = self.cache.get('parcel', cache_key)
+            if cached is not MISS:
+                return cached
+        
+        try:
+            url, params = self._parcel_request(address)
+            async with async_api_slot('newton_gis'):
+                response = await client.get(url, params=params, timeout=10)
             response.raise_for_status()
             
-            data = response.json()
+            parcel_data = self._parse_parcel(response.json(), address)
             
-            if data:
-                result = data[0]
-                coords = {
-                    'latitude': float(result['lat']),
-                    'longitude': float(result['lon'])
-                }
-                
-                self.logger.info(f"Geocoded: {address}")
-                return coords
+            if self.cache:
+                self.cache.set('parcel', cache_key, parcel_data)
+            return parcel_data
+            
+        except Exception as e:
+            self.logger.error(f"Error fetching parcel data: {e}")
+            return None
+    
+    async def _aget_assessment_data(self, address: str, client) -> Optional[Dict[str, Any]]:
+        """Async variant of _get_assessment_data"""
+        try:
+            url, params = self._assessment_request(address)
+            async with async_api_slot('newton_gis'):
+                response = await client.get(url, params=params, timeout=10)
+            
+            if response.status_code == 200:
+                return self._parse_assessment(response.json(), address)
             
             return None
             
+        except Exception as e:
+            self.logger.warning(f"Assessment data not available: {e}")
+            return None
+    
+    async def _ageocode_address(self, address: str, client) -> Optional[Dict[str, float]]:
+        """Async variant of _geocode_address"""
+        cache_key = address.strip().lower()
+        if self.cache:
+            cached = self.cache.get('geocode', cache_key)
+            if cached is not MISS:
+                return cached
+        
+        try:
+            url, params, headers = self._geocode_request(address)
+            async with async_api_slot('nominatim'):
+                response = await client.get(url, params=params, headers=headers, timeout=10)
+            response.raise_for_status()
+            
+            coords = self._parse_geocode(response.json(), address)
+            
+            if self.cache:
+                self.cache.set('geocode', cache_key, coords)
+            return coords
+            
         except Exception as e:
             self.logger.error(f"Geocoding failed: {e}")
             return None
     
+    def _parcel_request(self, address: str) -> Tuple[str, Dict[str, Any]]:
+        """URL and query parameters for a Newton parcel lookup"""
+        # Newton Parcels API endpoint
+        url = f"{self.newton_gis_base}/Public/Parcels/MapServer/0/query"
+        
+        params = {
+            'where': f"SITE_ADDR LIKE '%{self._clean_address_for_query(address)}%'",
+            'outFields': '*',
+            'f': 'json',
+            'returnGeometry': 'true'
+        }
+        return url, params
+    
+    def _parse_parcel(self, data: Dict[str, Any], address: str) -> Optional[Dict[str, Any]]:
+        """
+        Extract parcel fields from a Newton GIS query response
+        
+        Args:
+            data: Decoded JSON response
+            address: Property address (for logging)
+            
+        Returns:
+            Dictionary with parcel data, or None if no parcel matched
+        """
+        if not data.get('features'):
+            return None
+        
+        feature = data['features'][0]
+        attrs = feature.get('attributes', {})
+        
+        parcel_data = {
+            'parcel_id': attrs.get('PARCEL_ID'),
+            'lot_size': clean_sqft(str(attrs.get('LOT_SIZE', ''))),
+            'zoning': attrs.get('ZONING'),
+            'land_use': attrs.get('LAND_USE'),
+            'frontage': attrs.get('FRONTAGE'),
+            'owner_name': attrs.get('OWNER_NAME'),
+            'owner_address': attrs.get('OWNER_ADDR')
+        }
+        
+        # Extract coordinates from geometry
+        if 'geometry' in feature:
+            geom = feature['geometry']
+            if 'x' in geom and 'y' in geom:
+                parcel_data['longitude'] = geom['x']
+                parcel_data['latitude'] = geom['y']
+        
+        self.logger.info(f"Found parcel data for {address}")
+        return parcel_data
+    
+    def _assessment_request(self, address: str) -> Tuple[str, Dict[str, Any]]:
+        """URL and query parameters for a Newton assessor lookup"""
+        # This is a placeholder - actual API may vary
+        # Newton may have a public assessor database or API
+        url = self.newton_assessor_api
+        
+        params = {
+            'address': address,
+            '$limit': 1
+        }
+        return url, params
+    
+    def _parse_assessment(self, data: List[Dict[str, Any]], address: str) -> Optional[Dict[str, Any]]:
+        """
+        Extract assessment fields from an assessor response
+        
+        Args:
+            data: Decoded JSON response
+            address: Property address (for logging)
+            
+        Returns:
+            Dictionary with assessment data, or None if no record matched
+        """
+        if not data:
+            return None
+        
+        record = data[0]
+        
+        assessment_data = {
+            'assessed_value': record.get('total_value'),
+            'land_value': record.get('land_value'),
+            'building_value': record.get('building_value'),
+            'year_built': record.get('year_built'),
+            'building_area': clean_sqft(str(record.get('building_area', '')))
+        }
+        
+        self.logger.info(f"Found assessment data for {address}")
+        return assessment_data
+    
+    def _geocode_request(self, address: str) -> Tuple[str, Dict[str, Any], Dict[str, str]]:
+        """URL, query parameters and headers for a Nominatim lookup"""
+        # Using Nominatim (OpenStreetMap) - free geocoding
+        url = self.nominatim_url
+        
+        params = {
+            'q': address,
+            'format': 'json',
+            'limit': 1
+        }
+        
+        headers = {
+            'User-Agent': 'Anil_Project_Real_Estate/1.0'
+        }
+        return url, params, headers
+    
+    def _parse_geocode(self, data: List[Dict[str, Any]], address: str) -> Optional[Dict[str, float]]:
+        """
+        Extract coordinates from a Nominatim response
+        
+        Args:
+            data: Decoded JSON response
+            address: Property address (for logging)
+            
+        Returns:
+            Dictionary with latitude and longitude, or None if not found
+        """
+        if not data:
+            return None
+        
+        result = data[0]
+        coords = {
+            'latitude': float(result['lat']),
+            'longitude': float(result['lon'])
+        }
+        
+        self.logger.info(f"Geocoded: {address}")
+        return coords
+    
     def _calculate_metrics(self, listing: Dict[str, Any]) -> Dict[str, Any]:
         """
         Calculate derived metrics from available data
@@ -12,6 +12,7 @@ from datetime import datetime
 from typing import List, Dict, Optional
 import requests
 from dotenv import load_dotenv
+from app.core.api_limits import api_slot
 
 # Load environment variables
 load_dotenv()
@@ -203,7 +204,7 @@ class AlertManager:
             msg.attach(part)
             
             # Send email
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
+            with api_slot('smtp'), smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
                 server.starttls()
                 server.login(self.sender_email, self.sender_password)
                 server.send_message(msg)
@@ -240,7 +241,8 @@ class AlertManager:
             }
             
             # Send to Slack
-            response = requests.post(self.slack_webhook, json=payload, timeout=10)
+            with api_slot('slack'):
+                response = requests.post(self.slack_webhook, json=payload, timeout=10)
             response.raise_for_status()
             
             self.logger.info(f"✓ Slack alert sent ({len(opportunities)} opportunities)")
@@ -531,7 +533,7 @@ class AlertManager:
             msg.attach(part)
             
             # Send email
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
+            with api_slot('smtp'), smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
                 server.starttls()
                 server.login(self.sender_email, self.sender_password)
                 server.send_message(msg)
@@ -560,7 +562,8 @@ class AlertManager:
             ]
             
             payload = {'blocks': blocks, 'text': f"{run_type_display} scan started"}
-            requests.post(self.slack_webhook, json=payload, timeout=10)
+            with api_slot('slack'):
+                requests.post(self.slack_webhook, json=payload, timeout=10)
             self.logger.info(f"✓ Scan started notification sent to Slack")
             return True
             
@@ -653,7 +656,7 @@ class AlertManager:
             msg.attach(part)
             
             # Send email
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
+            with api_slot('smtp'), smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
                 server.starttls()
                 server.login(self.sender_email, self.sender_password)
                 server.send_message(msg)
@@ -723,7 +726,8 @@ class AlertManager:
             ]
             
             payload = {'blocks': blocks, 'text': f"{run_type_display} scan completed"}
-            requests.post(self.slack_webhook, json=payload, timeout=10)
+            with api_slot('slack'):
+                requests.post(self.slack_webhook, json=payload, timeout=10)
             self.logger.info(f"✓ Scan completed notification sent to Slack")
             return True
             
@@ -817,7 +821,8 @@ class AlertManager:
             ]
             
             payload = {'blocks': blocks}
-            requests.post(self.slack_webhook, json=payload, timeout=10)
+            with api_slot('slack'):
+                requests.post(self.slack_webhook, json=payload, timeout=10)
             return True
             
         except Exception as e:
@@ -11,6 +11,8 @@ from pathlib import Path
 import logging
 from contextlib import contextmanager
 
+from app.utils import has_classification
+
 logger = logging.getLogger(__name__)
 
 
@@ -23,6 +25,12 @@ class HistoricalDatabaseManager:
     - classifications: Classification history (tracks score changes)
     - price_history: Price tracking (detect value changes)
     - scan_runs: Pipeline execution metadata
+    - listing_snapshots: Last processed record + source fingerprint (incremental runs)
+    - stage_profiles: Per-stage timing and resource usage of each scan run
+    - query_template_stats: Accumulated yield of each search query template per location
+    - street_sweeps: When each street was last searched by a street sweep, and its yield
+    - api_usage: Ledger of credits spent on external APIs (SerpAPI, OpenAI, Sheets)
+    - listing_ids: Stable Zillow/Redfin/Realtor listing IDs seen in earlier runs and their address
     """
     
     def __init__(self, db_path: str = "data/development_leads.db"):
@@ -42,7 +50,8 @@ class HistoricalDatabaseManager:
     @contextmanager
     def _get_connection(self):
         """Context manager for database connections"""
-        conn = sqlite3.connect(str(self.db_path))
+        # Generous busy timeout: multi-location runs write from several processes
+        conn = sqlite3.connect(str(self.db_path), timeout=30)
         conn.row_factory = sqlite3.Row
         conn.execute("PRAGMA foreign_keys = ON")
         try:
@@ -72,10 +81,16 @@ class HistoricalDatabaseManager:
                     opportunities_found INTEGER,
                     high_value_found INTEGER,
                     duration_seconds FLOAT,
-                    status TEXT DEFAULT 'success'
+                    status TEXT DEFAULT 'success',
+                    batch_id TEXT
                 )
             """)
             
+            # Databases created before multi-location runs lack batch_id
+            scan_run_columns = {row['name'] for row in cursor.execute("PRAGMA table_info(scan_runs)")}
+            if 'batch_id' not in scan_run_columns:
+                cursor.execute("ALTER TABLE scan_runs ADD COLUMN batch_id TEXT")
+            
             # Core listings table - one record per unique property
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS listings (
@@ -138,6 +153,92 @@ class HistoricalDatabaseManager:
                 )
             """)
             
+            # Listing snapshots - last fully processed record per listing, keyed by
+            # a fingerprint of its source fields so unchanged listings can be reused
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS listing_snapshots (
+                    listing_id INTEGER PRIMARY KEY,
+                    run_id INTEGER,
+                    fingerprint TEXT NOT NULL,
+                    snapshot TEXT NOT NULL,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    FOREIGN KEY(listing_id) REFERENCES listings(listing_id),
+                    FOREIGN KEY(run_id) REFERENCES scan_runs(run_id)
+                )
+            """)
+            
+            # Stage profiles - wall/CPU time, memory and external calls per pipeline stage
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS stage_profiles (
+                    profile_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    run_id INTEGER NOT NULL,
+                    stage TEXT NOT NULL,
+                    wall_seconds REAL,
+                    cpu_seconds REAL,
+                    peak_rss_mb REAL,
+                    items INTEGER,
+                    external_calls TEXT,
+                    FOREIGN KEY(run_id) REFERENCES scan_runs(run_id)
+                )
+            """)
+            
+            # Query template stats - what each search query template has yielded per location
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS query_template_stats (
+                    location TEXT NOT NULL,
+                    template TEXT NOT NULL,
+                    runs INTEGER DEFAULT 0,
+                    pages INTEGER DEFAULT 0,
+                    results INTEGER DEFAULT 0,
+                    real_addresses INTEGER DEFAULT 0,
+                    new_addresses INTEGER DEFAULT 0,
+                    high_score_leads INTEGER DEFAULT 0,
+                    last_run TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (location, template)
+                )
+            """)
+            
+            # Street sweeps - rotation state and yield of street-level searches
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS street_sweeps (
+                    location TEXT NOT NULL,
+                    street TEXT NOT NULL COLLATE NOCASE,
+                    sweeps INTEGER DEFAULT 0,
+                    results INTEGER DEFAULT 0,
+                    real_addresses INTEGER DEFAULT 0,
+                    new_addresses INTEGER DEFAULT 0,
+                    last_swept TIMESTAMP,
+                    PRIMARY KEY (location, street)
+                )
+            """)
+            
+            # API credit ledger - one row per reserved external call
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS api_usage (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    service TEXT NOT NULL,
+                    credits REAL NOT NULL,
+                    priority TEXT,
+                    location TEXT,
+                    used_at TIMESTAMP NOT NULL
+                )
+            """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_api_usage_service ON api_usage(service, used_at)
+            """)
+            
+            # Seen-ID index - stable listing IDs from listing URLs, across runs
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS listing_ids (
+                    listing_id TEXT PRIMARY KEY,
+                    address TEXT NOT NULL,
+                    link TEXT,
+                    first_seen TIMESTAMP NOT NULL,
+                    last_seen TIMESTAMP NOT NULL,
+                    times_seen INTEGER DEFAULT 1
+                )
+            """)
+            
             # Create indexes for performance
             cursor.execute("""
                 CREATE INDEX IF NOT EXISTS idx_listings_address ON listings(address)
@@ -157,6 +258,9 @@ class HistoricalDatabaseManager:
             cursor.execute("""
                 CREATE INDEX IF NOT EXISTS idx_scan_runs_date ON scan_runs(run_date)
             """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_stage_profiles_run ON stage_profiles(run_id)
+            """)
             
             logger.info(f"Database initialized at {self.db_path}")
     
@@ -168,7 +272,8 @@ class HistoricalDatabaseManager:
         total_found: int = 0,
         opportunities_found: int = 0,
         high_value_found: int = 0,
-        duration_seconds: float = 0.0
+        duration_seconds: float = 0.0,
+        batch_id: Optional[str] = None
     ) -> int:
         """
         Record a pipeline scan run
@@ -181,6 +286,7 @@ class HistoricalDatabaseManager:
             opportunities_found: Development opportunities found
             high_value_found: High-value opportunities (score >= 70)
             duration_seconds: Pipeline execution time
+            batch_id: Groups the per-location runs of one multi-location scan
             
         Returns:
             run_id for tracking
@@ -190,15 +296,333 @@ class HistoricalDatabaseManager:
             cursor.execute("""
                 INSERT INTO scan_runs
                 (search_query, location, run_type, total_found, opportunities_found, 
-                 high_value_found, duration_seconds)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
+                 high_value_found, duration_seconds, batch_id)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
             """, (search_query, location, run_type, total_found, opportunities_found,
-                  high_value_found, duration_seconds))
+                  high_value_found, duration_seconds, batch_id))
             
             run_id = cursor.lastrowid
             logger.info(f"Recorded scan run {run_id}: {opportunities_found} opportunities in {duration_seconds:.1f}s")
             return run_id
-    
+
+    def update_scan_run(self, run_id: int, **fields) -> None:
+        """
+        Update totals of an already recorded scan run
+
+        Used when a run is recorded up front (e.g. streaming mode persists
+        listings while the run is still in progress) and finalized later.
+
+        Args:
+            run_id: Scan run to update
+            **fields: Any of total_found, opportunities_found, high_value_found,
+                      duration_seconds, status
+        """
+        allowed = {'total_found', 'opportunities_found', 'high_value_found',
+                   'duration_seconds', 'status'}
+        unknown = set(fields) - allowed
+        if unknown:
+            raise ValueError(f"Unknown scan run fields: {sorted(unknown)}")
+        if not fields:
+            return
+
+        assignments = ', '.join(f"{name} = ?" for name in fields)
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                f"UPDATE scan_runs SET {assignments} WHERE run_id = ?",
+                (*fields.values(), run_id)
+            )
+            logger.info(f"Updated scan run {run_id}: {', '.join(fields)}")
+
+    def save_stage_profiles(self, run_id: int, profiles: List[Dict[str, Any]]) -> None:
+        """
+        Store the per-stage profile of a scan run
+
+        Args:
+            run_id: Scan run the stages belong to
+            profiles: Dictionaries with stage, wall_seconds, cpu_seconds,
+                      peak_rss_mb, items and external_calls ({service: count})
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany("""
+                INSERT INTO stage_profiles
+                (run_id, stage, wall_seconds, cpu_seconds, peak_rss_mb, items, external_calls)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, [
+                (run_id, p['stage'], p.get('wall_seconds'), p.get('cpu_seconds'),
+                 p.get('peak_rss_mb'), p.get('items'), json.dumps(p.get('external_calls') or {}))
+                for p in profiles
+            ])
+
+    def get_stage_profiles(self, run_id: int) -> List[Dict[str, Any]]:
+        """
+        Get the per-stage profile of a scan run, in stage order
+
+        Args:
+            run_id: Scan run to look up
+
+        Returns:
+            List of stage profile dictionaries
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT * FROM stage_profiles WHERE run_id = ? ORDER BY profile_id",
+                (run_id,)
+            )
+            profiles = []
+            for row in cursor.fetchall():
+                profile = dict(row)
+                profile['external_calls'] = json.loads(profile['external_calls'] or '{}')
+                profiles.append(profile)
+            return profiles
+
+    def save_query_template_stats(self, location: str, template_stats: List[Dict[str, Any]]) -> None:
+        """
+        Add one run's per-template search yield to the accumulated totals
+
+        Args:
+            location: Location the queries searched
+            template_stats: Dictionaries with template, pages, results,
+                            real_addresses, new_addresses and high_score_leads
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany("""
+                INSERT INTO query_template_stats
+                (location, template, runs, pages, results, real_addresses, new_addresses, high_score_leads)
+                VALUES (?, ?, 1, ?, ?, ?, ?, ?)
+                ON CONFLICT(location, template) DO UPDATE SET
+                runs = runs + 1,
+                pages = pages + excluded.pages,
+                results = results + excluded.results,
+                real_addresses = real_addresses + excluded.real_addresses,
+                new_addresses = new_addresses + excluded.new_addresses,
+                high_score_leads = high_score_leads + excluded.high_score_leads,
+                last_run = CURRENT_TIMESTAMP
+            """, [
+                (location, s['template'], s.get('pages', 0), s.get('results', 0), s.get('real_addresses', 0),
+                 s.get('new_addresses', 0), s.get('high_score_leads', 0))
+                for s in template_stats
+            ])
+
+    def get_query_template_stats(self, location: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the accumulated search yield of each query template for a location
+
+        Args:
+            location: Location the queries searched
+
+        Returns:
+            Dictionary of template name to its stats dictionary
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM query_template_stats WHERE location = ?", (location,))
+            return {row['template']: dict(row) for row in cursor.fetchall()}
+
+    def record_street_sweeps(self, location: str, sweeps: List[Dict[str, Any]]) -> None:
+        """
+        Mark streets as swept now and add their search yield
+
+        Args:
+            location: Location the streets are in
+            sweeps: Dictionaries with street, results, real_addresses and new_addresses
+        """
+        swept_at = datetime.now().isoformat(timespec='microseconds')
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany("""
+                INSERT INTO street_sweeps
+                (location, street, sweeps, results, real_addresses, new_addresses, last_swept)
+                VALUES (?, ?, 1, ?, ?, ?, ?)
+                ON CONFLICT(location, street) DO UPDATE SET
+                sweeps = sweeps + 1,
+                results = results + excluded.results,
+                real_addresses = real_addresses + excluded.real_addresses,
+                new_addresses = new_addresses + excluded.new_addresses,
+                last_swept = excluded.last_swept
+            """, [
+                (location, s['street'], s.get('results', 0), s.get('real_addresses', 0),
+                 s.get('new_addresses', 0), swept_at)
+                for s in sweeps
+            ])
+
+    def get_street_sweep_history(self, location: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the sweep record of every street swept in a location
+
+        Args:
+            location: Location the streets are in
+
+        Returns:
+            Dictionary of street name to its sweep record (sweeps, yield, last_swept)
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM street_sweeps WHERE location = ?", (location,))
+            return {row['street']: dict(row) for row in cursor.fetchall()}
+
+    def reserve_api_credits(self, entry: Dict[str, Any], limit: float, since: str) -> bool:
+        """
+        Record an API call in the ledger if its service's window has credits left
+
+        The check and the write run in one IMMEDIATE transaction, so processes
+        sharing the database cannot both take the last credits.
+
+        Args:
+            entry: Ledger entry (service, credits, priority, location, used_at)
+            limit: Most credits the service may spend since `since`
+            since: ISO timestamp where the rolling window starts
+
+        Returns:
+            True if the entry was recorded, False if it would exceed the limit
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute(
+                "SELECT COALESCE(SUM(credits), 0) FROM api_usage WHERE service = ? AND used_at >= ?",
+                (entry['service'], since)
+            )
+            if cursor.fetchone()[0] + entry['credits'] > limit:
+                return False
+            self._insert_api_usage(cursor, [entry])
+            return True
+
+    def record_api_usage(self, entries: List[Dict[str, Any]]) -> None:
+        """
+        Add API calls to the ledger
+
+        Args:
+            entries: Dictionaries with service, credits, priority, location and used_at
+        """
+        with self._get_connection() as conn:
+            self._insert_api_usage(conn.cursor(), entries)
+
+    @staticmethod
+    def _insert_api_usage(cursor, entries: List[Dict[str, Any]]) -> None:
+        cursor.executemany("""
+            INSERT INTO api_usage (service, credits, priority, location, used_at)
+            VALUES (?, ?, ?, ?, ?)
+        """, [
+            (e['service'], e['credits'], e.get('priority'), e.get('location'), e['used_at'])
+            for e in entries
+        ])
+
+    def get_api_usage(self, since: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Get credits spent per service
+
+        Args:
+            since: ISO timestamp to count from (None counts the whole ledger)
+
+        Returns:
+            Dictionary of service name to {'credits', 'calls'}
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT service, SUM(credits) AS credits, COUNT(*) AS calls
+                FROM api_usage WHERE used_at >= ?
+                GROUP BY service
+            """, (since or '',))
+            return {row['service']: {'credits': row['credits'], 'calls': row['calls']}
+                    for row in cursor.fetchall()}
+
+    def get_listing_ids(self, listing_ids: List[str]) -> Dict[str, str]:
+        """
+        Look up listing IDs in the seen-ID index
+
+        Args:
+            listing_ids: Stable listing IDs (e.g. 'zillow:56322493')
+
+        Returns:
+            Dictionary of listing ID to the address it was first seen with,
+            for the IDs that are indexed
+        """
+        found = {}
+        if not listing_ids:
+            return found
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            # Chunked to stay under SQLite's bound-parameter limit
+            for i in range(0, len(listing_ids), 500):
+                chunk = listing_ids[i:i + 500]
+                cursor.execute(
+                    f"SELECT listing_id, address FROM listing_ids "
+                    f"WHERE listing_id IN ({', '.join('?' * len(chunk))})",
+                    chunk
+                )
+                found.update((row['listing_id'], row['address']) for row in cursor.fetchall())
+        return found
+
+    def record_listing_ids(self, entries: List[Dict[str, Any]]) -> None:
+        """
+        Add listing IDs to the seen-ID index, or mark indexed ones as seen again
+
+        The address and link an ID was first seen with are kept.
+
+        Args:
+            entries: Dictionaries with listing_id, address and link
+        """
+        seen_at = datetime.now().isoformat(timespec='microseconds')
+        with self._get_connection() as conn:
+            conn.cursor().executemany("""
+                INSERT INTO listing_ids (listing_id, address, link, first_seen, last_seen)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(listing_id) DO UPDATE SET
+                last_seen = excluded.last_seen,
+                times_seen = times_seen + 1
+            """, [
+                (e['listing_id'], e['address'], e.get('link'), seen_at, seen_at)
+                for e in entries
+            ])
+
+    def get_known_addresses(self, addresses: List[str]) -> set:
+        """
+        Find which addresses are already stored (case-insensitive)
+
+        Args:
+            addresses: Addresses to look up
+
+        Returns:
+            The given addresses, lowercased, that have a listing record
+        """
+        lowered = sorted({address.strip().lower() for address in addresses if address})
+        known = set()
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            # Chunked to stay under SQLite's bound-parameter limit
+            for i in range(0, len(lowered), 500):
+                chunk = lowered[i:i + 500]
+                cursor.execute(
+                    f"SELECT lower(address) AS address FROM listings "
+                    f"WHERE lower(address) IN ({', '.join('?' * len(chunk))})",
+                    chunk
+                )
+                known.update(row['address'] for row in cursor.fetchall())
+        return known
+
+    def get_batch_runs(self, batch_id: str) -> List[Dict[str, Any]]:
+        """
+        Get the per-location scan runs of one multi-location scan
+
+        Args:
+            batch_id: Batch id the runs were recorded with
+
+        Returns:
+            List of scan run dictionaries ordered by location
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT * FROM scan_runs WHERE batch_id = ? ORDER BY location",
+                (batch_id,)
+            )
+            return [dict(row) for row in cursor.fetchall()]
+
     def save_listings(
         self,
         listings: List[Dict[str, Any]],
@@ -327,6 +751,20 @@ class HistoricalDatabaseManager:
                             listing.get('model_version', 'gpt-4o-mini')
                         ))
                         stats['classifications_added'] += 1
+                    
+                    # Remember the processed record for incremental runs; failed or
+                    # skipped classifications are not kept, so the next run retries them
+                    if listing.get('fingerprint') and has_classification(listing):
+                        cursor.execute("""
+                            INSERT OR REPLACE INTO listing_snapshots
+                            (listing_id, run_id, fingerprint, snapshot, updated_at)
+                            VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+                        """, (
+                            listing_id,
+                            run_id,
+                            listing['fingerprint'],
+                            json.dumps(listing, default=str)
+                        ))
                 
                 except Exception as e:
                     logger.error(f"Error saving listing {address}: {e}")
@@ -361,6 +799,58 @@ class HistoricalDatabaseManager:
                 
                 logger.debug(f"Price change tracked: ${price_change:+,.0f} ({price_change_percent:+.1f}%)")
     
+    def get_listing_snapshots(
+        self,
+        addresses: List[str],
+        max_age_days: Optional[int] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the last processed record of each listing, for incremental runs
+        
+        Args:
+            addresses: Listing addresses to look up
+            max_age_days: Ignore snapshots older than N days (None = any age)
+            
+        Returns:
+            Dictionary of address -> {'fingerprint': str, 'snapshot': dict}
+        """
+        addresses = [a.strip() for a in addresses if a and a.strip()]
+        snapshots = {}
+        if not addresses:
+            return snapshots
+        
+        age_filter = ""
+        age_params = ()
+        if max_age_days is not None:
+            age_filter = "AND s.updated_at >= datetime('now', ?)"
+            age_params = (f'-{int(max_age_days)} days',)
+        
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            
+            # Stay well below SQLite's bound-parameter limit
+            for i in range(0, len(addresses), 500):
+                chunk = addresses[i:i + 500]
+                placeholders = ','.join('?' * len(chunk))
+                cursor.execute(f"""
+                    SELECT l.address, s.fingerprint, s.snapshot
+                    FROM listing_snapshots s
+                    JOIN listings l ON l.listing_id = s.listing_id
+                    WHERE l.address IN ({placeholders}) {age_filter}
+                """, (*chunk, *age_params))
+                
+                for row in cursor.fetchall():
+                    try:
+                        snapshot = json.loads(row['snapshot'])
+                    except (TypeError, ValueError):
+                        continue
+                    snapshots[row['address']] = {
+                        'fingerprint': row['fingerprint'],
+                        'snapshot': snapshot
+                    }
+        
+        return snapshots
+    
     def get_recent_opportunities(
         self,
         days: int = 7,
@@ -696,6 +1186,8 @@ class HistoricalDatabaseManager:
                 # Delete related records
                 cursor.execute(f"DELETE FROM price_history WHERE run_id IN ({placeholders})", run_ids)
                 cursor.execute(f"DELETE FROM classifications WHERE run_id IN ({placeholders})", run_ids)
+                cursor.execute(f"DELETE FROM stage_profiles WHERE run_id IN ({placeholders})", run_ids)
+                cursor.execute(f"DELETE FROM listing_snapshots WHERE run_id IN ({placeholders})", run_ids)
                 cursor.execute(f"DELETE FROM scan_runs WHERE run_id IN ({placeholders})", run_ids)
                 
                 logger.info(f"Deleted {len(run_ids)} old scan runs (older than {days} days)")
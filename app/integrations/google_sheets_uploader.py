@@ -10,6 +10,8 @@ import os
 from datetime import datetime
 from typing import List, Dict, Optional
 
+from app.core.api_budget import spend_credits
+
 
 def _num_to_col(n: int) -> str:
     """Convert a column number (1-based) to a letter (A, B, ..., Z, AA, AB, ...)"""
@@ -21,6 +23,10 @@ def _num_to_col(n: int) -> str:
     return result
 
 
+# Sheets API writes per upload besides one per row: clear, freeze and filter
+_UPLOAD_OVERHEAD_REQUESTS = 3
+
+
 class GoogleSheetsUploader:
     """
     Manages uploading real estate listings to Google Sheets
@@ -123,6 +129,9 @@ class GoogleSheetsUploader:
                 row = self._listing_to_row(listing, headers)
                 all_rows.append(row)
             
+            # Reserve every write before clearing, so a refused upload leaves the sheet intact
+            spend_credits('sheets', len(all_rows) + _UPLOAD_OVERHEAD_REQUESTS, priority='high')
+            
             # Clear worksheet
             worksheet.clear()
             
@@ -218,6 +227,8 @@ class GoogleSheetsUploader:
                         row = self._listing_to_row(listing, headers)
                         all_rows.append(row)
                     
+                    spend_credits('sheets', len(all_rows) + _UPLOAD_OVERHEAD_REQUESTS, priority='high')
+                    
                     # Clear worksheet
                     worksheet.clear()
                     
@@ -0,0 +1,144 @@
+"""
+Street address recognizer for search results
+Parses titles such as "68 Vernon St, Newton, MA 02458 | MLS# ..." into
+house number, street, suffix, directional, unit, city, state and ZIP with one
+precompiled pattern, and tells real property addresses apart from
+category pages ("Homes for Sale in Newton, MA", ...)
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+# Street suffixes, abbreviated and spelled out. Matched as whole words, so
+# 'St' no longer matches inside 'Street', 'State' or 'Stanley'.
+STREET_SUFFIXES = (
+    'St', 'Street', 'Rd', 'Road', 'Ave', 'Av', 'Avenue', 'Ln', 'Lane',
+    'Blvd', 'Boulevard', 'Way', 'Ct', 'Court', 'Dr', 'Drive', 'Pl', 'Place',
+    'Ter', 'Terr', 'Terrace', 'Tr', 'Trl', 'Trail', 'Pkwy', 'Parkway',
+    'Cir', 'Circle', 'Cv', 'Cove', 'Sq', 'Square', 'Hwy', 'Highway', 'Path', 'Row',
+)
+
+# Directionals written after the suffix ("12 Main St N")
+DIRECTIONS = ('N', 'S', 'E', 'W', 'NE', 'NW', 'SE', 'SW', 'North', 'South', 'East', 'West')
+
+# Spelled-out state names, for titles such as "Newton, Massachusetts 02459"
+STATE_NAMES = {
+    'Alabama': 'AL', 'Alaska': 'AK', 'Arizona': 'AZ', 'Arkansas': 'AR', 'California': 'CA',
+    'Colorado': 'CO', 'Connecticut': 'CT', 'Delaware': 'DE', 'Florida': 'FL', 'Georgia': 'GA',
+    'Hawaii': 'HI', 'Idaho': 'ID', 'Illinois': 'IL', 'Indiana': 'IN', 'Iowa': 'IA',
+    'Kansas': 'KS', 'Kentucky': 'KY', 'Louisiana': 'LA', 'Maine': 'ME', 'Maryland': 'MD',
+    'Massachusetts': 'MA', 'Michigan': 'MI', 'Minnesota': 'MN', 'Mississippi': 'MS', 'Missouri': 'MO',
+    'Montana': 'MT', 'Nebraska': 'NE', 'Nevada': 'NV', 'New Hampshire': 'NH', 'New Jersey': 'NJ',
+    'New Mexico': 'NM', 'New York': 'NY', 'North Carolina': 'NC', 'North Dakota': 'ND', 'Ohio': 'OH',
+    'Oklahoma': 'OK', 'Oregon': 'OR', 'Pennsylvania': 'PA', 'Rhode Island': 'RI', 'South Carolina': 'SC',
+    'South Dakota': 'SD', 'Tennessee': 'TN', 'Texas': 'TX', 'Utah': 'UT', 'Vermont': 'VT',
+    'Virginia': 'VA', 'Washington': 'WA', 'West Virginia': 'WV', 'Wisconsin': 'WI', 'Wyoming': 'WY',
+}
+
+# Phrases that mark category/search pages even when they start with a number
+CATEGORY_PHRASES = (
+    'for sale in',
+    'homes for sale',
+    'properties for sale',
+    'listings',
+    'real estate in',
+    'browse',
+    'search homes',
+    'view all',
+    'land & lots',
+    'new construction homes',
+)
+
+# Titles and Maps addresses are title case; all-caps variants are matched too
+_suffixes = '|'.join(sorted(
+    set(STREET_SUFFIXES) | {suffix.upper() for suffix in STREET_SUFFIXES}, key=len, reverse=True
+))
+
+_directions = '|'.join(sorted(set(DIRECTIONS) | {d.upper() for d in DIRECTIONS}, key=len, reverse=True))
+_state_names = '|'.join(sorted(
+    set(STATE_NAMES) | {name.upper() for name in STATE_NAMES}, key=len, reverse=True
+)).replace(' ', r'\ ')
+
+# Case-sensitive with literal spaces: IGNORECASE and \s classes roughly
+# double the matching time per title
+_ADDRESS = re.compile(rf"""
+    ^\s*
+    (?P<number>\d+[A-Za-z]?(?:-\d+[A-Za-z]?)?)\s+
+    # Street name: up to six words, no separators; longest name that
+    # still leaves a suffix (so "W Boulevard Rd" is street "W Boulevard")
+    (?P<street>[A-Za-z0-9][\w'.&-]*(?:\ [A-Za-z0-9][\w'.&-]*){{0,5}})\ +
+    (?P<suffix>{_suffixes})\b\.?
+    # A directional ends the street line, so "St North Andover" keeps its city
+    (?:\ (?P<direction>{_directions})\b\.?(?=,|\ *$|\ *[^\w\ ]|\ (?:Unit|UNIT|Apt|APT|Suite|Ste)\b))?
+    (?:,?\ (?P<unit>(?:\#|(?:Unit|UNIT|Apt|APT|Suite|Ste)\b\.?)\ ?[\w-]+))?
+    # City, state and ZIP: ", Newton, MA 02458" / " West Newton MA" /
+    # ", Newton, MA, 02458" / ", Newton, Massachusetts 02458"
+    (?:(?:,\ *|\ +)(?P<city>[A-Za-z][\w.'-]*(?:\ [A-Za-z][\w.'-]*){{0,3}}),?\ +
+       (?P<state>[A-Z]{{2}}|{_state_names})\b
+       (?:,?\ +(?P<zip>\d{{5}})(?:-\d{{4}})?)?)?
+    (?![\w\#])
+""", re.VERBOSE)
+
+# Fallback for lowercase or mixed-case titles ("68 vernon st, newton, ma"),
+# only tried when the fast pattern finds no address, or one without a state
+_ADDRESS_ANY_CASE = re.compile(_ADDRESS.pattern, re.VERBOSE | re.IGNORECASE)
+
+_GROUPS = ('number', 'street', 'suffix', 'unit', 'city', 'state', 'zip', 'direction')
+
+
+@dataclass
+class ParsedAddress:
+    """A street address recognized in a search result"""
+    number: str
+    street: str                  # Street name without its suffix (e.g. "Oak Hill")
+    suffix: str                  # As written (e.g. "St", "Avenue")
+    text: str                    # The matched address (e.g. "133 Oak Hill St, Newton, MA 02459")
+    unit: Optional[str] = None   # e.g. "Unit 21", "#180"
+    city: Optional[str] = None
+    state: Optional[str] = None        # Two-letter code, also when spelled out in the text
+    zip: Optional[str] = None
+    direction: Optional[str] = None    # Directional after the suffix (e.g. "N" in "12 Main St N")
+
+    @property
+    def street_line(self) -> str:
+        """House number, street, suffix and directional (e.g. "133 Oak Hill St")"""
+        line = f"{self.number} {self.street} {self.suffix}"
+        return f"{line} {self.direction}" if self.direction else line
+
+
+def parse_address(text: str) -> Optional[ParsedAddress]:
+    """
+    Recognize the street address at the start of a search result title
+
+    Args:
+        text: Title or address text (e.g. "68 Vernon St, Newton, MA 02458 | MLS# 123")
+
+    Returns:
+        ParsedAddress, or None if the text does not start with a street
+        address or is a category page
+    """
+    if not text:
+        return None
+    match = _ADDRESS.match(text)
+    # The fast pattern may stop before a lowercase city/state
+    if (match is None or match.group('state') is None) and text.lstrip()[:1].isdigit():
+        fallback = _ADDRESS_ANY_CASE.match(text)
+        if fallback is not None and (match is None or fallback.group('state')):
+            match = fallback
+    if match is None:
+        return None
+    # Substring tests are cheaper than a case-insensitive alternation
+    lowered = text.lower()
+    for phrase in CATEGORY_PHRASES:
+        if phrase in lowered:
+            return None
+    number, street, suffix, unit, city, state, zip_code, direction = match.group(*_GROUPS)
+    if state:
+        state = STATE_NAMES[state.title()] if len(state) > 2 else state.upper()
+    return ParsedAddress(number, street, suffix, match.group(0).strip(), unit, city, state, zip_code, direction)
+
+
+def is_real_address(text: str) -> bool:
+    """True if the text starts with a street address and is not a category page"""
+    return parse_address(text) is not None
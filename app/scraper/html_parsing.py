@@ -0,0 +1,153 @@
+"""
+HTML parsing for the direct scrapers
+Pages are parsed with lxml, search pages keeping only the property-card
+nodes, in a process pool: fetch threads and the event loop hand raw bytes
+to parser processes, so parsing uses every core instead of holding the GIL
+"""
+
+import os
+import atexit
+import asyncio
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+HTML_PARSER = 'lxml'
+
+# A card selector: (tag name, attribute filters), as given to find_all
+CardSelector = Tuple[str, Dict[str, Any]]
+
+
+def make_soup(content: bytes, parse_only: Optional[SoupStrainer] = None) -> BeautifulSoup:
+    """Parse a page with lxml, keeping only what parse_only matches (everything if None)"""
+    return BeautifulSoup(content, HTML_PARSER, parse_only=parse_only)
+
+
+def find_cards(content: bytes, selectors: List[CardSelector]) -> list:
+    """
+    Property cards of a search page, by the first selector that matches any
+
+    Each selector parses the page again but builds only the matching nodes
+    and their contents, which is far cheaper than a full parse.
+
+    Args:
+        content: Page HTML
+        selectors: Card selectors, most common markup first
+
+    Returns:
+        Matching card elements
+    """
+    for name, attrs in selectors:
+        soup = make_soup(content, SoupStrainer(name, attrs=attrs))
+        cards = soup.find_all(name, attrs=attrs)
+        if cards:
+            return cards
+    return []
+
+
+# Parser-process state: one scraper per scraper class, built on first use
+_worker_scrapers: Dict[type, Any] = {}
+
+
+def _parse_in_worker(scraper_class: type, method: str, content: bytes, url: str) -> Any:
+    """Run a scraper's parse method inside a parser process"""
+    scraper = _worker_scrapers.get(scraper_class)
+    if scraper is None:
+        scraper = _worker_scrapers[scraper_class] = scraper_class()
+    return getattr(scraper, method)(content, url)
+
+
+class ParsePool:
+    """
+    Process pool running the scrapers' parse methods
+
+    Parse methods take (content, url) and return picklable results. Parser
+    processes are spawned on first use; workers=0 parses in the calling
+    thread instead (e.g. inside multi-location workers, which already use
+    every core).
+    """
+
+    def __init__(self, workers: Optional[int] = None):
+        """
+        Args:
+            workers: Parser processes (defaults to the CPU count; a single
+                core parses in-process, where a pool would only add overhead)
+        """
+        if workers is None:
+            cpus = os.cpu_count() or 1
+            workers = cpus if cpus > 1 else 0
+        self.workers = workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # Spawned workers get fresh interpreters (no inherited sockets or locks)
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            return self._executor
+
+    def parse(self, scraper: Any, method: str, content: bytes, url: str) -> Any:
+        """
+        Run scraper.<method>(content, url) in a parser process
+
+        Args:
+            scraper: Scraper instance (its class is rebuilt in the worker)
+            method: Name of the parse method
+            content: Page HTML
+            url: Page URL
+
+        Returns:
+            The parse method's result
+        """
+        if self.workers <= 0:
+            return getattr(scraper, method)(content, url)
+        return self._pool().submit(_parse_in_worker, type(scraper), method, content, url).result()
+
+    async def aparse(self, scraper: Any, method: str, content: bytes, url: str) -> Any:
+        """Async variant of parse (awaits the worker without blocking the event loop)"""
+        if self.workers <= 0:
+            return getattr(scraper, method)(content, url)
+        future = self._pool().submit(_parse_in_worker, type(scraper), method, content, url)
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self) -> None:
+        """Stop the parser processes (a later parse starts new ones)"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown()
+
+
+_parse_pool: Optional[ParsePool] = None
+_parse_pool_lock = threading.Lock()
+
+
+def parse_pool() -> ParsePool:
+    """The process-wide parse pool (a default pool unless one was installed)"""
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is None:
+            _parse_pool = ParsePool()
+        return _parse_pool
+
+
+def install_parse_pool(pool: ParsePool) -> None:
+    """Make the given pool the one the scrapers parse with in this process"""
+    global _parse_pool
+    with _parse_pool_lock:
+        previous, _parse_pool = _parse_pool, pool
+    if previous is not None and previous is not pool:
+        previous.shutdown()
+
+
+@atexit.register
+def _shutdown_parse_pool():
+    if _parse_pool is not None:
+        _parse_pool.shutdown()
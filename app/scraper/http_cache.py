@@ -0,0 +1,293 @@
+"""
+HTTP cache for the direct scrapers
+A page fetched within its host's TTL is served from disk without a request;
+an older one is revalidated with a conditional GET (If-None-Match /
+If-Modified-Since), so an unchanged page costs a 304 instead of a download.
+Bodies live in the page archive; parse results are cached by body hash, so
+an unchanged page is not parsed again either
+"""
+
+import asyncio
+import hashlib
+import inspect
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+from app.core.shared_cache import SharedCache, MISS
+from app.scraper import html_parsing
+from app.scraper.html_parsing import parse_pool
+from app.scraper.page_archive import PageArchive, archive_page, page_archive
+from app.scraper.page_fetcher import HostThrottle
+from app.utils import setup_logging
+
+# Per host: seconds a fetched page is used without asking the host again.
+# Search results change as listings come and go; Zillow is revalidated less
+# often because every request risks a block.
+DEFAULT_HOST_TTLS: Dict[str, float] = {
+    'www.redfin.com': 6 * 3600,
+    'www.realtor.com': 6 * 3600,
+    'www.zillow.com': 12 * 3600,
+}
+FALLBACK_TTL = 3600
+
+# Validators and parse results older than this are dropped
+ENTRY_MAX_AGE = 30 * 86400
+
+
+@dataclass
+class FetchedPage:
+    """A page body and how it was obtained"""
+    url: str
+    content: bytes
+    sha256: str
+    status: str   # 'fresh' (from cache), 'revalidated' (304) or 'fetched'
+
+
+@lru_cache(maxsize=None)
+def parser_fingerprint(scraper_class: type) -> str:
+    """Hash of a scraper's module and the shared parsing code; changes whenever a parser may have"""
+    digest = hashlib.sha256()
+    for path in (inspect.getsourcefile(scraper_class), html_parsing.__file__):
+        digest.update(Path(path).read_bytes())
+    return digest.hexdigest()[:16]
+
+
+class HttpCache:
+    """
+    Conditional-GET cache of scraper pages
+
+    Entries (validators and fetch time per URL) are kept in a SharedCache,
+    bodies in a PageArchive, parse results in the SharedCache by parser
+    fingerprint, URL and body hash. Works with requests sessions and httpx
+    clients alike.
+    """
+
+    def __init__(
+        self,
+        archive: PageArchive,
+        cache: Optional[SharedCache] = None,
+        ttls: Optional[Dict[str, float]] = None
+    ):
+        """
+        Args:
+            archive: Page archive holding the cached bodies
+            cache: Store for entries and parse results (defaults to the shared cache file)
+            ttls: Per-host TTLs, merged over DEFAULT_HOST_TTLS
+        """
+        self.archive = archive
+        self.cache = cache or SharedCache()
+        self.ttls = dict(DEFAULT_HOST_TTLS)
+        self.ttls.update(ttls or {})
+        self.logger = setup_logging('http_cache')
+        self._stats_lock = threading.Lock()
+        self.stats = {'fresh': 0, 'revalidated': 0, 'fetched': 0, 'parses_skipped': 0}
+
+    def fetch(self, session, url: str, throttle: HostThrottle, kind: str = 'search',
+              headers: Optional[Dict[str, str]] = None, timeout: float = 15) -> FetchedPage:
+        """
+        Get a page through the cache
+
+        Args:
+            session: requests session to fetch with
+            url: Page URL
+            throttle: Host throttle held for the request (not for cache hits)
+            kind: Archive kind of the page ('search' or 'details')
+            headers: Request headers
+            timeout: Request timeout in seconds
+
+        Returns:
+            The page
+
+        Raises:
+            requests.exceptions.RequestException: The request failed
+            HostBlocked: The host's circuit is open or it served a block page
+        """
+        entry, page = self._lookup(url)
+        if page is not None:
+            return page
+        with throttle.slot():
+            response = session.get(url, headers=self._request_headers(headers, entry), timeout=timeout)
+        throttle.observe(response.status_code, response.content, response.headers.get('Retry-After'))
+        return self._record(url, kind, entry, response)
+
+    async def afetch(self, client, url: str, throttle: HostThrottle, kind: str = 'search',
+                     headers: Optional[Dict[str, str]] = None, timeout: float = 15) -> FetchedPage:
+        """Async variant of fetch, with an httpx.AsyncClient"""
+        entry, page = await asyncio.to_thread(self._lookup, url)
+        if page is not None:
+            return page
+        async with throttle.aslot():
+            response = await client.get(url, headers=self._request_headers(headers, entry), timeout=timeout,
+                                        follow_redirects=True)
+        throttle.observe(response.status_code, response.content, response.headers.get('Retry-After'))
+        return await asyncio.to_thread(self._record, url, kind, entry, response)
+
+    def parse(self, scraper: Any, method: str, page: FetchedPage) -> Any:
+        """
+        scraper.<method>(content, url) for a page, reusing the result of an
+        earlier parse of the same body by the same parser
+        """
+        key = self._parse_key(scraper, method, page)
+        result = self.cache.get('parsed', key)
+        if result is not MISS:
+            self._count('parses_skipped')
+            return result
+        result = parse_pool().parse(scraper, method, page.content, page.url)
+        self.cache.set('parsed', key, result, ttl=ENTRY_MAX_AGE)
+        return result
+
+    async def aparse(self, scraper: Any, method: str, page: FetchedPage) -> Any:
+        """Async variant of parse"""
+        key = self._parse_key(scraper, method, page)
+        result = await asyncio.to_thread(self.cache.get, 'parsed', key)
+        if result is not MISS:
+            self._count('parses_skipped')
+            return result
+        result = await parse_pool().aparse(scraper, method, page.content, page.url)
+        await asyncio.to_thread(self.cache.set, 'parsed', key, result, ENTRY_MAX_AGE)
+        return result
+
+    def _lookup(self, url: str) -> Tuple[Optional[Dict[str, Any]], Optional[FetchedPage]]:
+        """A URL's cache entry (None if its body is gone), and its page if still fresh"""
+        entry = self.cache.get('http', url, None)
+        if entry is None or not self.archive.contains(entry['sha256']):
+            return None, None
+        host = urlsplit(url).netloc.lower()
+        if time.time() - entry['fetched_at'] >= self.ttls.get(host, FALLBACK_TTL):
+            return entry, None
+        self._count('fresh')
+        return entry, FetchedPage(url, self.archive.load(entry['sha256']), entry['sha256'], 'fresh')
+
+    @staticmethod
+    def _request_headers(headers: Optional[Dict[str, str]], entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        headers = dict(headers or {})
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def _record(self, url: str, kind: str, entry: Optional[Dict[str, Any]], response) -> FetchedPage:
+        """Turn a response into a page, updating the entry and archive"""
+        if response.status_code == 304 and entry:
+            content, status = self.archive.load(entry['sha256']), 'revalidated'
+            # A 304 may carry updated validators
+            entry = dict(entry, etag=response.headers.get('ETag') or entry.get('etag'),
+                         last_modified=response.headers.get('Last-Modified') or entry.get('last_modified'))
+        else:
+            response.raise_for_status()
+            content, status = response.content, 'fetched'
+            entry = {
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+            }
+        self._count(status)
+
+        try:
+            entry['sha256'] = self.archive.store(url, content, kind)
+        except (OSError, sqlite3.Error) as e:
+            self.logger.warning(f"Could not archive {url}: {e}")
+            return FetchedPage(url, content, hashlib.sha256(content).hexdigest(), status)
+
+        if 'no-store' not in response.headers.get('Cache-Control', ''):
+            entry['fetched_at'] = time.time()
+            self.cache.set('http', url, entry, ttl=ENTRY_MAX_AGE)
+        return FetchedPage(url, content, entry['sha256'], status)
+
+    @staticmethod
+    def _parse_key(scraper: Any, method: str, page: FetchedPage) -> str:
+        # Parse results include the page URL, so it is part of the key
+        return f"{parser_fingerprint(type(scraper))}:{method}:{page.sha256}:{page.url}"
+
+    def _count(self, outcome: str) -> None:
+        with self._stats_lock:
+            self.stats[outcome] += 1
+
+
+_http_cache: Optional[HttpCache] = None
+_cache_enabled = True
+_http_cache_lock = threading.Lock()
+
+
+def http_cache() -> Optional[HttpCache]:
+    """The process-wide HTTP cache (None if disabled or the page archive is)"""
+    global _http_cache
+    with _http_cache_lock:
+        if _http_cache is None and _cache_enabled:
+            archive = page_archive()
+            if archive is None:
+                return None
+            _http_cache = HttpCache(archive)
+        return _http_cache
+
+
+def http_cache_stats() -> Optional[Dict[str, int]]:
+    """Outcomes of the process-wide cache's fetches and parses (None until it is first used)"""
+    with _http_cache_lock:
+        return dict(_http_cache.stats) if _http_cache is not None else None
+
+
+def install_http_cache(cache: Optional[HttpCache]) -> None:
+    """Make the given cache the one the scrapers fetch through (None disables caching)"""
+    global _http_cache, _cache_enabled
+    with _http_cache_lock:
+        _http_cache = cache
+        _cache_enabled = cache is not None
+
+
+def get_page(session, url: str, throttle: HostThrottle, kind: str, headers: Dict[str, str],
+             logger, timeout: float = 15) -> FetchedPage:
+    """
+    Fetch a scraper page through the HTTP cache, or directly (archiving it)
+    when caching is disabled
+
+    Raises:
+        requests.exceptions.RequestException: The request failed
+        HostBlocked: The host's circuit is open or it served a block page
+    """
+    cache = http_cache()
+    if cache is not None:
+        return cache.fetch(session, url, throttle, kind, headers, timeout)
+    with throttle.slot():
+        response = session.get(url, headers=headers, timeout=timeout)
+    throttle.observe(response.status_code, response.content, response.headers.get('Retry-After'))
+    response.raise_for_status()
+    archive_page(url, response.content, kind, logger)
+    return FetchedPage(url, response.content, hashlib.sha256(response.content).hexdigest(), 'fetched')
+
+
+async def aget_page(client, url: str, throttle: HostThrottle, kind: str, headers: Dict[str, str],
+                    logger, timeout: float = 15) -> FetchedPage:
+    """Async variant of get_page, with an httpx.AsyncClient"""
+    cache = await asyncio.to_thread(http_cache)
+    if cache is not None:
+        return await cache.afetch(client, url, throttle, kind, headers, timeout)
+    async with throttle.aslot():
+        response = await client.get(url, headers=headers, timeout=timeout, follow_redirects=True)
+    throttle.observe(response.status_code, response.content, response.headers.get('Retry-After'))
+    response.raise_for_status()
+    await asyncio.to_thread(archive_page, url, response.content, kind, logger)
+    return FetchedPage(url, response.content, hashlib.sha256(response.content).hexdigest(), 'fetched')
+
+
+def parse_page(scraper: Any, method: str, page: FetchedPage) -> Any:
+    """Parse a fetched page in the parse pool, skipping bodies already parsed when caching"""
+    cache = http_cache()
+    if cache is not None:
+        return cache.parse(scraper, method, page)
+    return parse_pool().parse(scraper, method, page.content, page.url)
+
+
+async def aparse_page(scraper: Any, method: str, page: FetchedPage) -> Any:
+    """Async variant of parse_page"""
+    cache = await asyncio.to_thread(http_cache)
+    if cache is not None:
+        return await cache.aparse(scraper, method, page)
+    return await parse_pool().aparse(scraper, method, page.content, page.url)
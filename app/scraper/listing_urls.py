@@ -0,0 +1,105 @@
+"""
+Listing URL canonicalization
+Pulls stable listing IDs out of Zillow, Redfin and Realtor.com URLs, so the
+same listing found through different queries, tracking parameters or
+alternate paths is recognized as one listing
+"""
+
+import re
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters that never change the page a URL points to
+TRACKING_PARAMS = {
+    'gclid', 'fbclid', 'msclkid', 'ref', 'referrer', 'src', 'source',
+    'rtoken', 'mls_tracking', 'cid', 'lid', 'ex',
+}
+
+# Stable listing ID patterns per site: (host suffix, pattern, ID prefix)
+_LISTING_ID_PATTERNS = (
+    # https://www.zillow.com/homedetails/133-Oak-Hill-St-Newton-MA-02459/56322493_zpid/
+    ('zillow.com', re.compile(r'/(\d+)_zpid\b|[?&]zpid=(\d+)'), 'zillow'),
+    # https://www.redfin.com/MA/Newton/471-Washington-St-02458/home/190923238
+    ('redfin.com', re.compile(r'/home/(\d+)\b'), 'redfin'),
+    # https://www.realtor.com/realestateandhomes-detail/42-Lindbergh-Ave_Newton_MA_02465_M39462-14789
+    ('realtor.com', re.compile(r'_(M\d+-\d+)\b|[?&]property_id=(\d+)'), 'realtor'),
+)
+
+
+def canonical_url(url: str) -> str:
+    """
+    Normalize a URL for comparison
+
+    Lowercases the scheme and host, drops 'www.', the fragment, tracking
+    parameters (utm_* and TRACKING_PARAMS) and trailing slashes, and sorts
+    the remaining query parameters.
+
+    Args:
+        url: URL as found in a search result or scraped page
+
+    Returns:
+        Canonical URL ('' for an empty URL)
+    """
+    url = (url or '').strip()
+    if not url:
+        return ''
+    parts = urlsplit(url)
+    host = parts.netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith('utm_') and key.lower() not in TRACKING_PARAMS
+    )
+    return urlunsplit(('https', host, parts.path.rstrip('/') or '/', urlencode(query), ''))
+
+
+def listing_id(url: str) -> Optional[str]:
+    """
+    Stable ID of the listing a Zillow, Redfin or Realtor.com URL points to
+
+    Args:
+        url: Listing page URL
+
+    Returns:
+        ID such as 'zillow:56322493', 'redfin:190923238' or
+        'realtor:M39462-14789', or None for other pages
+    """
+    if not url:
+        return None
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    for site, pattern, prefix in _LISTING_ID_PATTERNS:
+        if host == site or host.endswith('.' + site):
+            match = pattern.search(f"{parts.path}?{parts.query}")
+            if match:
+                return f"{prefix}:{next(group for group in match.groups() if group)}"
+            return None
+    return None
+
+
+def listing_identity(listing: Dict[str, Any]) -> Optional[str]:
+    """
+    Stable listing ID of a listing dictionary
+
+    Args:
+        listing: Search result or scraped listing ('link' or 'url', and
+            'zpid' from the Zillow scraper)
+
+    Returns:
+        ID (see listing_id), or None if its URL has none
+    """
+    stable_id = listing_id(listing.get('link') or listing.get('url') or '')
+    if stable_id is None and listing.get('zpid'):
+        stable_id = f"zillow:{listing['zpid']}"
+    return stable_id
+
+
+def listing_key(listing: Dict[str, Any]) -> Optional[str]:
+    """
+    Dedup key of a listing: its stable listing ID, else its canonical URL
+
+    Returns:
+        Key, or None for listings without a URL
+    """
+    return listing_identity(listing) or canonical_url(listing.get('link') or listing.get('url') or '') or None
@@ -4,11 +4,23 @@ Alternative to direct scraping, more reliable and faster
 """
 
 import os
+import json
 import time
-from typing import List, Dict, Any, Optional
+import asyncio
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
+import httpx
 import requests
 from dotenv import load_dotenv
-from app.utils import setup_logging, get_env_variable, clean_price, clean_sqft
+from app.utils import setup_logging, get_env_variable, clean_price, clean_sqft, normalize_address
+from app.core.api_limits import api_slot, async_api_slot
+from app.core.api_budget import BudgetExceeded, spend_credits, async_spend_credits
+from app.core.rate_limit import TokenBucket, backoff_delay
+from app.core.shared_cache import SharedCache, MISS
+from app.scraper.search_query_builder import SearchQueryBuilder
+from app.scraper.address_parser import ParsedAddress, parse_address
+from app.scraper.listing_urls import listing_key
 
 load_dotenv()
 
@@ -19,10 +31,49 @@ class LLMSearch:
     Provides structured data from Google search results
     """
     
-    def __init__(self):
+    # Queries in flight at once in search_multiple_queries
+    SEARCH_WORKERS = 5
+    
+    # Retries of a request answered with 429 Too Many Requests, and the
+    # first backoff delay in seconds (doubled on each retry)
+    MAX_RETRIES = 4
+    BACKOFF_BASE = 2.0
+    
+    # Result pages fetched per query at most, and the fewest new real
+    # addresses per requested result a page must add to fetch the next one
+    SEARCH_MAX_PAGES = 3
+    MIN_PAGE_YIELD = 0.1
+    
+    # Seconds a cached response stays fresh, per SerpAPI engine
+    CACHE_TTL = {
+        'google': 24 * 3600,
+        'google_maps': 7 * 24 * 3600,
+    }
+    
+    def __init__(
+        self,
+        cache: Optional[SharedCache] = None,
+        cache_ttl: Optional[Dict[str, float]] = None
+    ):
+        """
+        Args:
+            cache: Optional persistent cache for SerpAPI responses; repeated
+                requests within their TTL are served from it and spend no credits
+            cache_ttl: Per-engine TTLs in seconds, merged over CACHE_TTL
+        """
         self.api_key = get_env_variable('SERPAPI_KEY')
         self.base_url = "https://serpapi.com/search"
         self.logger = setup_logging('llm_search')
+        self.cache = cache
+        self.cache_ttl = dict(self.CACHE_TTL)
+        self.cache_ttl.update(cache_ttl or {})
+        
+        # Shared by every query this instance issues, sync or async. Set the
+        # rate to the SerpAPI plan's; the burst lets one scan's queries start together.
+        self.rate_limiter = TokenBucket(
+            rate=float(os.getenv('SERPAPI_RATE_PER_SECOND', '1')),
+            capacity=float(os.getenv('SERPAPI_BURST', '10'))
+        )
         
     def search_properties(
         self, 
@@ -42,36 +93,392 @@ class LLMSearch:
             List of property dictionaries
         """
         self.logger.info(f"Searching: '{query}' in {location}")
+        params = self._search_params(query, location, num_results)
         
-        # Construct full search query
-        full_query = f"{query} {location} site:zillow.com OR site:redfin.com OR site:realtor.com"
+        try:
+            data = self._fetch(params)
+            
+            listings = self._parse_search_results(data)
+            self.logger.info(f"Found {len(listings)} listings from search")
+            
+            return listings
+            
+        except requests.exceptions.RequestException as e:
+            self.logger.error(f"SerpAPI request failed: {e}")
+            return []
+        except BudgetExceeded as e:
+            self.logger.warning(f"SerpAPI search skipped: {e}")
+            return []
+        except Exception as e:
+            self.logger.error(f"Error processing search results: {e}")
+            return []
+    
+    async def asearch_properties(
+        self,
+        query: str,
+        client,
+        location: str = "Newton, MA",
+        num_results: int = 20
+    ) -> List[Dict[str, Any]]:
+        """
+        Async variant of search_properties
         
-        params = {
-            "q": full_query,
-            "api_key": self.api_key,
-            "engine": "google",
-            "num": num_results,
-            "gl": "us",
-            "hl": "en"
-        }
+        Args:
+            query: Search query (e.g., "teardown single family home")
+            client: httpx.AsyncClient owned by the caller's event loop
+            location: Location to search
+            num_results: Number of results to fetch
+            
+        Returns:
+            List of property dictionaries
+        """
+        self.logger.info(f"Searching: '{query}' in {location}")
+        params = self._search_params(query, location, num_results)
         
         try:
-            response = requests.get(self.base_url, params=params, timeout=30)
-            response.raise_for_status()
-            data = response.json()
+            data = await self._afetch(client, params)
             
             listings = self._parse_search_results(data)
             self.logger.info(f"Found {len(listings)} listings from search")
             
             return listings
             
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             self.logger.error(f"SerpAPI request failed: {e}")
             return []
+        except BudgetExceeded as e:
+            self.logger.warning(f"SerpAPI search skipped: {e}")
+            return []
         except Exception as e:
             self.logger.error(f"Error processing search results: {e}")
             return []
     
+    def search_properties_paginated(
+        self,
+        query: str,
+        location: str = "Newton, MA",
+        num_results: int = 20,
+        max_pages: Optional[int] = None,
+        min_yield: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Search for properties across result pages, stopping when pages dry up
+        
+        Each page's yield is the number of real addresses (per
+        SearchQueryBuilder.extract_real_addresses) not seen on earlier pages,
+        divided by num_results. The next page is only fetched while the
+        yield stays at or above min_yield, so deep pages are paid for only
+        when they keep turning up new properties.
+        
+        Args:
+            query: Search query (e.g., "teardown single family home")
+            location: Location to search
+            num_results: Results requested per page
+            max_pages: Most pages to fetch (defaults to SEARCH_MAX_PAGES)
+            min_yield: Lowest yield that earns another page (defaults to MIN_PAGE_YIELD)
+            
+        Returns:
+            List of property dictionaries from every page fetched
+        """
+        min_yield = self.MIN_PAGE_YIELD if min_yield is None else min_yield
+        seen_addresses = set()
+        listings = []
+        
+        for page, results in enumerate(self.iter_search_pages(query, location, num_results, max_pages), 1):
+            listings.extend(results)
+            page_yield = self._page_yield(results, seen_addresses, num_results)
+            if page_yield < min_yield:
+                self.logger.info(f"Stopping '{query}' after page {page} (yield {page_yield:.2f} < {min_yield:.2f})")
+                break
+        
+        return listings
+    
+    async def asearch_properties_paginated(
+        self,
+        query: str,
+        client,
+        location: str = "Newton, MA",
+        num_results: int = 20,
+        max_pages: Optional[int] = None,
+        min_yield: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """Async variant of search_properties_paginated"""
+        min_yield = self.MIN_PAGE_YIELD if min_yield is None else min_yield
+        seen_addresses = set()
+        listings = []
+        
+        page = 0
+        async for results in self.aiter_search_pages(query, client, location, num_results, max_pages):
+            page += 1
+            listings.extend(results)
+            page_yield = self._page_yield(results, seen_addresses, num_results)
+            if page_yield < min_yield:
+                self.logger.info(f"Stopping '{query}' after page {page} (yield {page_yield:.2f} < {min_yield:.2f})")
+                break
+        
+        return listings
+    
+    def iter_search_pages(
+        self,
+        query: str,
+        location: str = "Newton, MA",
+        num_results: int = 20,
+        max_pages: Optional[int] = None
+    ):
+        """
+        Yield parsed listings one result page at a time
+        
+        Pages are fetched lazily, so a caller that stops iterating spends
+        no further credits. Listings are tagged with their 'search_page'. Iteration ends at max_pages, on a failed
+        request, on an empty page, or when SerpAPI reports no next page.
+        
+        Args:
+            query: Search query
+            location: Location to search
+            num_results: Results requested per page
+            max_pages: Most pages to fetch (defaults to SEARCH_MAX_PAGES)
+        """
+        self.logger.info(f"Searching: '{query}' in {location}")
+        
+        for page in range(max_pages or self.SEARCH_MAX_PAGES):
+            params = self._search_params(query, location, num_results, start=page * num_results)
+            try:
+                data = self._fetch(params)
+                listings = self._parse_search_results(data)
+            except requests.exceptions.RequestException as e:
+                self.logger.error(f"SerpAPI request failed: {e}")
+                return
+            except BudgetExceeded as e:
+                self.logger.warning(f"SerpAPI search skipped: {e}")
+                return
+            except Exception as e:
+                self.logger.error(f"Error processing search results: {e}")
+                return
+            
+            self.logger.info(f"Found {len(listings)} listings on page {page + 1}")
+            if not listings:
+                return
+            for listing in listings:
+                listing['search_page'] = page + 1
+            yield listings
+            if not self._has_next_page(data):
+                return
+    
+    async def aiter_search_pages(
+        self,
+        query: str,
+        client,
+        location: str = "Newton, MA",
+        num_results: int = 20,
+        max_pages: Optional[int] = None
+    ):
+        """Async variant of iter_search_pages"""
+        self.logger.info(f"Searching: '{query}' in {location}")
+        
+        for page in range(max_pages or self.SEARCH_MAX_PAGES):
+            params = self._search_params(query, location, num_results, start=page * num_results)
+            try:
+                data = await self._afetch(client, params)
+                listings = self._parse_search_results(data)
+            except httpx.HTTPError as e:
+                self.logger.error(f"SerpAPI request failed: {e}")
+                return
+            except BudgetExceeded as e:
+                self.logger.warning(f"SerpAPI search skipped: {e}")
+                return
+            except Exception as e:
+                self.logger.error(f"Error processing search results: {e}")
+                return
+            
+            self.logger.info(f"Found {len(listings)} listings on page {page + 1}")
+            if not listings:
+                return
+            for listing in listings:
+                listing['search_page'] = page + 1
+            yield listings
+            if not self._has_next_page(data):
+                return
+    
+    @staticmethod
+    def _has_next_page(data: Dict[str, Any]) -> bool:
+        """Whether SerpAPI lists a page after this one"""
+        return bool(data.get('serpapi_pagination', {}).get('next'))
+    
+    @staticmethod
+    def _page_yield(results: List[Dict[str, Any]], seen_addresses: set, num_results: int) -> float:
+        """
+        Share of a page's requested results that are new real addresses
+        
+        Args:
+            results: Listings parsed from the page
+            seen_addresses: Addresses from earlier pages of the same query (updated in place)
+            num_results: Results requested per page
+            
+        Returns:
+            New real addresses divided by num_results
+        """
+        new = 0
+        for listing in SearchQueryBuilder.extract_real_addresses(results):
+            address = (listing.get('address', '') or listing.get('title', '')).strip().lower()
+            if address and address not in seen_addresses:
+                seen_addresses.add(address)
+                new += 1
+        return new / max(1, num_results)
+    
+    @property
+    def cache_stats(self) -> Dict[str, Dict[str, int]]:
+        """Hit/miss counts of SerpAPI cache lookups in this process, per engine"""
+        if not self.cache:
+            return {}
+        return {
+            namespace.split(':', 1)[1]: dict(counts)
+            for namespace, counts in self.cache.stats.items()
+            if namespace.startswith('serpapi:')
+        }
+    
+    def _fetch(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        SerpAPI response for params, from the cache when fresh
+        
+        Args:
+            params: SerpAPI query parameters
+            
+        Returns:
+            Decoded JSON response
+        """
+        namespace, key = self._cache_entry(params)
+        if self.cache:
+            cached = self.cache.get(namespace, key)
+            if cached is not MISS:
+                return cached
+        
+        data = self._request(params).json()
+        self._store(namespace, key, params, data)
+        return data
+    
+    async def _afetch(self, client, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Async variant of _fetch"""
+        namespace, key = self._cache_entry(params)
+        if self.cache:
+            cached = self.cache.get(namespace, key)
+            if cached is not MISS:
+                return cached
+        
+        data = (await self._arequest(client, params)).json()
+        self._store(namespace, key, params, data)
+        return data
+    
+    def _cache_entry(self, params: Dict[str, Any]) -> Tuple[str, str]:
+        """
+        Cache namespace and key for a request
+        
+        The namespace is per engine; the key hashes the normalized request
+        parameters (api_key stripped, whitespace and case folded), so the same
+        query hits the cache whoever issues it.
+        """
+        normalized = {
+            name: ' '.join(str(value).lower().split())
+            for name, value in params.items()
+            if name != 'api_key'
+        }
+        key = hashlib.sha256(json.dumps(normalized, sort_keys=True).encode('utf-8')).hexdigest()
+        return f"serpapi:{params.get('engine', 'google')}", key
+    
+    def _store(self, namespace: str, key: str, params: Dict[str, Any], data: Dict[str, Any]):
+        """Cache a successful response for its engine's TTL (SerpAPI error payloads are not cached)"""
+        if not self.cache or 'error' in data:
+            return
+        engine = params.get('engine', 'google')
+        self.cache.set(namespace, key, data, ttl=self.cache_ttl.get(engine, self.cache_ttl['google']))
+    
+    def _request(self, params: Dict[str, Any]) -> requests.Response:
+        """
+        GET SerpAPI under the shared rate limiter, backing off on 429
+        
+        Args:
+            params: SerpAPI query parameters
+            
+        Returns:
+            Successful response
+            
+        Raises:
+            BudgetExceeded: If the run's SerpAPI credit budget refuses the search
+            requests.exceptions.RequestException: If the request fails, or is
+                still rate limited after MAX_RETRIES retries
+        """
+        spend_credits('serpapi', priority=self._credit_priority(params))
+        for attempt in range(self.MAX_RETRIES + 1):
+            delay = self.rate_limiter.reserve()
+            if delay > 0:
+                time.sleep(delay)
+            with api_slot('serpapi'):
+                response = requests.get(self.base_url, params=params, timeout=30)
+            if response.status_code != 429 or attempt == self.MAX_RETRIES:
+                break
+            self._back_off(response.headers.get('Retry-After'), attempt)
+        
+        response.raise_for_status()
+        return response
+    
+    async def _arequest(self, client, params: Dict[str, Any]):
+        """Async variant of _request (raises httpx.HTTPError instead)"""
+        await async_spend_credits('serpapi', priority=self._credit_priority(params))
+        for attempt in range(self.MAX_RETRIES + 1):
+            delay = self.rate_limiter.reserve()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            async with async_api_slot('serpapi'):
+                response = await client.get(self.base_url, params=params, timeout=30)
+            if response.status_code != 429 or attempt == self.MAX_RETRIES:
+                break
+            self._back_off(response.headers.get('Retry-After'), attempt)
+        
+        response.raise_for_status()
+        return response
+    
+    @staticmethod
+    def _credit_priority(params: Dict[str, Any]) -> str:
+        """Budget priority of a search: first result pages before deeper pages and Maps lookups"""
+        if params.get('start') or params.get('engine') == 'google_maps':
+            return 'low'
+        return 'normal'
+    
+    def _back_off(self, retry_after: Optional[str], attempt: int):
+        """Pause all queries after a 429, longer on each consecutive retry"""
+        delay = backoff_delay(attempt, retry_after, base=self.BACKOFF_BASE)
+        self.logger.warning(f"SerpAPI rate limited (429) - backing off {delay:.1f}s "
+                            f"(retry {attempt + 1}/{self.MAX_RETRIES})")
+        self.rate_limiter.pause(delay)
+    
+    def _search_params(self, query: str, location: str, num_results: int, start: int = 0) -> Dict[str, Any]:
+        """
+        Build SerpAPI parameters for a listing search
+        
+        Args:
+            query: Search query
+            location: Location to search
+            num_results: Number of results to fetch
+            start: Offset of the first result (0 for the first page)
+            
+        Returns:
+            SerpAPI query parameters
+        """
+        # Construct full search query
+        full_query = f"{query} {location} site:zillow.com OR site:redfin.com OR site:realtor.com"
+        
+        params = {
+            "q": full_query,
+            "api_key": self.api_key,
+            "engine": "google",
+            "num": num_results,
+            "gl": "us",
+            "hl": "en"
+        }
+        # Left out on the first page so its cache key matches unpaginated searches
+        if start:
+            params["start"] = start
+        return params
+    
     def _parse_search_results(self, data: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
         Parse SerpAPI search results into structured listings
@@ -140,23 +547,10 @@ class LLMSearch:
     
     def _extract_address(self, result: Dict[str, Any]) -> str:
         """Extract address from search result - only real property addresses"""
-        title = result.get('title', '')
-        
         # Address is typically at the start of the title
-        # Example: "68 Vernon St, Newton, MA 02458 | MLS# ..."
-        import re
-        
-        # FIRST: Check if this is a real address or category page
-        if not self._is_real_address(title):
-            return ""
-        
-        # Extract the address part before pipe or colon
-        address_match = re.match(r'^([^|:]+)', title)
-        
-        if address_match:
-            return address_match.group(1).strip()
-        
-        return ""
+        # Example: "68 Vernon St, Newton, MA 02458 | MLS# ..." -> "68 Vernon St, Newton, MA 02458"
+        parsed = self._parse_real_address(result.get('title', ''))
+        return parsed.text if parsed else ""
     
     def _is_real_address(self, text: str) -> bool:
         """
@@ -165,42 +559,15 @@ class LLMSearch:
         Real address pattern: "123 Main St, City, State 12345"
         Category pages: "Homes for Sale in...", "Land & Lots For Sale", etc
         """
-        import re
-        
-        # Real address must start with a number (street number)
-        if not re.match(r'^\d+\s+', text):
-            return False
-        
-        # Check for street type indicators after number
-        street_types = ['St', 'Rd', 'Ave', 'Ln', 'Blvd', 'Way', 'Ct', 'Dr', 'Pl', 'Terr', 'Tr', 'Pkwy', 'Circle', 'Cove']
-        has_street_type = any(st in text for st in street_types)
-        
-        if not has_street_type:
-            return False
-        
-        # Exclude category page keywords
-        exclude_keywords = [
-            'for sale in',
-            'homes for sale',
-            'properties for sale',
-            'listings',
-            'browse',
-            'search homes',
-            'land & lots',
-            'new construction homes',
-        ]
-        
-        text_lower = text.lower()
-        for keyword in exclude_keywords:
-            if keyword in text_lower:
-                return False
-        
-        # Must have location info (city, state, zip)
-        has_state = re.search(r',\s*[A-Z]{2}\s*\d{5}', text)
-        if not has_state:
-            return False
-        
-        return True
+        return self._parse_real_address(text) is not None
+    
+    @staticmethod
+    def _parse_real_address(text: str) -> Optional[ParsedAddress]:
+        """Parsed street address at the start of text, if it includes state and ZIP"""
+        parsed = parse_address(text)
+        if parsed is None or not (parsed.state and parsed.zip):
+            return None
+        return parsed
     
     def search_google_maps(
         self, 
@@ -228,9 +595,7 @@ class LLMSearch:
         }
         
         try:
-            response = requests.get(self.base_url, params=params, timeout=30)
-            response.raise_for_status()
-            data = response.json()
+            data = self._fetch(params)
             
             results = data.get('local_results', [])
             
@@ -249,40 +614,116 @@ class LLMSearch:
             self.logger.info(f"Found {len(listings)} results from Google Maps")
             return listings
             
+        except BudgetExceeded as e:
+            self.logger.warning(f"Google Maps search skipped: {e}")
+            return []
         except Exception as e:
             self.logger.error(f"Google Maps search failed: {e}")
             return []
     
+    def harvest_coordinates(
+        self,
+        queries: List[str],
+        location: str = "Newton, MA"
+    ) -> Dict[str, Dict[str, float]]:
+        """
+        Run Google Maps searches and index their results' coordinates by address
+        
+        Args:
+            queries: Google Maps search queries (e.g., street names)
+            location: Location to search
+            
+        Returns:
+            Dictionary of normalized address (see normalize_address) to
+            {'latitude', 'longitude'}; the first result per address wins
+        """
+        if not queries:
+            return {}
+        
+        with ThreadPoolExecutor(max_workers=min(self.SEARCH_WORKERS, len(queries))) as executor:
+            results = list(executor.map(lambda query: self.search_google_maps(query, location), queries))
+        
+        coordinates = {}
+        for result in (result for listings in results for result in listings):
+            gps = result.get('gps_coordinates') or {}
+            key = normalize_address(result.get('address', ''))
+            if key and gps.get('latitude') is not None and gps.get('longitude') is not None:
+                coordinates.setdefault(key, {
+                    'latitude': float(gps['latitude']),
+                    'longitude': float(gps['longitude'])
+                })
+        
+        self.logger.info(f"Google Maps: coordinates for {len(coordinates)} addresses from {len(queries)} searches")
+        return coordinates
+    
     def search_multiple_queries(
         self, 
         queries: List[str], 
         location: str = "Newton, MA"
     ) -> List[Dict[str, Any]]:
         """
-        Run multiple search queries and combine results
+        Run multiple search queries concurrently and combine results
+        
+        Queries share the instance's rate limiter, so Stage 1 takes about as
+        long as the slowest query once the plan's rate allows them all. Each
+        query walks result pages until they stop adding new real addresses
+        (see search_properties_paginated).
         
         Args:
             queries: List of search queries
             location: Location to search
             
         Returns:
-            Combined list of all results
+            Combined list of all results, in query order
+        """
+        if not queries:
+            return []
+        
+        with ThreadPoolExecutor(max_workers=min(self.SEARCH_WORKERS, len(queries))) as executor:
+            results = list(executor.map(lambda query: self.search_properties_paginated(query, location), queries))
+        
+        return self._unique_listings([listing for listings in results for listing in listings])
+    
+    async def asearch_multiple_queries(
+        self,
+        queries: List[str],
+        client,
+        location: str = "Newton, MA"
+    ) -> List[Dict[str, Any]]:
         """
-        all_listings = []
+        Async variant of search_multiple_queries
         
-        for query in queries:
-            listings = self.search_properties(query, location)
-            all_listings.extend(listings)
-            time.sleep(1)  # Rate limiting
+        Queries run concurrently under the same rate limiter as
+        search_multiple_queries.
         
-        # Deduplicate by link
-        seen_links = set()
+        Args:
+            queries: List of search queries
+            client: httpx.AsyncClient owned by the caller's event loop
+            location: Location to search
+            
+        Returns:
+            Combined list of all results, in query order
+        """
+        results = await asyncio.gather(
+            *(self.asearch_properties_paginated(query, client, location) for query in queries)
+        )
+        return self._unique_listings([listing for listings in results for listing in listings])
+    
+    def _unique_listings(self, listings: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Deduplicate listings by stable listing ID, keeping the first occurrence
+        
+        Links to the same Zillow/Redfin/Realtor listing with different
+        tracking parameters or paths count as one listing; other links are
+        compared canonicalized (see listing_urls.listing_key).
+        """
+        seen_keys = set()
         unique_listings = []
         
-        for listing in all_listings:
-            link = listing.get('link', '')
-            if link and link not in seen_links:
-                seen_links.add(link)
+        for listing in listings:
+            key = listing_key(listing)
+            if key and key not in seen_keys:
+                seen_keys.add(key)
                 unique_listings.append(listing)
         
         self.logger.info(f"Total unique listings: {len(unique_listings)}")
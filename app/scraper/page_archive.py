@@ -0,0 +1,242 @@
+"""
+Raw HTML archive for the direct scrapers
+Every fetched page is stored compressed under the SHA-256 of its content and
+indexed by URL and fetch date, so parser fixes and parser benchmarks can be
+run over real pages (scripts/reparse_archive.py) without scraping again
+"""
+
+import os
+import gzip
+import logging
+import sqlite3
+import hashlib
+import importlib
+import tempfile
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Any, Iterator, Optional
+from urllib.parse import urlsplit
+
+from app.utils import DATA_DIR
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+DEFAULT_ARCHIVE_DIR = DATA_DIR / "archive"
+
+# zstd level: well compressed HTML while staying cheap enough for every fetch
+ZSTD_LEVEL = 10
+
+
+@dataclass
+class ArchivedPage:
+    """Index entry of one archived page"""
+    url: str
+    fetched_on: str   # ISO date
+    source: str       # 'redfin', 'realtor' or 'zillow'
+    kind: str         # 'search' or 'details'
+    sha256: str
+
+
+# Scraper class of each archived source: (module, class name)
+SOURCE_SCRAPERS = {
+    'redfin': ('app.scraper.redfin_scraper', 'RedfinScraper'),
+    'realtor': ('app.scraper.realtor_scraper', 'RealtorScraper'),
+    'zillow': ('app.scraper.zillow_scraper', 'ZillowScraper'),
+}
+
+# Parse method for each kind of archived page
+PARSE_METHODS = {
+    'search': '_parse_search_page',
+    'details': '_parse_property_details',
+}
+
+
+def load_scraper(source: str) -> Any:
+    """A new scraper for an archived source (its parse methods re-parse archived pages)"""
+    module_name, class_name = SOURCE_SCRAPERS[source]
+    return getattr(importlib.import_module(module_name), class_name)()
+
+
+def page_source(url: str) -> str:
+    """Source name of a listing site URL ('https://www.redfin.com/...' -> 'redfin')"""
+    host = urlsplit(url).netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    return host.rsplit('.', 1)[0]
+
+
+class PageArchive:
+    """
+    Content-addressed store of fetched pages
+
+    Page bodies live in <root>/pages/<sha[:2]>/<sha>.html.zst (.html.gz when
+    zstandard is not installed); identical pages are stored once. The index
+    (<root>/index.db) maps (url, fetch date) to the content hash, keeping the
+    last fetch of each URL per day.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        """
+        Args:
+            root: Archive directory (defaults to data/archive)
+        """
+        self.root = Path(root or DEFAULT_ARCHIVE_DIR)
+        (self.root / "pages").mkdir(parents=True, exist_ok=True)
+        self.index_path = self.root / "index.db"
+        self._initialize_db()
+
+    @contextmanager
+    def _get_connection(self):
+        conn = sqlite3.connect(str(self.index_path), timeout=30)
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _initialize_db(self):
+        with self._get_connection() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS archived_pages (
+                    url TEXT NOT NULL,
+                    fetched_on TEXT NOT NULL,
+                    source TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    sha256 TEXT NOT NULL,
+                    PRIMARY KEY (url, fetched_on)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_archived_source ON archived_pages(source, kind)")
+
+    def _blob_path(self, sha: str, suffix: str) -> Path:
+        return self.root / "pages" / sha[:2] / f"{sha}.html{suffix}"
+
+    def store(self, url: str, content: bytes, kind: str = 'search') -> str:
+        """
+        Archive a fetched page
+
+        Args:
+            url: Page URL
+            content: Page body as fetched
+            kind: 'search' (results page) or 'details' (property page)
+
+        Returns:
+            SHA-256 of the content
+        """
+        sha = hashlib.sha256(content).hexdigest()
+        if self._existing_blob(sha) is None:
+            if zstandard is not None:
+                path, data = self._blob_path(sha, '.zst'), zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(content)
+            else:
+                path, data = self._blob_path(sha, '.gz'), gzip.compress(content)
+            path.parent.mkdir(exist_ok=True)
+            # Written to a temporary file first so readers never see a partial page
+            fd, tmp = tempfile.mkstemp(dir=path.parent)
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp, path)
+            except OSError:
+                os.unlink(tmp)
+                raise
+
+        with self._get_connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO archived_pages (url, fetched_on, source, kind, sha256) VALUES (?, ?, ?, ?, ?)",
+                (url, date.today().isoformat(), page_source(url), kind, sha)
+            )
+        return sha
+
+    def contains(self, sha: str) -> bool:
+        """Whether a page with that hash is stored"""
+        return self._existing_blob(sha) is not None
+
+    def _existing_blob(self, sha: str) -> Optional[Path]:
+        for suffix in ('.zst', '.gz'):
+            path = self._blob_path(sha, suffix)
+            if path.exists():
+                return path
+        return None
+
+    def load(self, sha: str) -> bytes:
+        """
+        Body of an archived page
+
+        Raises:
+            KeyError: No page with that hash is stored
+            RuntimeError: The page is zstd-compressed and zstandard is not installed
+        """
+        path = self._existing_blob(sha)
+        if path is None:
+            raise KeyError(sha)
+        data = path.read_bytes()
+        if path.suffix == '.gz':
+            return gzip.decompress(data)
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read .zst archive pages (pip install zstandard)")
+        return zstandard.ZstdDecompressor().decompress(data)
+
+    def pages(
+        self,
+        source: Optional[str] = None,
+        kind: Optional[str] = None,
+        since: Optional[str] = None
+    ) -> Iterator[ArchivedPage]:
+        """
+        Archived pages, oldest fetch first
+
+        Args:
+            source: Only this site ('redfin', 'realtor', 'zillow')
+            kind: Only 'search' or 'details' pages
+            since: Only pages fetched on or after this ISO date
+        """
+        query = "SELECT url, fetched_on, source, kind, sha256 FROM archived_pages WHERE 1 = 1"
+        params = []
+        for column, value, op in (('source', source, '='), ('kind', kind, '='), ('fetched_on', since, '>=')):
+            if value is not None:
+                query += f" AND {column} {op} ?"
+                params.append(value)
+        query += " ORDER BY fetched_on, url"
+        with self._get_connection() as conn:
+            rows = conn.execute(query, params).fetchall()
+        return (ArchivedPage(*row) for row in rows)
+
+
+_page_archive: Optional[PageArchive] = None
+_archive_enabled = True
+_page_archive_lock = threading.Lock()
+
+
+def page_archive() -> Optional[PageArchive]:
+    """The process-wide page archive (None if archiving is disabled)"""
+    global _page_archive
+    with _page_archive_lock:
+        if _page_archive is None and _archive_enabled:
+            _page_archive = PageArchive()
+        return _page_archive
+
+
+def install_page_archive(archive: Optional[PageArchive]) -> None:
+    """Make the given archive the one the scrapers store pages in (None disables archiving)"""
+    global _page_archive, _archive_enabled
+    with _page_archive_lock:
+        _page_archive = archive
+        _archive_enabled = archive is not None
+
+
+def archive_page(url: str, content: bytes, kind: str, logger: logging.Logger) -> None:
+    """Store a fetched page in the process-wide archive; archive errors are logged, never raised"""
+    archive = page_archive()
+    if archive is None:
+        return
+    try:
+        archive.store(url, content, kind)
+    except (OSError, sqlite3.Error) as e:
+        logger.warning(f"Could not archive {url}: {e}")
@@ -0,0 +1,265 @@
+"""
+Pipelined search-page fetching for the direct scrapers
+Each listing site gets a per-host concurrency cap and adaptive request rate
+shared by every scraper instance and thread; a source's result pages are
+fetched a few at a time in page order instead of one by one with fixed
+sleeps, and a host that keeps blocking us is not called again for the run
+"""
+
+import time
+import asyncio
+import threading
+from collections import deque
+from itertools import islice
+from contextlib import contextmanager, asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from app.core.rate_limit import TokenBucket, backoff_delay
+
+# Per host: (simultaneous requests, requests per second). The rates match
+# the fixed gaps the scrapers used to sleep between pages and are the most
+# the adaptive rate climbs back to.
+DEFAULT_HOST_LIMITS: Dict[str, Tuple[int, float]] = {
+    'www.redfin.com': (2, 1 / 2),
+    'www.realtor.com': (2, 1 / 2),
+    'www.zillow.com': (1, 1 / 3),    # Strong anti-scraping measures
+}
+FALLBACK_HOST_LIMIT = (2, 1 / 2)
+
+# Statuses a host answers with when it is throttling or blocking us
+BLOCK_STATUSES = {403: 'forbidden', 429: 'rate limited'}
+
+# Per host: body markers of a block page served with a success status
+BLOCK_MARKERS: Dict[str, Tuple[bytes, ...]] = {
+    'www.zillow.com': (b'captcha',),
+    'www.realtor.com': (b'px-captcha',),
+}
+
+
+class HostBlocked(Exception):
+    """A host is blocking our requests"""
+
+
+class HostThrottle:
+    """
+    Adaptive concurrency cap and request rate for one host
+
+    Blocking and async callers share the same cap and token bucket. The rate
+    follows AIMD: every successful response adds RATE_STEP of the base rate
+    (up to the base rate), every block signal (403, 429, CAPTCHA page)
+    halves it (down to RATE_FLOOR of the base rate) and pauses the host.
+    BLOCK_LIMIT block signals in a row open the circuit: every later
+    request raises HostBlocked until reset().
+    """
+
+    # Seconds between checks for a free slot by async callers
+    POLL_INTERVAL = 0.05
+
+    RATE_STEP = 0.1
+    RATE_FLOOR = 0.125
+    BLOCK_LIMIT = 3
+
+    def __init__(self, concurrency: int, rate: float, host: str = ''):
+        """
+        Args:
+            concurrency: Most requests in flight at once
+            rate: Requests per second on average (the most the rate adapts up to)
+            host: Host name, for block messages and markers
+        """
+        self.host = host
+        self.concurrency = max(1, concurrency)
+        self.base_rate = rate
+        self.bucket = TokenBucket(rate, capacity=1)
+        self._semaphore = threading.BoundedSemaphore(self.concurrency)
+        self._lock = threading.Lock()
+        self.blocks = 0               # Block signals seen
+        self._blocks_in_a_row = 0
+        self.circuit_open = False
+
+    @property
+    def rate(self) -> float:
+        """Current requests per second"""
+        return self.bucket.rate
+
+    @contextmanager
+    def slot(self):
+        """
+        Hold one request slot, after waiting for the host's rate
+
+        Raises:
+            HostBlocked: The host's circuit is open
+        """
+        self._check_circuit()
+        with self._semaphore:
+            delay = self.bucket.reserve()
+            if delay > 0:
+                time.sleep(delay)
+            self._check_circuit()   # It may have opened while we waited
+            yield
+
+    @asynccontextmanager
+    async def aslot(self):
+        """Async variant of slot (waits without blocking the event loop)"""
+        self._check_circuit()
+        # Polled rather than acquired in a worker thread, so a cancelled
+        # task never ends up holding a slot
+        while not self._semaphore.acquire(blocking=False):
+            await asyncio.sleep(self.POLL_INTERVAL)
+        try:
+            delay = self.bucket.reserve()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._check_circuit()
+            yield
+        finally:
+            self._semaphore.release()
+
+    def observe(self, status: int, content: bytes = b'', retry_after: Optional[str] = None) -> None:
+        """
+        Adapt the rate to a response from the host
+
+        Args:
+            status: HTTP status code
+            content: Response body (checked for the host's block-page markers)
+            retry_after: Retry-After header value, if any
+
+        Raises:
+            HostBlocked: The response is a block page served with a success status
+        """
+        signal = BLOCK_STATUSES.get(status)
+        if signal is None and status < 400:
+            body = content.lower()
+            if any(marker in body for marker in BLOCK_MARKERS.get(self.host, ())):
+                signal = 'CAPTCHA page'
+
+        if signal is None:
+            if status < 400:
+                self._speed_up()
+            return
+        self._slow_down(retry_after)
+        if status < 400:
+            raise HostBlocked(f"{self.host} served a {signal}")
+
+    def _speed_up(self) -> None:
+        with self._lock:
+            self._blocks_in_a_row = 0
+            self.bucket.set_rate(min(self.base_rate, self.bucket.rate + self.RATE_STEP * self.base_rate))
+
+    def _slow_down(self, retry_after: Optional[str]) -> None:
+        with self._lock:
+            self.blocks += 1
+            self._blocks_in_a_row += 1
+            self.bucket.set_rate(max(self.RATE_FLOOR * self.base_rate, self.bucket.rate / 2))
+            self.bucket.pause(backoff_delay(self._blocks_in_a_row - 1, retry_after))
+            if self._blocks_in_a_row >= self.BLOCK_LIMIT:
+                self.circuit_open = True
+
+    def _check_circuit(self) -> None:
+        if self.circuit_open:
+            raise HostBlocked(f"{self.host} blocked {self._blocks_in_a_row} requests in a row; "
+                              f"not calling it again this run")
+
+    def reset(self) -> None:
+        """Close the circuit and return to the base rate (e.g. at the start of a run)"""
+        with self._lock:
+            self._blocks_in_a_row = 0
+            self.circuit_open = False
+            self.bucket.set_rate(self.base_rate)
+
+    def stats(self) -> Dict[str, Any]:
+        """Current rate, block signals seen and circuit state"""
+        return {'rate': round(self.rate, 3), 'blocks': self.blocks, 'circuit_open': self.circuit_open}
+
+
+_throttles: Dict[str, HostThrottle] = {}
+_throttles_lock = threading.Lock()
+
+
+def host_throttle(url: str) -> HostThrottle:
+    """
+    The process-wide throttle of a URL's host
+
+    Args:
+        url: Any URL on the host (e.g. the scraper's base_url)
+    """
+    host = urlsplit(url).netloc.lower()
+    with _throttles_lock:
+        if host not in _throttles:
+            _throttles[host] = HostThrottle(*DEFAULT_HOST_LIMITS.get(host, FALLBACK_HOST_LIMIT), host=host)
+        return _throttles[host]
+
+
+def reset_host_throttles() -> None:
+    """Reset every host's throttle (see HostThrottle.reset)"""
+    with _throttles_lock:
+        throttles = list(_throttles.values())
+    for throttle in throttles:
+        throttle.reset()
+
+
+def host_throttle_stats() -> Dict[str, Dict[str, Any]]:
+    """Current rate, block signals and circuit state of every host used in this process"""
+    with _throttles_lock:
+        return {host: throttle.stats() for host, throttle in _throttles.items()}
+
+
+def fetch_pages(
+    fetch_page: Callable[[str], List[dict]],
+    page_urls: List[str],
+    window: int
+) -> List[List[dict]]:
+    """
+    Fetch result pages in order, up to `window` at a time, until one is empty
+
+    Pages after the first empty page are discarded; at most window - 1 of
+    them have been requested by then.
+
+    Args:
+        fetch_page: Fetches and parses one page (returns [] on failure)
+        page_urls: Page URLs, first page first
+        window: Pages in flight at once (usually the host's concurrency)
+
+    Returns:
+        Listings of each page before the first empty one
+    """
+    pages = []
+    with ThreadPoolExecutor(max_workers=max(1, window)) as executor:
+        urls = iter(page_urls)
+        in_flight = deque(executor.submit(fetch_page, url) for url in islice(urls, max(1, window)))
+        while in_flight:
+            listings = in_flight.popleft().result()
+            if not listings:
+                for future in in_flight:
+                    future.cancel()
+                break
+            pages.append(listings)
+            url = next(urls, None)
+            if url is not None:
+                in_flight.append(executor.submit(fetch_page, url))
+    return pages
+
+
+async def afetch_pages(
+    fetch_page: Callable[[str], Awaitable[List[dict]]],
+    page_urls: List[str],
+    window: int
+) -> List[List[dict]]:
+    """Async variant of fetch_pages"""
+    pages = []
+    urls = iter(page_urls)
+    in_flight = deque(asyncio.ensure_future(fetch_page(url)) for url in islice(urls, max(1, window)))
+    try:
+        while in_flight:
+            listings = await in_flight.popleft()
+            if not listings:
+                break
+            pages.append(listings)
+            url = next(urls, None)
+            if url is not None:
+                in_flight.append(asyncio.ensure_future(fetch_page(url)))
+    finally:
+        for task in in_flight:
+            task.cancel()
+    return pages
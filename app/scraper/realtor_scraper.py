@@ -3,13 +3,17 @@ Realtor.com scraper for real estate listings
 Uses requests + BeautifulSoup for data extraction
 """
 
-import time
 import re
 from typing import List, Dict, Any, Optional
+import httpx
 import requests
 from bs4 import BeautifulSoup
 from fake_useragent import UserAgent
 from app.utils import setup_logging, clean_price, clean_sqft, clean_year
+from app.core.single_flight import CoalescingSession
+from app.scraper.html_parsing import find_cards, make_soup
+from app.scraper.http_cache import get_page, aget_page, parse_page, aparse_page
+from app.scraper.page_fetcher import HostBlocked, host_throttle, fetch_pages, afetch_pages
 
 
 class RealtorScraper:
@@ -17,11 +21,19 @@ class RealtorScraper:
     Scraper for Realtor.com real estate listings
     """
     
+    # Property-card markup, most common first: Realtor.com uses specific
+    # data attributes, with card classes on some layouts
+    CARD_SELECTORS = [
+        ('li', {'data-testid': 'property-card'}),
+        ('div', {'class': re.compile(r'property-card|PropertyCard')}),
+    ]
+    
     def __init__(self):
         self.base_url = "https://www.realtor.com"
         self.logger = setup_logging('realtor_scraper')
         self.ua = UserAgent()
-        self.session = requests.Session()
+        self.session = CoalescingSession()
+        self.throttle = host_throttle(self.base_url)
         
     def _get_headers(self) -> Dict[str, str]:
         """Generate request headers with random user agent"""
@@ -55,29 +67,51 @@ class RealtorScraper:
         """
         self.logger.info(f"Scraping Realtor.com: {city}, {state}")
         
+        pages = fetch_pages(self._scrape_search_page,
+                            self._page_urls(city, state, property_type, max_pages),
+                            window=self.throttle.concurrency)
+        return self._combine_pages(pages, max_pages)
+    
+    async def asearch_location(
+        self,
+        city: str,
+        state: str,
+        client,
+        property_type: str = "single_family",
+        max_pages: int = 5
+    ) -> List[Dict[str, Any]]:
+        """
+        Async variant of search_location
+        
+        Args:
+            client: httpx.AsyncClient owned by the caller's event loop
+        """
+        self.logger.info(f"Scraping Realtor.com: {city}, {state}")
+        
+        pages = await afetch_pages(lambda url: self._ascrape_search_page(url, client),
+                                   self._page_urls(city, state, property_type, max_pages),
+                                   window=self.throttle.concurrency)
+        return self._combine_pages(pages, max_pages)
+    
+    def _page_urls(self, city: str, state: str, property_type: str, max_pages: int) -> List[str]:
+        """Search result page URLs, first page first"""
         # Construct Realtor.com search URL
         city_formatted = city.replace(' ', '_')
         search_url = f"{self.base_url}/realestateandhomes-search/{city_formatted}_{state}/type-{property_type}"
         
+        return [
+            f"{search_url}/pg-{page}" if page > 1 else search_url
+            for page in range(1, max_pages + 1)
+        ]
+    
+    def _combine_pages(self, pages: List[List[Dict[str, Any]]], max_pages: int) -> List[Dict[str, Any]]:
+        """Flatten fetched pages, logging per-page counts"""
         all_listings = []
-        
-        for page in range(1, max_pages + 1):
-            page_url = f"{search_url}/pg-{page}" if page > 1 else search_url
-            
-            try:
-                listings = self._scrape_search_page(page_url)
-                if not listings:
-                    self.logger.info(f"No more listings found on page {page}")
-                    break
-                
-                all_listings.extend(listings)
-                self.logger.info(f"Page {page}: Found {len(listings)} listings")
-                
-                time.sleep(2)  # Rate limiting
-                
-            except Exception as e:
-                self.logger.error(f"Error scraping page {page}: {e}")
-                continue
+        for page, listings in enumerate(pages, 1):
+            all_listings.extend(listings)
+            self.logger.info(f"Page {page}: Found {len(listings)} listings")
+        if len(pages) < max_pages:
+            self.logger.info(f"No more listings found on page {len(pages) + 1}")
         
         self.logger.info(f"Total Realtor.com listings scraped: {len(all_listings)}")
         return all_listings
@@ -93,28 +127,12 @@ class RealtorScraper:
             List of listings from the page
         """
         try:
-            response = self.session.get(url, headers=self._get_headers(), timeout=15)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Realtor.com uses specific data attributes
-            property_cards = soup.find_all('li', attrs={'data-testid': 'property-card'})
-            
-            if not property_cards:
-                # Try alternative selectors
-                property_cards = soup.find_all('div', class_=re.compile(r'property-card|PropertyCard'))
-            
-            listings = []
-            for card in property_cards:
-                listing = self._parse_property_card(card)
-                if listing:
-                    listing['source'] = 'realtor'
-                    listing['source_url'] = url
-                    listings.append(listing)
-            
-            return listings
+            page = get_page(self.session, url, self.throttle, 'search', self._get_headers(), self.logger)
+            return parse_page(self, '_parse_search_page', page)
             
+        except HostBlocked as e:
+            self.logger.warning(f"Skipped {url}: {e}")
+            return []
         except requests.exceptions.RequestException as e:
             self.logger.error(f"Request failed for {url}: {e}")
             return []
@@ -122,6 +140,45 @@ class RealtorScraper:
             self.logger.error(f"Error parsing page {url}: {e}")
             return []
     
+    async def _ascrape_search_page(self, url: str, client) -> List[Dict[str, Any]]:
+        """Async variant of _scrape_search_page"""
+        try:
+            page = await aget_page(client, url, self.throttle, 'search', self._get_headers(), self.logger)
+            return await aparse_page(self, '_parse_search_page', page)
+            
+        except HostBlocked as e:
+            self.logger.warning(f"Skipped {url}: {e}")
+            return []
+        except httpx.HTTPError as e:
+            self.logger.error(f"Request failed for {url}: {e}")
+            return []
+        except Exception as e:
+            self.logger.error(f"Error parsing page {url}: {e}")
+            return []
+    
+    def _parse_search_page(self, content: bytes, url: str) -> List[Dict[str, Any]]:
+        """
+        Parse a Realtor.com search results page
+        
+        Args:
+            content: Page HTML
+            url: Page URL
+            
+        Returns:
+            List of listings from the page
+        """
+        property_cards = find_cards(content, self.CARD_SELECTORS)
+        
+        listings = []
+        for card in property_cards:
+            listing = self._parse_property_card(card)
+            if listing:
+                listing['source'] = 'realtor'
+                listing['source_url'] = url
+                listings.append(listing)
+        
+        return listings
+    
     def _parse_property_card(self, card: BeautifulSoup) -> Optional[Dict[str, Any]]:
         """
         Parse a single property card from Realtor.com
@@ -222,56 +279,70 @@ class RealtorScraper:
         self.logger.info(f"Scraping property details: {property_url}")
         
         try:
-            response = self.session.get(property_url, headers=self._get_headers(), timeout=15)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            details = {
-                'url': property_url,
-                'source': 'realtor'
-            }
-            
-            # Year built
-            year_elem = soup.find('span', string=re.compile(r'Year Built', re.IGNORECASE))
-            if year_elem:
-                year_parent = year_elem.find_parent()
-                if year_parent:
-                    year_match = re.search(r'\d{4}', year_parent.get_text())
-                    details['year_built'] = clean_year(year_match.group()) if year_match else None
-            
-            # Lot size
-            lot_elem = soup.find('span', string=re.compile(r'Lot Size', re.IGNORECASE))
-            if lot_elem:
-                lot_parent = lot_elem.find_parent()
-                if lot_parent:
-                    lot_match = re.search(r'([\d,]+)', lot_parent.get_text())
-                    details['lot_size'] = clean_sqft(lot_match.group(1)) if lot_match else None
-            
-            # Description
-            desc_elem = soup.find('div', attrs={'data-testid': 'description'})
-            if not desc_elem:
-                desc_elem = soup.find('div', class_=re.compile(r'description'))
-            details['description'] = desc_elem.get_text(strip=True) if desc_elem else ""
-            
-            # MLS number
-            mls_elem = soup.find(string=re.compile(r'MLS#', re.IGNORECASE))
-            if mls_elem:
-                mls_match = re.search(r'MLS#\s*:?\s*(\w+)', mls_elem)
-                details['mls_number'] = mls_match.group(1) if mls_match else None
-            
-            # Zoning
-            zoning_elem = soup.find('span', string=re.compile(r'Zoning', re.IGNORECASE))
-            if zoning_elem:
-                zoning_parent = zoning_elem.find_parent()
-                if zoning_parent:
-                    details['zoning'] = zoning_parent.get_text().replace('Zoning', '').strip()
-            
-            return details
+            page = get_page(self.session, property_url, self.throttle, 'details', self._get_headers(), self.logger)
+            return parse_page(self, '_parse_property_details', page)
             
+        except HostBlocked as e:
+            self.logger.warning(f"Skipped {property_url}: {e}")
+            return {}
         except Exception as e:
             self.logger.error(f"Error scraping property details: {e}")
             return {}
+    
+    def _parse_property_details(self, content: bytes, url: str) -> Dict[str, Any]:
+        """
+        Parse a Realtor.com property detail page
+        
+        Args:
+            content: Page HTML
+            url: Page URL
+            
+        Returns:
+            Dictionary with detailed property information
+        """
+        soup = make_soup(content)
+        
+        details = {
+            'url': url,
+            'source': 'realtor'
+        }
+        
+        # Year built
+        year_elem = soup.find('span', string=re.compile(r'Year Built', re.IGNORECASE))
+        if year_elem:
+            year_parent = year_elem.find_parent()
+            if year_parent:
+                year_match = re.search(r'\d{4}', year_parent.get_text())
+                details['year_built'] = clean_year(year_match.group()) if year_match else None
+        
+        # Lot size
+        lot_elem = soup.find('span', string=re.compile(r'Lot Size', re.IGNORECASE))
+        if lot_elem:
+            lot_parent = lot_elem.find_parent()
+            if lot_parent:
+                lot_match = re.search(r'([\d,]+)', lot_parent.get_text())
+                details['lot_size'] = clean_sqft(lot_match.group(1)) if lot_match else None
+        
+        # Description
+        desc_elem = soup.find('div', attrs={'data-testid': 'description'})
+        if not desc_elem:
+            desc_elem = soup.find('div', class_=re.compile(r'description'))
+        details['description'] = desc_elem.get_text(strip=True) if desc_elem else ""
+        
+        # MLS number
+        mls_elem = soup.find(string=re.compile(r'MLS#', re.IGNORECASE))
+        if mls_elem:
+            mls_match = re.search(r'MLS#\s*:?\s*(\w+)', mls_elem)
+            details['mls_number'] = mls_match.group(1) if mls_match else None
+        
+        # Zoning
+        zoning_elem = soup.find('span', string=re.compile(r'Zoning', re.IGNORECASE))
+        if zoning_elem:
+            zoning_parent = zoning_elem.find_parent()
+            if zoning_parent:
+                details['zoning'] = zoning_parent.get_text().replace('Zoning', '').strip()
+        
+        return details
 
 
 # Example usage
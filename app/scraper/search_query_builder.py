@@ -7,6 +7,8 @@ import os
 from typing import List, Tuple
 from dotenv import load_dotenv
 
+from app.scraper.address_parser import parse_address
+
 load_dotenv()
 
 
@@ -16,6 +18,9 @@ class SearchQueryBuilder:
     instead of generic listing category pages
     """
     
+    # Street-level query used by street-sweep runs
+    STREET_QUERY_TEMPLATE = "\"{street}\" {location} real estate for sale"
+    
     # Query templates that return actual properties with addresses
     SPECIFIC_PROPERTY_QUERIES = [
         # Site-specific searches for individual listings
@@ -24,7 +29,7 @@ class SearchQueryBuilder:
         "site:realtor.com {location} MLS property \"address\"",
         
         # Address pattern searches
-        "\"{street}\" {location} real estate for sale",
+        STREET_QUERY_TEMPLATE,
         "{location} homes for sale by owner address",
         
         # Development-specific with address patterns
@@ -55,6 +60,28 @@ class SearchQueryBuilder:
     def __init__(self):
         pass
     
+    # Address-focused query templates, keyed by a stable name that their
+    # yield statistics are stored under ({city} and {state} are filled in)
+    ADDRESS_QUERY_TEMPLATES = [
+        # Direct address searches
+        ('zillow_mls_address', "site:zillow.com {city} {state} single family home \"$\" address MLS"),
+        ('redfin_zip_address', "site:redfin.com {city} {state} property address zip code"),
+        ('realtor_mls_number', "site:realtor.com {city} {state} \"for sale\" MLS# address"),
+        
+        # Specific development targets
+        ('teardown_sold', "{city} {state} teardown property street address sold"),
+        ('fixer_upper', "{city} {state} fixer upper single family home address"),
+        ('large_lot', "{city} {state} large lot development ready property"),
+        
+        # Alternative format searches
+        ('city_mls_for_sale', "\"{city},\" {state} home address \"for sale\" MLS"),
+        ('street_suffix', "{city} MA real estate listing \"St\" OR \"Rd\" OR \"Ave\" OR \"Ln\""),
+        
+        # Specific neighborhood/address pattern searches
+        ('zillow_street_words', "site:zillow.com {city} {state} \"Road\" OR \"Street\" OR \"Avenue\" OR \"Lane\" for sale"),
+        ('redfin_unit_number', "site:redfin.com {city} {state} homes \"#\" address"),
+    ]
+    
     @staticmethod
     def build_address_focused_queries(location: str) -> List[str]:
         """
@@ -66,31 +93,44 @@ class SearchQueryBuilder:
         Returns:
             List of targeted search queries
         """
+        return [query for _, query in SearchQueryBuilder.build_template_queries(location)]
+    
+    @staticmethod
+    def build_template_queries(location: str) -> List[Tuple[str, str]]:
+        """
+        Build the address-focused queries along with their template names
+        
+        Args:
+            location: Location string (e.g., "Newton, MA")
+            
+        Returns:
+            List of (template name, search query) tuples
+        """
         city, state = location.split(',') if ',' in location else (location, '')
         city = city.strip()
         state = state.strip()
         
-        queries = [
-            # Direct address searches
-            f"site:zillow.com {city} {state} single family home \"$\" address MLS",
-            f"site:redfin.com {city} {state} property address zip code",
-            f"site:realtor.com {city} {state} \"for sale\" MLS# address",
-            
-            # Specific development targets
-            f"{city} {state} teardown property street address sold",
-            f"{city} {state} fixer upper single family home address",
-            f"{city} {state} large lot development ready property",
-            
-            # Alternative format searches
-            f"\"{city},\" {state} home address \"for sale\" MLS",
-            f"{city} MA real estate listing \"St\" OR \"Rd\" OR \"Ave\" OR \"Ln\"",
-            
-            # Specific neighborhood/address pattern searches
-            f"site:zillow.com {city} {state} \"Road\" OR \"Street\" OR \"Avenue\" OR \"Lane\" for sale",
-            f"site:redfin.com {city} {state} homes \"#\" address",
+        return [
+            (name, template.format(city=city, state=state))
+            for name, template in SearchQueryBuilder.ADDRESS_QUERY_TEMPLATES
         ]
+    
+    @staticmethod
+    def build_street_queries(streets: List[str], location: str) -> List[Tuple[str, str]]:
+        """
+        Build street-level search queries for a street sweep
         
-        return queries
+        Args:
+            streets: Street names (e.g., "Lindbergh Ave")
+            location: Location string (e.g., "Newton, MA")
+            
+        Returns:
+            List of (street, search query) tuples
+        """
+        return [
+            (street, SearchQueryBuilder.STREET_QUERY_TEMPLATE.format(street=street, location=location))
+            for street in streets
+        ]
     
     @staticmethod
     def build_optimized_query(
@@ -141,39 +181,8 @@ class SearchQueryBuilder:
         Returns:
             True if it looks like a real address
         """
-        # Real addresses typically have:
-        # - A number at the start
-        # - Street type indicators
-        # - Not category keywords
-        
-        import re
-        
         # Real address pattern: "123 Main St, Newton, MA 02459"
-        address_pattern = r'^\d+\s+[A-Za-z\s]+(?:St|Rd|Ave|Ln|Blvd|Way|Ct|Dr|Pl|Terr|Tr).*'
-        
-        # Category page patterns to exclude
-        category_patterns = [
-            r'for sale in',
-            r'homes for sale',
-            r'properties for sale',
-            r'listings in',
-            r'real estate in',
-            r'browse',
-            r'search',
-            r'view all',
-        ]
-        
-        # Check if it looks like a real address
-        if re.match(address_pattern, address, re.IGNORECASE):
-            return True
-        
-        # Check if it matches category patterns
-        address_lower = address.lower()
-        for pattern in category_patterns:
-            if re.search(pattern, address_lower):
-                return False
-        
-        return False
+        return parse_address(address) is not None
     
     @staticmethod
     def extract_real_addresses(listings: List[dict]) -> List[dict]:
@@ -0,0 +1,146 @@
+"""
+Street-sweep search planning
+Loads a local street list and picks the streets each run searches, rotating
+through the whole list over successive runs so a town is covered street by
+street without querying every street on every run
+"""
+
+import re
+import csv
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.utils import DATA_DIR
+
+# Street lists are looked up here by location, e.g. data/streets/newton_ma.txt
+STREETS_DIR = DATA_DIR / "streets"
+
+# Columns holding the street name in CSV files and GIS layers, in order of preference
+STREET_NAME_COLUMNS = ('street', 'street_name', 'st_name', 'streetname', 'full_str', 'full_name', 'name')
+
+_HOUSE_NUMBER = re.compile(r'^\d+[A-Za-z]?(?:-\d+[A-Za-z]?)?\s+')
+_UNIT = re.compile(r'\s+(?:Unit|Apt|#).*$', re.IGNORECASE)
+
+
+def street_list_path(location: str) -> Path:
+    """
+    Default street list file for a location
+
+    Args:
+        location: Location string (e.g., "Newton, MA")
+
+    Returns:
+        Path such as data/streets/newton_ma.txt
+    """
+    slug = re.sub(r'[^a-z0-9]+', '_', location.lower()).strip('_')
+    return STREETS_DIR / f"{slug}.txt"
+
+
+def load_street_list(path: Path) -> List[str]:
+    """
+    Read street names from a local list
+
+    Supported formats: plain text (one street per line, # comments), CSV
+    (a STREET_NAME_COLUMNS column, else the first column), and GIS layers
+    readable by geopandas (.shp, .geojson, .gpkg) with a street name column.
+    Street names are deduplicated case-insensitively, keeping file order.
+
+    Args:
+        path: Street list file
+
+    Returns:
+        List of street names (e.g., "Lindbergh Ave")
+    """
+    path = Path(path)
+    suffix = path.suffix.lower()
+
+    if suffix == '.csv':
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            rows = list(csv.DictReader(f))
+        column = (_street_column(rows[0].keys()) or next(iter(rows[0]), None)) if rows else None
+        names = [row.get(column) or '' for row in rows] if column else []
+    elif suffix in ('.shp', '.geojson', '.json', '.gpkg'):
+        import geopandas as gpd
+        layer = gpd.read_file(path)
+        column = _street_column(layer.columns)
+        if column is None:
+            raise ValueError(f"No street name column in {path} (expected one of {STREET_NAME_COLUMNS})")
+        names = [str(value) for value in layer[column].dropna()]
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            names = [line.split('#', 1)[0] for line in f]
+
+    return _unique_streets(names)
+
+
+def street_from_address(address: str) -> Optional[str]:
+    """
+    Street name of a street address
+
+    Args:
+        address: Address such as "42 Lindbergh Ave, Newton, MA 02465"
+
+    Returns:
+        Street name (e.g., "Lindbergh Ave"), or None without a house number
+    """
+    street = (address or '').split(',')[0].strip()
+    if not _HOUSE_NUMBER.match(street):
+        return None
+    street = _UNIT.sub('', _HOUSE_NUMBER.sub('', street)).strip()
+    return street or None
+
+
+def streets_from_parcel_cache(cache) -> List[str]:
+    """
+    Streets of the parcels found by earlier GIS lookups
+
+    Parcel cache keys are cleaned street addresses; lookups that found no
+    parcel are skipped.
+
+    Args:
+        cache: SharedCache holding the 'parcel' namespace
+
+    Returns:
+        List of street names, title-cased
+    """
+    names = []
+    for key, parcel in cache.items('parcel'):
+        street = street_from_address(key) if parcel else None
+        if street:
+            names.append(street.title())
+    return _unique_streets(names)
+
+
+def next_streets(streets: List[str], history: Dict[str, Dict[str, Any]], count: int) -> List[str]:
+    """
+    Streets to sweep this run: never-swept streets first, then least recently swept
+
+    Args:
+        streets: Street list, in file order
+        history: Sweep records per street (with last_swept), keyed case-insensitively
+        count: Streets to pick
+
+    Returns:
+        Up to count street names, in list order
+    """
+    last_swept = {street.lower(): record.get('last_swept') or '' for street, record in history.items()}
+    order = sorted(range(len(streets)), key=lambda i: (last_swept.get(streets[i].lower(), ''), i))
+    return [streets[i] for i in sorted(order[:max(0, count)])]
+
+
+def _street_column(columns: Iterable[str]) -> Optional[str]:
+    by_name = {str(column).lower(): column for column in columns}
+    for candidate in STREET_NAME_COLUMNS:
+        if candidate in by_name:
+            return by_name[candidate]
+    return None
+
+
+def _unique_streets(names: Iterable[str]) -> List[str]:
+    seen, streets = set(), []
+    for name in names:
+        street = ' '.join(str(name).split())
+        if street and street.lower() not in seen:
+            seen.add(street.lower())
+            streets.append(street)
+    return streets
@@ -3,14 +3,18 @@ Zillow scraper for real estate listings
 Uses requests + BeautifulSoup with anti-bot measures
 """
 
-import time
 import re
 import json
 from typing import List, Dict, Any, Optional
+import httpx
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 from fake_useragent import UserAgent
 from app.utils import setup_logging, clean_price, clean_sqft, clean_year
+from app.core.single_flight import CoalescingSession
+from app.scraper.html_parsing import find_cards, make_soup
+from app.scraper.http_cache import get_page, aget_page, parse_page, aparse_page
+from app.scraper.page_fetcher import HostBlocked, host_throttle, fetch_pages, afetch_pages
 
 
 class ZillowScraper:
@@ -19,11 +23,18 @@ class ZillowScraper:
     Note: Zillow has strong anti-scraping measures, may require additional handling
     """
     
+    # Property-card markup for the HTML fallback, most common first
+    CARD_SELECTORS = [
+        ('article', {'class': re.compile(r'list-card')}),
+        ('div', {'data-test': 'property-card'}),
+    ]
+    
     def __init__(self):
         self.base_url = "https://www.zillow.com"
         self.logger = setup_logging('zillow_scraper')
         self.ua = UserAgent()
-        self.session = requests.Session()
+        self.session = CoalescingSession()
+        self.throttle = host_throttle(self.base_url)
         
     def _get_headers(self) -> Dict[str, str]:
         """Generate request headers with random user agent"""
@@ -58,29 +69,51 @@ class ZillowScraper:
         """
         self.logger.info(f"Scraping Zillow: {city}, {state}")
         
+        pages = fetch_pages(self._scrape_search_page,
+                            self._page_urls(city, state, property_type, max_pages),
+                            window=self.throttle.concurrency)
+        return self._combine_pages(pages, max_pages)
+    
+    async def asearch_location(
+        self,
+        city: str,
+        state: str,
+        client,
+        property_type: str = "houses",
+        max_pages: int = 5
+    ) -> List[Dict[str, Any]]:
+        """
+        Async variant of search_location
+        
+        Args:
+            client: httpx.AsyncClient owned by the caller's event loop
+        """
+        self.logger.info(f"Scraping Zillow: {city}, {state}")
+        
+        pages = await afetch_pages(lambda url: self._ascrape_search_page(url, client),
+                                   self._page_urls(city, state, property_type, max_pages),
+                                   window=self.throttle.concurrency)
+        return self._combine_pages(pages, max_pages)
+    
+    def _page_urls(self, city: str, state: str, property_type: str, max_pages: int) -> List[str]:
+        """Search result page URLs, first page first"""
         # Construct Zillow search URL
         city_formatted = city.replace(' ', '-').lower()
         search_url = f"{self.base_url}/{city_formatted}-{state.lower()}"
         
+        return [
+            f"{search_url}/{page}_p" if page > 1 else search_url
+            for page in range(1, max_pages + 1)
+        ]
+    
+    def _combine_pages(self, pages: List[List[Dict[str, Any]]], max_pages: int) -> List[Dict[str, Any]]:
+        """Flatten fetched pages, logging per-page counts"""
         all_listings = []
-        
-        for page in range(1, max_pages + 1):
-            page_url = f"{search_url}/{page}_p" if page > 1 else search_url
-            
-            try:
-                listings = self._scrape_search_page(page_url)
-                if not listings:
-                    self.logger.info(f"No more listings found on page {page}")
-                    break
-                
-                all_listings.extend(listings)
-                self.logger.info(f"Page {page}: Found {len(listings)} listings")
-                
-                time.sleep(3)  # Longer delay for Zillow
-                
-            except Exception as e:
-                self.logger.error(f"Error scraping page {page}: {e}")
-                continue
+        for page, listings in enumerate(pages, 1):
+            all_listings.extend(listings)
+            self.logger.info(f"Page {page}: Found {len(listings)} listings")
+        if len(pages) < max_pages:
+            self.logger.info(f"No more listings found on page {len(pages) + 1}")
         
         self.logger.info(f"Total Zillow listings scraped: {len(all_listings)}")
         return all_listings
@@ -96,36 +129,12 @@ class ZillowScraper:
             List of listings from the page
         """
         try:
-            response = self.session.get(url, headers=self._get_headers(), timeout=15)
-            response.raise_for_status()
-            
-            # Check if we hit a CAPTCHA or block
-            if 'captcha' in response.text.lower() or response.status_code == 403:
-                self.logger.warning("Zillow CAPTCHA or block detected")
-                return []
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Try to extract JSON data (Zillow often embeds data in scripts)
-            script_data = self._extract_json_data(soup)
-            if script_data:
-                return self._parse_json_listings(script_data)
-            
-            # Fallback to HTML parsing
-            property_cards = soup.find_all('article', class_=re.compile(r'list-card'))
-            if not property_cards:
-                property_cards = soup.find_all('div', attrs={'data-test': 'property-card'})
-            
-            listings = []
-            for card in property_cards:
-                listing = self._parse_property_card(card)
-                if listing:
-                    listing['source'] = 'zillow'
-                    listing['source_url'] = url
-                    listings.append(listing)
-            
-            return listings
+            page = get_page(self.session, url, self.throttle, 'search', self._get_headers(), self.logger)
+            return parse_page(self, '_parse_search_page', page)
             
+        except HostBlocked as e:
+            self.logger.warning(f"Skipped {url}: {e}")
+            return []
         except requests.exceptions.RequestException as e:
             self.logger.error(f"Request failed for {url}: {e}")
             return []
@@ -133,6 +142,56 @@ class ZillowScraper:
             self.logger.error(f"Error parsing page {url}: {e}")
             return []
     
+    async def _ascrape_search_page(self, url: str, client) -> List[Dict[str, Any]]:
+        """Async variant of _scrape_search_page"""
+        try:
+            page = await aget_page(client, url, self.throttle, 'search', self._get_headers(), self.logger)
+            return await aparse_page(self, '_parse_search_page', page)
+            
+        except HostBlocked as e:
+            self.logger.warning(f"Skipped {url}: {e}")
+            return []
+        except httpx.HTTPError as e:
+            self.logger.error(f"Request failed for {url}: {e}")
+            return []
+        except Exception as e:
+            self.logger.error(f"Error parsing page {url}: {e}")
+            return []
+    
+    def _parse_search_page(self, content: bytes, url: str) -> List[Dict[str, Any]]:
+        """
+        Parse a Zillow search results page
+        
+        Args:
+            content: Page HTML
+            url: Page URL
+            
+        Returns:
+            List of listings from the page
+        """
+        # Check if we hit a CAPTCHA or block
+        if b'captcha' in content.lower():
+            self.logger.warning("Zillow CAPTCHA or block detected")
+            return []
+        
+        # Try to extract JSON data (Zillow often embeds data in scripts)
+        script_data = self._extract_json_data(make_soup(content, SoupStrainer('script')))
+        if script_data:
+            return self._parse_json_listings(script_data)
+        
+        # Fallback to HTML parsing
+        property_cards = find_cards(content, self.CARD_SELECTORS)
+        
+        listings = []
+        for card in property_cards:
+            listing = self._parse_property_card(card)
+            if listing:
+                listing['source'] = 'zillow'
+                listing['source_url'] = url
+                listings.append(listing)
+        
+        return listings
+    
     def _extract_json_data(self, soup: BeautifulSoup) -> Optional[Dict]:
         """
         Extract JSON data embedded in Zillow page scripts
@@ -292,48 +351,62 @@ class ZillowScraper:
         self.logger.info(f"Scraping property details: {property_url}")
         
         try:
-            response = self.session.get(property_url, headers=self._get_headers(), timeout=15)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            details = {
-                'url': property_url,
-                'source': 'zillow'
-            }
-            
-            # Try to extract structured data
-            json_data = self._extract_json_data(soup)
-            if json_data:
-                # Parse from JSON if available
-                home_info = json_data.get('props', {}).get('pageProps', {}).get('gdpClientCache', {})
-                # Structure varies, adapt as needed
-            
-            # Year built
-            year_elem = soup.find('span', string=re.compile(r'Year Built', re.IGNORECASE))
-            if year_elem:
-                year_parent = year_elem.find_parent()
-                if year_parent:
-                    year_match = re.search(r'\d{4}', year_parent.get_text())
-                    details['year_built'] = clean_year(year_match.group()) if year_match else None
-            
-            # Lot size
-            lot_elem = soup.find('span', string=re.compile(r'Lot', re.IGNORECASE))
-            if lot_elem:
-                lot_parent = lot_elem.find_parent()
-                if lot_parent:
-                    lot_match = re.search(r'([\d,]+)', lot_parent.get_text())
-                    details['lot_size'] = clean_sqft(lot_match.group(1)) if lot_match else None
-            
-            # Description
-            desc_elem = soup.find('div', class_=re.compile(r'description'))
-            details['description'] = desc_elem.get_text(strip=True) if desc_elem else ""
-            
-            return details
+            page = get_page(self.session, property_url, self.throttle, 'details', self._get_headers(), self.logger)
+            return parse_page(self, '_parse_property_details', page)
             
+        except HostBlocked as e:
+            self.logger.warning(f"Skipped {property_url}: {e}")
+            return {}
         except Exception as e:
             self.logger.error(f"Error scraping property details: {e}")
             return {}
+    
+    def _parse_property_details(self, content: bytes, url: str) -> Dict[str, Any]:
+        """
+        Parse a Zillow property detail page
+        
+        Args:
+            content: Page HTML
+            url: Page URL
+            
+        Returns:
+            Dictionary with detailed property information
+        """
+        soup = make_soup(content)
+        
+        details = {
+            'url': url,
+            'source': 'zillow'
+        }
+        
+        # Try to extract structured data
+        json_data = self._extract_json_data(soup)
+        if json_data:
+            # Parse from JSON if available
+            home_info = json_data.get('props', {}).get('pageProps', {}).get('gdpClientCache', {})
+            # Structure varies, adapt as needed
+        
+        # Year built
+        year_elem = soup.find('span', string=re.compile(r'Year Built', re.IGNORECASE))
+        if year_elem:
+            year_parent = year_elem.find_parent()
+            if year_parent:
+                year_match = re.search(r'\d{4}', year_parent.get_text())
+                details['year_built'] = clean_year(year_match.group()) if year_match else None
+        
+        # Lot size
+        lot_elem = soup.find('span', string=re.compile(r'Lot', re.IGNORECASE))
+        if lot_elem:
+            lot_parent = lot_elem.find_parent()
+            if lot_parent:
+                lot_match = re.search(r'([\d,]+)', lot_parent.get_text())
+                details['lot_size'] = clean_sqft(lot_match.group(1)) if lot_match else None
+        
+        # Description
+        desc_elem = soup.find('div', class_=re.compile(r'description'))
+        details['description'] = desc_elem.get_text(strip=True) if desc_elem else ""
+        
+        return details
 
 
 # Example usage
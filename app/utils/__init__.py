@@ -3,11 +3,14 @@ Utility functions for the Anil Project
 """
 
 import os
+import re
+import csv
 import json
 import logging
+import textwrap
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterable
 import pandas as pd
 from dotenv import load_dotenv
 
@@ -20,6 +23,14 @@ LOGS_DIR = DATA_DIR / "logs"
 DATA_DIR.mkdir(exist_ok=True)
 LOGS_DIR.mkdir(exist_ok=True)
 
+# Street suffix and direction abbreviations used by normalize_address
+ADDRESS_ABBREVIATIONS = {
+    'street': 'st', 'avenue': 'ave', 'road': 'rd', 'lane': 'ln', 'drive': 'dr',
+    'court': 'ct', 'place': 'pl', 'boulevard': 'blvd', 'terrace': 'ter', 'terr': 'ter',
+    'circle': 'cir', 'parkway': 'pkwy', 'highway': 'hwy', 'square': 'sq',
+    'north': 'n', 'south': 's', 'east': 'e', 'west': 'w',
+}
+
 def setup_logging(name: str = "anil_project", level: int = logging.INFO) -> logging.Logger:
     logger = logging.getLogger(name)
     logger.setLevel(level)
@@ -49,10 +60,13 @@ def save_to_csv(data: List[Dict[str, Any]], filename: str, append: bool = False)
         logger.warning(f"No data to save to {filename}")
         return ""
     filepath = DATA_DIR / filename
-    df = pd.DataFrame(data)
     mode = 'a' if append else 'w'
     header = not append or not filepath.exists()
-    df.to_csv(filepath, mode=mode, header=header, index=False, encoding='utf-8')
+    if isinstance(data, list):
+        df = pd.DataFrame(data)
+        df.to_csv(filepath, mode=mode, header=header, index=False, encoding='utf-8')
+    else:
+        _stream_to_csv(data, filepath, mode=mode, header=header)
     logger = setup_logging()
     logger.info(f"Saved {len(data)} records to {filepath}")
     return str(filepath)
@@ -69,11 +83,37 @@ def load_from_csv(filename: str) -> List[Dict[str, Any]]:
 def save_to_json(data: List[Dict[str, Any]], filename: str) -> str:
     filepath = DATA_DIR / filename
     with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+        if isinstance(data, list):
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        else:
+            _stream_to_json(data, f)
     logger = setup_logging()
     logger.info(f"Saved {len(data)} records to {filepath}")
     return str(filepath)
 
+def _stream_to_csv(records: Iterable[Dict[str, Any]], filepath: Path, mode: str, header: bool) -> None:
+    # Re-iterable record streams (e.g. a SpillBuffer) are written in two passes
+    # without loading them whole: one for the columns, one for the rows
+    columns = {}
+    for record in records:
+        columns.update(dict.fromkeys(record))
+    with open(filepath, mode, newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=list(columns), restval='')
+        if header:
+            writer.writeheader()
+        for record in records:
+            writer.writerow(record)
+
+def _stream_to_json(records: Iterable[Dict[str, Any]], f) -> None:
+    # Same layout as json.dump(list, indent=2), one record at a time
+    f.write('[')
+    written = 0
+    for record in records:
+        f.write(',\n' if written else '\n')
+        f.write(textwrap.indent(json.dumps(record, indent=2, ensure_ascii=False), '  '))
+        written += 1
+    f.write('\n]' if written else ']')
+
 def clean_price(price_str: str) -> Optional[float]:
     if not price_str or price_str == "N/A":
         return None
@@ -126,6 +166,32 @@ def deduplicate_listings(listings: List[Dict[str, Any]], key: str = 'address') -
     logger.info(f"Deduplicated {len(listings)} -> {len(unique_listings)} listings")
     return unique_listings
 
+def normalize_address(address: str) -> str:
+    """
+    Join key for matching one street address across sources
+
+    Keeps the street line only (before the first comma), drops unit
+    numbers and punctuation, lowercases and abbreviates street suffixes,
+    so "42 Lindbergh Avenue, Newton, MA" and "42 Lindbergh Ave." match.
+    """
+    street = (address or '').split(',')[0].lower()
+    street = re.sub(r'\s+(?:(?:unit|apt)\b|#).*$', '', street)
+    words = re.sub(r'[^a-z0-9\s]', ' ', street).split()
+    return ' '.join(ADDRESS_ABBREVIATIONS.get(word, word) for word in words)
+
+def has_classification(listing: Dict[str, Any]) -> bool:
+    """
+    Whether a listing carries a real LLM classification
+
+    Failed classifications and ones skipped for budget get an 'unknown'
+    placeholder flagged classification_error / classification_skipped; a
+    later run must classify those again, not reuse them. An unflagged
+    'unknown' is the model's own verdict and counts as a result.
+    """
+    return (bool(listing.get('label'))
+            and not listing.get('classification_error')
+            and not listing.get('classification_skipped'))
+
 def calculate_price_per_sqft(price: Optional[float], sqft: Optional[float]) -> Optional[float]:
     if price and sqft and sqft > 0:
         return round(price / sqft, 2)
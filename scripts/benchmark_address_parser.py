@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Address Recognizer Micro-benchmark
+Times the compiled address recognizer against the previous per-result
+implementation over recorded SerpAPI result titles: cached SerpAPI responses
+(data/cache/shared_cache.db) and earlier search results (data/raw_listings.csv)
+
+Usage:
+    python scripts/benchmark_address_parser.py
+    python scripts/benchmark_address_parser.py --repeat 2000 --cache data/cache/shared_cache.db
+"""
+
+import sys
+import csv
+import time
+import argparse
+from pathlib import Path
+from typing import Callable, List
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.core.shared_cache import SharedCache, DEFAULT_CACHE_PATH
+from app.scraper.address_parser import parse_address
+from app.scraper.llm_search import LLMSearch
+
+SERPAPI_NAMESPACES = ('serpapi:google', 'serpapi:google_maps')
+
+
+def _legacy_is_real_address(text: str) -> bool:
+    """LLMSearch._is_real_address before the compiled recognizer (kept for comparison)"""
+    import re
+    if not re.match(r'^\d+\s+', text):
+        return False
+    street_types = ['St', 'Rd', 'Ave', 'Ln', 'Blvd', 'Way', 'Ct', 'Dr', 'Pl', 'Terr', 'Tr', 'Pkwy', 'Circle', 'Cove']
+    if not any(st in text for st in street_types):
+        return False
+    exclude_keywords = ['for sale in', 'homes for sale', 'properties for sale', 'listings', 'browse',
+                        'search homes', 'land & lots', 'new construction homes']
+    text_lower = text.lower()
+    if any(keyword in text_lower for keyword in exclude_keywords):
+        return False
+    return bool(re.search(r',\s*[A-Z]{2}\s*\d{5}', text))
+
+
+def _legacy_extract_address(title: str) -> str:
+    """LLMSearch._extract_address before the compiled recognizer"""
+    import re
+    if not _legacy_is_real_address(title):
+        return ""
+    match = re.match(r'^([^|:]+)', title)
+    return match.group(1).strip() if match else ""
+
+
+def load_recorded_titles(cache_path: Path, csv_path: Path) -> List[str]:
+    """Result titles from cached SerpAPI responses and saved raw listings"""
+    titles = []
+    if cache_path.exists():
+        cache = SharedCache(str(cache_path))
+        for namespace in SERPAPI_NAMESPACES:
+            for _, data in cache.items(namespace):
+                for result in data.get('organic_results', []) + data.get('local_results', []):
+                    titles.append(result.get('title') or result.get('address') or '')
+    if csv_path.exists():
+        with open(csv_path, newline='', encoding='utf-8') as f:
+            titles.extend(row.get('title', '') for row in csv.DictReader(f))
+    return [t for t in titles if t]
+
+
+def time_per_title(parse: Callable[[str], object], titles: List[str], repeat: int) -> float:
+    """Mean microseconds per title over `repeat` passes"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for title in titles:
+            parse(title)
+    return (time.perf_counter() - start) / (repeat * len(titles)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Address recognizer micro-benchmark')
+    parser.add_argument('--repeat', type=int, default=1000, help='Passes over the recorded titles')
+    parser.add_argument('--cache', default=str(DEFAULT_CACHE_PATH), help='SerpAPI response cache')
+    parser.add_argument('--csv', default=str(PROJECT_ROOT / 'data' / 'raw_listings.csv'),
+                        help='Saved raw search listings')
+    args = parser.parse_args()
+
+    titles = load_recorded_titles(Path(args.cache), Path(args.csv))
+    if not titles:
+        print("No recorded SerpAPI results found")
+        return 1
+
+    legacy = time_per_title(_legacy_extract_address, titles, args.repeat)
+    compiled = time_per_title(lambda title: LLMSearch._parse_real_address(title), titles, args.repeat)
+    parse_only = time_per_title(parse_address, titles, args.repeat)
+
+    changed = [(t, _legacy_extract_address(t), (LLMSearch._parse_real_address(t) or None))
+               for t in titles]
+    changed = [(t, old, new.text if new else '') for t, old, new in changed
+               if old != (new.text if new else '')]
+
+    print(f"{len(titles)} recorded titles x {args.repeat} passes")
+    print(f"  {'legacy extract':<18} {legacy:>8.2f} us/title")
+    print(f"  {'compiled extract':<18} {compiled:>8.2f} us/title  ({legacy / compiled:.1f}x)")
+    print(f"  {'parse_address':<18} {parse_only:>8.2f} us/title")
+    print(f"\n{len(changed)} titles extract differently:")
+    for title, old, new in changed[:20]:
+        print(f"  {title!r}\n    legacy:   {old!r}\n    compiled: {new!r}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Search Page Parse Benchmark
+Times search-page parsing over archived pages: the previous full html.parser
+parse, lxml keeping only the property cards, and the same parse spread over
+the parser process pool
+
+Usage:
+    python scripts/benchmark_html_parsing.py redfin
+    python scripts/benchmark_html_parsing.py redfin pages/redfin/*.html
+    python scripts/benchmark_html_parsing.py zillow pages/zillow --workers 4 --repeat 3
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Any, Callable, List, Optional
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from bs4 import BeautifulSoup
+from app.scraper.html_parsing import ParsePool
+from app.scraper.page_archive import PageArchive, SOURCE_SCRAPERS, load_scraper
+
+
+def load_pages(paths: List[str], source: str, archive_dir: Optional[str], limit: int) -> List[bytes]:
+    """
+    HTML of the given files and of the .html files in the given directories,
+    or without paths, the source's search pages in the page archive
+    """
+    if not paths:
+        archive = PageArchive(archive_dir)
+        return [archive.load(page.sha256) for page in islice(archive.pages(source, 'search'), limit)]
+    files = []
+    for path in map(Path, paths):
+        files.extend(sorted(path.glob('*.html')) if path.is_dir() else [path])
+    return [f.read_bytes() for f in files if f.is_file()]
+
+
+def legacy_parse(scraper: Any, content: bytes, url: str) -> List[dict]:
+    """_parse_search_page before the lxml card parse (kept for comparison)"""
+    soup = BeautifulSoup(content, 'html.parser')
+    if hasattr(scraper, '_extract_json_data'):
+        script_data = scraper._extract_json_data(soup)
+        if script_data:
+            return scraper._parse_json_listings(script_data)
+    for name, attrs in scraper.CARD_SELECTORS:
+        cards = soup.find_all(name, attrs=attrs)
+        if cards:
+            return [listing for listing in map(scraper._parse_property_card, cards) if listing]
+    return []
+
+
+def time_pages(parse_page: Callable[[bytes], List[dict]], pages: List[bytes], repeat: int,
+               threads: int = 1) -> tuple:
+    """(pages per second, listings found per pass)"""
+    start = time.perf_counter()
+    found = 0
+    for _ in range(repeat):
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            found = sum(len(listings) for listings in executor.map(parse_page, pages))
+    return repeat * len(pages) / (time.perf_counter() - start), found
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Search page parse benchmark')
+    parser.add_argument('source', choices=sorted(SOURCE_SCRAPERS), help='Site the pages came from')
+    parser.add_argument('pages', nargs='*',
+                        help='Page files or directories of .html files (default: the page archive)')
+    parser.add_argument('--archive', default=None, help='Page archive directory (default: data/archive)')
+    parser.add_argument('--limit', type=int, default=200, help='Most archived pages to load')
+    parser.add_argument('--repeat', type=int, default=3, help='Passes over the pages')
+    parser.add_argument('--workers', type=int, default=None, help='Parser processes (default: CPU count)')
+    args = parser.parse_args()
+
+    pages = load_pages(args.pages, args.source, args.archive, args.limit)
+    if not pages:
+        print("No archived pages found")
+        return 1
+
+    scraper = load_scraper(args.source)
+    url = scraper.base_url
+    results = [
+        ('html.parser', time_pages(lambda page: legacy_parse(scraper, page, url), pages, args.repeat)),
+        ('lxml cards', time_pages(lambda page: scraper._parse_search_page(page, url), pages, args.repeat)),
+    ]
+
+    pool = ParsePool(workers=args.workers)
+    if pool.workers > 0:
+        parse_in_pool = lambda page: pool.parse(scraper, '_parse_search_page', page, url)
+        time_pages(parse_in_pool, pages[:pool.workers], 1, threads=pool.workers)   # Start the workers
+        results.append((f'pool x{pool.workers}',
+                        time_pages(parse_in_pool, pages, args.repeat, threads=pool.workers)))
+        pool.shutdown()
+
+    baseline = results[0][1][0]
+    print(f"{len(pages)} {args.source} pages x {args.repeat} passes")
+    for name, (rate, found) in results:
+        print(f"  {name:<12} {rate:>8.1f} pages/s  ({rate / baseline:.1f}x)  {found} listings/pass")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+End-to-end Pipeline Benchmark
+Runs DevelopmentPipeline.run (or arun) against local stand-ins for every external service
+and reports throughput, per-stage p50/p95 and peak memory per listing count
+
+Usage:
+    python scripts/benchmark_pipeline.py
+    python scripts/benchmark_pipeline.py --sizes 100 1000 --latency all=0.01 --error-rate openai=0.02
+    python scripts/benchmark_pipeline.py --mode async --latency all=0.05
+    python scripts/benchmark_pipeline.py --save data/benchmarks/baseline.json
+    python scripts/benchmark_pipeline.py --baseline data/benchmarks/baseline.json --max-regression 0.2
+"""
+
+import os
+import sys
+import json
+import asyncio
+import time
+import argparse
+import tempfile
+import multiprocessing
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPTS_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+from fake_services import FakeServices, FakeSheetsClient, ServiceBehavior, parse_behaviors
+
+DEFAULT_SIZES = [100, 1000, 10000]
+MODES = ('batch', 'streaming', 'async')
+LOCATION = "Newton, MA"
+
+
+class _NoSleepTime:
+    """The time module with sleep() disabled (client-side rate limiting is moot against local fakes)"""
+
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+    @staticmethod
+    def sleep(seconds):
+        pass
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile (pct in 0-100)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, int(round(pct / 100 * len(ordered) + 0.5)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def _run_scenario(config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Run one pipeline pass in a fresh (spawned) process pointed at the fakes
+
+    Runs in its own process so peak RSS is per scenario and the patches
+    below never leak into the caller.
+    """
+    import logging
+    import smtplib
+
+    os.environ.update(config['env'])
+    workdir = Path(config['workdir'])
+    os.chdir(workdir)
+    if not config['verbose']:
+        logging.disable(logging.INFO)
+
+    import app.utils
+    import app.core.api_limits
+    import app.core.checkpoint
+    import app.core.spill
+    import app.dev_pipeline
+    import app.scraper.llm_search
+    import app.enrichment.gis_enrichment
+    from app.integrations.google_sheets_uploader import GoogleSheetsUploader
+
+    # Keep result files and checkpoints out of the project's data/ directory
+    app.utils.DATA_DIR = workdir / "data"
+    app.utils.DATA_DIR.mkdir(exist_ok=True)
+    app.core.checkpoint.CHECKPOINT_DIR = app.utils.DATA_DIR / "checkpoints"
+    app.core.spill.SPILL_DIR = app.utils.DATA_DIR / "spill"
+
+    if not config['keep_sleeps']:
+        for module in (app.dev_pipeline, app.scraper.llm_search, app.enrichment.gis_enrichment):
+            module.time = _NoSleepTime()
+        # The fake Nominatim has no usage policy
+        app.core.api_limits.install_api_rates({})
+
+    # The fake SMTP server speaks plain text only
+    smtplib.SMTP.starttls = lambda self, *args, **kwargs: (220, b'ready')
+
+    base_url = config['http_url']
+
+    def sheets_init(uploader, credentials_path=None):
+        uploader.logger = logging.getLogger('sheets_uploader')
+        uploader.client = FakeSheetsClient(base_url)
+
+    GoogleSheetsUploader.__init__ = sheets_init
+
+    # Every run must hit the fakes, not responses cached by an earlier run
+    pipeline = app.dev_pipeline.DevelopmentPipeline(search_cache=False)
+    pipeline.llm_search.base_url = f"{base_url}/serpapi/search"
+    pipeline.enricher.newton_gis_base = f"{base_url}/arcgis"
+    pipeline.enricher.newton_assessor_api = f"{base_url}/assessor.json"
+    pipeline.enricher.nominatim_url = f"{base_url}/nominatim/search"
+
+    start = time.perf_counter()
+    if config['mode'] == 'async':
+        stats = asyncio.run(pipeline.arun(location=LOCATION))
+    else:
+        stats = pipeline.run(location=LOCATION, streaming=config['mode'] == 'streaming',
+                             spill_mb=config['spill_mb'])
+    wall_seconds = time.perf_counter() - start
+
+    try:
+        import resource
+        peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    except ImportError:
+        peak_rss_mb = max((p['peak_rss_mb'] or 0) for p in stats['stage_profile'])
+
+    return {
+        'wall_seconds': wall_seconds,
+        'total_listings': stats['total_listings'],
+        'classified_listings': stats['classified_listings'],
+        'stage_profile': stats['stage_profile'],
+        'peak_rss_mb': peak_rss_mb,
+    }
+
+
+def run_benchmark(
+    sizes: List[int],
+    repeats: int = 3,
+    behaviors: Optional[Dict[str, ServiceBehavior]] = None,
+    mode: str = 'batch',
+    spill_mb: Optional[float] = None,
+    keep_sleeps: bool = False,
+    verbose: bool = False,
+    seed: int = 0
+) -> Dict[str, Any]:
+    """
+    Benchmark the pipeline at each listing count
+
+    Args:
+        sizes: Synthetic listing counts to run
+        repeats: Runs per size (percentiles are taken across runs)
+        behaviors: Per-service latency/error settings for the fakes
+        mode: Pipeline mode to benchmark: 'batch', 'streaming' or 'async'
+        spill_mb: Spill threshold for streaming runs (bounded-memory mode)
+        keep_sleeps: Keep the pipeline's client-side rate-limit sleeps
+        verbose: Keep INFO logging in the pipeline runs
+        seed: Seed for fake-service jitter and injected errors
+
+    Returns:
+        Results dictionary (see summarize_runs), keyed by size
+    """
+    from app.scraper.search_query_builder import SearchQueryBuilder
+
+    queries = len(SearchQueryBuilder.build_address_focused_queries(LOCATION))
+    context = multiprocessing.get_context('spawn')
+    results = {
+        'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'mode': mode,
+        'spill_mb': spill_mb,
+        'repeats': repeats,
+        'behaviors': {name: vars(b) for name, b in (behaviors or {}).items()},
+        'sizes': {},
+    }
+
+    with FakeServices(behaviors=behaviors, seed=seed) as fakes:
+        env = {
+            'SERPAPI_KEY': 'benchmark',
+            'OPENAI_API_KEY': 'benchmark',
+            'OPENAI_BASE_URL': f"{fakes.http_url}/openai/v1",
+            'SLACK_WEBHOOK_URL': f"{fakes.http_url}/slack",
+            'SMTP_SERVER': '127.0.0.1',
+            'SMTP_PORT': str(fakes.smtp_port),
+            'SENDER_EMAIL': 'benchmark@example.com',
+            'SENDER_PASSWORD': 'benchmark',
+        }
+
+        for size in sizes:
+            runs = []
+            for attempt in range(repeats):
+                print(f"  {size} listings, run {attempt + 1}/{repeats}...", flush=True)
+                fakes.reset(listings=size, queries=queries, location=LOCATION)
+                with tempfile.TemporaryDirectory() as workdir:
+                    config = {
+                        'env': env,
+                        'workdir': workdir,
+                        'http_url': fakes.http_url,
+                        'mode': mode,
+                        'spill_mb': spill_mb,
+                        'keep_sleeps': keep_sleeps,
+                        'verbose': verbose,
+                    }
+                    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                        run = executor.submit(_run_scenario, config).result()
+                run['requests'] = dict(fakes.requests)
+                run['errors'] = dict(fakes.errors)
+                runs.append(run)
+            results['sizes'][str(size)] = summarize_runs(runs)
+
+    return results
+
+
+def summarize_runs(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Aggregate repeated runs of one size
+
+    Returns:
+        Throughput (listings/sec, median), wall time and per-stage p50/p95,
+        peak RSS (max) and external requests/errors of the last run
+    """
+    throughputs = [r['total_listings'] / r['wall_seconds'] for r in runs if r['wall_seconds'] > 0]
+    walls = [r['wall_seconds'] for r in runs]
+
+    stage_walls: Dict[str, List[float]] = {}
+    for run in runs:
+        for profile in run['stage_profile']:
+            stage_walls.setdefault(profile['stage'], []).append(profile['wall_seconds'])
+
+    return {
+        'listings': runs[-1]['total_listings'],
+        'classified': runs[-1]['classified_listings'],
+        'throughput': percentile(throughputs, 50),
+        'wall_p50': percentile(walls, 50),
+        'wall_p95': percentile(walls, 95),
+        'stages': {
+            stage: {'p50': percentile(values, 50), 'p95': percentile(values, 95)}
+            for stage, values in stage_walls.items()
+        },
+        'peak_rss_mb': max(r['peak_rss_mb'] for r in runs),
+        'requests': runs[-1]['requests'],
+        'errors': runs[-1]['errors'],
+    }
+
+
+def print_report(results: Dict[str, Any]):
+    print("\n" + "=" * 60)
+    print(f"PIPELINE BENCHMARK ({results['mode']}, {results['repeats']} runs per size)")
+    print("=" * 60)
+
+    for size, summary in results['sizes'].items():
+        print(f"\n{size} listings ({summary['listings']} found, {summary['classified']} classified)")
+        print(f"  Throughput: {summary['throughput']:.1f} listings/sec")
+        print(f"  Wall time:  p50 {summary['wall_p50']:.2f}s  p95 {summary['wall_p95']:.2f}s")
+        print(f"  Peak RSS:   {summary['peak_rss_mb']:.0f} MB")
+        print(f"  {'Stage':<12} {'p50 s':>8} {'p95 s':>8}")
+        for stage, timing in summary['stages'].items():
+            print(f"  {stage:<12} {timing['p50']:>8.3f} {timing['p95']:>8.3f}")
+        requests = ', '.join(f"{s}={n}" for s, n in sorted(summary['requests'].items()))
+        print(f"  Requests:   {requests or '-'}")
+        if summary['errors']:
+            print(f"  Injected errors: {', '.join(f'{s}={n}' for s, n in sorted(summary['errors'].items()))}")
+
+
+def check_regressions(results: Dict[str, Any], baseline: Dict[str, Any], max_regression: float) -> List[str]:
+    """
+    Compare throughput per size against a saved baseline
+
+    Returns:
+        Messages for sizes whose throughput dropped by more than max_regression
+    """
+    regressions = []
+    for size, summary in results['sizes'].items():
+        previous = baseline.get('sizes', {}).get(size)
+        if not previous or not previous.get('throughput'):
+            continue
+        change = summary['throughput'] / previous['throughput'] - 1
+        if change < -max_regression:
+            regressions.append(
+                f"{size} listings: {summary['throughput']:.1f}/s vs baseline "
+                f"{previous['throughput']:.1f}/s ({change:+.0%})"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the pipeline against local fake services')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help='Synthetic listing counts (default: 100 1000 10000)')
+    parser.add_argument('--repeats', type=int, default=3, help='Runs per size')
+    parser.add_argument('--latency', action='append', metavar='SERVICE=SECONDS',
+                        help='Fake response latency, e.g. openai=0.05 or all=0.01 (repeatable)')
+    parser.add_argument('--jitter', action='append', metavar='SERVICE=SECONDS',
+                        help='Random extra latency up to SECONDS (repeatable)')
+    parser.add_argument('--error-rate', action='append', metavar='SERVICE=FRACTION',
+                        help='Fraction of requests failing, e.g. nominatim=0.05 (repeatable)')
+    parser.add_argument('--mode', choices=MODES, default='batch', help='Pipeline mode to benchmark')
+    parser.add_argument('--spill-mb', type=float, metavar='MB',
+                        help='With --mode streaming: spill retained listings to disk past MB')
+    parser.add_argument('--keep-sleeps', action='store_true',
+                        help="Keep the pipeline's client-side rate-limit sleeps")
+    parser.add_argument('--seed', type=int, default=0, help='Seed for jitter and injected errors')
+    parser.add_argument('--verbose', action='store_true', help='Show pipeline INFO logging')
+    parser.add_argument('--save', metavar='FILE', help='Write results as JSON')
+    parser.add_argument('--baseline', metavar='FILE', help='Fail if throughput regressed against this result file')
+    parser.add_argument('--max-regression', type=float, default=0.2,
+                        help='Allowed throughput drop vs baseline (default: 0.2 = 20%%)')
+    args = parser.parse_args()
+
+    behaviors = parse_behaviors(args.latency, args.error_rate, args.jitter)
+
+    print("🏁 Running pipeline benchmark")
+    results = run_benchmark(
+        args.sizes,
+        repeats=args.repeats,
+        behaviors=behaviors,
+        mode=args.mode,
+        spill_mb=args.spill_mb,
+        keep_sleeps=args.keep_sleeps,
+        verbose=args.verbose,
+        seed=args.seed
+    )
+    print_report(results)
+
+    if args.save:
+        path = Path(args.save)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(results, indent=2))
+        print(f"\n✓ Results saved: {path}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        regressions = check_regressions(results, baseline, args.max_regression)
+        if regressions:
+            print("\n❌ Throughput regressions:")
+            for message in regressions:
+                print(f"  - {message}")
+            return 1
+        print(f"\n✓ No throughput regression beyond {args.max_regression:.0%}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
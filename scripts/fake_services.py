@@ -0,0 +1,406 @@
+#!/usr/bin/env python3
+"""
+Local stand-ins for the pipeline's external services
+SerpAPI, Nominatim, Newton GIS (ArcGIS + assessor), OpenAI chat completions,
+Slack webhook, SMTP and Google Sheets - with configurable latency and error rates
+"""
+
+import json
+import math
+import time
+import random
+import hashlib
+import threading
+import socketserver
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse, parse_qs
+
+# HTTP path prefix -> service name (as counted by app.core.api_limits)
+HTTP_SERVICES = {
+    'serpapi': 'serpapi',
+    'nominatim': 'nominatim',
+    'arcgis': 'newton_gis',
+    'assessor.json': 'newton_gis',
+    'openai': 'openai',
+    'slack': 'slack',
+    'sheets': 'google_sheets',
+}
+
+SERVICES = ('serpapi', 'nominatim', 'newton_gis', 'openai', 'slack', 'smtp', 'google_sheets')
+
+STREETS = ['Lindbergh Ave', 'Cherry St', 'Nahanton St', 'Dudley Rd', 'Rockland Pl',
+           'Walnut St', 'Beacon St', 'Commonwealth Ave', 'Centre St', 'Parker St']
+
+
+@dataclass
+class ServiceBehavior:
+    """How a fake service responds"""
+    latency: float = 0.0      # Seconds added to every response
+    jitter: float = 0.0       # Up to this many extra seconds, uniformly random
+    error_rate: float = 0.0   # Fraction of requests answered with an error
+
+
+def synthetic_listing(index: int, location: str = "Newton, MA") -> Dict[str, Any]:
+    """SerpAPI organic result for synthetic listing number `index` (unique address and link)"""
+    city, state = [part.strip() for part in location.split(',')][:2]
+    street = STREETS[index % len(STREETS)]
+    price = 600000 + (index * 7919) % 900000
+    return {
+        'title': f"{index + 1} {street}, {city}, {state} 0245{index % 10} | MLS# {100000 + index}",
+        'link': f"https://www.zillow.com/homedetails/{index + 1}-{street.replace(' ', '-')}/{5600000 + index}_zpid/",
+        'snippet': f"${price:,} 3 bd 2 ba 1,850 sqft single family home on a large lot. "
+                   f"Builder special, sold as-is.",
+    }
+
+
+def _stable_fraction(text: str) -> float:
+    """Deterministic 0-1 value per input, so runs are reproducible"""
+    return int(hashlib.md5(text.encode('utf-8')).hexdigest()[:8], 16) / 0xFFFFFFFF
+
+
+class FakeServices:
+    """
+    Runs the fake HTTP and SMTP servers on localhost in background threads
+
+    Usage:
+        with FakeServices(behaviors={'openai': ServiceBehavior(latency=0.05)}) as fakes:
+            fakes.reset(listings=1000, queries=10)
+            ... point the pipeline at fakes.http_url / fakes.smtp_port ...
+    """
+
+    def __init__(self, behaviors: Optional[Dict[str, ServiceBehavior]] = None, seed: int = 0):
+        """
+        Args:
+            behaviors: Per-service latency/error settings (see SERVICES)
+            seed: Seed for jitter and injected errors
+        """
+        self.behaviors = {service: ServiceBehavior() for service in SERVICES}
+        self.behaviors.update(behaviors or {})
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.listings = 0
+        self.location = "Newton, MA"
+        self._per_query = 0
+        self._search_calls = 0
+        self.requests: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+        self.emails: List[str] = []
+        self._http = None
+        self._smtp = None
+
+    # ------------------------------------------------------------------ lifecycle
+
+    def start(self) -> 'FakeServices':
+        fakes = self
+
+        class Handler(_HTTPHandler):
+            services = fakes
+
+        class SMTPHandler(_SMTPHandler):
+            services = fakes
+
+        self._http = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._http.daemon_threads = True
+        self._smtp = _ThreadingTCPServer(('127.0.0.1', 0), SMTPHandler)
+        for server in (self._http, self._smtp):
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        for server in (self._http, self._smtp):
+            if server is not None:
+                server.shutdown()
+                server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    @property
+    def http_url(self) -> str:
+        return f"http://127.0.0.1:{self._http.server_address[1]}"
+
+    @property
+    def smtp_port(self) -> int:
+        return self._smtp.server_address[1]
+
+    def reset(self, listings: int, queries: int, location: str = "Newton, MA"):
+        """
+        Start a new scenario: the next `queries` SerpAPI searches return
+        `listings` unique synthetic listings between them
+        """
+        with self._lock:
+            self.listings = listings
+            self.location = location
+            self._per_query = math.ceil(listings / max(1, queries))
+            self._search_calls = 0
+            self.requests = {}
+            self.errors = {}
+            self.emails = []
+
+    # ------------------------------------------------------------------ behavior
+
+    def respond(self, service: str) -> bool:
+        """Count a request, sleep its latency and decide whether it fails"""
+        behavior = self.behaviors[service]
+        with self._lock:
+            self.requests[service] = self.requests.get(service, 0) + 1
+            delay = behavior.latency + self._random.uniform(0, behavior.jitter)
+            failed = self._random.random() < behavior.error_rate
+            if failed:
+                self.errors[service] = self.errors.get(service, 0) + 1
+        if delay:
+            time.sleep(delay)
+        return not failed
+
+    def next_search_page(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            start = self._search_calls * self._per_query
+            self._search_calls += 1
+            end = min(self.listings, start + self._per_query)
+        return [synthetic_listing(i, self.location) for i in range(start, end)]
+
+    # ------------------------------------------------------------------ payloads
+
+    def payload(self, prefix: str, path: str, query: Dict[str, List[str]], body: bytes) -> Any:
+        if prefix == 'serpapi':
+            return {'search_metadata': {'status': 'Success'}, 'organic_results': self.next_search_page()}
+
+        if prefix == 'arcgis':
+            where = query.get('where', [''])[0]
+            # ~70% of addresses have a parcel match; the rest fall through to geocoding
+            if _stable_fraction(where) > 0.7:
+                return {'features': []}
+            fraction = _stable_fraction(where + 'lot')
+            return {'features': [{
+                'attributes': {
+                    'PARCEL_ID': hashlib.md5(where.encode('utf-8')).hexdigest()[:10],
+                    'LOT_SIZE': str(int(6000 + fraction * 24000)),
+                    'ZONING': 'SR2' if fraction > 0.5 else 'SR3',
+                    'LAND_USE': 'Single Family',
+                    'FRONTAGE': int(60 + fraction * 90),
+                    'OWNER_NAME': 'Synthetic Owner',
+                    'OWNER_ADDR': 'PO Box 1, Newton, MA',
+                },
+                'geometry': {'x': -71.2 - fraction / 10, 'y': 42.32 + fraction / 10},
+            }]}
+
+        if prefix == 'assessor.json':
+            fraction = _stable_fraction(query.get('address', [''])[0])
+            return [{
+                'total_value': int(700000 + fraction * 800000),
+                'land_value': int(500000 + fraction * 500000),
+                'building_value': int(200000 + fraction * 300000),
+                'year_built': int(1920 + fraction * 80),
+                'building_area': str(int(1200 + fraction * 2000)),
+            }]
+
+        if prefix == 'nominatim':
+            fraction = _stable_fraction(query.get('q', [''])[0])
+            return [{'lat': str(42.32 + fraction / 10), 'lon': str(-71.2 - fraction / 10)}]
+
+        if prefix == 'openai':
+            request = json.loads(body or b'{}')
+            prompt = json.dumps(request.get('messages', []))
+            fraction = _stable_fraction(prompt)
+            label = 'development' if fraction > 0.6 else 'potential' if fraction > 0.3 else 'no'
+            content = json.dumps({
+                'label': label,
+                'confidence': round(0.5 + fraction / 2, 2),
+                'explanation': f"Synthetic classification ({label})",
+            })
+            return {
+                'id': f"chatcmpl-{hashlib.md5(prompt.encode('utf-8')).hexdigest()[:12]}",
+                'object': 'chat.completion',
+                'created': int(time.time()),
+                'model': request.get('model', 'gpt-4o-mini'),
+                'choices': [{
+                    'index': 0,
+                    'message': {'role': 'assistant', 'content': content},
+                    'finish_reason': 'stop',
+                }],
+                'usage': {'prompt_tokens': len(prompt) // 4, 'completion_tokens': 40,
+                          'total_tokens': len(prompt) // 4 + 40},
+            }
+
+        if prefix == 'sheets':
+            return {'ok': True, 'op': path.rsplit('/', 1)[-1]}
+
+        return {'ok': True}
+
+
+class _HTTPHandler(BaseHTTPRequestHandler):
+    services: FakeServices = None
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True  # keep-alive responses would otherwise wait on delayed ACKs
+
+    def log_message(self, format, *args):
+        pass
+
+    def _handle(self):
+        parsed = urlparse(self.path)
+        parts = [p for p in parsed.path.split('/') if p]
+        prefix = parts[0] if parts else ''
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+
+        service = HTTP_SERVICES.get(prefix)
+        if service is None:
+            self._send(404, {'error': f"unknown path {parsed.path}"})
+            return
+        if not self.services.respond(service):
+            self._send(500, {'error': {'message': 'injected failure', 'type': 'server_error'}})
+            return
+        self._send(200, self.services.payload(prefix, parsed.path, parse_qs(parsed.query), body))
+
+    def _send(self, status: int, payload: Any):
+        encoded = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(encoded)))
+        self.end_headers()
+        self.wfile.write(encoded)
+
+    do_GET = _handle
+    do_POST = _handle
+
+
+class _ThreadingTCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    """Just enough plain-text SMTP for smtplib: EHLO, AUTH, MAIL, RCPT, DATA, QUIT"""
+    services: FakeServices = None
+
+    def _reply(self, line: str):
+        self.wfile.write((line + '\r\n').encode('ascii'))
+
+    def handle(self):
+        self._reply('220 fake-smtp ready')
+        while True:
+            raw = self.rfile.readline()
+            if not raw:
+                return
+            command = raw.decode('utf-8', 'replace').strip().upper()
+            if command.startswith(('EHLO', 'HELO')):
+                self.wfile.write(b'250-fake-smtp\r\n250-AUTH PLAIN LOGIN\r\n250 OK\r\n')
+            elif command.startswith('AUTH'):
+                self._reply('235 Authentication successful')
+            elif command.startswith(('MAIL', 'RCPT', 'RSET', 'NOOP')):
+                self._reply('250 OK')
+            elif command == 'DATA':
+                self._reply('354 End data with <CR><LF>.<CR><LF>')
+                lines = []
+                while True:
+                    line = self.rfile.readline()
+                    if not line or line in (b'.\r\n', b'.\n'):
+                        break
+                    lines.append(line)
+                if self.services.respond('smtp'):
+                    self.services.emails.append(b''.join(lines).decode('utf-8', 'replace'))
+                    self._reply('250 Message accepted')
+                else:
+                    self._reply('451 Injected failure')
+            elif command == 'QUIT':
+                self._reply('221 Bye')
+                return
+            else:
+                self._reply('502 Command not implemented')
+
+
+class FakeSheetsClient:
+    """
+    Stands in for an authorized gspread client
+
+    Every worksheet operation is one HTTP round trip to the fake Sheets
+    service, mirroring the API calls the real client makes.
+    """
+
+    def __init__(self, base_url: str):
+        import requests
+
+        self._session = requests.Session()
+        self._base_url = f"{base_url}/sheets"
+
+    def call(self, op: str, **payload):
+        response = self._session.post(f"{self._base_url}/{op}", json=payload, timeout=10)
+        response.raise_for_status()
+        return response.json()
+
+    def open(self, name: str) -> '_FakeSpreadsheet':
+        self.call('open', name=name)
+        return _FakeSpreadsheet(self, name)
+
+    def create(self, name: str) -> '_FakeSpreadsheet':
+        self.call('create', name=name)
+        return _FakeSpreadsheet(self, name)
+
+
+class _FakeSpreadsheet:
+    def __init__(self, client: FakeSheetsClient, name: str):
+        self._client = client
+        self.name = name
+        self.sheet1 = _FakeWorksheet(client, 'Sheet1')
+
+    def worksheet(self, title: str) -> '_FakeWorksheet':
+        self._client.call('worksheet', title=title)
+        return _FakeWorksheet(self._client, title)
+
+    def add_worksheet(self, title: str, rows: int = 1000, cols: int = 26) -> '_FakeWorksheet':
+        self._client.call('add_worksheet', title=title, rows=rows, cols=cols)
+        return _FakeWorksheet(self._client, title)
+
+
+class _FakeWorksheet:
+    def __init__(self, client: FakeSheetsClient, title: str):
+        self._client = client
+        self.title = title
+
+    def clear(self):
+        return self._client.call('clear', title=self.title)
+
+    def update(self, values=None, range_name=None, **kwargs):
+        return self._client.call('update', title=self.title, range=range_name, rows=len(values or []))
+
+    def append_rows(self, values, **kwargs):
+        return self._client.call('append_rows', title=self.title, rows=len(values))
+
+    def freeze(self, rows=None, cols=None):
+        return self._client.call('freeze', title=self.title)
+
+    def add_filter(self, *args, **kwargs):
+        return self._client.call('add_filter', title=self.title)
+
+    def format(self, *args, **kwargs):
+        return self._client.call('format', title=self.title)
+
+
+def parse_behaviors(latency: List[str], error_rate: List[str], jitter: List[str]) -> Dict[str, ServiceBehavior]:
+    """
+    Build per-service behaviors from CLI values like 'openai=0.05' or 'all=0.01'
+
+    Returns:
+        Dictionary of service -> ServiceBehavior
+    """
+    behaviors = {service: ServiceBehavior() for service in SERVICES}
+    for attribute, values in (('latency', latency), ('error_rate', error_rate), ('jitter', jitter)):
+        for item in values or []:
+            service, value = _split_setting(item)
+            for name in (SERVICES if service == 'all' else [service]):
+                if name not in behaviors:
+                    raise ValueError(f"Unknown service '{name}' (choose from {', '.join(SERVICES)} or all)")
+                setattr(behaviors[name], attribute, float(value))
+    return behaviors
+
+
+def _split_setting(item: str) -> Tuple[str, str]:
+    if '=' not in item:
+        raise ValueError(f"Expected SERVICE=VALUE, got '{item}'")
+    service, value = item.split('=', 1)
+    return service.strip(), value.strip()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Re-parse Archived Pages
+Runs the current scraper parsers over pages in the page archive, in the
+parser process pool, and reports what they find: use it to check a parser
+fix after a site's markup changes, without scraping again
+
+Usage:
+    python scripts/reparse_archive.py
+    python scripts/reparse_archive.py --source zillow --since 2026-10-01
+    python scripts/reparse_archive.py --source redfin --kind search --output data/reparsed.json
+"""
+
+import sys
+import json
+import time
+import argparse
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.scraper.html_parsing import ParsePool
+from app.scraper.page_archive import ArchivedPage, PageArchive, PARSE_METHODS, SOURCE_SCRAPERS, load_scraper
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Re-parse archived scraper pages')
+    parser.add_argument('--archive', default=None, help='Page archive directory (default: data/archive)')
+    parser.add_argument('--source', choices=sorted(SOURCE_SCRAPERS), help='Only pages from this site')
+    parser.add_argument('--kind', choices=sorted(PARSE_METHODS), help='Only search or detail pages')
+    parser.add_argument('--since', help='Only pages fetched on or after this date (YYYY-MM-DD)')
+    parser.add_argument('--workers', type=int, default=None, help='Parser processes (default: CPU count)')
+    parser.add_argument('--output', help='Write every page\'s parse result to this JSON file')
+    args = parser.parse_args()
+
+    archive = PageArchive(args.archive)
+    pages = [page for page in archive.pages(args.source, args.kind, args.since)
+             if page.source in SOURCE_SCRAPERS]
+    if not pages:
+        print("No archived pages found")
+        return 1
+
+    scrapers = {source: load_scraper(source) for source in {page.source for page in pages}}
+    pool = ParsePool(workers=args.workers)
+
+    def reparse(page: ArchivedPage) -> Tuple[ArchivedPage, Any]:
+        try:
+            content = archive.load(page.sha256)
+            return page, pool.parse(scrapers[page.source], PARSE_METHODS[page.kind], content, page.url)
+        except Exception as e:
+            return page, e
+
+    start = time.perf_counter()
+    # Pages are loaded inside the tasks, so only the ones being parsed are held in memory
+    with ThreadPoolExecutor(max_workers=max(1, pool.workers)) as executor:
+        results = list(executor.map(reparse, pages))
+    elapsed = time.perf_counter() - start
+    pool.shutdown()
+
+    totals: Dict[Tuple[str, str], Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    empty, failed = [], []
+    for page, result in results:
+        counts = totals[(page.source, page.kind)]
+        counts['pages'] += 1
+        if isinstance(result, Exception):
+            failed.append((page, result))
+        elif not result:
+            empty.append(page)
+        elif page.kind == 'search':
+            counts['listings'] += len(result)
+
+    print(f"Re-parsed {len(results)} archived pages in {elapsed:.1f}s ({len(results) / elapsed:.1f} pages/s)")
+    for (source, kind), counts in sorted(totals.items()):
+        found = f", {counts['listings']} listings" if kind == 'search' else ""
+        print(f"  {source:<8} {kind:<8} {counts['pages']:>5} pages{found}")
+
+    if empty:
+        print(f"\n{len(empty)} pages parse to nothing (markup change or block page?):")
+        for page in empty[:20]:
+            print(f"  {page.fetched_on}  {page.url}")
+    if failed:
+        print(f"\n{len(failed)} pages failed:")
+        for page, error in failed[:20]:
+            print(f"  {page.fetched_on}  {page.url}: {error}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump([
+                {'url': page.url, 'fetched_on': page.fetched_on, 'source': page.source, 'kind': page.kind,
+                 'sha256': page.sha256, 'result': None if isinstance(result, Exception) else result}
+                for page, result in results
+            ], f, indent=2, default=str)
+        print(f"\nParse results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,38 @@
+"""
+Shared helpers for the SerpAPI test scripts
+A canned requests response and an LLMSearch that never touches the real key or rate
+"""
+
+import os
+
+import app.scraper.llm_search as llm_search
+from app.core.rate_limit import TokenBucket
+
+
+class FakeResponse:
+    status_code = 200
+    headers = {}
+
+    def __init__(self, data):
+        self._data = data
+
+    def json(self):
+        return self._data
+
+    def raise_for_status(self):
+        pass
+
+
+def make_searcher(**kwargs):
+    """LLMSearch with a fake key that other test modules never see, and an effectively unlimited rate"""
+    saved_key = os.environ.get('SERPAPI_KEY')
+    os.environ['SERPAPI_KEY'] = 'test'
+    try:
+        searcher = llm_search.LLMSearch(**kwargs)
+    finally:
+        if saved_key is None:
+            del os.environ['SERPAPI_KEY']
+        else:
+            os.environ['SERPAPI_KEY'] = saved_key
+    searcher.rate_limiter = TokenBucket(rate=1000, capacity=100)
+    return searcher
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Test script for the address recognizer
+Validates parsed address parts, address spelling variants, whole-word suffixes
+and category page rejection
+"""
+
+import sys
+from pathlib import Path
+
+# Add project to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.scraper.address_parser import parse_address, is_real_address
+from app.scraper.llm_search import LLMSearch
+from app.scraper.search_query_builder import SearchQueryBuilder
+
+
+def test_parses_address_parts():
+    """Test 1: Number, street, suffix, unit, city, state and ZIP are parsed from result titles"""
+    print("\n" + "="*60)
+    print("TEST 1: Address Parts")
+    print("="*60)
+
+    parsed = parse_address("31 W Boulevard Rd, Newton, MA 02459 | MLS #73431265")
+    print(f"✓ {parsed}")
+    assert (parsed.number, parsed.street, parsed.suffix) == ('31', 'W Boulevard', 'Rd')
+    assert (parsed.city, parsed.state, parsed.zip) == ('Newton', 'MA', '02459')
+    assert parsed.text == "31 W Boulevard Rd, Newton, MA 02459"
+    assert parsed.street_line == "31 W Boulevard Rd"
+
+    parsed = parse_address("21 Francis St Unit 21, Newton Upper Falls, MA 02464 [Updated 10/22]")
+    assert parsed.unit == 'Unit 21'
+    assert parsed.city == 'Newton Upper Falls'
+    assert parsed.text == "21 Francis St Unit 21, Newton Upper Falls, MA 02464"
+
+    parsed = parse_address("180 Hunnewell Ave #180, Newton, MA 02458 - Zillow")
+    assert parsed.unit == '#180' and parsed.zip == '02458'
+
+    parsed = parse_address("42 Lindbergh Avenue")
+    assert parsed.suffix == 'Avenue' and parsed.city is None
+
+
+def test_suffixes_match_whole_words_only():
+    """Test 2: 'St' no longer matches inside 'Street', 'State' or 'Stanley'"""
+    print("\n" + "="*60)
+    print("TEST 2: Whole-word Suffixes")
+    print("="*60)
+
+    assert not is_real_address("5 Stanley Stevens, Newton, MA 02459")
+    assert not is_real_address("12 State Parks, Boston, MA 02110")
+    assert parse_address("12 Main Street, Boston, MA 02110").suffix == 'Street'
+    print("✓ Substring suffixes rejected")
+
+
+def test_category_pages_rejected():
+    """Test 3: Category pages are not addresses, in LLMSearch and SearchQueryBuilder alike"""
+    print("\n" + "="*60)
+    print("TEST 3: Category Pages")
+    print("="*60)
+
+    for title in [
+        "Homes for Sale in Newton, MA with a Large Lot",
+        "Newton MA Land & Lots For Sale - 11 Listings",
+        "3 Bedroom Homes For Sale on Walnut St, Newton, MA 02460",
+    ]:
+        assert not is_real_address(title), title
+        assert not SearchQueryBuilder.validate_address(title), title
+        assert LLMSearch._parse_real_address(title) is None
+
+    listings = [
+        {'title': "Homes for Sale in Newton, MA", 'address': ''},
+        {'title': "136 Dudley Rd, Newton, MA 02459 | MLS #73430275",
+         'address': "136 Dudley Rd, Newton, MA 02459"},
+    ]
+    assert SearchQueryBuilder.extract_real_addresses(listings) == listings[1:]
+
+    # LLMSearch only extracts addresses with state and ZIP
+    assert LLMSearch._parse_real_address("136 Dudley Rd, Newton") is None
+    print("✓ Category pages rejected")
+
+
+def test_address_variants_accepted():
+    """Test 4: Directionals, a missing city comma, a comma before the ZIP, spelled-out states and lowercase"""
+    print("\n" + "="*60)
+    print("TEST 4: Address Variants")
+    print("="*60)
+
+    parsed = parse_address("12 Main St N, Newton, MA 02459")
+    assert parsed.direction == 'N' and parsed.street_line == "12 Main St N"
+    assert (parsed.city, parsed.state, parsed.zip) == ('Newton', 'MA', '02459')
+
+    parsed = parse_address("24 Lake Ave Newton, MA 02459 | Redfin")
+    assert parsed.city == 'Newton' and parsed.text == "24 Lake Ave Newton, MA 02459"
+
+    parsed = parse_address("88 Lowell Ave, Newton, MA, 02460")
+    assert (parsed.state, parsed.zip) == ('MA', '02460')
+
+    parsed = parse_address("5 Cabot St, Newton, Massachusetts 02459 - Zillow")
+    assert (parsed.city, parsed.state, parsed.zip) == ('Newton', 'MA', '02459')
+    assert parsed.text == "5 Cabot St, Newton, Massachusetts 02459"
+
+    # A spelled-out directional followed by a word starts the city instead
+    parsed = parse_address("12 Main St North Andover, MA 01845")
+    assert parsed.direction is None and parsed.city == 'North Andover'
+
+    # Lowercase and mixed-case titles fall back to a case-insensitive match
+    parsed = parse_address("68 vernon st, newton, ma 02458")
+    assert (parsed.street_line, parsed.city, parsed.state, parsed.zip) == ("68 vernon st", 'newton', 'MA', '02458')
+    assert parse_address("133 oak Hill ST, Newton, massachusetts 02459").state == 'MA'
+    assert SearchQueryBuilder.validate_address("68 vernon st, newton, ma 02458")
+    assert not is_real_address("3 bedroom homes for sale on walnut st, newton, ma")
+
+    for title in [
+        "68 vernon st, newton, ma 02458",
+        "12 Main St N, Newton, MA 02459",
+        "24 Lake Ave Newton, MA 02459",
+        "88 Lowell Ave, Newton, MA, 02460",
+        "5 Cabot St, Newton, Massachusetts 02459",
+    ]:
+        assert LLMSearch._parse_real_address(title) is not None, title
+    print("✓ Variants accepted")
+
+
+if __name__ == "__main__":
+    test_parses_address_parts()
+    test_suffixes_match_whole_words_only()
+    test_category_pages_rejected()
+    test_address_variants_accepted()
+    print("\n✅ All address parser tests passed")
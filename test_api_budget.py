@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Test script for the API credit budget
+Validates per-run limits, priority reserves, rolling-window limits, the ledger,
+flagging classifications the budget refused and releasing a failed run's budget
+"""
+
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add project to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.core.api_budget import (
+    ApiBudget, BudgetExceeded, install_api_budget, spend_credits, window_limits_from_env
+)
+from app.classifier.llm_classifier import LLMClassifier
+from app.dev_pipeline import DevelopmentPipeline
+from app.integrations.database_manager import HistoricalDatabaseManager
+from app.utils import has_classification, setup_logging
+
+
+def test_run_limit_holds_back_credits_for_higher_priority():
+    """Test 1: Low-priority calls stop first, high-priority calls may spend the whole run limit"""
+    print("\n" + "="*60)
+    print("TEST 1: Run Limit and Priorities")
+    print("="*60)
+
+    budget = ApiBudget(run_limits={'serpapi': 10})
+    for _ in range(7):
+        budget.reserve('serpapi', priority='low')
+    try:
+        budget.reserve('serpapi', priority='low')
+        assert False, "Low priority may not spend the last 30%"
+    except BudgetExceeded as e:
+        print(f"✓ Refused: {e}")
+
+    budget.reserve('serpapi', priority='normal')
+    budget.reserve('serpapi', priority='normal')
+    try:
+        budget.reserve('serpapi', priority='normal')
+        assert False, "Normal priority may not spend the last 10%"
+    except BudgetExceeded:
+        pass
+    budget.reserve('serpapi', priority='high')
+    budget.reserve('openai', credits=50)  # No limit for this service
+
+    summary = budget.summary()
+    print(f"✓ Summary: {summary}")
+    assert summary['serpapi'] == {'credits': 10, 'calls': 10, 'refused': 2, 'run_limit': 10}
+    assert summary['openai']['credits'] == 50
+
+
+def test_window_limit_spans_runs_through_ledger():
+    """Test 2: Window limits count earlier runs' ledger entries; old entries fall out of the window"""
+    print("\n" + "="*60)
+    print("TEST 2: Rolling Window Ledger")
+    print("="*60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = HistoricalDatabaseManager(str(Path(tmp) / 'leads.db'))
+        old = (datetime.now() - timedelta(days=40)).isoformat()
+        db.record_api_usage([{'service': 'serpapi', 'credits': 100, 'used_at': old}])
+
+        limits = {'serpapi': (5, 30 * 86400)}
+        first = ApiBudget(window_limits=limits, ledger=db, location='Newton, MA')
+        for _ in range(3):
+            first.reserve('serpapi', priority='high')
+        first.reserve('openai')
+        assert first.flush() == 1  # SerpAPI entries are written as they are reserved
+
+        second = ApiBudget(window_limits=limits, ledger=db, location='Waltham, MA')
+        second.reserve('serpapi', priority='high')
+        try:
+            second.reserve('serpapi', priority='normal')  # 5 * 0.9 = 4.5 credits for normal priority
+            assert False, "Window limit spans runs"
+        except BudgetExceeded as e:
+            print(f"✓ Refused: {e}")
+        second.reserve('serpapi', priority='high')
+
+        recent = db.get_api_usage(since=(datetime.now() - timedelta(days=1)).isoformat())
+        print(f"✓ Ledger: {recent}")
+        assert recent['serpapi'] == {'credits': 5, 'calls': 5}
+        assert recent['openai']['calls'] == 1
+        assert db.get_api_usage()['serpapi']['credits'] == 105
+
+
+def test_installed_budget_and_env_limits():
+    """Test 3: spend_credits reserves against the installed budget only; env vars set window limits"""
+    print("\n" + "="*60)
+    print("TEST 3: Installed Budget")
+    print("="*60)
+
+    spend_credits('openai', 1000)  # No budget installed: not limited
+
+    budget = ApiBudget(run_limits={'openai': 2})
+    install_api_budget(budget)
+    try:
+        spend_credits('openai')
+        spend_credits('openai', priority='high')
+        try:
+            spend_credits('openai', priority='high')
+            assert False, "Installed budget is enforced"
+        except BudgetExceeded:
+            pass
+    finally:
+        install_api_budget(None)
+    assert budget.summary()['openai']['calls'] == 2
+
+    import os
+    os.environ['SERPAPI_CREDIT_LIMIT'] = '5000'
+    os.environ['SERPAPI_CREDIT_WINDOW_DAYS'] = '7'
+    try:
+        assert window_limits_from_env()['serpapi'] == (5000.0, 7 * 86400)
+    finally:
+        del os.environ['SERPAPI_CREDIT_LIMIT'], os.environ['SERPAPI_CREDIT_WINDOW_DAYS']
+    print("✓ Budget enforced while installed")
+
+
+def test_refused_classification_flagged_as_skipped():
+    """Test 4: A classification the budget refuses is an 'unknown' placeholder flagged as skipped"""
+    print("\n" + "="*60)
+    print("TEST 4: Skipped Classifications")
+    print("="*60)
+
+    classifier = LLMClassifier.__new__(LLMClassifier)   # No OpenAI key needed: the call is refused
+    classifier.logger = setup_logging('llm_classifier')
+    classifier.cache = None
+    classifier.model = 'gpt-4o-mini'
+
+    install_api_budget(ApiBudget(run_limits={'openai': 1}))   # Held back for high priority
+    try:
+        listing = classifier.classify_listing({'address': "42 Lindbergh Ave, Newton, MA 02465"})
+    finally:
+        install_api_budget(None)
+
+    assert listing['label'] == 'unknown'
+    assert listing['classification_skipped'] and listing['classification_error']
+    assert not has_classification(listing)
+
+    # A later successful classification clears the flags
+    classifier._apply_classification(listing, {'label': 'development', 'confidence': 0.9, 'explanation': 'Large lot'})
+    assert 'classification_skipped' not in listing and has_classification(listing)
+    print("✓ Skipped listing flagged, then classified")
+
+
+def test_failed_run_releases_budget():
+    """Test 5: A run that fails partway still uninstalls its budget and writes its ledger entries"""
+    print("\n" + "="*60)
+    print("TEST 5: Failed Run Budget")
+    print("="*60)
+
+    def failing_stream(*args, **kwargs):
+        spend_credits('openai', priority='high')
+        raise RuntimeError("Stage failed")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pipeline = DevelopmentPipeline()
+        pipeline.database = HistoricalDatabaseManager(str(Path(tmp) / 'leads.db'))
+        pipeline._plan_queries = lambda *args: None
+        pipeline._run_streaming = failing_stream
+
+        try:
+            pipeline.run(streaming=True, publish=False, credit_limits={'openai': 5})
+            assert False, "The stage failure propagates"
+        except RuntimeError:
+            pass
+
+        spend_credits('openai', 1000)  # Budget uninstalled: not limited
+        usage = pipeline.database.get_api_usage()
+        print(f"✓ Ledger after failed run: {usage}")
+        assert usage['openai']['calls'] == 1
+
+
+if __name__ == "__main__":
+    test_run_limit_holds_back_credits_for_higher_priority()
+    test_window_limit_spans_runs_through_ledger()
+    test_installed_budget_and_env_limits()
+    test_refused_classification_flagged_as_skipped()
+    test_failed_run_releases_budget()
+    print("\n✅ All API budget tests passed")
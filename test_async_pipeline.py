@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Test script for the asyncio pipeline
+Validates per-service async caps, request-rate pacing and a full arun() pass
+against the fake services
+"""
+
+import sys
+import time
+import asyncio
+import threading
+from pathlib import Path
+
+# Add project and scripts to path
+sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).parent / "scripts"))
+
+from app.core.api_limits import (
+    DEFAULT_API_RATES, api_slot, async_api_slot, create_async_limits, install_async_limits,
+    install_api_rates, api_call_counts
+)
+from benchmark_pipeline import run_benchmark
+
+
+def test_async_slots_cap_concurrency():
+    """Test 1: async_api_slot keeps each service within its cap and counts calls"""
+    print("\n" + "="*60)
+    print("TEST 1: Async Service Caps")
+    print("="*60)
+
+    in_flight = {'openai': 0, 'nominatim': 0}
+    peak = {'openai': 0, 'nominatim': 0}
+
+    async def call(service):
+        async with async_api_slot(service):
+            in_flight[service] += 1
+            peak[service] = max(peak[service], in_flight[service])
+            await asyncio.sleep(0.01)
+            in_flight[service] -= 1
+
+    async def main():
+        install_async_limits(create_async_limits({'openai': 3}))
+        await asyncio.gather(*(call('openai') for _ in range(12)),
+                             *(call('nominatim') for _ in range(4)))
+
+    before = api_call_counts()
+    install_api_rates({})   # Caps only; pacing is tested below
+    try:
+        asyncio.run(main())
+    finally:
+        install_api_rates(DEFAULT_API_RATES)
+    after = api_call_counts()
+
+    print(f"✓ Peak in flight: {peak}")
+    assert peak == {'openai': 3, 'nominatim': 1}
+    assert after.get('openai', 0) - before.get('openai', 0) == 12
+
+
+def test_arun_against_fakes():
+    """Test 2: arun() collects, enriches, classifies and publishes like run()"""
+    print("\n" + "="*60)
+    print("TEST 2: Async Pipeline Run")
+    print("="*60)
+
+    results = run_benchmark([20], repeats=1, mode='async')
+    summary = results['sizes']['20']
+    print(f"✓ {summary['throughput']:.1f} listings/sec, stages: {list(summary['stages'])}")
+
+    assert results['mode'] == 'async'
+    assert summary['listings'] == 20
+    assert summary['classified'] == 20
+    assert {'collect', 'process', 'roi', 'database'} <= set(summary['stages'])
+    assert summary['requests']['openai'] == 20
+
+
+def test_rate_paced_services():
+    """Test 3: Nominatim calls start 1/rate apart, async or threaded, with or without a cap"""
+    print("\n" + "="*60)
+    print("TEST 3: Request Rate Pacing")
+    print("="*60)
+
+    assert DEFAULT_API_RATES['nominatim'] == 1.0
+    starts = []
+
+    async def acall():
+        async with async_api_slot('nominatim'):
+            starts.append(time.monotonic())
+
+    async def main():
+        install_async_limits(create_async_limits())
+        await asyncio.gather(*(acall() for _ in range(3)))
+
+    def call():
+        with api_slot('nominatim'):   # No cap installed, as in single-process streaming runs
+            starts.append(time.monotonic())
+
+    install_api_rates({'nominatim': 20})
+    try:
+        asyncio.run(main())
+        threads = [threading.Thread(target=call) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        install_api_rates(DEFAULT_API_RATES)
+
+    gaps = [b - a for a, b in zip(starts, starts[1:])]
+    print(f"✓ Gaps between calls: {[round(gap, 3) for gap in gaps]}")
+    assert len(starts) == 6 and min(gaps) >= 0.045
+
+
+if __name__ == "__main__":
+    test_async_slots_cap_concurrency()
+    test_arun_against_fakes()
+    test_rate_paced_services()
+    print("\n✅ All async pipeline tests passed")
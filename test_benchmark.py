@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Test script for the pipeline benchmark harness
+Validates the fake services and a small end-to-end benchmark run
+"""
+
+import sys
+from pathlib import Path
+
+import requests
+
+# Add project and scripts to path
+sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).parent / "scripts"))
+
+from fake_services import FakeServices, parse_behaviors
+from benchmark_pipeline import run_benchmark, check_regressions, percentile
+
+
+def test_fake_services():
+    """Test 1: Fakes serve synthetic SerpAPI pages and inject configured errors"""
+    print("\n" + "="*60)
+    print("TEST 1: Fake Services")
+    print("="*60)
+
+    behaviors = parse_behaviors(latency=['all=0'], error_rate=['nominatim=1.0'], jitter=None)
+    with FakeServices(behaviors=behaviors) as fakes:
+        fakes.reset(listings=25, queries=10)
+        page = requests.get(f"{fakes.http_url}/serpapi/search", params={'q': 'x'}).json()
+        assert len(page['organic_results']) == 3
+        assert page['organic_results'][0]['title'].startswith('1 Lindbergh Ave, Newton, MA')
+
+        completion = requests.post(f"{fakes.http_url}/openai/v1/chat/completions",
+                                   json={'model': 'gpt-4o-mini', 'messages': [{'role': 'user', 'content': 'hi'}]}).json()
+        assert completion['choices'][0]['message']['content'].startswith('{"label"')
+
+        assert requests.get(f"{fakes.http_url}/nominatim/search", params={'q': 'x'}).status_code == 500
+        print(f"✓ Requests: {fakes.requests}, errors: {fakes.errors}")
+        assert fakes.errors == {'nominatim': 1}
+
+
+def test_small_benchmark_run():
+    """Test 2: A small benchmark runs the whole pipeline against the fakes"""
+    print("\n" + "="*60)
+    print("TEST 2: Small Benchmark Run")
+    print("="*60)
+
+    results = run_benchmark([20], repeats=1)
+    summary = results['sizes']['20']
+    print(f"✓ {summary['throughput']:.1f} listings/sec, stages: {list(summary['stages'])}")
+
+    assert summary['listings'] == 20
+    assert summary['classified'] == 20
+    assert {'collect', 'enrich', 'classify', 'database'} <= set(summary['stages'])
+    assert summary['requests']['openai'] == 20
+    assert summary['peak_rss_mb'] > 0
+
+    slower = {'sizes': {'20': dict(summary, throughput=summary['throughput'] * 2)}}
+    assert check_regressions(results, slower, max_regression=0.2)
+    assert not check_regressions(results, results, max_regression=0.2)
+    assert percentile([3.0, 1.0, 2.0], 50) == 2.0
+
+
+if __name__ == "__main__":
+    test_fake_services()
+    test_small_benchmark_run()
+    print("\n✅ All benchmark harness tests passed")
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Test script for scraper HTML parsing
+Validates card-only lxml parsing and parsing in the parser process pool
+"""
+
+import sys
+import json
+from pathlib import Path
+
+# Add project to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from bs4 import SoupStrainer
+from app.scraper.html_parsing import ParsePool, find_cards, make_soup
+from app.scraper.redfin_scraper import RedfinScraper
+from app.scraper.zillow_scraper import ZillowScraper
+
+CARD = """
+<div class="HomeCard">
+  <a class="link-and-anchor" href="/MA/Newton/{n}-Oak-Hill-St-02459/home/{n}"></a>
+  <span class="homecardV2Price price">$1,250,000</span>
+  <div class="HomeStatsV2">3 bd 2.5 ba 1,850 sq ft</div>
+  <div class="homeAddressV2">{n} Oak Hill St, Newton, MA 02459</div>
+  <span class="status">Active</span>
+</div>
+"""
+NAV = "<nav><ul>" + "".join(f"<li><a href='/x/{i}'>Link {i}</a></li>" for i in range(50)) + "</ul></nav>"
+REDFIN_PAGE = ("<html><body>" + NAV + "<div class='results'>"
+               + "".join(CARD.format(n=n) for n in (133, 42)) + "</div>" + NAV + "</body></html>").encode()
+
+
+def test_cards_parsed_without_the_rest_of_the_page():
+    """Test 1: Only property cards are built, and listings match the card contents"""
+    print("\n" + "="*60)
+    print("TEST 1: Card-Only Parsing")
+    print("="*60)
+
+    cards = find_cards(REDFIN_PAGE, RedfinScraper.CARD_SELECTORS)
+    assert len(cards) == 2
+    assert not any(card.find('nav') or card.find_parent('nav') for card in cards)
+
+    # Alternative markup is found by the next selector
+    alt_page = b"<html><body><div data-rf-test-name='HomeCard'><p>x</p></div></body></html>"
+    assert len(find_cards(alt_page, RedfinScraper.CARD_SELECTORS)) == 1
+    assert find_cards(b"<html><body><p>No results</p></body></html>", RedfinScraper.CARD_SELECTORS) == []
+
+    listings = RedfinScraper()._parse_search_page(REDFIN_PAGE, 'https://www.redfin.com/city/Newton/MA')
+    assert [l['address'] for l in listings] == ["133 Oak Hill St, Newton, MA 02459",
+                                                "42 Oak Hill St, Newton, MA 02459"]
+    assert listings[0]['price'] == 1250000 and listings[0]['beds'] == 3
+    assert listings[0]['link'] == "https://www.redfin.com/MA/Newton/133-Oak-Hill-St-02459/home/133"
+    print(f"✓ {len(listings)} listings from 2 cards")
+
+    # Zillow's embedded JSON survives the script-only parse
+    data = {'searchResults': {'listResults': []}}
+    zillow_page = ("<html><body>" + NAV + "<script type='application/json'>"
+                   + json.dumps(data) + "</script></body></html>").encode()
+    assert ZillowScraper()._extract_json_data(make_soup(zillow_page, SoupStrainer('script'))) == data
+    print("✓ Embedded JSON found")
+
+
+def test_pool_parses_like_inline():
+    """Test 2: Parsing in a parser process gives the same listings as parsing in-process"""
+    print("\n" + "="*60)
+    print("TEST 2: Parser Process Pool")
+    print("="*60)
+
+    scraper = RedfinScraper()
+    url = 'https://www.redfin.com/city/Newton/MA'
+    inline = ParsePool(workers=0).parse(scraper, '_parse_search_page', REDFIN_PAGE, url)
+
+    pool = ParsePool(workers=1)
+    try:
+        pooled = pool.parse(scraper, '_parse_search_page', REDFIN_PAGE, url)
+        details = pool.parse(scraper, '_parse_property_details',
+                             b"<html><body><div>Year Built: 1952</div></body></html>", url)
+    finally:
+        pool.shutdown()
+
+    assert pooled == inline
+    assert details['year_built'] == 1952 and details['url'] == url
+    print(f"✓ {len(pooled)} listings, details {details}")
+
+
+if __name__ == "__main__":
+    test_cards_parsed_without_the_rest_of_the_page()
+    test_pool_parses_like_inline()
+    print("\n✅ All HTML parsing tests passed")
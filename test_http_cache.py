@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Test script for the scraper HTTP cache
+Validates fresh hits, conditional GETs answered with 304 and skipped re-parses
+"""
+
+import sys
+import asyncio
+import tempfile
+from pathlib import Path
+
+# Add project to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import httpx
+import requests
+from app.core.shared_cache import SharedCache
+from app.scraper.html_parsing import ParsePool, install_parse_pool, parse_pool
+from app.scraper.http_cache import HttpCache, install_http_cache
+from app.scraper.page_archive import PageArchive
+from app.scraper.page_fetcher import HostThrottle
+from app.scraper.redfin_scraper import RedfinScraper
+
+URL = "https://www.redfin.com/city/newton/MA/filter/property-type=house"
+PAGE = b"""<html><body><div class="HomeCard">
+<div class="homeAddressV2">{n} Oak Hill St, Newton, MA 02459</div>
+</div></body></html>"""
+
+
+class FakeHost:
+    """Serves one page with an ETag and answers matching conditional GETs with 304"""
+
+    def __init__(self):
+        self.version = 1
+        self.requests = []   # (If-None-Match sent, status returned)
+
+    def respond(self, if_none_match):
+        etag = f'"v{self.version}"'
+        status = 304 if if_none_match == etag else 200
+        self.requests.append((if_none_match, status))
+        body = PAGE.replace(b'{n}', str(self.version * 100).encode()) if status == 200 else b''
+        return status, {'ETag': etag}, body
+
+
+def make_cache(tmp: str, ttl: float) -> HttpCache:
+    return HttpCache(PageArchive(str(Path(tmp) / 'archive')), SharedCache(str(Path(tmp) / 'cache.db')),
+                     ttls={'www.redfin.com': ttl})
+
+
+def test_fresh_revalidated_and_changed_pages():
+    """Test 1: Fresh pages cost no request, stale ones a 304, and unchanged bodies are not re-parsed"""
+    print("\n" + "="*60)
+    print("TEST 1: Conditional Requests")
+    print("="*60)
+
+    host = FakeHost()
+
+    class FakeAdapter(requests.adapters.BaseAdapter):
+        def send(self, request, **kwargs):
+            status, headers, body = host.respond(request.headers.get('If-None-Match'))
+            response = requests.Response()
+            response.status_code = status
+            response.headers.update(headers)
+            response._content = body
+            response.url = request.url
+            return response
+
+        def close(self):
+            pass
+
+    previous_pool = parse_pool()
+    install_parse_pool(ParsePool(workers=0))
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = make_cache(tmp, ttl=3600)
+            install_http_cache(cache)
+            scraper = RedfinScraper()
+            scraper.session.mount('https://', FakeAdapter())
+
+            first = scraper._scrape_search_page(URL)
+            second = scraper._scrape_search_page(URL)
+            assert first == second and first[0]['address'].startswith("100 ")
+            assert len(host.requests) == 1
+            print(f"✓ Fresh hit: {cache.stats}")
+
+            # Past the TTL the page is revalidated; the host answers 304
+            cache.ttls['www.redfin.com'] = 0
+            assert scraper._scrape_search_page(URL) == first
+            assert host.requests[-1] == ('"v1"', 304)
+            assert cache.stats['revalidated'] == 1 and cache.stats['parses_skipped'] == 2
+
+            # A changed page is downloaded and parsed again
+            host.version = 2
+            changed = scraper._scrape_search_page(URL)
+            assert host.requests[-1] == ('"v1"', 200)
+            assert changed[0]['address'].startswith("200 ")
+            assert cache.stats == {'fresh': 1, 'revalidated': 1, 'fetched': 2, 'parses_skipped': 2}
+            print(f"✓ Revalidated and changed: {cache.stats}")
+    finally:
+        install_http_cache(None)
+        install_parse_pool(previous_pool)
+
+
+def test_async_conditional_requests():
+    """Test 2: The async path sends the same conditional GETs through httpx"""
+    print("\n" + "="*60)
+    print("TEST 2: Async Conditional Requests")
+    print("="*60)
+
+    host = FakeHost()
+
+    def handler(request):
+        status, headers, body = host.respond(request.headers.get('If-None-Match'))
+        return httpx.Response(status, headers=headers, content=body)
+
+    async def fetch_twice(cache):
+        throttle = HostThrottle(concurrency=2, rate=100)
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            first = await cache.afetch(client, URL, throttle)
+            second = await cache.afetch(client, URL, throttle)
+        return first, second
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = make_cache(tmp, ttl=0)
+        first, second = asyncio.run(fetch_twice(cache))
+        assert (first.status, second.status) == ('fetched', 'revalidated')
+        assert first.content == second.content and first.sha256 == second.sha256
+        assert [status for _, status in host.requests] == [200, 304]
+        print(f"✓ {first.status} then {second.status}")
+
+
+if __name__ == "__main__":
+    test_fresh_revalidated_and_changed_pages()
+    test_async_conditional_requests()
+    print("\n✅ All HTTP cache tests passed")
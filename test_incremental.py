@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Test script for incremental runs
+Validates listing fingerprints, snapshot reuse from the historical database
+and retrying failed classifications
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Add project to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.core.incremental import listing_fingerprint
+from app.dev_pipeline import DevelopmentPipeline
+from app.integrations.database_manager import HistoricalDatabaseManager
+
+
+def test_fingerprint_ignores_formatting_noise():
+    """Test 1: Same listing scraped twice gets the same fingerprint"""
+    print("\n" + "="*60)
+    print("TEST 1: Fingerprint Stability")
+    print("="*60)
+
+    first = {'address': '42 Lindbergh Ave, Newton, MA 02465', 'price': 500000,
+             'description': 'Builder special  on large lot', 'snippet': 'query A'}
+    second = {'address': '42 lindbergh ave, Newton, MA 02465', 'price': 500000.0,
+              'description': 'Builder special on large lot', 'snippet': 'query B',
+              'link': 'https://www.zillow.com/homedetails/1_zpid/'}
+
+    assert listing_fingerprint(first) == listing_fingerprint(second)
+    print("✓ Case, whitespace, int/float and snippet differences ignored")
+
+
+def test_fingerprint_detects_changes():
+    """Test 2: Price or description changes produce a new fingerprint"""
+    print("\n" + "="*60)
+    print("TEST 2: Change Detection")
+    print("="*60)
+
+    base = {'address': '42 Lindbergh Ave, Newton, MA 02465', 'price': 500000,
+            'description': 'Builder special'}
+
+    assert listing_fingerprint(base) != listing_fingerprint(dict(base, price=475000))
+    assert listing_fingerprint(base) != listing_fingerprint(dict(base, description='Renovated'))
+    print("✓ Price drop and new description detected")
+
+
+def test_snapshot_roundtrip():
+    """Test 3: Saved listings can be looked up by address with their fingerprint"""
+    print("\n" + "="*60)
+    print("TEST 3: Snapshot Roundtrip")
+    print("="*60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = HistoricalDatabaseManager(db_path=str(Path(tmp) / 'leads.db'))
+        run_id = db.record_scan_run(search_query="test", location="Newton, MA")
+
+        listing = {
+            'address': '371 Cherry St, Newton, MA 02465',
+            'price': 450000,
+            'lot_size': 15000,
+            'label': 'development',
+            'development_score': 78.0,
+            'roi_score': 64.0,
+        }
+        listing['fingerprint'] = listing_fingerprint(listing)
+        unfingerprinted = {'address': '253 Nahanton St, Newton, MA 02459', 'development_score': 40.0}
+        db.save_listings([listing, unfingerprinted], run_id)
+
+        snapshots = db.get_listing_snapshots([listing['address'], unfingerprinted['address']])
+        print(f"✓ Found snapshots for: {list(snapshots)}")
+        assert list(snapshots) == [listing['address']]
+        stored = snapshots[listing['address']]
+        assert stored['fingerprint'] == listing['fingerprint']
+        assert stored['snapshot']['development_score'] == 78.0
+        assert stored['snapshot']['roi_score'] == 64.0
+
+
+def test_failed_classifications_retried():
+    """Test 4: Failed and budget-skipped classifications are retried; a clean 'unknown' verdict is reused"""
+    print("\n" + "="*60)
+    print("TEST 4: Failed Classifications Retried")
+    print("="*60)
+
+    def raw(address):
+        listing = {'address': address, 'price': 600000, 'lot_size': 12000}
+        listing['fingerprint'] = listing_fingerprint(listing)
+        return listing
+
+    addresses = ['371 Cherry St, Newton, MA 02465', '253 Nahanton St, Newton, MA 02459',
+                 '42 Lindbergh Ave, Newton, MA 02465']
+    first_run = [
+        dict(raw(addresses[0]), label='development', development_score=78.0),
+        dict(raw(addresses[1]), label='unknown', development_score=0.0, classification_error=True,
+             explanation='Classification error: OpenAI timeout'),
+        dict(raw(addresses[2]), label='unknown', development_score=0.0, classification_error=True,
+             classification_skipped=True, explanation='Classification skipped: openai run budget spent'),
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = HistoricalDatabaseManager(db_path=str(Path(tmp) / 'leads.db'))
+        db.save_listings(first_run, db.record_scan_run(search_query="test", location="Newton, MA"))
+        assert list(db.get_listing_snapshots(addresses)) == [addresses[0]]
+
+        pipeline = DevelopmentPipeline(search_cache=False)
+        pipeline.database = db
+        reused = pipeline._find_unchanged([raw(address) for address in addresses])
+        assert list(reused) == [addresses[0]]
+        print(f"✓ Reused {len(reused)}, retrying {len(addresses) - len(reused)}")
+
+        # A clean 'unknown' is the model's verdict: stored and reused like any other label
+        verdict = dict(raw(addresses[1]), label='unknown', development_score=20.0,
+                       explanation='Not enough information to judge')
+        db.save_listings([verdict], db.record_scan_run(search_query="test", location="Newton, MA"))
+        reused = pipeline._find_unchanged([raw(address) for address in addresses])
+        assert sorted(reused) == sorted(addresses[:2])
+        assert reused[addresses[1]]['label'] == 'unknown'
+        print("✓ Model's 'unknown' verdict reused")
+
+
+if __name__ == "__main__":
+    test_fingerprint_ignores_formatting_noise()
+    test_fingerprint_detects_changes()
+    test_snapshot_roundtrip()
+    test_failed_classifications_retried()
+    print("\n✅ All incremental run tests passed")
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Test script for listing URL canonicalization
+Validates stable listing IDs, link dedup and the cross-run seen-ID index
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add project to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import app.scraper.llm_search as llm_search
+from app.dev_pipeline import DevelopmentPipeline
+from app.integrations.database_manager import HistoricalDatabaseManager
+from app.scraper.listing_urls import canonical_url, listing_id, listing_key
+
+ZILLOW = "https://www.zillow.com/homedetails/133-Oak-Hill-St-Newton-MA-02459/56322493_zpid/"
+REDFIN = "https://www.redfin.com/MA/Newton/471-Washington-St-02458/home/190923238"
+REALTOR = "https://www.realtor.com/realestateandhomes-detail/42-Lindbergh-Ave_Newton_MA_02465_M39462-14789"
+
+
+def test_listing_ids_from_urls():
+    """Test 1: zpid, Redfin home id and Realtor property id are pulled out of listing URLs"""
+    print("\n" + "="*60)
+    print("TEST 1: Listing IDs")
+    print("="*60)
+
+    assert listing_id(ZILLOW) == 'zillow:56322493'
+    assert listing_id("https://zillow.com/homedetails/56322493_zpid?utm_source=google") == 'zillow:56322493'
+    assert listing_id(REDFIN + "?utm_campaign=email") == 'redfin:190923238'
+    assert listing_id(REALTOR) == 'realtor:M39462-14789'
+    assert listing_id("https://www.zillow.com/newton-ma/") is None
+    assert listing_id("https://example.com/home/123") is None
+
+    assert canonical_url("HTTP://WWW.Example.com/a/?utm_source=x&b=2&a=1#top") == "https://example.com/a?a=1&b=2"
+    assert listing_key({'link': "https://example.com/a/?gclid=1"}) == "https://example.com/a"
+    assert listing_key({'link': None, 'zpid': '123'}) == 'zillow:123'
+    assert listing_key({'link': ''}) is None
+    print("✓ IDs extracted")
+
+
+def test_search_results_dedup_by_listing_id():
+    """Test 2: Tracking parameters and alternate paths no longer get duplicates through"""
+    print("\n" + "="*60)
+    print("TEST 2: Search Result Dedup")
+    print("="*60)
+
+    saved_key = os.environ.get('SERPAPI_KEY')
+    os.environ['SERPAPI_KEY'] = 'test'
+    try:
+        searcher = llm_search.LLMSearch()
+    finally:
+        if saved_key is None:
+            del os.environ['SERPAPI_KEY']
+        else:
+            os.environ['SERPAPI_KEY'] = saved_key
+
+    unique = searcher._unique_listings([
+        {'link': ZILLOW},
+        {'link': ZILLOW + "?utm_source=google&rtoken=abc"},
+        {'link': "https://www.zillow.com/homedetails/56322493_zpid/"},
+        {'link': REDFIN},
+        {'link': ''},
+    ])
+    assert [l['link'] for l in unique] == [ZILLOW, REDFIN]
+    print(f"✓ {len(unique)} unique listings")
+
+
+def test_seen_id_index_spans_runs():
+    """Test 3: A listing seen in an earlier run keeps its first address, so it is one listing downstream"""
+    print("\n" + "="*60)
+    print("TEST 3: Seen-ID Index")
+    print("="*60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pipeline = DevelopmentPipeline(search_cache=False)
+        pipeline.database = HistoricalDatabaseManager(str(Path(tmp) / 'leads.db'))
+
+        first = pipeline._resolve_listing_ids([
+            {'address': "133 Oak Hill St, Newton, MA 02459", 'link': ZILLOW},
+            {'address': "133 Oak Hill Street, Newton, MA", 'link': ZILLOW + "?utm_source=x"},
+            {'address': "9 Any Rd, Newton, MA 02459", 'link': "https://example.com/9-any-rd"},
+        ], set())
+        assert [l['address'] for l in first] == ["133 Oak Hill St, Newton, MA 02459", "9 Any Rd, Newton, MA 02459"]
+        assert first[0]['listing_id'] == 'zillow:56322493'
+        assert 'listing_id' not in first[1]
+
+        # Next run: same zpid, differently written address
+        second = pipeline._resolve_listing_ids([
+            {'address': "133 Oak Hill St., Newton, MA 02459", 'link': "https://zillow.com/homedetails/56322493_zpid"},
+            {'address': "471 Washington St, Newton, MA 02458", 'link': REDFIN},
+        ], set())
+        assert second[0]['address'] == "133 Oak Hill St, Newton, MA 02459"
+        assert second[1]['address'] == "471 Washington St, Newton, MA 02458"
+
+        indexed = pipeline.database.get_listing_ids(['zillow:56322493', 'redfin:190923238', 'realtor:M1-2'])
+        assert indexed == {
+            'zillow:56322493': "133 Oak Hill St, Newton, MA 02459",
+            'redfin:190923238': "471 Washington St, Newton, MA 02458",
+        }
+        print(f"✓ Index: {indexed}")
+
+
+if __name__ == "__main__":
+    test_listing_ids_from_urls()
+    test_search_results_dedup_by_listing_id()
+    test_seen_id_index_spans_runs()
+    print("\n✅ All listing URL tests passed")
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Test script for Google Maps coordinate harvesting
+Validates address normalization, Maps result indexing and skipping geocoding for matched listings
+"""
+
+import sys
+import tempfile
+from types import SimpleNamespace
+from pathlib import Path
+
+# Add project to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import app.scraper.llm_search as llm_search
+from app.core.shared_cache import SharedCache, MISS
+from app.dev_pipeline import DevelopmentPipeline
+from app.enrichment.gis_enrichment import GISEnrichment
+from app.utils import normalize_address
+from serpapi_test_utils import FakeResponse, make_searcher
+
+
+def test_addresses_normalize_across_sources():
+    """Test 1: Listing and Maps spellings of one address share a join key"""
+    print("\n" + "="*60)
+    print("TEST 1: Address Normalization")
+    print("="*60)
+
+    key = normalize_address("42 Lindbergh Ave, Newton, MA 02465")
+    assert key == '42 lindbergh ave'
+    assert normalize_address("42 Lindbergh Avenue, Newton, MA") == key
+    assert normalize_address("42 LINDBERGH AVE.") == key
+    assert normalize_address("42 Lindbergh Ave Unit 3, Newton, MA") == key
+    assert normalize_address("17 West Street #2") == '17 w st'
+    assert normalize_address("8 Walnut St Apt 3, Newton, MA") == '8 walnut st'
+    # Street names starting with 'unit' or 'apt' are not unit markers
+    assert normalize_address("5 Unity Ave, Newton, MA") == '5 unity ave'
+    assert normalize_address("5 Apthorp St") == '5 apthorp st'
+    assert normalize_address("12 Aptos Rd Unit 2") == '12 aptos rd'
+    assert normalize_address("") == ''
+    print(f"✓ Join key: {key!r}")
+
+
+def test_maps_results_indexed_by_address():
+    """Test 2: Maps results with GPS coordinates are indexed by normalized address"""
+    print("\n" + "="*60)
+    print("TEST 2: Coordinate Harvest")
+    print("="*60)
+
+    local_results = {
+        'Lindbergh Ave': [
+            {'title': 'House', 'address': '42 Lindbergh Avenue, Newton, MA 02465',
+             'gps_coordinates': {'latitude': 42.31, 'longitude': -71.22}},
+            {'title': 'No GPS', 'address': '44 Lindbergh Ave, Newton, MA 02465'},
+        ],
+        'Cherry St': [
+            {'title': 'House', 'address': '9 Cherry Street, Newton, MA 02465',
+             'gps_coordinates': {'latitude': '42.35', 'longitude': '-71.25'}},
+            {'title': 'Duplicate', 'address': '42 Lindbergh Ave, Newton, MA',
+             'gps_coordinates': {'latitude': 0.0, 'longitude': 0.0}},
+        ],
+    }
+    requested = []
+
+    def fake_get(url, params=None, timeout=None):
+        assert params['engine'] == 'google_maps'
+        street = params['q'].replace(' Newton, MA', '')
+        requested.append(street)
+        return FakeResponse({'local_results': local_results.get(street, [])})
+
+    searcher = make_searcher()
+    original_get = llm_search.requests.get
+    llm_search.requests.get = fake_get
+    try:
+        coordinates = searcher.harvest_coordinates(['Lindbergh Ave', 'Cherry St'], "Newton, MA")
+    finally:
+        llm_search.requests.get = original_get
+
+    print(f"✓ {coordinates}")
+    assert sorted(requested) == ['Cherry St', 'Lindbergh Ave']
+    assert coordinates == {
+        '42 lindbergh ave': {'latitude': 42.31, 'longitude': -71.22},  # First result per address wins
+        '9 cherry st': {'latitude': 42.35, 'longitude': -71.25},
+    }
+    assert searcher.harvest_coordinates([], "Newton, MA") == {}
+
+
+def test_matched_listings_skip_geocoding():
+    """Test 3: Listings matched to Maps results keep its coordinates and never hit Nominatim"""
+    print("\n" + "="*60)
+    print("TEST 3: Geocoding Skipped For Matches")
+    print("="*60)
+
+    searched = []
+
+    def harvest_coordinates(queries, location):
+        searched.extend(queries)
+        return {'42 lindbergh ave': {'latitude': 42.31, 'longitude': -71.22}}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pipeline = DevelopmentPipeline(search_cache=False)
+        pipeline.llm_search = SimpleNamespace(harvest_coordinates=harvest_coordinates)
+        pipeline.cache = SharedCache(Path(tmp) / 'cache.db')
+
+        listings = [
+            {'address': '42 Lindbergh Ave, Newton, MA 02465'},
+            {'address': '50 Lindbergh Ave, Newton, MA 02465'},
+            {'address': '9 Cherry St, Newton, MA 02465'},
+            {'address': '3 Dudley Rd, Newton, MA 02459', 'latitude': 42.3, 'longitude': -71.2},
+        ]
+        assert pipeline._attach_maps_coordinates(listings, "Newton, MA", max_queries=1) == 1
+        assert searched == ['Lindbergh Ave']  # Street with the most listings missing coordinates
+
+        assert listings[0]['coordinates_source'] == 'google_maps'
+        assert (listings[0]['latitude'], listings[0]['longitude']) == (42.31, -71.22)
+        assert 'latitude' not in listings[1]
+        assert 'coordinates_source' not in listings[3]
+        assert pipeline.cache.get('geocode', '42 lindbergh ave, newton, ma 02465') == \
+            {'latitude': 42.31, 'longitude': -71.22}
+        assert pipeline.cache.get('geocode', '50 lindbergh ave, newton, ma 02465') is MISS
+
+        # Enrichment geocodes only the listings still missing coordinates
+        enricher = GISEnrichment()
+        geocoded = []
+        enricher._get_parcel_data = lambda address: None
+        enricher._get_assessment_data = lambda address: None
+        enricher._geocode_address = lambda address: geocoded.append(address) or None
+        for listing in listings:
+            enricher.enrich_listing(listing)
+        print(f"✓ Geocoded: {geocoded}")
+        assert geocoded == ['50 Lindbergh Ave, Newton, MA 02465', '9 Cherry St, Newton, MA 02465']
+
+
+if __name__ == "__main__":
+    test_addresses_normalize_across_sources()
+    test_maps_results_indexed_by_address()
+    test_matched_listings_skip_geocoding()
+    print("\n✅ All Maps coordinate tests passed")
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Test script for multi-location runs
+Validates shared API caps, the cross-process cache and batch-grouped scan runs
+"""
+
+import sys
+import sqlite3
+import tempfile
+import threading
+import time
+import multiprocessing
+from pathlib import Path
+
+# Add project to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.core.api_limits import api_slot, create_api_limits, install_api_limits
+from app.core.shared_cache import SharedCache, MISS
+from app.integrations.database_manager import HistoricalDatabaseManager
+
+
+def _cache_writer(path):
+    SharedCache(path).set('geocode', '42 lindbergh ave', {'latitude': 42.33, 'longitude': -71.2})
+
+
+def test_api_slot_caps_concurrency():
+    """Test 1: api_slot never lets more calls through than the service cap"""
+    print("\n" + "="*60)
+    print("TEST 1: API Concurrency Caps")
+    print("="*60)
+
+    install_api_limits(create_api_limits({'serpapi': 2}))
+    in_flight, peak = [0], [0]
+    lock = threading.Lock()
+
+    def call():
+        with api_slot('serpapi'):
+            with lock:
+                in_flight[0] += 1
+                peak[0] = max(peak[0], in_flight[0])
+            time.sleep(0.05)
+            with lock:
+                in_flight[0] -= 1
+
+    try:
+        threads = [threading.Thread(target=call) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        install_api_limits({})
+
+    print(f"✓ Peak concurrent SerpAPI calls: {peak[0]}")
+    assert peak[0] == 2
+
+    # Without installed limits the slot is a no-op
+    with api_slot('serpapi'):
+        pass
+
+
+def test_shared_cache_across_processes():
+    """Test 2: Entries written by a worker process are visible to others, incl. negative results"""
+    print("\n" + "="*60)
+    print("TEST 2: Shared Cache")
+    print("="*60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / 'cache.db')
+        cache = SharedCache(path)
+        assert cache.get('geocode', '42 lindbergh ave') is MISS
+
+        worker = multiprocessing.get_context('spawn').Process(target=_cache_writer, args=(path,))
+        worker.start()
+        worker.join()
+
+        assert cache.get('geocode', '42 lindbergh ave') == {'latitude': 42.33, 'longitude': -71.2}
+        print("✓ Geocode written by worker process is a cache hit")
+
+        cache.set('parcel', 'unknown st', None)
+        assert cache.get('parcel', 'unknown st') is None
+        cache.set('parcel', 'old st', {'lot_size': 1}, ttl=-1)
+        assert cache.get('parcel', 'old st') is MISS
+        assert cache.purge_expired() == 1
+        print(f"✓ Negative result cached, expired entry purged: {cache.stats}")
+
+
+def test_batch_runs_grouped():
+    """Test 3: Per-location scan runs share a batch_id, and old databases are migrated"""
+    print("\n" + "="*60)
+    print("TEST 3: Batch Scan Runs")
+    print("="*60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / 'leads.db'
+
+        # Database created before batch_id existed
+        conn = sqlite3.connect(str(db_path))
+        conn.execute("""
+            CREATE TABLE scan_runs (
+                run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                run_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                search_query TEXT, location TEXT, run_type TEXT,
+                total_found INTEGER, opportunities_found INTEGER,
+                high_value_found INTEGER, duration_seconds FLOAT,
+                status TEXT DEFAULT 'success'
+            )
+        """)
+        conn.commit()
+        conn.close()
+
+        db = HistoricalDatabaseManager(db_path=str(db_path))
+        for location in ['Waltham, MA', 'Newton, MA']:
+            db.record_scan_run(search_query="test", location=location, total_found=3, batch_id='batch-1')
+        db.record_scan_run(search_query="test", location="Needham, MA")
+
+        runs = db.get_batch_runs('batch-1')
+        print(f"✓ Batch runs: {[r['location'] for r in runs]}")
+        assert [r['location'] for r in runs] == ['Newton, MA', 'Waltham, MA']
+        assert sum(r['total_found'] for r in runs) == 6
+
+
+if __name__ == "__main__":
+    test_api_slot_caps_concurrency()
+    test_shared_cache_across_processes()
+    test_batch_runs_grouped()
+    print("\n✅ All multi-location tests passed")
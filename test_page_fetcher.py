@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Test script for pipelined page fetching
+Validates per-host throttling, in-order page pipelining, concurrent sources
+and backing off hosts that block
+"""
+
+import sys
+import time
+import asyncio
+import threading
+from pathlib import Path
+
+import requests
+
+# Add project to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.dev_pipeline import DevelopmentPipeline
+from app.scraper.http_cache import install_http_cache
+from app.scraper.page_archive import install_page_archive
+from app.scraper.page_fetcher import (
+    HostBlocked, HostThrottle, host_throttle, fetch_pages, afetch_pages
+)
+from app.scraper.zillow_scraper import ZillowScraper
+
+PAGE_URLS = [f"https://www.redfin.com/city/Newton/MA/page-{page}" for page in range(1, 6)]
+
+
+def test_pages_pipelined_in_order():
+    """Test 1: Pages are fetched a window at a time, kept in order and cut at the first empty page"""
+    print("\n" + "="*60)
+    print("TEST 1: Pipelined Pages")
+    print("="*60)
+
+    requested = []
+    in_flight = [0, 0]   # current, peak
+    lock = threading.Lock()
+
+    def fetch_page(url):
+        with lock:
+            requested.append(url)
+            in_flight[0] += 1
+            in_flight[1] = max(in_flight[1], in_flight[0])
+        page = int(url.rsplit('-', 1)[1])
+        time.sleep(0.05 * (4 - page))   # Later pages answer first
+        with lock:
+            in_flight[0] -= 1
+        return [{'page': page}] if page < 4 else []
+
+    start = time.perf_counter()
+    pages = fetch_pages(fetch_page, PAGE_URLS, window=3)
+    elapsed = time.perf_counter() - start
+
+    assert [listings[0]['page'] for listings in pages] == [1, 2, 3]
+    assert in_flight[1] == 3
+    assert len(requested) == 5   # Pages 4 and 5 were already in flight
+    assert elapsed < 0.3, elapsed
+    print(f"✓ 3 pages in {elapsed:.2f}s (peak {in_flight[1]} in flight)")
+
+    async def afetch_page(url):
+        page = int(url.rsplit('-', 1)[1])
+        await asyncio.sleep(0.01)
+        return [{'page': page}] if page != 2 else []
+
+    pages = asyncio.run(afetch_pages(afetch_page, PAGE_URLS, window=2))
+    assert [listings[0]['page'] for listings in pages] == [1]
+    print("✓ Async pages stop at the first empty page")
+
+
+def test_host_throttle_caps_concurrency_and_rate():
+    """Test 2: A host's throttle limits simultaneous requests and spaces them out"""
+    print("\n" + "="*60)
+    print("TEST 2: Host Throttle")
+    print("="*60)
+
+    throttle = HostThrottle(concurrency=2, rate=20)
+    active = [0, 0]
+    lock = threading.Lock()
+    starts = []
+
+    def request():
+        with throttle.slot():
+            with lock:
+                starts.append(time.perf_counter())
+                active[0] += 1
+                active[1] = max(active[1], active[0])
+            time.sleep(0.05)
+            with lock:
+                active[0] -= 1
+
+    threads = [threading.Thread(target=request) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    starts.sort()
+    assert active[1] <= 2
+    assert starts[-1] - starts[0] >= 5 / 20 - 0.02
+    print(f"✓ Peak {active[1]} in flight, 6 requests over {starts[-1] - starts[0]:.2f}s")
+
+    assert host_throttle("https://www.zillow.com/newton-ma") is host_throttle("https://WWW.ZILLOW.COM/")
+    assert host_throttle("https://www.zillow.com/").concurrency == 1
+
+
+def test_sources_scraped_concurrently():
+    """Test 3: The three scrapers run at once, so the stage lasts about as long as the slowest"""
+    print("\n" + "="*60)
+    print("TEST 3: Concurrent Sources")
+    print("="*60)
+
+    class FakeScraper:
+        def __init__(self, source, delay, fail=False):
+            self.source, self.delay, self.fail = source, delay, fail
+
+        def search_location(self, city, state, max_pages=5):
+            time.sleep(self.delay)
+            if self.fail:
+                raise RuntimeError("blocked")
+            return [{'source': self.source, 'address': f"1 {city} St"}]
+
+        async def asearch_location(self, city, state, client, max_pages=5):
+            await asyncio.sleep(self.delay)
+            if self.fail:
+                raise RuntimeError("blocked")
+            return [{'source': self.source, 'address': f"1 {city} St"}]
+
+    pipeline = DevelopmentPipeline(search_cache=False)
+    pipeline.redfin_scraper = FakeScraper('redfin', 0.2)
+    pipeline.realtor_scraper = FakeScraper('realtor', 0.1)
+    pipeline.zillow_scraper = FakeScraper('zillow', 0.3, fail=True)
+
+    start = time.perf_counter()
+    results = list(pipeline._scrape_sources("Newton, MA", max_pages=2))
+    elapsed = time.perf_counter() - start
+    assert [name for name, _ in results] == ['Realtor.com', 'Redfin']
+    assert elapsed < 0.5, elapsed
+    print(f"✓ Sources in {elapsed:.2f}s (failed source skipped)")
+
+    start = time.perf_counter()
+    listings = asyncio.run(pipeline._ascrape_sources("Newton, MA", max_pages=2, client=None))
+    elapsed = time.perf_counter() - start
+    assert sorted(l['source'] for l in listings) == ['realtor', 'redfin']
+    assert elapsed < 0.5, elapsed
+    print(f"✓ Async sources in {elapsed:.2f}s")
+
+
+def test_rate_adapts_and_circuit_opens():
+    """Test 4: Block signals halve the rate, successes win it back, and repeated blocks stop the host"""
+    print("\n" + "="*60)
+    print("TEST 4: Adaptive Rate and Circuit")
+    print("="*60)
+
+    throttle = HostThrottle(concurrency=1, rate=8, host='www.zillow.com')
+    throttle.observe(429, retry_after='0')
+    assert throttle.rate == 4
+    throttle.observe(200, b'<html>listings</html>')
+    assert throttle.rate == 4.8
+    for _ in range(20):
+        throttle.observe(200)
+    assert throttle.rate == 8   # Never above the base rate
+    print(f"✓ AIMD: {throttle.stats()}")
+
+    try:
+        throttle.observe(200, b'<html>Please verify you are human (CAPTCHA)</html>')
+        assert False, "CAPTCHA page accepted"
+    except HostBlocked:
+        pass
+    throttle.observe(403, retry_after='0')
+    throttle.observe(429, retry_after='0')
+    assert throttle.circuit_open and throttle.rate == 1   # Floor: 1/8 of the base rate
+    try:
+        with throttle.slot():
+            assert False, "request let through an open circuit"
+    except HostBlocked as e:
+        print(f"✓ Circuit open: {e}")
+
+    throttle.reset()
+    assert throttle.stats() == {'rate': 8, 'blocks': 4, 'circuit_open': False}
+    with throttle.slot():
+        pass
+    print("✓ Reset for the next run")
+
+
+def test_captcha_page_skipped():
+    """Test 5: A CAPTCHA page served with 200 is skipped by the scraper and slows its host down"""
+    print("\n" + "="*60)
+    print("TEST 5: Block Page Detection")
+    print("="*60)
+
+    class CaptchaAdapter(requests.adapters.BaseAdapter):
+        def send(self, request, **kwargs):
+            response = requests.Response()
+            response.status_code = 200
+            response._content = b"<html><div id='captcha-container'>Press and hold</div></html>"
+            response.url = request.url
+            return response
+
+        def close(self):
+            pass
+
+    install_page_archive(None)
+    install_http_cache(None)
+    try:
+        scraper = ZillowScraper()
+        scraper.throttle = HostThrottle(concurrency=1, rate=4, host='www.zillow.com')
+        scraper.session.mount('https://', CaptchaAdapter())
+        assert scraper._scrape_search_page("https://www.zillow.com/newton-ma/") == []
+    finally:
+        install_page_archive(None)
+        install_http_cache(None)
+    assert scraper.throttle.stats() == {'rate': 2, 'blocks': 1, 'circuit_open': False}
+    print(f"✓ Skipped: {scraper.throttle.stats()}")
+
+
+if __name__ == "__main__":
+    test_pages_pipelined_in_order()
+    test_host_throttle_caps_concurrency_and_rate()
+    test_sources_scraped_concurrently()
+    test_rate_adapts_and_circuit_opens()
+    test_captcha_page_skipped()
+    print("\n✅ All page fetcher tests passed")
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Test script for query template yield analytics
+Validates per-template yield counters, their persistence and the budget planner
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Add project to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.core.query_planner import QueryPlanner, QueryYieldTracker
+from app.integrations.database_manager import HistoricalDatabaseManager
+from app.scraper.search_query_builder import SearchQueryBuilder
+
+
+def result(title, page=1):
+    return {'title': title, 'address': title if title[0].isdigit() else '', 'search_page': page}
+
+
+def test_tracker_counts_yield_per_template():
+    """Test 1: Results, real, new addresses and high-score leads are counted per template"""
+    print("\n" + "="*60)
+    print("TEST 1: Template Yield Counters")
+    print("="*60)
+
+    tracker = QueryYieldTracker(known_addresses=lambda addresses: {'1 cherry st, newton, ma 02465'})
+    tracker.record_search('teardown_sold', [
+        result("1 Cherry St, Newton, MA 02465"),          # Stored by an earlier run
+        result("2 Cherry St, Newton, MA 02465"),
+        result("Homes for sale in Newton, MA"),           # Category page
+        result("3 Cherry St, Newton, MA 02465", page=2),
+    ])
+    tracker.record_search('large_lot', [
+        result("2 Cherry St, Newton, MA 02465"),          # Already found by teardown_sold
+        result("9 Dudley Rd, Newton, MA 02459"),
+    ])
+    tracker.record_search('fixer_upper', [])
+
+    classified = [
+        dict(result("3 Cherry St, Newton, MA 02465"), query_template='teardown_sold', development_score=85),
+        dict(result("9 Dudley Rd, Newton, MA 02459"), query_template='large_lot', development_score=40),
+    ]
+    tracker.record_leads(classified)
+
+    stats = {s['template']: s for s in tracker.to_dicts()}
+    print(f"✓ {stats}")
+    assert stats['teardown_sold'] == {'template': 'teardown_sold', 'pages': 2, 'results': 4,
+                                      'real_addresses': 3, 'new_addresses': 2, 'high_score_leads': 1}
+    assert stats['large_lot']['new_addresses'] == 1
+    assert stats['large_lot']['high_score_leads'] == 0
+    assert stats['fixer_upper']['pages'] == 1  # An empty query still spent its first page
+
+
+def test_stats_accumulate_across_runs():
+    """Test 2: Per-run counters add up in the database, per location"""
+    print("\n" + "="*60)
+    print("TEST 2: Persisted Template Stats")
+    print("="*60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = HistoricalDatabaseManager(str(Path(tmp) / 'leads.db'))
+        run = [{'template': 'teardown_sold', 'pages': 2, 'results': 30, 'real_addresses': 12,
+                'new_addresses': 8, 'high_score_leads': 1}]
+        db.save_query_template_stats('Newton, MA', run)
+        db.save_query_template_stats('Newton, MA', run)
+        db.save_query_template_stats('Waltham, MA', run)
+
+        stats = db.get_query_template_stats('Newton, MA')['teardown_sold']
+        assert (stats['runs'], stats['pages'], stats['new_addresses'], stats['high_score_leads']) == (2, 4, 16, 2)
+        assert db.get_query_template_stats('Waltham, MA')['teardown_sold']['runs'] == 1
+
+        run_id = db.record_scan_run("teardown", "Newton, MA")
+        db.save_listings([{'address': "42 Lindbergh Ave, Newton, MA 02465"}], run_id)
+        assert db.get_known_addresses(["42 LINDBERGH AVE, Newton, MA 02465", "7 Walnut St"]) == \
+            {"42 lindbergh ave, newton, ma 02465"}
+        print("✓ Stats accumulate per location; known addresses match case-insensitively")
+
+
+def test_planner_spends_budget_on_best_templates():
+    """Test 3: The budget goes to high-yield and untried templates, deepest for the best"""
+    print("\n" + "="*60)
+    print("TEST 3: Query Budget Planner")
+    print("="*60)
+
+    templates = SearchQueryBuilder.build_template_queries("Newton, MA")
+    assert len(templates) == len(SearchQueryBuilder.ADDRESS_QUERY_TEMPLATES)
+    assert [query for _, query in templates] == SearchQueryBuilder.build_address_focused_queries("Newton, MA")
+
+    names = [name for name, _ in templates]
+    # Long history: two strong templates, the rest mostly category pages
+    stats = {name: {'pages': 20, 'new_addresses': 2, 'high_score_leads': 0} for name in names}
+    stats['teardown_sold'] = {'pages': 20, 'new_addresses': 60, 'high_score_leads': 6}
+    stats['large_lot'] = {'pages': 20, 'new_addresses': 50, 'high_score_leads': 2}
+    del stats['redfin_unit_number']  # Never run
+
+    planner = QueryPlanner()
+    plan = planner.plan(templates, stats, budget=6, max_pages=3)
+    print(f"✓ Plan: {[(q.template, q.max_pages) for q in plan]}")
+    assert [q.template for q in plan] == ['teardown_sold', 'large_lot', 'redfin_unit_number']
+    assert [q.max_pages for q in plan] == [3, 2, 1]
+    assert sum(q.max_pages for q in plan) == 6
+
+    assert len(planner.plan(templates, stats, budget=2)) == 2
+    unbudgeted = planner.plan(templates, stats, budget=None, max_pages=3)
+    assert [q.template for q in unbudgeted] == names
+    assert all(q.max_pages == 3 for q in unbudgeted)
+
+
+if __name__ == "__main__":
+    test_tracker_counts_yield_per_template()
+    test_stats_accumulate_across_runs()
+    test_planner_spends_budget_on_best_templates()
+    print("\n✅ All query planner tests passed")
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Test script for concurrent SerpAPI queries
+Validates the token-bucket limiter, 429 backoff and concurrent query execution
+"""
+
+import os
+import sys
+import time
+import threading
+from pathlib import Path
+
+# Add project to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import app.scraper.llm_search as llm_search
+from app.core.rate_limit import TokenBucket, backoff_delay
+
+
+class FakeResponse:
+    def __init__(self, status_code, data=None, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self._data = data or {}
+
+    def json(self):
+        return self._data
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise llm_search.requests.exceptions.HTTPError(f"{self.status_code} error")
+
+
+def test_token_bucket_burst_rate_and_pause():
+    """Test 1: The bucket allows a burst, then paces to its rate; pause() holds everyone back"""
+    print("\n" + "="*60)
+    print("TEST 1: Token Bucket")
+    print("="*60)
+
+    bucket = TokenBucket(rate=20, capacity=3)
+    delays = [bucket.reserve() for _ in range(5)]
+    print(f"✓ Delays: {[round(d, 3) for d in delays]}")
+    assert delays[:3] == [0.0, 0.0, 0.0]
+    assert 0.04 <= delays[3] <= 0.06
+    assert 0.09 <= delays[4] <= 0.11
+
+    bucket = TokenBucket(rate=100, capacity=5)
+    bucket.pause(0.2)
+    assert bucket.reserve() >= 0.19  # Burst tokens are dropped too
+    assert bucket.reserve() >= 0.2
+
+    assert backoff_delay(0, retry_after='3') == 3.0
+    assert 4.0 <= backoff_delay(2, base=1.0) <= 5.0
+    assert backoff_delay(10, base=1.0, cap=30.0) == 30.0
+
+
+def test_queries_run_concurrently_with_429_backoff():
+    """Test 2: search_multiple_queries overlaps queries and retries 429s after backing off"""
+    print("\n" + "="*60)
+    print("TEST 2: Concurrent Queries with 429 Backoff")
+    print("="*60)
+
+    calls, lock = [], threading.Lock()
+    rate_limited = {'teardown': 1}
+
+    def fake_get(url, params=None, timeout=None):
+        query = params['q'].split()[0]
+        with lock:
+            calls.append(query)
+            throttle = rate_limited.get(query, 0) > 0
+            if throttle:
+                rate_limited[query] -= 1
+        if throttle:
+            return FakeResponse(429, headers={'Retry-After': '0.1'})
+        time.sleep(0.2)
+        return FakeResponse(200, {'organic_results': [{
+            'title': f"{len(query)} {query.title()} Rd, Newton, MA 02459",
+            'link': f"https://www.zillow.com/homedetails/{query}"
+        }]})
+
+    # Scoped so other test modules don't see a (fake) SerpAPI key
+    saved_key = os.environ.get('SERPAPI_KEY')
+    os.environ['SERPAPI_KEY'] = 'test'
+    try:
+        searcher = llm_search.LLMSearch()
+    finally:
+        if saved_key is None:
+            del os.environ['SERPAPI_KEY']
+        else:
+            os.environ['SERPAPI_KEY'] = saved_key
+    searcher.rate_limiter = TokenBucket(rate=50, capacity=10)
+    queries = ['teardown', 'builder', 'fixer', 'estate', 'lot', 'ranch']
+
+    original_get = llm_search.requests.get
+    llm_search.requests.get = fake_get
+    try:
+        start = time.perf_counter()
+        results = searcher.search_multiple_queries(queries, "Newton, MA")
+        elapsed = time.perf_counter() - start
+    finally:
+        llm_search.requests.get = original_get
+
+    print(f"✓ {len(queries)} queries ({len(calls)} requests) in {elapsed:.2f}s")
+    assert len(calls) == len(queries) + 1  # One retry after the 429
+    assert elapsed < 0.9  # Sequential would be 6 x 0.2s plus 1s sleeps between queries
+    assert [r['link'].rsplit('/', 1)[1] for r in results] == queries  # Query order kept
+
+
+if __name__ == "__main__":
+    test_token_bucket_burst_rate_and_pause()
+    test_queries_run_concurrently_with_429_backoff()
+    print("\n✅ All rate limit tests passed")
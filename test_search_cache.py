@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Test script for the persistent SerpAPI response cache
+Validates cache keys, per-engine TTLs, hit/miss counters and purging expired entries
+"""
+
+import sys
+import time
+import tempfile
+from pathlib import Path
+
+# Add project to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import app.scraper.llm_search as llm_search
+from app.core.shared_cache import SharedCache, MISS
+from app.dev_pipeline import DevelopmentPipeline
+from serpapi_test_utils import FakeResponse, make_searcher
+
+
+def test_cache_key_ignores_api_key_and_formatting():
+    """Test 1: Keys come from normalized params without the api_key; namespaces are per engine"""
+    print("\n" + "="*60)
+    print("TEST 1: Cache Keys")
+    print("="*60)
+
+    searcher = make_searcher(cache=None)
+    base = searcher._search_params("teardown  Lindbergh", "Newton, MA", 20)
+    other_key = dict(base, api_key='another-account', q=base['q'].upper())
+
+    assert searcher._cache_entry(base) == searcher._cache_entry(other_key)
+    assert searcher._cache_entry(base)[0] == 'serpapi:google'
+    assert searcher._cache_entry(dict(base, engine='google_maps'))[0] == 'serpapi:google_maps'
+    assert searcher._cache_entry(base) != searcher._cache_entry(dict(base, num=40))
+    print("✓ api_key, case and whitespace don't change the key")
+
+
+def test_repeated_queries_hit_cache_until_ttl():
+    """Test 2: Repeats are served from disk until their engine's TTL; errors are not cached"""
+    print("\n" + "="*60)
+    print("TEST 2: Cached Searches")
+    print("="*60)
+
+    requests_made = []
+
+    def fake_get(url, params=None, timeout=None):
+        requests_made.append(params['q'])
+        if 'broken' in params['q']:
+            return FakeResponse({'error': 'Invalid query'})
+        return FakeResponse({'organic_results': [{
+            'title': "42 Lindbergh Ave, Newton, MA 02465",
+            'link': f"https://www.zillow.com/homedetails/{len(requests_made)}"
+        }]})
+
+    original_get = llm_search.requests.get
+    llm_search.requests.get = fake_get
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = SharedCache(Path(tmp) / 'cache.db')
+            searcher = make_searcher(cache=cache, cache_ttl={'google': 0.3})
+
+            first = searcher.search_properties("teardown", "Newton, MA")
+            # A new client (e.g. the next scheduled run) reuses the same file
+            again = make_searcher(cache=SharedCache(Path(tmp) / 'cache.db')).search_properties("teardown", "Newton, MA")
+            assert len(requests_made) == 1
+            assert [l['link'] for l in again] == [l['link'] for l in first]
+
+            searcher.search_properties("broken", "Newton, MA")
+            searcher.search_properties("broken", "Newton, MA")
+            assert len(requests_made) == 3
+
+            time.sleep(0.35)
+            searcher.search_properties("teardown", "Newton, MA")
+            assert len(requests_made) == 4
+
+            print(f"✓ Cache stats: {searcher.cache_stats}")
+            assert searcher.cache_stats == {'google': {'hits': 0, 'misses': 4}}
+            searcher.search_properties("teardown", "Newton, MA")
+            assert searcher.cache_stats['google']['hits'] == 1
+            assert len(requests_made) == 4
+    finally:
+        llm_search.requests.get = original_get
+
+
+def test_expired_entries_purged_each_run():
+    """Test 3: The pipeline drops expired entries from its cache file when a run finishes"""
+    print("\n" + "="*60)
+    print("TEST 3: Expired Entry Purge")
+    print("="*60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / 'cache.db')
+        cache = SharedCache(path)
+        cache.set('serpapi:google', 'stale', {'organic_results': []}, ttl=0.01)
+        cache.set('serpapi:google', 'fresh', {'organic_results': []}, ttl=3600)
+        cache.set('geocode', 'forever', {'lat': 42.33, 'lon': -71.2})
+        time.sleep(0.05)
+
+        pipeline = DevelopmentPipeline(cache_path=path)
+        pipeline._purge_caches()
+
+        with cache._get_connection() as conn:
+            keys = sorted(row[0] for row in conn.execute("SELECT cache_key FROM cache_entries"))
+        print(f"✓ Entries left: {keys}")
+        assert keys == ['forever', 'fresh']
+        assert cache.get('serpapi:google', 'stale') is MISS
+
+
+if __name__ == "__main__":
+    test_cache_key_ignores_api_key_and_formatting()
+    test_repeated_queries_hit_cache_until_ttl()
+    test_expired_entries_purged_each_run()
+    print("\n✅ All search cache tests passed")
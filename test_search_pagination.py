@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Test script for paginated SerpAPI searches
+Validates start offsets and stopping once pages stop adding new real addresses
+"""
+
+import sys
+from pathlib import Path
+
+# Add project to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import app.scraper.llm_search as llm_search
+from serpapi_test_utils import FakeResponse, make_searcher
+
+
+def fake_serpapi(pages, requested):
+    """requests.get stand-in serving `pages` (lists of titles) by start offset"""
+    def fake_get(url, params=None, timeout=None):
+        start = params.get('start', 0)
+        requested.append(start)
+        page = start // params['num']
+        titles = pages[page] if page < len(pages) else []
+        data = {'organic_results': [
+            {'title': title, 'link': f"https://www.zillow.com/homedetails/{page}-{i}"}
+            for i, title in enumerate(titles)
+        ]}
+        if page + 1 < len(pages):
+            data['serpapi_pagination'] = {'next': f"https://serpapi.com/search?start={start + params['num']}"}
+        return FakeResponse(data)
+    return fake_get
+
+
+def test_pages_walk_start_offsets():
+    """Test 1: Pages are requested at successive start offsets; page 1 has no start param"""
+    print("\n" + "="*60)
+    print("TEST 1: Start Offsets")
+    print("="*60)
+
+    searcher = make_searcher()
+    assert 'start' not in searcher._search_params("teardown", "Newton, MA", 10)
+    assert searcher._search_params("teardown", "Newton, MA", 10, start=20)['start'] == 20
+
+    pages = [[f"{page * 10 + i} Walnut St, Newton, MA 02460" for i in range(10)] for page in range(5)]
+    requested = []
+    original_get = llm_search.requests.get
+    llm_search.requests.get = fake_serpapi(pages, requested)
+    try:
+        listings = searcher.search_properties_paginated("teardown", "Newton, MA", num_results=10, max_pages=4)
+        assert requested == [0, 10, 20, 30]
+        assert len(listings) == 40
+
+        # SerpAPI reports no page after the last one
+        requested.clear()
+        listings = searcher.search_properties_paginated("teardown", "Newton, MA", num_results=10, max_pages=10)
+        assert requested == [0, 10, 20, 30, 40]
+        assert len(listings) == 50
+        print(f"✓ Offsets requested: {requested}")
+    finally:
+        llm_search.requests.get = original_get
+
+
+def test_low_yield_page_stops_search():
+    """Test 2: A page adding too few new real addresses is the last one fetched"""
+    print("\n" + "="*60)
+    print("TEST 2: Yield-Based Early Stop")
+    print("="*60)
+
+    pages = [
+        [f"{i} Cherry St, Newton, MA 02465" for i in range(1, 11)],
+        # Repeats of page 1, category pages and just one new address
+        [f"{i} Cherry St, Newton, MA 02465" for i in range(1, 8)]
+        + ["Homes for sale in Newton, MA", "Newton MA real estate listings", "99 Dudley Rd, Newton, MA 02459"],
+        [f"{i} Beacon St, Newton, MA 02459" for i in range(1, 11)],
+    ]
+    requested = []
+    searcher = make_searcher()
+    original_get = llm_search.requests.get
+    llm_search.requests.get = fake_serpapi(pages, requested)
+    try:
+        listings = searcher.search_properties_paginated("teardown", "Newton, MA", num_results=10,
+                                                        max_pages=3, min_yield=0.2)
+        print(f"✓ Stopped after {len(requested)} pages with {len(listings)} results")
+        assert requested == [0, 10]
+        assert len(listings) == 20  # Results of the last page are still returned
+
+        requested.clear()
+        searcher.search_properties_paginated("teardown", "Newton, MA", num_results=10,
+                                             max_pages=3, min_yield=0.1)
+        assert requested == [0, 10, 20]
+    finally:
+        llm_search.requests.get = original_get
+
+
+if __name__ == "__main__":
+    test_pages_walk_start_offsets()
+    test_low_yield_page_stops_search()
+    print("\n✅ All search pagination tests passed")
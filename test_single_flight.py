@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Test script for request coalescing
+Validates that concurrent identical requests share one call and its outcome
+"""
+
+import sys
+import time
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+# Add project to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import requests
+from app.core.api_limits import api_call_counts
+from app.core.single_flight import SingleFlight, CoalescingSession
+
+
+def test_concurrent_calls_share_one_call():
+    """Test 1: Overlapping callers with one key share the call; later callers make a new one"""
+    print("\n" + "="*60)
+    print("TEST 1: Single Flight")
+    print("="*60)
+
+    flights = SingleFlight()
+    made = []
+
+    def slow_call():
+        made.append(1)
+        time.sleep(0.1)
+        return {'lat': 42.33}
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda _: flights.do('geocode', slow_call), range(8)))
+
+    print(f"✓ {len(made)} call for 8 callers")
+    assert len(made) == 1
+    assert all(result is results[0] for result in results)
+    assert (flights.calls, flights.shared) == (1, 7)
+
+    flights.do('geocode', slow_call)
+    assert len(made) == 2
+
+
+def test_errors_reach_every_waiter():
+    """Test 2: A failed call raises in every caller that shared it"""
+    print("\n" + "="*60)
+    print("TEST 2: Shared Errors")
+    print("="*60)
+
+    flights = SingleFlight()
+    started = threading.Event()
+
+    def failing_call():
+        started.set()
+        time.sleep(0.1)
+        raise requests.exceptions.ConnectionError("down")
+
+    errors = []
+
+    def caller():
+        try:
+            flights.do('parcel', failing_call)
+        except requests.exceptions.ConnectionError as e:
+            errors.append(e)
+
+    first = threading.Thread(target=caller)
+    first.start()
+    started.wait()
+    others = [threading.Thread(target=caller) for _ in range(3)]
+    for thread in others:
+        thread.start()
+    for thread in [first] + others:
+        thread.join()
+    assert len(errors) == 4
+    print("✓ Error shared")
+
+
+def test_session_coalesces_identical_gets():
+    """Test 3: CoalescingSession sends one request for identical GETs and holds one api slot"""
+    print("\n" + "="*60)
+    print("TEST 3: Coalescing Session")
+    print("="*60)
+
+    sent = []
+
+    class FakeAdapter(requests.adapters.BaseAdapter):
+        def send(self, request, **kwargs):
+            sent.append(request.url)
+            time.sleep(0.1)
+            response = requests.Response()
+            response.status_code = 200
+            response._content = b'[{"lat": "42.33", "lon": "-71.2"}]'
+            response.url = request.url
+            return response
+
+        def close(self):
+            pass
+
+    session = CoalescingSession(flights=SingleFlight())
+    session.mount('https://', FakeAdapter())
+    url = 'https://nominatim.example/search'
+    before = api_call_counts().get('nominatim', 0)
+
+    def geocode(i):
+        headers = {'User-Agent': f'agent-{i}'}  # Rotating headers don't split requests
+        return session.get(url, params={'q': '42 Lindbergh Ave', 'format': 'json'},
+                           headers=headers, timeout=10, slot='nominatim')
+
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        responses = list(executor.map(geocode, range(5)))
+
+    assert len(sent) == 1
+    assert all(r.json()[0]['lat'] == '42.33' for r in responses)
+    assert api_call_counts().get('nominatim', 0) - before == 1
+
+    # Different parameters and non-GET requests are sent separately
+    session.get(url, params={'q': '43 Lindbergh Ave', 'format': 'json'})
+    session.post(url, data={'q': '42 Lindbergh Ave'})
+    assert len(sent) == 3
+    print(f"✓ {len(sent)} requests sent for 7 calls")
+
+
+if __name__ == "__main__":
+    test_concurrent_calls_share_one_call()
+    test_errors_reach_every_waiter()
+    test_session_coalesces_identical_gets()
+    print("\n✅ All single-flight tests passed")
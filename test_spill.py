@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Test script for bounded-memory spill mode
+Validates spilling, out-of-core dedup/sort and streamed result files
+"""
+
+import sys
+import json
+import pickle
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+# Add project to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import app.utils
+from app.core.spill import SpillBuffer, SpillSet
+
+
+def make_listings(count):
+    return [
+        {'address': f"{i % 40} Lindbergh Ave, Newton, MA", 'price': 500000 + i,
+         'development_score': (i * 37) % 100, 'notes': 'x' * 200}
+        for i in range(count)
+    ]
+
+
+def test_buffer_spills_and_keeps_order():
+    """Test 1: Records past the memory limit go to disk; iteration keeps append order"""
+    print("\n" + "="*60)
+    print("TEST 1: Spill Buffer")
+    print("="*60)
+
+    listings = make_listings(200)
+    with tempfile.TemporaryDirectory() as tmp:
+        buffer = SpillBuffer(memory_limit_mb=0.01, root=Path(tmp))  # ~10 KB in memory
+        buffer.extend(listings)
+
+        print(f"✓ {len(buffer)} records, {len(buffer.segments)} segments, {buffer.in_memory} in memory")
+        assert buffer.spilled
+        assert buffer.in_memory < 50
+        assert len(buffer) == 200
+        assert list(buffer) == listings
+        assert list(buffer) == listings  # re-iterable
+
+        # Handed across processes on the same host, e.g. from a worker
+        restored = pickle.loads(pickle.dumps(buffer))
+        assert list(restored) == listings
+
+        buffer.close()
+        assert not any(Path(tmp).iterdir())
+
+
+def test_out_of_core_dedup_and_sort():
+    """Test 2: unique() and sorted() on spilled buffers match their in-memory results"""
+    print("\n" + "="*60)
+    print("TEST 2: Out-of-Core Dedup and Sort")
+    print("="*60)
+
+    listings = make_listings(300)
+    with tempfile.TemporaryDirectory() as tmp:
+        with SpillBuffer(memory_limit_mb=0.01, root=Path(tmp)) as buffer:
+            buffer.extend(listings)
+
+            with buffer.unique('address') as unique:
+                assert [l['address'] for l in unique] == [l['address'] for l in listings[:40]]
+                assert [l['price'] for l in unique] == [l['price'] for l in listings[:40]]
+
+            score = lambda l: l['development_score']
+            with buffer.sorted(key=score, reverse=True) as ordered:
+                assert [score(l) for l in ordered] == sorted(map(score, listings), reverse=True)
+                assert len(ordered) == 300
+            print("✓ Dedup and external sort match in-memory results")
+
+        keys = SpillSet(max_keys=5, root=Path(tmp))
+        added = [keys.add(str(i % 8)) for i in range(20)]
+        assert keys.spilled
+        assert added == [True] * 8 + [False] * 12
+        assert '3' in keys and '9' not in keys
+        assert len(keys) == 8
+        keys.close()
+        print("✓ Key index spilled to disk after 5 keys")
+
+
+def test_streamed_result_files():
+    """Test 3: save_to_csv/save_to_json write spill buffers like the list path"""
+    print("\n" + "="*60)
+    print("TEST 3: Streamed Result Files")
+    print("="*60)
+
+    listings = make_listings(60)
+    listings[5]['zoning'] = 'SR-2'  # Column appearing mid-stream
+    original_data_dir = app.utils.DATA_DIR
+    with tempfile.TemporaryDirectory() as tmp:
+        app.utils.DATA_DIR = Path(tmp)
+        try:
+            with SpillBuffer(memory_limit_mb=0.005, root=Path(tmp) / 'spill') as buffer:
+                buffer.extend(listings)
+                app.utils.save_to_csv(listings, 'list.csv')
+                app.utils.save_to_csv(buffer, 'spilled.csv')
+                app.utils.save_to_json(listings, 'list.json')
+                app.utils.save_to_json(buffer, 'spilled.json')
+
+            assert (Path(tmp) / 'spilled.json').read_text() == (Path(tmp) / 'list.json').read_text()
+            assert json.loads((Path(tmp) / 'spilled.json').read_text()) == listings
+            pd.testing.assert_frame_equal(pd.read_csv(Path(tmp) / 'spilled.csv'),
+                                          pd.read_csv(Path(tmp) / 'list.csv'))
+            print("✓ CSV and JSON match the in-memory export")
+        finally:
+            app.utils.DATA_DIR = original_data_dir
+
+
+if __name__ == "__main__":
+    test_buffer_spills_and_keeps_order()
+    test_out_of_core_dedup_and_sort()
+    test_streamed_result_files()
+    print("\n✅ All spill mode tests passed")
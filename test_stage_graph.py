@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Test script for the pipeline stage dependency graph
+Validates concurrent sink execution and dependency ordering
+"""
+
+import sys
+import time
+import threading
+from pathlib import Path
+
+# Add project to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.core.stage_graph import StageGraph
+
+
+def test_independent_stages_run_concurrently():
+    """Test 1: Independent sinks overlap instead of running back to back"""
+    print("\n" + "="*60)
+    print("TEST 1: Concurrent Independent Stages")
+    print("="*60)
+
+    graph = StageGraph(max_workers=4)
+    for name in ('sheets', 'alerts', 'database'):
+        graph.add_stage(name, lambda: time.sleep(0.2))
+
+    start = time.perf_counter()
+    results = graph.run()
+    elapsed = time.perf_counter() - start
+
+    print(f"✓ 3 x 0.2s stages finished in {elapsed:.2f}s")
+    assert all(r.ok for r in results.values())
+    assert elapsed < 0.5
+
+
+def test_dependent_stage_waits():
+    """Test 2: Map stage starts only after the database stage finishes"""
+    print("\n" + "="*60)
+    print("TEST 2: Dependency Ordering")
+    print("="*60)
+
+    order = []
+    lock = threading.Lock()
+
+    def record(name, delay):
+        def stage():
+            time.sleep(delay)
+            with lock:
+                order.append(name)
+            return name
+        return stage
+
+    graph = StageGraph(max_workers=4)
+    graph.add_stage('database', record('database', 0.1))
+    graph.add_stage('map', record('map', 0.0), depends_on=['database'])
+    graph.add_stage('sheets', record('sheets', 0.3))
+    results = graph.run()
+
+    print(f"✓ Completion order: {order}")
+    assert order.index('database') < order.index('map')
+    assert results['map'].started_at >= results['database'].finished_at
+    # The map must not wait on the unrelated (slower) sheets stage
+    assert order.index('map') < order.index('sheets')
+
+
+def test_failing_stage_is_isolated():
+    """Test 3: A failing sink is reported without cancelling the others"""
+    print("\n" + "="*60)
+    print("TEST 3: Failure Isolation")
+    print("="*60)
+
+    def boom():
+        raise RuntimeError("sheets quota exceeded")
+
+    graph = StageGraph(max_workers=2)
+    graph.add_stage('sheets', boom)
+    graph.add_stage('database', lambda: 42)
+    graph.add_stage('map', lambda: 'map.html', depends_on=['database'])
+    results = graph.run()
+
+    print(f"✓ sheets error: {results['sheets'].error}")
+    assert not results['sheets'].ok
+    assert results['database'].value == 42
+    assert results['map'].value == 'map.html'
+
+
+def test_invalid_graphs_rejected():
+    """Test 4: Unknown dependencies and cycles are rejected up front"""
+    print("\n" + "="*60)
+    print("TEST 4: Graph Validation")
+    print("="*60)
+
+    graph = StageGraph()
+    graph.add_stage('map', lambda: None, depends_on=['database'])
+    try:
+        graph.run()
+        assert False, "unknown dependency should be rejected"
+    except ValueError as e:
+        print(f"✓ Rejected: {e}")
+
+    graph = StageGraph()
+    graph.add_stage('a', lambda: None, depends_on=['b'])
+    graph.add_stage('b', lambda: None, depends_on=['a'])
+    try:
+        graph.run()
+        assert False, "cycle should be rejected"
+    except ValueError as e:
+        print(f"✓ Rejected: {e}")
+
+
+if __name__ == "__main__":
+    test_independent_stages_run_concurrently()
+    test_dependent_stage_waits()
+    test_failing_stage_is_isolated()
+    test_invalid_graphs_rejected()
+    print("\n✅ All stage graph tests passed")
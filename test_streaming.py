@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Test script for the streaming stage runner
+Validates per-item flow, overlap between stages and error isolation
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add project to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.core.streaming import StreamStage, stream_through
+
+
+def test_items_flow_through_all_stages():
+    """Test 1: Every item passes each stage; None drops an item"""
+    print("\n" + "="*60)
+    print("TEST 1: Items Flow Through Stages")
+    print("="*60)
+
+    stages = [
+        StreamStage('enrich', lambda x: x * 10, workers=2),
+        StreamStage('classify', lambda x: None if x == 30 else x + 1, workers=3),
+    ]
+    results = sorted(stream_through(range(1, 6), stages, queue_size=2))
+
+    print(f"✓ Results: {results}")
+    assert results == [11, 21, 41, 51]
+
+
+def test_first_item_arrives_before_source_finishes():
+    """Test 2: Downstream work starts before the slow source is exhausted"""
+    print("\n" + "="*60)
+    print("TEST 2: Time To First Result")
+    print("="*60)
+
+    def slow_source():
+        for i in range(5):
+            yield i
+            time.sleep(0.1)
+
+    start = time.perf_counter()
+    stream = stream_through(slow_source(), [StreamStage('enrich', lambda x: x)])
+    first = next(stream)
+    first_after = time.perf_counter() - start
+    rest = list(stream)
+
+    print(f"✓ First item after {first_after:.2f}s")
+    assert first == 0
+    assert first_after < 0.3
+    assert len(rest) == 4
+
+
+def test_stage_errors_drop_only_that_item():
+    """Test 3: An exception for one item does not stop the stream; pass-through stages keep the item"""
+    print("\n" + "="*60)
+    print("TEST 3: Error Isolation")
+    print("="*60)
+
+    def flaky(x):
+        if x == 2:
+            raise RuntimeError("OpenAI timeout")
+        return x
+
+    results = sorted(stream_through(range(5), [StreamStage('classify', flaky, workers=2)]))
+
+    print(f"✓ Results: {results}")
+    assert results == [0, 1, 3, 4]
+
+    # Enrichment failures keep the un-enriched item, as in batch mode
+    def flaky_enrich(x):
+        if x == 2:
+            raise RuntimeError("GIS timeout")
+        return x * 10
+
+    stages = [StreamStage('enrich', flaky_enrich, workers=2, pass_through_on_error=True),
+              StreamStage('classify', lambda x: x + 1)]
+    results = sorted(stream_through(range(5), stages))
+    print(f"✓ Passed through: {results}")
+    assert results == [1, 3, 11, 31, 41]
+
+
+def test_early_close_stops_workers():
+    """Test 4: Closing the generator early does not hang"""
+    print("\n" + "="*60)
+    print("TEST 4: Early Close")
+    print("="*60)
+
+    stream = stream_through(iter(range(10_000)), [StreamStage('enrich', lambda x: x)], queue_size=4)
+    assert next(stream) is not None
+
+    start = time.perf_counter()
+    stream.close()
+    elapsed = time.perf_counter() - start
+
+    print(f"✓ Closed in {elapsed:.2f}s")
+    assert elapsed < 2
+
+
+if __name__ == "__main__":
+    test_items_flow_through_all_stages()
+    test_first_item_arrives_before_source_finishes()
+    test_stage_errors_drop_only_that_item()
+    test_early_close_stops_workers()
+    print("\n✅ All streaming tests passed")
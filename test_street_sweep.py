@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Test script for street-sweep search mode
+Validates street list loading, rotation across runs and street query planning
+"""
+
+import sys
+import tempfile
+from types import SimpleNamespace
+from pathlib import Path
+
+# Add project to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.core.query_planner import QueryYieldTracker
+from app.core.shared_cache import SharedCache
+from app.dev_pipeline import DevelopmentPipeline
+from app.integrations.database_manager import HistoricalDatabaseManager
+from app.scraper.street_sweep import (
+    load_street_list, next_streets, street_from_address, streets_from_parcel_cache
+)
+
+STREETS = ['Lindbergh Ave', 'Cherry St', 'Nahanton St', 'Dudley Rd', 'Rockland Pl']
+
+
+def test_street_lists_load():
+    """Test 1: Streets come from text/CSV lists or from cached parcel lookups"""
+    print("\n" + "="*60)
+    print("TEST 1: Street Lists")
+    print("="*60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        text = Path(tmp) / 'newton_ma.txt'
+        text.write_text("# Newton streets\nLindbergh Ave\ncherry st  # duplicate below\n\nCherry St\nDudley  Rd\n")
+        assert load_street_list(text) == ['Lindbergh Ave', 'cherry st', 'Dudley Rd']
+
+        table = Path(tmp) / 'streets.csv'
+        table.write_text("ward,ST_NAME\n1,Walnut St\n2,Beacon St\n3,Walnut St\n")
+        assert load_street_list(table) == ['Walnut St', 'Beacon St']
+
+        assert street_from_address("42 Lindbergh Ave, Newton, MA 02465") == 'Lindbergh Ave'
+        assert street_from_address("12A Cherry St Unit 3") == 'Cherry St'
+        assert street_from_address("Homes for sale in Newton, MA") is None
+
+        cache = SharedCache(Path(tmp) / 'cache.db')
+        cache.set('parcel', '42 lindbergh ave', {'parcel_id': 'P1'})
+        cache.set('parcel', '7 lindbergh ave', {'parcel_id': 'P2'})
+        cache.set('parcel', '5 nowhere ln', None)  # Lookup that found no parcel
+        cache.set('parcel', '9 rockland pl', {'parcel_id': 'P3'})
+        assert streets_from_parcel_cache(cache) == ['Lindbergh Ave', 'Rockland Pl']
+        print("✓ Text, CSV and parcel-cache street lists")
+
+
+def test_rotation_covers_every_street():
+    """Test 2: Successive runs sweep the least recently swept streets first"""
+    print("\n" + "="*60)
+    print("TEST 2: Street Rotation")
+    print("="*60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = HistoricalDatabaseManager(str(Path(tmp) / 'leads.db'))
+        sweeps = []
+        for _ in range(4):
+            chosen = next_streets(STREETS, db.get_street_sweep_history('Newton, MA'), 2)
+            sweeps.append(chosen)
+            db.record_street_sweeps('Newton, MA', [{'street': street, 'results': 10} for street in chosen])
+
+        print(f"✓ Runs: {sweeps}")
+        assert sweeps[0] == ['Lindbergh Ave', 'Cherry St']
+        assert sweeps[1] == ['Nahanton St', 'Dudley Rd']
+        assert sweeps[2] == ['Lindbergh Ave', 'Rockland Pl']  # Rockland never swept, then the oldest
+        assert sweeps[3] == ['Cherry St', 'Nahanton St']
+
+        history = db.get_street_sweep_history('Newton, MA')
+        assert history['Lindbergh Ave']['sweeps'] == 2
+        assert history['Lindbergh Ave']['results'] == 20
+        assert db.get_street_sweep_history('Waltham, MA') == {}
+
+
+def test_pipeline_plans_street_queries():
+    """Test 3: The pipeline adds one-page street queries and records their yield per street"""
+    print("\n" + "="*60)
+    print("TEST 3: Street Sweep Plan")
+    print("="*60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        street_list = Path(tmp) / 'streets.txt'
+        street_list.write_text('\n'.join(STREETS))
+
+        pipeline = DevelopmentPipeline(search_cache=False)
+        pipeline.llm_search = SimpleNamespace(SEARCH_MAX_PAGES=3)  # Planning sends no requests
+        pipeline.database = HistoricalDatabaseManager(str(Path(tmp) / 'leads.db'))
+        pipeline.database.record_street_sweeps('Newton, MA', [{'street': 'Lindbergh Ave'}])
+
+        plan = pipeline._plan_queries('Newton, MA', street_sweep=2, street_list=str(street_list))
+        streets = [q for q in plan if q.street]
+        assert len(plan) == 10 + 2
+        assert [q.street for q in streets] == ['Cherry St', 'Nahanton St']
+        assert all(q.max_pages == 1 and q.template == 'street_sweep' for q in streets)
+        assert streets[0].query == '"Cherry St" Newton, MA real estate for sale'
+
+        tracker = QueryYieldTracker()
+        for planned in streets:
+            tracker.record_search(planned.template, [
+                {'title': f"{n} {planned.street}, Newton, MA", 'address': f"{n} {planned.street}, Newton, MA"}
+                for n in (10, 12)
+            ], street=planned.street)
+        pipeline._save_query_yield('Newton, MA', tracker, [])
+
+        history = pipeline.database.get_street_sweep_history('Newton, MA')
+        assert history['Cherry St']['new_addresses'] == 2
+        assert pipeline.database.get_query_template_stats('Newton, MA')['street_sweep']['real_addresses'] == 4
+
+        # Missing street lists skip the sweep instead of failing the run
+        assert pipeline._plan_street_sweep('Newton, MA', 2, str(Path(tmp) / 'missing.txt')) == []
+        print(f"✓ Planned streets: {[q.street for q in streets]}")
+
+
+if __name__ == "__main__":
+    test_street_lists_load()
+    test_rotation_covers_every_street()
+    test_pipeline_plans_street_queries()
+    print("\n✅ All street sweep tests passed")